@@ -0,0 +1,468 @@
+"""Local load test for the lead agent and its A2A delegation path.
+
+Runs entirely on localhost, without Bedrock:
+
+* N stub A2A servers (subprocesses of this file) answer with configurable
+  latency and token rate.
+* The backend app from main.py runs in-process on its own thread and event
+  loop, with MODEL replaced by a scripted model that delegates each query to
+  the next remote agent in turn and then streams a canned answer.
+* M concurrent sessions drive /invoke_stream for a number of turns each.
+
+The report records TTFT, turn latency, throughput, error rate, thread count,
+CPU and event-loop lag on the backend loop, the requests each stub agent
+served, and is written as JSON so runs
+can be compared. The backend runs in the same process as the load
+generator, so ``cpu_utilisation`` covers both, not the backend alone; it is
+only meaningful compared between runs:
+
+    uv run loadtest.py --agents 3 --sessions 20 --turns 3 --output run.json
+    uv run loadtest.py ... --baseline run.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import typing
+import uuid
+from typing import Any, Iterable, Optional
+
+import httpx
+import uvicorn
+
+
+# ---------------------------------------------------------------------------
+# Stub A2A server
+# ---------------------------------------------------------------------------
+
+def run_stub_agent(port: int, index: int, latency: float, tokens_per_sec: float, tokens: int):
+    from a2a.server.agent_execution import AgentExecutor, RequestContext
+    from a2a.server.apps import A2AStarletteApplication
+    from a2a.server.events.event_queue import EventQueue
+    from a2a.server.request_handlers import DefaultRequestHandler
+    from a2a.server.tasks import InMemoryTaskStore
+    from a2a.types import (
+        AgentCapabilities,
+        AgentCard,
+        AgentSkill,
+        TaskArtifactUpdateEvent,
+        TaskState,
+        TaskStatus,
+        TaskStatusUpdateEvent,
+    )
+    from a2a.utils import new_agent_text_message, new_task, new_text_artifact
+
+    async def enqueue(event_queue, event):
+        result = event_queue.enqueue_event(event)
+        if asyncio.iscoroutine(result):
+            await result
+
+    served = 0
+
+    class StubExecutor(AgentExecutor):
+        async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+            nonlocal served
+            served += 1
+            task = context.current_task or new_task(context.message)
+            if not context.current_task:
+                await enqueue(event_queue, task)
+            await asyncio.sleep(latency)
+            interval = 1 / tokens_per_sec if tokens_per_sec else 0
+            text = []
+            for i in range(tokens):
+                text.append(f"word{i} ")
+                await enqueue(
+                    event_queue,
+                    TaskStatusUpdateEvent(
+                        status=TaskStatus(
+                            state=TaskState.working,
+                            message=new_agent_text_message(text[-1], task.contextId, task.id),
+                        ),
+                        final=False,
+                        contextId=task.contextId,
+                        taskId=task.id,
+                    ),
+                )
+                if interval:
+                    await asyncio.sleep(interval)
+            await enqueue(
+                event_queue,
+                TaskArtifactUpdateEvent(
+                    append=False,
+                    contextId=task.contextId,
+                    taskId=task.id,
+                    lastChunk=True,
+                    artifact=new_text_artifact(name="current_result", text="".join(text)),
+                ),
+            )
+            await enqueue(
+                event_queue,
+                TaskStatusUpdateEvent(
+                    status=TaskStatus(state=TaskState.completed),
+                    final=True,
+                    contextId=task.contextId,
+                    taskId=task.id,
+                ),
+            )
+
+        async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+            pass
+
+    card = AgentCard(
+        name=f"stub agent {index}",
+        description="Stub remote agent for load testing.",
+        url=f"http://127.0.0.1:{port}/",
+        version="1.0.0",
+        defaultInputModes=["text"],
+        defaultOutputModes=["text"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[
+            AgentSkill(
+                id="echo",
+                name="echo",
+                description="Answers any question with canned text.",
+                tags=["stub"],
+                examples=["anything"],
+            )
+        ],
+    )
+    handler = DefaultRequestHandler(agent_executor=StubExecutor(), task_store=InMemoryTaskStore())
+    app = A2AStarletteApplication(agent_card=card, http_handler=handler).build()
+
+    async def stats(request):
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({"name": card.name, "requests": served})
+
+    app.add_route("/stats", stats, methods=["GET"])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ---------------------------------------------------------------------------
+# Scripted lead-agent model
+# ---------------------------------------------------------------------------
+
+def make_scripted_model(tokens: int, tokens_per_sec: float, first_token_delay: float):
+    """A strands Model that delegates to the remote agent tools in rotation, then streams an answer."""
+    from strands.types.models import Model
+
+    class ScriptedModel(Model):
+        def __init__(self):
+            self.config = {"model_id": "scripted"}
+            # Spreads delegations over all remote agents
+            self._delegations = itertools.count()
+
+        def update_config(self, **model_config: Any) -> None:
+            self.config.update(model_config)
+
+        def get_config(self) -> Any:
+            return self.config
+
+        def structured_output(self, output_model, prompt, callback_handler=None):
+            # Canned values for required fields: text for strings, zero or
+            # empty for everything else; optional fields keep their defaults
+            canned = {str: "scripted", int: 0, float: 0.0, bool: False, list: [], dict: {}}
+            values = {
+                name: canned.get(typing.get_origin(field.annotation) or field.annotation)
+                for name, field in output_model.model_fields.items()
+                if field.is_required()
+            }
+            time.sleep(first_token_delay)
+            return output_model.model_validate(values)
+
+        def format_request(self, messages, tool_specs=None, system_prompt=None) -> Any:
+            return {"messages": messages, "tool_specs": tool_specs or []}
+
+        def format_chunk(self, event: Any) -> Any:
+            return event
+
+        def stream(self, request: Any) -> Iterable[Any]:
+            messages = request["messages"]
+            last = messages[-1]["content"] if messages else []
+            answered = any("toolResult" in block for block in last)
+            time.sleep(first_token_delay)
+            yield {"messageStart": {"role": "assistant"}}
+            if request["tool_specs"] and not answered:
+                tool_specs = sorted(request["tool_specs"], key=lambda spec: spec["name"])
+                spec = tool_specs[next(self._delegations) % len(tool_specs)]
+                query = next((b["text"] for b in last if "text" in b), "")
+                yield {
+                    "contentBlockStart": {
+                        "start": {"toolUse": {"name": spec["name"], "toolUseId": uuid.uuid4().hex}}
+                    }
+                }
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps({"task": query})}}}}
+                yield {"contentBlockStop": {}}
+                yield {"messageStop": {"stopReason": "tool_use"}}
+            else:
+                interval = 1 / tokens_per_sec if tokens_per_sec else 0
+                for i in range(tokens):
+                    yield {"contentBlockDelta": {"delta": {"text": f"tok{i} "}}}
+                    if interval:
+                        time.sleep(interval)
+                yield {"contentBlockStop": {}}
+                yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {
+                "metadata": {
+                    "usage": {"inputTokens": 0, "outputTokens": tokens, "totalTokens": tokens},
+                    "metrics": {"latencyMs": 0},
+                }
+            }
+
+    return ScriptedModel()
+
+
+# ---------------------------------------------------------------------------
+# Backend under test
+# ---------------------------------------------------------------------------
+
+class BackendServer:
+    """Runs main.app with uvicorn on a dedicated thread/loop and samples it."""
+
+    def __init__(self, port: int, model):
+        import main
+
+        # main.py logs every streamed chunk at INFO; keep the report readable
+        logging.getLogger().setLevel(logging.WARNING)
+        main.MODEL = model
+        main._shared_model = None
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = threading.Thread(target=self._run, name="backend", daemon=True)
+        self.lag_samples: list[float] = []
+        self.thread_samples: list[int] = []
+        self._sampling = False
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    async def _probe(self, interval: float):
+        while self._sampling:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.lag_samples.append(time.perf_counter() - start - interval)
+            self.thread_samples.append(threading.active_count())
+
+    def start_sampling(self, interval: float = 0.01):
+        self._sampling = True
+        asyncio.run_coroutine_threadsafe(self._probe(interval), self.loop)
+
+    def stop(self):
+        self._sampling = False
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+async def run_turn(client: httpx.AsyncClient, base_url: str, session_id: str, query: str) -> dict:
+    result = {"ttft": None, "latency": None, "chars": 0, "error": None}
+    start = time.perf_counter()
+    try:
+        async with client.stream(
+            "POST", f"{base_url}/invoke_stream", json={"query": query, "session_id": session_id}
+        ) as response:
+            if response.status_code != 200:
+                result["error"] = f"HTTP {response.status_code}"
+                return result
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[6:])
+                if event["type"] == "stream":
+                    if result["ttft"] is None:
+                        result["ttft"] = time.perf_counter() - start
+                    result["chars"] += len(event["content"])
+                elif event["type"] == "error":
+                    result["error"] = event["content"][:200]
+    except Exception as e:
+        result["error"] = repr(e)
+    result["latency"] = time.perf_counter() - start
+    return result
+
+
+async def run_session(client, base_url: str, turns: int, results: list):
+    session_id = uuid.uuid4().hex
+    for turn in range(turns):
+        results.append(await run_turn(client, base_url, session_id, f"question {turn} from {session_id}"))
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))]
+    return {
+        "p50": pick(50),
+        "p95": pick(95),
+        "p99": pick(99),
+        "max": values[-1],
+        "mean": statistics.fmean(values),
+    }
+
+
+async def drive(args) -> dict:
+    stub_ports = [args.stub_base_port + i for i in range(args.agents)]
+    stubs = [
+        subprocess.Popen(
+            [
+                sys.executable, __file__, "stub",
+                "--port", str(port), "--index", str(i),
+                "--latency", str(args.stub_latency),
+                "--tokens-per-sec", str(args.stub_tokens_per_sec),
+                "--tokens", str(args.stub_tokens),
+            ]
+        )
+        for i, port in enumerate(stub_ports)
+    ]
+    backend = BackendServer(
+        args.port, make_scripted_model(args.lead_tokens, args.lead_tokens_per_sec, args.lead_first_token_delay)
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        backend.start()
+        limits = httpx.Limits(max_connections=args.sessions + 10)
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+            for port in stub_ports:
+                for _ in range(100):
+                    try:
+                        response = await client.post(f"{base_url}/add_agent", json={"url": f"http://127.0.0.1:{port}"})
+                        if response.status_code == 200:
+                            break
+                    except httpx.HTTPError:
+                        pass
+                    await asyncio.sleep(0.1)
+                else:
+                    raise RuntimeError(f"stub agent on port {port} did not come up")
+
+            results: list[dict] = []
+            backend.start_sampling()
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            await asyncio.gather(
+                *(run_session(client, base_url, args.turns, results) for _ in range(args.sessions))
+            )
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+
+            requests_per_agent = {}
+            for port in stub_ports:
+                stats = (await client.get(f"http://127.0.0.1:{port}/stats")).json()
+                requests_per_agent[stats["name"]] = stats["requests"]
+    finally:
+        backend.stop()
+        for stub in stubs:
+            stub.terminate()
+        for stub in stubs:
+            stub.wait()
+
+    ok = [r for r in results if not r["error"]]
+    errors = [r["error"] for r in results if r["error"]]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "command")},
+        "turns": len(results),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "error_samples": errors[:5],
+        "wall_seconds": wall,
+        "turns_per_sec": len(results) / wall,
+        "requests_per_agent": requests_per_agent,
+        "chars_per_sec": sum(r["chars"] for r in ok) / wall,
+        "ttft_seconds": percentiles([r["ttft"] for r in ok if r["ttft"] is not None]),
+        "turn_latency_seconds": percentiles([r["latency"] for r in ok]),
+        "backend_loop_lag_seconds": percentiles(backend.lag_samples),
+        "threads": {
+            "max": max(backend.thread_samples, default=0),
+            "mean": statistics.fmean(backend.thread_samples) if backend.thread_samples else 0,
+        },
+        # Process CPU: the backend plus this load generator and its sampling
+        "cpu_utilisation": cpu / wall,
+        "cpu_scope": "process (backend and in-process load generator)",
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the metrics that regressed by more than ``tolerance`` (ratio)."""
+    regressions = []
+    checks = [
+        ("ttft_seconds", "p95"),
+        ("turn_latency_seconds", "p95"),
+        ("backend_loop_lag_seconds", "p99"),
+    ]
+    for metric, key in checks:
+        old, new = baseline.get(metric, {}).get(key), report.get(metric, {}).get(key)
+        # Ignore sub-5ms changes; loop lag in particular is noisy at that scale
+        if old and new and new > old * (1 + tolerance) and new - old > 0.005:
+            regressions.append(f"{metric}.{key}: {old:.4f} -> {new:.4f}")
+    if report["error_rate"] > baseline.get("error_rate", 0) + 0.01:
+        regressions.append(f"error_rate: {baseline.get('error_rate', 0):.3f} -> {report['error_rate']:.3f}")
+    if report["turns_per_sec"] < baseline.get("turns_per_sec", 0) * (1 - tolerance):
+        regressions.append(f"turns_per_sec: {baseline['turns_per_sec']:.2f} -> {report['turns_per_sec']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+
+    stub = sub.add_parser("stub", help="run a single stub A2A agent (used internally)")
+    stub.add_argument("--port", type=int, required=True)
+    stub.add_argument("--index", type=int, default=0)
+    stub.add_argument("--latency", type=float, default=0.2)
+    stub.add_argument("--tokens-per-sec", type=float, default=200)
+    stub.add_argument("--tokens", type=int, default=50)
+
+    parser.add_argument("--agents", type=int, default=2, help="number of stub A2A servers")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent chat sessions")
+    parser.add_argument("--turns", type=int, default=3, help="turns per session")
+    parser.add_argument("--port", type=int, default=18000, help="backend port")
+    parser.add_argument("--stub-base-port", type=int, default=18100)
+    parser.add_argument("--stub-latency", type=float, default=0.2, help="seconds before a stub answers")
+    parser.add_argument("--stub-tokens-per-sec", type=float, default=200)
+    parser.add_argument("--stub-tokens", type=int, default=50)
+    parser.add_argument("--lead-first-token-delay", type=float, default=0.05)
+    parser.add_argument("--lead-tokens-per-sec", type=float, default=200)
+    parser.add_argument("--lead-tokens", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against a previous JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        run_stub_agent(args.port, args.index, args.latency, args.tokens_per_sec, args.tokens)
+        return
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    report = asyncio.run(drive(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
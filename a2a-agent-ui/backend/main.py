@@ -5,7 +5,9 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import asyncio
 import json
+import time
 import uuid
+from collections import OrderedDict
 from uuid import uuid4
 
 from datetime import datetime
@@ -16,7 +18,8 @@ from contextlib import asynccontextmanager
 from a2a.client import A2AClient, A2ACardResolver
 from a2a.types import MessageSendParams, SendStreamingMessageRequest,  SendMessageRequest
 from strands import Agent, tool
-from strands.agent.conversation_manager import SlidingWindowConversationManager
+from token_budget_manager import TokenBudgetConversationManager
+from strands.models import BedrockModel
 import nest_asyncio
 import logging
 import os
@@ -63,7 +66,13 @@ if public_key and secret_key:
 
 # Global variables
 agent_registry: Dict[str, Dict[str, Any]] = {}
-lead_agent_instance = None
+
+# Per-session lead agent limits
+LEAD_AGENT_MAX_SESSIONS = int(os.environ.get("LEAD_AGENT_MAX_SESSIONS", "100"))
+LEAD_AGENT_SESSION_TTL = int(os.environ.get("LEAD_AGENT_SESSION_TTL", "3600"))
+# Estimated tokens of lead-agent history kept per session
+LEAD_AGENT_TOKEN_BUDGET = int(os.environ.get("LEAD_AGENT_TOKEN_BUDGET", "60000"))
+DEFAULT_SESSION_ID = "default"
 
 # Pydantic models
 class AgentInfo(BaseModel):
@@ -85,6 +94,7 @@ class DeleteAgentRequest(BaseModel):
 
 class InvokeStreamRequest(BaseModel):
     query: str
+    session_id: Optional[str] = None
 
 class PreviewAgentRequest(BaseModel):
     url: str
@@ -193,6 +203,8 @@ class A2AClientManager:
         self.a2aclient_pool = {}
         self.agent_cards = []
         self.tools = []
+        # Bumped whenever the tool set changes so lead agents know to rebuild
+        self.tools_version = 0
         
     async def add_agent_by_url(self, agent_url: str) -> str:
         """Add a single agent by URL and return agent_id."""        
@@ -310,6 +322,7 @@ class A2AClientManager:
                 
                 self.tools.append(self._generate_function(normalized_name, function_desc))
         
+        self.tools_version += 1
         return self.tools
     
     def _generate_function(self, function_name, desc):
@@ -363,24 +376,38 @@ class A2AClientManager:
                     
             return artifact
 
+_shared_model = None
+
+def get_shared_model():
+    """Return the process-wide model (and its boto3 client), created on first use."""
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = BedrockModel(model_id=MODEL) if isinstance(MODEL, str) else MODEL
+    return _shared_model
+
 # Lead Agent (adapted from your code)
 class LeadAgent:
-    def __init__(self, tools: List[Any]):
-        self.messages = []
-        self.tools = tools
-        self.conversation_manager = SlidingWindowConversationManager(
-            window_size=20,
-        )
+    def __init__(self, manager: "A2AClientManager"):
+        self.manager = manager
+        self.agent = None
+        self.tools_version = -1
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
         
     def get_agent(self):
-        agent = Agent(
-            model=MODEL,
-            messages=self.messages,
-            conversation_manager=self.conversation_manager,
-            system_prompt="""You are a coordinator agent, you can communicate with other remote agents to resolve problems.""",
-            tools=self.tools
-        )
-        return agent
+        """Return the cached agent, rebuilding it only if the tool set changed."""
+        if self.agent is None or self.tools_version != self.manager.tools_version:
+            self.agent = Agent(
+                model=get_shared_model(),
+                messages=self.agent.messages if self.agent else [],
+                conversation_manager=TokenBudgetConversationManager(
+                    max_tokens=LEAD_AGENT_TOKEN_BUDGET,
+                ),
+                system_prompt="""You are a coordinator agent, you can communicate with other remote agents to resolve problems.""",
+                tools=self.manager.tools
+            )
+            self.tools_version = self.manager.tools_version
+        return self.agent
         
     async def stream(self, query: str, session_id: str = None):      
         """Stream responses from the lead agent."""
@@ -388,35 +415,81 @@ class LeadAgent:
         tool_use_name_buffer = ""
         tool_use_input_buffer = ""
         try:
-            async for event in self.get_agent().stream_async(query):
-                if "data" in event:
-                    if tool_use_buffer_start:
-                        yield {"current_tool_use":tool_use_name_buffer}
-                        yield {"current_tool_use_input":tool_use_input_buffer}
-                        tool_use_buffer_start = False
-                        tool_use_name_buffer = ""
-                        tool_use_input_buffer = ""
-                    yield {"data":event["data"]}
-                        
-                elif "current_tool_use" in event and event["current_tool_use"].get("name"):
-                    # logger.info(f"{event['current_tool_use']}")
-                    tool_use_name_buffer = event["current_tool_use"]["name"]
-                    tool_use_input_buffer = event["current_tool_use"]["input"]
-                    tool_use_buffer_start = True
-            
-                    
-            self.messages = self.get_agent().messages
+            # Turns within one session are serialized on its agent
+            async with self.lock:
+                self.last_used = time.monotonic()
+                async for event in self.get_agent().stream_async(query):
+                    if "data" in event:
+                        if tool_use_buffer_start:
+                            yield {"current_tool_use":tool_use_name_buffer}
+                            yield {"current_tool_use_input":tool_use_input_buffer}
+                            tool_use_buffer_start = False
+                            tool_use_name_buffer = ""
+                            tool_use_input_buffer = ""
+                        yield {"data":event["data"]}
+                            
+                    elif "current_tool_use" in event and event["current_tool_use"].get("name"):
+                        # logger.info(f"{event['current_tool_use']}")
+                        tool_use_name_buffer = event["current_tool_use"]["name"]
+                        tool_use_input_buffer = event["current_tool_use"]["input"]
+                        tool_use_buffer_start = True
+                self.last_used = time.monotonic()
         except Exception as e:
             yield f"Error: {str(e)}"
 
+class LeadAgentStore:
+    """Session-keyed lead agents with LRU and idle-TTL eviction."""
+
+    def __init__(self, manager: "A2AClientManager", max_sessions: int, ttl_seconds: int):
+        self.manager = manager
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, LeadAgent]" = OrderedDict()
+
+    def _evict_expired(self):
+        # Sessions are kept in last-used order, so expired ones are at the front
+        now = time.monotonic()
+        while self._sessions:
+            session_id, lead_agent = next(iter(self._sessions.items()))
+            if now - lead_agent.last_used < self.ttl_seconds or lead_agent.lock.locked():
+                break
+            del self._sessions[session_id]
+
+    def _evict_overflow(self):
+        # Drop least recently used sessions past max_sessions, skipping any
+        # with a turn in flight; the store may stay over the limit until
+        # those turns end
+        excess = len(self._sessions) - self.max_sessions
+        for session_id, lead_agent in list(self._sessions.items()):
+            if excess <= 0:
+                break
+            if not lead_agent.lock.locked():
+                del self._sessions[session_id]
+                excess -= 1
+
+    def get(self, session_id: str) -> LeadAgent:
+        self._evict_expired()
+        lead_agent = self._sessions.get(session_id)
+        if lead_agent is None:
+            lead_agent = LeadAgent(self.manager)
+            self._sessions[session_id] = lead_agent
+            self._evict_overflow()
+        else:
+            self._sessions.move_to_end(session_id)
+        lead_agent.last_used = time.monotonic()
+        return lead_agent
+
+    def __len__(self):
+        return len(self._sessions)
+
 # Global instances
 a2a_manager = A2AClientManager()
+lead_agents = LeadAgentStore(a2a_manager, LEAD_AGENT_MAX_SESSIONS, LEAD_AGENT_SESSION_TTL)
 
 # Lifespan manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global  lead_agent_instance
     yield
 
 # FastAPI app
@@ -505,13 +578,11 @@ async def preview_agent(request: PreviewAgentRequest):
 async def add_agent(request: AddAgentRequest):
     """Register a new remote agent by URL."""
     try:
-        global a2a_manager, lead_agent_instance
+        global a2a_manager
         
+        # Lead agents pick up the new tool set via a2a_manager.tools_version
         agent_id = await a2a_manager.add_agent_by_url(request.url)
         
-        # Recreate lead agent with updated tools
-        lead_agent_instance = LeadAgent(tools=a2a_manager.tools)
-        
         agent_name = agent_registry[agent_id].get("name", "Unknown")
         
         return {
@@ -527,7 +598,7 @@ async def add_agent(request: AddAgentRequest):
 @app.delete("/delete_agent")
 async def delete_agent(request: DeleteAgentRequest):
     """Delete a registered remote agent."""
-    global a2a_manager, lead_agent_instance
+    global a2a_manager
     
     agent_id = request.agent_id
     
@@ -537,9 +608,6 @@ async def delete_agent(request: DeleteAgentRequest):
     agent_name = agent_registry[agent_id].get("name", "Unknown")
     a2a_manager.remove_agent(agent_id)
     
-    # Recreate lead agent with updated tools
-    lead_agent_instance = LeadAgent(tools=a2a_manager.tools)
-    
     return {
         "message": f"Agent '{agent_name}' deleted successfully",
         "agent_id": agent_id
@@ -548,7 +616,7 @@ async def delete_agent(request: DeleteAgentRequest):
 @app.put("/update_agent_enabled")
 async def update_agent_enabled(request: UpdateAgentEnabledRequest):
     """Update the enabled status of a remote agent."""
-    global a2a_manager, lead_agent_instance
+    global a2a_manager
     
     agent_id = request.agent_id
     
@@ -559,12 +627,10 @@ async def update_agent_enabled(request: UpdateAgentEnabledRequest):
     agent_registry[agent_id]["enabled"] = request.enabled
     agent_name = agent_registry[agent_id].get("name", "Unknown")
     
-    # Regenerate tools to reflect the enabled/disabled status
+    # Regenerate tools to reflect the enabled/disabled status; this bumps
+    # tools_version so lead agents rebuild on their next turn
     a2a_manager._generate_tools()
     
-    # Recreate lead agent with updated tools
-    lead_agent_instance = LeadAgent(tools=a2a_manager.tools)
-    
     return {
         "message": f"Agent '{agent_name}' {'enabled' if request.enabled else 'disabled'} successfully",
         "agent_id": agent_id,
@@ -578,17 +644,13 @@ async def invoke_stream(request: InvokeStreamRequest):
     
     async def generate_stream():
         try:
-            global lead_agent_instance
-            
-            # Filter enabled agents (for now, we use all available agents as tools)
-            if not lead_agent_instance:
-                lead_agent_instance = LeadAgent(tools=a2a_manager.tools)
+            lead_agent = lead_agents.get(request.session_id or DEFAULT_SESSION_ID)
             
             logger.info("Starting stream generation...")
             yield "data: {\"type\": \"start\", \"message\": \"Starting lead agent...\"}\n\n"
             
             # Stream from lead agent
-            async for chunk in lead_agent_instance.stream(request.query):
+            async for chunk in lead_agent.stream(request.query):
                 if chunk:
                     logger.info(chunk)
                     if "data" in chunk:
@@ -623,7 +685,8 @@ async def health_check():
     return {
         "status": "healthy",
         "registered_agents": len(agent_registry),
-        "available_tools": len(a2a_manager.tools) if a2a_manager else 0
+        "available_tools": len(a2a_manager.tools) if a2a_manager else 0,
+        "active_sessions": len(lead_agents)
     }
 
 if __name__ == "__main__":
@@ -23,6 +23,19 @@ interface Message {
   task?: string;
 }
 
+// crypto.randomUUID only exists in secure contexts (HTTPS or localhost);
+// the UI is also opened over plain HTTP, where getRandomValues still works
+function newSessionId(): string {
+  if (typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  const bytes = crypto.getRandomValues(new Uint8Array(16));
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
 export default function ChatInterface() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState('');
@@ -32,6 +45,8 @@ export default function ChatInterface() {
   const [currentTask, setCurrentTask] = useState<string>('');
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const cancelStreamRef = useRef<(() => void) | null>(null);
+  // Each chat gets its own lead agent session on the backend
+  const sessionIdRef = useRef<string>(newSessionId());
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -93,7 +108,7 @@ export default function ChatInterface() {
 
     try {
       const cancelStream = await apiService.invokeStream(
-        { query: userMessage },
+        { query: userMessage, session_id: sessionIdRef.current },
         (data) => {
           if (data.type === 'stream' && data.content) {
             updateLastMessage(data.content);
@@ -186,6 +201,7 @@ export default function ChatInterface() {
                   setMessages([]);
                   setCurrentRemoteAgent('');
                   setCurrentTask('');
+                  sessionIdRef.current = newSessionId();
                 }}>
                   Clear Chat
                 </Button>
@@ -23,6 +23,7 @@ export interface DeleteAgentRequest {
 
 export interface InvokeStreamRequest {
   query: string;
+  session_id?: string;
 }
 
 export interface PreviewAgentRequest {
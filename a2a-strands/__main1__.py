@@ -1,5 +1,6 @@
 import click
 from doc_agent import DocAgent
+from mcp_pool import DOC_MCP_SERVER, get_pool
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
@@ -18,6 +19,11 @@ from agent_executor import StrandsAgentExecutor
 @click.option("--host", "host", default="localhost")
 @click.option("--port", "port", default=10000)
 def main(host: str, port: int):
+    pool = get_pool()
+    for spec, seconds in pool.prewarm([DOC_MCP_SERVER]).items():
+        print(f"MCP server {spec.command} {' '.join(spec.args)} ready in {seconds:.2f}s")
+    pool.start_monitor()
+
     request_handler = DefaultRequestHandler(
         agent_executor=StrandsAgentExecutor(DocAgent()),
         task_store=InMemoryTaskStore(),
@@ -1,24 +1,76 @@
 # from agent import StrandAgent
+import asyncio
+import inspect
+import time
+
 from typing_extensions import override
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.types import (
     TaskArtifactUpdateEvent,
+    TaskNotCancelableError,
     TaskState,
     TaskStatus,
     TaskStatusUpdateEvent,
-    UnsupportedOperationError
 )
 from a2a.utils import new_agent_text_message, new_task, new_text_artifact
 from a2a.utils.errors import ServerError
 
+# Default coalescing window: flush buffered text every FLUSH_INTERVAL_MS
+# milliseconds or once FLUSH_CHARS characters have accumulated.
+FLUSH_INTERVAL_MS = 50
+FLUSH_CHARS = 256
+
+
+async def _enqueue(event_queue: EventQueue, event) -> None:
+    # a2a-sdk made enqueue_event a coroutine after 0.2.1; support both.
+    result = event_queue.enqueue_event(event)
+    if inspect.isawaitable(result):
+        await result
+
 
 class StrandsAgentExecutor(AgentExecutor):
-    """Currency AgentExecutor Example."""
+    """Strands AgentExecutor that coalesces text deltas into status updates.
 
-    def __init__(self,agent):
+    Text chunks from ``agent.stream`` are buffered and sent as a single
+    ``TaskStatusUpdateEvent`` every ``flush_interval_ms`` milliseconds or
+    ``flush_chars`` characters, whichever comes first. The buffer is always
+    flushed on tool boundaries (events with ``is_boundary``) and before the
+    final artifact. Setting ``flush_chars=0`` disables coalescing.
+    """
+
+    def __init__(self, agent, flush_interval_ms: int = FLUSH_INTERVAL_MS, flush_chars: int = FLUSH_CHARS):
         self.agent = agent
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_chars = flush_chars
+        self._running: dict[str, asyncio.Task] = {}
+        # Tasks cancelled while execute() is still unwinding; it sends nothing more for them
+        self._cancelled: set[str] = set()
+
+    async def _send(self, task, event_queue: EventQueue, event) -> None:
+        if task.id in self._cancelled:
+            raise asyncio.CancelledError()
+        await _enqueue(event_queue, event)
+
+    async def _send_working(self, text: str, task, event_queue: EventQueue) -> None:
+        await self._send(
+            task,
+            event_queue,
+            TaskStatusUpdateEvent(
+                status=TaskStatus(
+                    state=TaskState.working,
+                    message=new_agent_text_message(
+                        text,
+                        task.contextId,
+                        task.id,
+                    ),
+                ),
+                final=False,
+                contextId=task.contextId,
+                taskId=task.id,
+            ),
+        )
 
     @override
     async def execute(
@@ -34,48 +86,86 @@ class StrandsAgentExecutor(AgentExecutor):
 
         if not task:
             task = new_task(context.message)
-            event_queue.enqueue_event(task)
-
-        async for event in self.agent.stream(query, task.contextId):
-            if event["is_task_complete"]:
-                event_queue.enqueue_event(
-                    TaskArtifactUpdateEvent(
-                        append=False,
-                        contextId=task.contextId,
-                        taskId=task.id,
-                        lastChunk=True,
-                        artifact=new_text_artifact(
-                            name="current_result",
-                            description="Result of request to agent.",
-                            text=event["content"],
+            await _enqueue(event_queue, task)
+
+        self._running[task.id] = asyncio.current_task()
+        stream = self.agent.stream(query, task.contextId)
+        buffer: list[str] = []
+        buffered = 0
+        last_flush = time.monotonic()
+
+        async def flush():
+            nonlocal buffered, last_flush
+            if buffer:
+                text = "".join(buffer)
+                buffer.clear()
+                buffered = 0
+                await self._send_working(text, task, event_queue)
+            last_flush = time.monotonic()
+
+        try:
+            async for event in stream:
+                if event["is_task_complete"]:
+                    await flush()
+                    await self._send(
+                        task,
+                        event_queue,
+                        TaskArtifactUpdateEvent(
+                            append=False,
+                            contextId=task.contextId,
+                            taskId=task.id,
+                            lastChunk=True,
+                            artifact=new_text_artifact(
+                                name="current_result",
+                                description="Result of request to agent.",
+                                text=event["content"],
+                            ),
                         ),
                     )
-                )
-                event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(state=TaskState.completed),
-                        final=True,
-                        contextId=task.contextId,
-                        taskId=task.id,
-                    )
-                )
-            else:
-                event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.working,
-                            message=new_agent_text_message(
-                                event["content"],
-                                task.contextId,
-                                task.id,
-                            ),
+                    await self._send(
+                        task,
+                        event_queue,
+                        TaskStatusUpdateEvent(
+                            status=TaskStatus(state=TaskState.completed),
+                            final=True,
+                            contextId=task.contextId,
+                            taskId=task.id,
                         ),
-                        final=False,
-                        contextId=task.contextId,
-                        taskId=task.id,
                     )
-                )
+                elif event.get("is_boundary"):
+                    await flush()
+                elif self.flush_chars <= 0:
+                    await self._send_working(event["content"], task, event_queue)
+                else:
+                    buffer.append(event["content"])
+                    buffered += len(event["content"])
+                    if (
+                        buffered >= self.flush_chars
+                        or time.monotonic() - last_flush >= self.flush_interval
+                    ):
+                        await flush()
+            await flush()
+        finally:
+            self._running.pop(task.id, None)
+            self._cancelled.discard(task.id)
+            await stream.aclose()
 
     @override
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        raise ServerError(error=UnsupportedOperationError())
+        running = self._running.pop(context.task_id, None)
+        if running is None:
+            raise ServerError(error=TaskNotCancelableError())
+
+        # Cancelling the execute() task unwinds the agent stream via aclose();
+        # the flag stops it sending anything after the canceled status below.
+        self._cancelled.add(context.task_id)
+        running.cancel()
+        await _enqueue(
+            event_queue,
+            TaskStatusUpdateEvent(
+                status=TaskStatus(state=TaskState.canceled),
+                final=True,
+                contextId=context.context_id,
+                taskId=context.task_id,
+            ),
+        )
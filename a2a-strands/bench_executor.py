@@ -0,0 +1,93 @@
+"""Measure status-update traffic produced by StrandsAgentExecutor.
+
+Replays a synthetic answer through the executor with and without coalescing
+and reports events/sec and serialized bytes on the wire. No model or MCP
+server is needed:
+
+    uv run bench_executor.py --deltas 4000 --rate 2000
+"""
+import asyncio
+import time
+
+import click
+
+from a2a.types import Message, Part, Role, TextPart
+from agent_executor import StrandsAgentExecutor
+
+
+class ReplayAgent:
+    """Yields `deltas` small text chunks at `rate` chunks/sec, with a tool
+    boundary every `tool_every` chunks, mimicking DocAgent.stream."""
+
+    def __init__(self, deltas: int, rate: float, tool_every: int):
+        self.deltas = deltas
+        self.rate = rate
+        self.tool_every = tool_every
+
+    async def stream(self, query: str, session_id: str):
+        response = str()
+        interval = 1 / self.rate if self.rate else 0
+        for i in range(self.deltas):
+            chunk = f"tok{i % 10} "
+            response += chunk
+            yield {"is_task_complete": False, "require_user_input": False, "content": chunk}
+            if self.tool_every and (i + 1) % self.tool_every == 0:
+                yield {"is_task_complete": False, "require_user_input": False, "is_boundary": True, "content": ""}
+            if interval:
+                await asyncio.sleep(interval)
+        yield {"is_task_complete": True, "require_user_input": False, "content": response}
+
+
+class CountingQueue:
+    def __init__(self):
+        self.events = 0
+        self.bytes = 0
+
+    async def enqueue_event(self, event):
+        self.events += 1
+        self.bytes += len(event.model_dump_json(exclude_none=True))
+
+
+class Context:
+    def __init__(self):
+        self.message = Message(
+            role=Role.user,
+            parts=[Part(root=TextPart(text="hello"))],
+            messageId="bench",
+        )
+        self.current_task = None
+
+    def get_user_input(self):
+        return "hello"
+
+
+async def run(label: str, executor: StrandsAgentExecutor):
+    queue = CountingQueue()
+    start = time.perf_counter()
+    await executor.execute(Context(), queue)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} events={queue.events:<6} bytes={queue.bytes:<9} "
+        f"events/sec={queue.events / elapsed:,.0f} elapsed={elapsed:.2f}s"
+    )
+
+
+@click.command()
+@click.option("--deltas", default=4000, help="Number of text deltas to replay.")
+@click.option("--rate", default=2000.0, help="Deltas per second (0 = as fast as possible).")
+@click.option("--tool-every", default=500, help="Insert a tool boundary every N deltas.")
+@click.option("--flush-ms", default=50, help="Coalescing interval in milliseconds.")
+@click.option("--flush-chars", default=256, help="Coalescing size threshold in characters.")
+def main(deltas: int, rate: float, tool_every: int, flush_ms: int, flush_chars: int):
+    agent = ReplayAgent(deltas, rate, tool_every)
+    asyncio.run(run("uncoalesced", StrandsAgentExecutor(agent, flush_chars=0)))
+    asyncio.run(
+        run(
+            f"coalesced {flush_ms}ms/{flush_chars}c",
+            StrandsAgentExecutor(agent, flush_interval_ms=flush_ms, flush_chars=flush_chars),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Startup-time benchmark: one MCP client per agent vs. the shared pool.
+
+Uses a local stub stdio MCP server (this file with --serve-stub) whose startup
+delay stands in for uvx package resolution, so no network is needed:
+
+    uv run bench_mcp_pool.py --agents 5 --startup-delay 1.0
+"""
+import sys
+import time
+
+import click
+
+from mcp_pool import MCPClientPool, MCPServerSpec
+
+
+def run_stub_server(startup_delay: float):
+    from mcp.server.fastmcp import FastMCP
+
+    time.sleep(startup_delay)
+    mcp = FastMCP("stub")
+
+    @mcp.tool()
+    def search_documentation(search_phrase: str) -> str:
+        """Search the stub documentation."""
+        return f"results for {search_phrase}"
+
+    @mcp.tool()
+    def read_documentation(url: str) -> str:
+        """Read a stub documentation page."""
+        return f"contents of {url}"
+
+    mcp.run()
+
+
+@click.command()
+@click.option("--agents", default=5, help="Number of agents to build.")
+@click.option("--startup-delay", default=1.0, help="Seconds the stub server sleeps before serving.")
+@click.option("--serve-stub", is_flag=True, hidden=True)
+def main(agents: int, startup_delay: float, serve_stub: bool):
+    if serve_stub:
+        return run_stub_server(startup_delay)
+
+    spec = MCPServerSpec(sys.executable, (__file__, "--serve-stub", "--startup-delay", str(startup_delay)))
+
+    start = time.perf_counter()
+    for _ in range(agents):
+        # Previous behaviour: every DocAgent starts its own server.
+        pool = MCPClientPool()
+        tools = pool.get_tools(spec)
+        pool.close()
+    per_agent = time.perf_counter() - start
+    print(f"client per agent  total={per_agent:.2f}s ({per_agent / agents:.2f}s/agent, {len(tools)} tools)")
+
+    pool = MCPClientPool()
+    start = time.perf_counter()
+    warm = pool.prewarm([spec])[spec]
+    first_call = time.perf_counter()
+    for _ in range(agents):
+        tools = pool.get_tools(spec)
+    shared = time.perf_counter() - start
+    print(
+        f"shared pool       total={shared:.2f}s (prewarm {warm:.2f}s, "
+        f"{(time.perf_counter() - first_call) / agents * 1e6:.0f}us/agent after warm-up)"
+    )
+    result = tools[0].mcp_client.call_tool_sync("bench", tools[0].tool_name, {"search_phrase": "s3"})
+    print(f"tool call via pooled client: {result['status']}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare per-turn session persistence cost: whole-file JSON vs. SessionStore.
+
+Simulates long conversations without a model; each turn appends a user and an
+assistant message to a stub agent and persists it the way DocAgent does:
+
+    uv run bench_session_store.py --turns 500 --sessions 4
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import click
+
+from session_store import SessionStore
+
+
+class StubAgent:
+    def __init__(self, messages=None, system_prompt="You are a researcher."):
+        self.messages = messages if messages is not None else []
+        self.system_prompt = system_prompt
+
+
+def play_turn(agent: StubAgent, turn: int, payload: str, window: int):
+    agent.messages.append({"role": "user", "content": [{"text": f"question {turn}"}]})
+    agent.messages.append({"role": "assistant", "content": [{"text": payload}]})
+    if window and len(agent.messages) > window:
+        del agent.messages[: len(agent.messages) - window]
+
+
+def bench_json(directory: str, sessions: int, turns: int, payload: str, window: int) -> float:
+    start = time.perf_counter()
+    for turn in range(turns):
+        for s in range(sessions):
+            path = os.path.join(directory, f"s{s}.json")
+            if os.path.isfile(path):
+                with open(path, "r") as f:
+                    state = json.load(f)
+                agent = StubAgent(state["messages"], state["system_prompt"])
+            else:
+                agent = StubAgent()
+            play_turn(agent, turn, payload, window)
+            with open(path, "w") as f:
+                json.dump({"messages": agent.messages, "system_prompt": agent.system_prompt}, f)
+    return time.perf_counter() - start
+
+
+def bench_store(directory: str, sessions: int, turns: int, payload: str, window: int) -> float:
+    store = SessionStore(directory)
+    start = time.perf_counter()
+    for turn in range(turns):
+        for s in range(sessions):
+            agent = store.get(f"s{s}", lambda messages, system_prompt: StubAgent(messages, system_prompt or "You are a researcher."))
+            play_turn(agent, turn, payload, window)
+            store.append(f"s{s}", agent)
+    store.close()
+    return time.perf_counter() - start
+
+
+def verify(directory: str, sessions: int, expected: int):
+    store = SessionStore(directory, cache_size=0)
+    for s in range(sessions):
+        _, messages, _ = store._read(f"s{s}")
+        assert len(messages) == expected, (len(messages), expected)
+
+
+@click.command()
+@click.option("--turns", default=500)
+@click.option("--sessions", default=4)
+@click.option("--payload-bytes", default=2000, help="Size of each assistant reply.")
+@click.option("--window", default=0, help="Trim history to this many messages (0 = keep all).")
+def main(turns: int, sessions: int, payload_bytes: int, window: int):
+    payload = "x" * payload_bytes
+    expected = min(turns * 2, window) if window else turns * 2
+    for name, fn in (("json rewrite", bench_json), ("journal + LRU", bench_store)):
+        directory = tempfile.mkdtemp(prefix="sessions-")
+        try:
+            elapsed = fn(directory, sessions, turns, payload, window)
+            if fn is bench_store:
+                verify(directory, sessions, expected)
+            size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+            print(
+                f"{name:<14} total={elapsed:.2f}s per-turn={elapsed / (turns * sessions) * 1000:.3f}ms "
+                f"on-disk={size / 1024:,.0f}KiB"
+            )
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-from mcp import StdioServerParameters, stdio_client
 from strands import Agent
-from strands.tools.mcp import MCPClient
 from strands_tools import file_write
+from session_store import SessionStore
+from mcp_pool import DOC_MCP_SERVER, get_pool
 import os
 import json
 import asyncio
+import weakref
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -27,46 +28,7 @@ MODEL = "us.amazon.nova-pro-v1:0"
 
 class DocAgent:
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
-
-    def __init__(self):
-        self.agent = None
-
-        try:
-            os.makedirs("sessions", exist_ok=True)
-            self.documentation_mcp_server = MCPClient(
-                lambda: stdio_client(
-                    StdioServerParameters(
-                        command="uvx",
-                        args=["awslabs.aws-documentation-mcp-server@latest"],
-                    )
-                )
-            )
-            self.documentation_mcp_server.start()
-            self.tools = self.documentation_mcp_server.list_tools_sync() + [file_write]
-
-        except Exception as e:
-            return f"Error initializing agent: {str(e)}"
-
-    def _load_agent_from_memory(self, session_id: str) -> str:
-        session_path = os.path.join("sessions", f"{session_id}.json")
-        agent = None
-
-        try:
-            if os.path.isfile(session_path):
-                with open(session_path, "r") as f:
-                    state = json.load(f)
-
-                agent = Agent(
-                    model=MODEL,
-                    messages=state["messages"],
-                    system_prompt=state["system_prompt"],
-                    tools=self.tools,
-                    callback_handler=None,
-                )
-            else:
-                agent = Agent(
-                    model="us.amazon.nova-pro-v1:0",
-                    system_prompt="""You are a thorough AWS researcher specialized in finding accurate 
+    SYSTEM_PROMPT = """You are a thorough AWS researcher specialized in finding accurate 
                     information online. For each question:
                     
                     1. Determine what information you need
@@ -79,22 +41,62 @@ class DocAgent:
                     for the information you find.
                     
                     Finally output your response to a file in current directory.
-                    """,
-                    tools=self.tools,
-                    callback_handler=None,
-                )
-            return agent
+                    """
+
+    def __init__(self):
+        self.agent = None
+        # One turn at a time per session: the store hands every request for a
+        # session the same live Agent. Locks go away with their last user.
+        self._turn_locks = weakref.WeakValueDictionary()
+
+        try:
+            self.sessions = SessionStore("sessions")
+            # MCP clients are shared process-wide; __main1__ pre-warms them.
+            self.tools = get_pool().get_tools(DOC_MCP_SERVER) + [file_write]
+
+        except Exception as e:
+            return f"Error initializing agent: {str(e)}"
+
+    def _create_agent(self, messages, system_prompt) -> Agent:
+        if messages is None:
+            return Agent(
+                model="us.amazon.nova-pro-v1:0",
+                system_prompt=self.SYSTEM_PROMPT,
+                tools=self.tools,
+                callback_handler=None,
+            )
+        return Agent(
+            model=MODEL,
+            messages=messages,
+            system_prompt=system_prompt,
+            tools=self.tools,
+            callback_handler=None,
+        )
+
+    def _load_agent_from_memory(self, session_id: str) -> Agent:
+        try:
+            return self.sessions.get(session_id, self._create_agent)
         except Exception as e:
-            raise f"Error Loading agent from memory: {e}"
+            raise RuntimeError(f"Error Loading agent from memory: {e}")
 
     def _store_agent_into_memory(self, agent: Agent, session_id: str) -> bool:
-        session_path = os.path.join("sessions", f"{session_id}.json")
-        state = {"messages": agent.messages, "system_prompt": agent.system_prompt}
-        with open(session_path, "w") as f:
-            json.dump(state, f)
-        return True
+        return self.sessions.append(session_id, agent)
+
+    def _turn_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._turn_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._turn_locks[session_id] = lock
+        return lock
 
     async def stream(self, query: str, session_id: str):
+        # Held for the whole turn so concurrent requests for one session do
+        # not interleave on agent.messages
+        async with self._turn_lock(session_id):
+            async for item in self._stream_turn(query, session_id):
+                yield item
+
+    async def _stream_turn(self, query: str, session_id: str):
         agent = self._load_agent_from_memory(session_id=session_id)
         response = str()
         try:
@@ -107,6 +109,15 @@ class DocAgent:
                         "require_user_input": False,
                         "content": event["data"],
                     }
+                elif "message" in event:
+                    # A message was appended (tool use / tool result): let
+                    # the executor flush any buffered text at this boundary.
+                    yield {
+                        "is_task_complete": False,
+                        "require_user_input": False,
+                        "is_boundary": True,
+                        "content": "",
+                    }
 
         except Exception as e:
             yield {
@@ -116,11 +127,13 @@ class DocAgent:
             }
         finally:
             self._store_agent_into_memory(agent, session_id)
-            yield {
-                "is_task_complete": True,
-                "require_user_input": False,
-                "content": response,
-            }
+        # Not in the finally block: a cancelled or closed stream must end
+        # here instead of reporting the task as complete
+        yield {
+            "is_task_complete": True,
+            "require_user_input": False,
+            "content": response,
+        }
 
     def invoke(self, query: str, session_id: str):
         agent = self._load_agent_from_memory(session_id=session_id)
@@ -0,0 +1,228 @@
+"""Process-wide pool of MCP clients shared by every agent in the process.
+
+Starting an MCP server over stdio (``uvx`` package resolution + handshake) is
+the dominant cost of building an agent, so clients are keyed by server spec
+and started once. Tool schemas are listed once per client and reused.
+
+A client whose session dies is not revived: the pool stops it and builds a
+new ``MCPClient`` from the spec. The ``MCPAgentTool`` objects already handed
+to agents are rebound to the new client through their public ``mcp_client``
+attribute, so agents that hold the tools keep working after a reconnect.
+Liveness is checked with ``list_tools_sync``, the public request every
+supported SDK version has, under a timeout.
+"""
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from mcp import StdioServerParameters, stdio_client
+from strands.tools.mcp import MCPClient
+
+logger = logging.getLogger(__name__)
+
+
+class MCPServerSpec(NamedTuple):
+    command: str
+    args: tuple = ()
+
+
+DOC_MCP_SERVER = MCPServerSpec("uvx", ("awslabs.aws-documentation-mcp-server@latest",))
+
+
+def _stdio_client_factory(spec: MCPServerSpec) -> MCPClient:
+    return MCPClient(lambda: stdio_client(StdioServerParameters(command=spec.command, args=list(spec.args))))
+
+
+def _stop_quietly(client: MCPClient) -> None:
+    try:
+        client.stop(None, None, None)
+    except Exception:
+        # A crashed session may fail to shut down cleanly; the client is
+        # dropped either way.
+        pass
+
+
+class _PooledClient:
+    def __init__(self, spec: MCPServerSpec):
+        self.spec = spec
+        self.client: MCPClient | None = None
+        self.tools = None
+        self.started = False
+        self.failures = 0
+        self.retry_at = 0.0
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+class MCPClientPool:
+    def __init__(
+        self,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retries: int = 5,
+        ping_interval: float = 5.0,
+        ping_timeout: float = 2.0,
+        client_factory=_stdio_client_factory,
+    ):
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retries = max_retries
+        self.client_factory = client_factory
+        self._clients: dict[MCPServerSpec, _PooledClient] = {}
+        self._lock = threading.Lock()
+        self._monitor: threading.Thread | None = None
+        self._closed = threading.Event()
+        # Runs health checks so a hung server cannot block the caller past
+        # ping_timeout
+        self._pinger = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mcp-ping")
+
+    def _entry(self, spec: MCPServerSpec) -> _PooledClient:
+        with self._lock:
+            entry = self._clients.get(spec)
+            if entry is None:
+                entry = self._clients[spec] = _PooledClient(spec)
+            return entry
+
+    def _connect(self, entry: _PooledClient) -> None:
+        """Start a fresh client once, scheduling the next retry on failure."""
+        if entry.client is not None:
+            if entry.started:
+                logger.warning("MCP server %s is down, reconnecting", entry.spec.args or entry.spec.command)
+            _stop_quietly(entry.client)
+            entry.client = None
+            entry.started = False
+        client = self.client_factory(entry.spec)
+        try:
+            client.start()
+            tools = client.list_tools_sync()
+        except Exception:
+            _stop_quietly(client)
+            entry.failures += 1
+            entry.retry_at = time.monotonic() + min(
+                self.backoff_max, self.backoff_base * 2 ** (entry.failures - 1)
+            )
+            raise
+        self._bind_tools(entry, client, tools)
+        entry.client = client
+        entry.started = True
+        entry.failures = 0
+        entry.retry_at = 0.0
+        entry.checked_at = time.monotonic()
+
+    @staticmethod
+    def _bind_tools(entry: _PooledClient, client: MCPClient, tools) -> None:
+        """Point the tools agents already hold at the new client."""
+        if entry.tools is None:
+            entry.tools = list(tools)
+            return
+        by_name = {tool.tool_name: tool for tool in entry.tools}
+        for tool in tools:
+            held = by_name.get(tool.tool_name)
+            if held is None:
+                # A tool the server gained since the first start
+                entry.tools.append(tool)
+            else:
+                held.mcp_client = client
+
+    def _alive(self, entry: _PooledClient, force: bool = False) -> bool:
+        """Liveness check; asks the server for its tools at most once per ``ping_interval``.
+
+        A crashed stdio server can leave the client's background thread
+        running, so only a round trip tells us whether the session works.
+        """
+        if not entry.started:
+            return False
+        now = time.monotonic()
+        if not force and now - entry.checked_at < self.ping_interval:
+            return True
+        try:
+            self._pinger.submit(entry.client.list_tools_sync).result(timeout=self.ping_timeout)
+        except Exception:
+            return False
+        entry.checked_at = now
+        return True
+
+    def _ensure(self, entry: _PooledClient, force: bool = False) -> None:
+        with entry.lock:
+            if self._alive(entry, force):
+                return
+            wait = entry.retry_at - time.monotonic()
+            if wait > 0:
+                raise RuntimeError(
+                    f"MCP server {entry.spec.command} {' '.join(entry.spec.args)} unavailable, "
+                    f"retrying in {wait:.1f}s"
+                )
+            self._connect(entry)
+
+    def get_tools(self, spec: MCPServerSpec) -> list:
+        """Return the cached tool list for ``spec``, connecting if needed."""
+        entry = self._entry(spec)
+        self._ensure(entry)
+        return entry.tools
+
+    def _warm(self, spec: MCPServerSpec) -> float:
+        entry = self._entry(spec)
+        start = time.perf_counter()
+        for attempt in range(self.max_retries):
+            try:
+                self._ensure(entry)
+                break
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(max(0.0, entry.retry_at - time.monotonic()))
+        return time.perf_counter() - start
+
+    def prewarm(self, specs) -> dict:
+        """Start every server in ``specs`` concurrently; returns seconds per spec."""
+        specs = list(specs)
+        if not specs:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(specs)) as pool:
+            return dict(zip(specs, pool.map(self._warm, specs)))
+
+    def start_monitor(self, interval: float = 10.0) -> None:
+        """Reconnect crashed servers in the background instead of on the next request."""
+        if self._monitor is not None:
+            return
+
+        def run():
+            while not self._closed.wait(interval):
+                for entry in list(self._clients.values()):
+                    if not entry.started and entry.tools is None:
+                        continue
+                    try:
+                        self._ensure(entry, force=True)
+                    except Exception as e:
+                        logger.warning("MCP reconnect failed: %s", e)
+
+        self._monitor = threading.Thread(target=run, name="mcp-pool-monitor", daemon=True)
+        self._monitor.start()
+
+    def close(self) -> None:
+        self._closed.set()
+        for entry in list(self._clients.values()):
+            if entry.client is not None:
+                _stop_quietly(entry.client)
+                entry.client = None
+                entry.started = False
+        self._pinger.shutdown(wait=False)
+
+
+_pool: MCPClientPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> MCPClientPool:
+    """Return the process-wide MCP client pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPClientPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,206 @@
+"""Append-only session journal with an in-memory LRU of live agents.
+
+Each session is stored as ``sessions/{session_id}.jsonl``. Every turn appends
+one record with only the messages added since the previous turn, so a turn
+costs O(delta) I/O instead of rewriting the whole history. Records are:
+
+    {"op": "init", "system_prompt": ...}
+    {"op": "append", "drop": k, "messages": [...]}   # drop k from the front first
+    {"op": "reset", "messages": [...]}               # history was rewritten
+
+``drop`` covers conversation managers that trim the window from the front.
+A torn trailing line (crash mid-write) is cut off on replay, before the next
+record is appended after it, and journals are
+compacted into a single ``reset`` record once they grow past
+``compact_every`` records. Hot sessions are served from the LRU and skip
+deserialization entirely.
+"""
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("agent", "persisted", "last", "records", "file", "pending")
+
+    def __init__(self, agent, records: int):
+        self.agent = agent
+        self.persisted = len(agent.messages)
+        self.last = agent.messages[-1] if agent.messages else None
+        self.records = records
+        self.file = None
+        self.pending = 0
+
+
+class SessionStore:
+    def __init__(
+        self,
+        directory: str = "sessions",
+        cache_size: int = 64,
+        fsync_every: int = 8,
+        compact_every: int = 200,
+    ):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close)
+
+    def _journal_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def _read(self, session_id: str):
+        """Replay a session journal; returns (system_prompt, messages, records)."""
+        path = self._journal_path(session_id)
+        if not os.path.isfile(path):
+            # Sessions written by the previous one-file-per-session format.
+            legacy = os.path.join(self.directory, f"{session_id}.json")
+            if os.path.isfile(legacy):
+                with open(legacy, "r") as f:
+                    state = json.load(f)
+                return state["system_prompt"], state["messages"], 0
+            return None, None, 0
+
+        system_prompt, messages, records = None, [], 0
+        # Offset just past the last complete record
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash; everything before it is intact.
+                    break
+                good += len(line)
+                records += 1
+                op = record["op"]
+                if op == "init":
+                    system_prompt = record["system_prompt"]
+                elif op == "append":
+                    if record["drop"]:
+                        del messages[: record["drop"]]
+                    messages.extend(record["messages"])
+                elif op == "reset":
+                    messages = record["messages"]
+        if good < os.path.getsize(path):
+            # Cut the torn tail so the next record does not get glued onto it
+            # and hide every later turn from replay.
+            os.truncate(path, good)
+        return system_prompt, messages, records
+
+    def get(self, session_id: str, factory):
+        """Return the live agent for ``session_id``.
+
+        ``factory(messages, system_prompt)`` builds an agent on a cache miss;
+        both arguments are None for a brand-new session.
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+                return entry.agent
+
+            system_prompt, messages, records = self._read(session_id)
+            agent = factory(messages, system_prompt)
+            entry = _Entry(agent, records)
+            if records == 0:
+                # New (or legacy) session: the journal starts with a snapshot.
+                entry.persisted = 0
+                entry.last = None
+            self._entries[session_id] = entry
+            while len(self._entries) > self.cache_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._close_entry(evicted)
+            return agent
+
+    def append(self, session_id: str, agent) -> bool:
+        """Persist the messages ``agent`` gained since the previous call."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.agent is not agent:
+                entry = _Entry(agent, 0)
+                entry.persisted = 0
+                entry.last = None
+                self._entries[session_id] = entry
+
+            messages = agent.messages
+            if entry.records == 0:
+                self._write(entry, session_id, {"op": "init", "system_prompt": agent.system_prompt})
+                self._write(entry, session_id, {"op": "reset", "messages": messages})
+            else:
+                start = self._find_last(messages, entry)
+                if start is None:
+                    record = {"op": "reset", "messages": messages}
+                else:
+                    record = {
+                        "op": "append",
+                        "drop": entry.persisted - start,
+                        "messages": messages[start:],
+                    }
+                    if not record["drop"] and not record["messages"]:
+                        record = None
+                if record is not None:
+                    self._write(entry, session_id, record)
+
+            entry.persisted = len(messages)
+            entry.last = messages[-1] if messages else None
+
+            if entry.records >= self.compact_every:
+                self._compact(entry, session_id)
+            return True
+
+    @staticmethod
+    def _find_last(messages, entry):
+        """Index just past the last persisted message, matched by identity."""
+        if entry.last is None:
+            return 0 if entry.persisted == 0 else None
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i] is entry.last:
+                return i + 1
+        return None
+
+    def _write(self, entry: _Entry, session_id: str, record: dict) -> None:
+        if entry.file is None:
+            # A fresh journal truncates any torn leftovers from a crash.
+            entry.file = open(self._journal_path(session_id), "w" if entry.records == 0 else "a")
+        entry.file.write(json.dumps(record) + "\n")
+        entry.file.flush()
+        entry.records += 1
+        entry.pending += 1
+        if entry.pending >= self.fsync_every:
+            os.fsync(entry.file.fileno())
+            entry.pending = 0
+
+    def _compact(self, entry: _Entry, session_id: str) -> None:
+        path = self._journal_path(session_id)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps({"op": "init", "system_prompt": entry.agent.system_prompt}) + "\n")
+            f.write(json.dumps({"op": "reset", "messages": entry.agent.messages}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._close_entry(entry)
+        os.replace(tmp, path)
+        entry.records = 2
+
+    @staticmethod
+    def _close_entry(entry: _Entry) -> None:
+        if entry.file is not None:
+            if entry.pending:
+                os.fsync(entry.file.fileno())
+                entry.pending = 0
+            entry.file.close()
+            entry.file = None
+
+    def close(self) -> None:
+        """fsync and close every open journal."""
+        with self._lock:
+            for entry in self._entries.values():
+                self._close_entry(entry)
@@ -0,0 +1,63 @@
+"""Cancellation tests for the A2A executor."""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a.types import TaskState  # noqa: E402
+
+from agent_executor import StrandsAgentExecutor  # noqa: E402
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.events = []
+
+    def enqueue_event(self, event):
+        self.events.append(event)
+
+
+class SlowAgent:
+    """Streams chunks until cancelled, then still reports the task complete,
+    as a stream that swallows the cancellation would."""
+
+    async def stream(self, query, session_id):
+        try:
+            for i in range(100):
+                yield {"is_task_complete": False, "require_user_input": False, "content": f"chunk {i} "}
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            pass
+        yield {"is_task_complete": True, "require_user_input": False, "content": "partial"}
+
+
+def states(events):
+    return [getattr(getattr(e, "status", None), "state", type(e).__name__) for e in events]
+
+
+def test_nothing_is_sent_after_canceled():
+    async def run():
+        executor = StrandsAgentExecutor(SlowAgent(), flush_chars=0)
+        queue = RecordingQueue()
+        task = SimpleNamespace(id="task-1", contextId="ctx-1")
+        context = SimpleNamespace(
+            get_user_input=lambda: "hello", current_task=task, message=object(),
+            task_id=task.id, context_id=task.contextId,
+        )
+        running = asyncio.create_task(executor.execute(context, queue))
+        await asyncio.sleep(0.05)
+        await executor.cancel(context, queue)
+        try:
+            await running
+        except asyncio.CancelledError:
+            pass
+        return states(queue.events)
+
+    sent = asyncio.run(run())
+
+    assert TaskState.working in sent
+    assert TaskState.canceled in sent
+    assert sent[sent.index(TaskState.canceled) + 1:] == []
+    assert TaskState.completed not in sent
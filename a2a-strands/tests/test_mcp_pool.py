@@ -0,0 +1,51 @@
+"""Reconnect tests for the MCP client pool, against a local stub stdio server."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_pool import MCPClientPool, MCPServerSpec  # noqa: E402
+
+STUB_SERVER = '''
+import os
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("stub")
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Echo the text."""
+    return text
+
+@mcp.tool()
+def crash() -> str:
+    """Exit the server without replying."""
+    os._exit(1)
+
+mcp.run()
+'''
+
+
+def call(tool, name, arguments):
+    return tool.mcp_client.call_tool_sync(f"{name}-call", tool.tool_name, arguments)
+
+
+def test_crashed_server_gets_new_client_and_tools_keep_working(tmp_path):
+    server = tmp_path / "stub_server.py"
+    server.write_text(STUB_SERVER)
+    spec = MCPServerSpec(sys.executable, (str(server),))
+    pool = MCPClientPool(ping_interval=0, ping_timeout=5, backoff_base=0)
+    try:
+        tools = {tool.tool_name: tool for tool in pool.get_tools(spec)}
+        first_client = tools["echo"].mcp_client
+        assert call(tools["echo"], "echo", {"text": "hi"})["status"] == "success"
+
+        assert call(tools["crash"], "crash", {})["status"] == "error"
+
+        # The next request notices the dead session and starts a new client
+        again = {tool.tool_name: tool for tool in pool.get_tools(spec)}
+        assert again["echo"] is tools["echo"]
+        assert tools["echo"].mcp_client is not first_client
+        assert call(tools["echo"], "echo", {"text": "back"})["status"] == "success"
+    finally:
+        pool.close()
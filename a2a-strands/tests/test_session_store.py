@@ -0,0 +1,66 @@
+"""Crash/restart tests for the session journal."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import SessionStore  # noqa: E402
+
+
+class StubAgent:
+    def __init__(self, messages=None, system_prompt="You are a researcher."):
+        self.messages = messages if messages is not None else []
+        self.system_prompt = system_prompt
+
+
+def factory(messages, system_prompt):
+    return StubAgent(messages, system_prompt or "You are a researcher.")
+
+
+def say(store, agent, text):
+    agent.messages.append({"role": "user", "content": [{"text": text}]})
+    store.append("s1", agent)
+
+
+def test_turns_after_torn_tail_survive_restart(tmp_path):
+    store = SessionStore(str(tmp_path))
+    agent = store.get("s1", factory)
+    for i in range(3):
+        say(store, agent, f"before {i}")
+    store.close()
+
+    # Crash in the middle of writing the next record
+    with open(tmp_path / "s1.jsonl", "a") as f:
+        f.write('{"op": "append", "drop": 0, "messages": [{"role": "us')
+
+    store = SessionStore(str(tmp_path))
+    agent = store.get("s1", factory)
+    assert len(agent.messages) == 3
+    for i in range(3):
+        say(store, agent, f"after {i}")
+    store.close()
+
+    _, messages, _ = SessionStore(str(tmp_path), cache_size=0)._read("s1")
+    assert [m["content"][0]["text"] for m in messages] == [
+        "before 0", "before 1", "before 2", "after 0", "after 1", "after 2",
+    ]
+
+
+def test_unterminated_last_record_is_dropped(tmp_path):
+    store = SessionStore(str(tmp_path))
+    agent = store.get("s1", factory)
+    say(store, agent, "kept")
+    say(store, agent, "lost")
+    store.close()
+
+    # The crash hit before the newline of the last record
+    path = tmp_path / "s1.jsonl"
+    path.write_bytes(path.read_bytes()[:-1])
+
+    store = SessionStore(str(tmp_path))
+    agent = store.get("s1", factory)
+    say(store, agent, "after")
+    store.close()
+
+    _, messages, _ = SessionStore(str(tmp_path), cache_size=0)._read("s1")
+    assert [m["content"][0]["text"] for m in messages] == ["kept", "after"]
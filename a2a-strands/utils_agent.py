@@ -52,6 +52,15 @@ class CalcAgent:
                         "require_user_input": False,
                         "content": event["data"],
                     }
+                elif "message" in event:
+                    # A message was appended (tool use / tool result): let
+                    # the executor flush any buffered text at this boundary.
+                    yield {
+                        "is_task_complete": False,
+                        "require_user_input": False,
+                        "is_boundary": True,
+                        "content": "",
+                    }
 
         except Exception as e:
             yield {
@@ -109,6 +118,15 @@ class WeatherAgent:
                         "require_user_input": False,
                         "content": event["data"],
                     }
+                elif "message" in event:
+                    # A message was appended (tool use / tool result): let
+                    # the executor flush any buffered text at this boundary.
+                    yield {
+                        "is_task_complete": False,
+                        "require_user_input": False,
+                        "is_boundary": True,
+                        "content": "",
+                    }
 
         except Exception as e:
             yield {
@@ -25,6 +25,7 @@ class Settings(BaseSettings):
 
     # Database Mode
     mock_db: bool = True  # Use in-memory mock (true) or DynamoDB (false)
+    mock_db_snapshot_dir: str = ""  # Save the mock tables here on shutdown and reload them on start
 
     # AWS
     aws_region: str = "us-west-2"
@@ -46,11 +47,28 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
 
-    # Rate Limiting
+    # Authenticated-user cache (0 disables it)
+    auth_cache_ttl_seconds: int = 30
+    auth_cache_max_entries: int = 10000
+
+    # Rate Limiting (per user, or per IP for anonymous requests)
+    rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 100
+    rate_limit_chat_per_minute: int = 20  # POST /api/chat/stream
+    rate_limit_redis_url: str = ""  # Share limits across workers, e.g. redis://localhost:6379/0
+
+    # Sessions: seconds between batched writes of last_accessed/title updates
+    session_flush_interval_seconds: float = 5.0
 
     # S3
     s3_bucket: str = "agent-platform-skills"
+    s3_endpoint: str | None = None  # S3-compatible endpoint, e.g. a local MinIO
+
+    # Skill packages
+    skill_store_dir: str = ""  # Keep packages in this directory instead of S3
+    skill_upload_max_mb: int = 50
+    skill_package_max_files: int = 1000
+    skill_package_max_uncompressed_mb: int = 200
 
     # Claude Agent SDK / Anthropic API Configuration
     anthropic_api_key: str = ""
@@ -1,10 +1,16 @@
 """Core business logic modules."""
 from .agent_manager import AgentManager, agent_manager
 from .session_manager import SessionManager, session_manager
+from .principal_cache import PrincipalCache, principal_cache
+from .skill_ingest import SkillIngestor, skill_ingestor
 
 __all__ = [
     "AgentManager",
     "agent_manager",
     "SessionManager",
     "session_manager",
+    "PrincipalCache",
+    "principal_cache",
+    "SkillIngestor",
+    "skill_ingestor",
 ]
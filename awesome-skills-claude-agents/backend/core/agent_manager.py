@@ -1,4 +1,5 @@
 """Agent lifecycle management using Claude Agent SDK."""
+from collections import OrderedDict
 from typing import AsyncIterator, Optional, Any
 from uuid import uuid4
 import logging
@@ -92,18 +93,119 @@ async def dangerous_command_blocker(
     return {}
 
 
+def _mcp_server_config(mcp_config: dict) -> Optional[dict]:
+    """Convert a stored MCP server into an entry of ClaudeAgentOptions.mcp_servers."""
+    connection_type = mcp_config.get("connection_type", "stdio")
+    config = mcp_config.get("config", {})
+
+    if connection_type == "stdio":
+        return {
+            "type": "stdio",
+            "command": config.get("command"),
+            "args": config.get("args", []),
+        }
+    elif connection_type == "sse":
+        return {
+            "type": "sse",
+            "url": config.get("url"),
+        }
+    elif connection_type == "http":
+        return {
+            "type": "http",
+            "url": config.get("url"),
+        }
+    return None
+
+
 class AgentManager:
     """Manages agent lifecycle using Claude Agent SDK.
 
     Uses ClaudeSDKClient for stateful, multi-turn conversations with Claude.
     Claude Code (underlying SDK) has built-in support for Skills and MCP servers.
+
+    Options are compiled once per (agent_id, agent updated_at, enable_skills,
+    enable_mcp) and shared by every session of the agent; the SDK does not
+    modify them. MCP server configs are fetched in one batch and cached.
+    The agents and MCP routes call invalidate_agent()/invalidate_mcp() on
+    update and delete.
     """
 
-    def __init__(self):
+    def __init__(self, max_cached_options: int = 256):
         self._clients: dict[str, ClaudeSDKClient] = {}
-
-    def _build_options(self, agent_config: dict, enable_skills: bool, enable_mcp: bool) -> ClaudeAgentOptions:
-        """Build ClaudeAgentOptions from agent configuration."""
+        self.max_cached_options = max_cached_options
+        # (agent_id, updated_at, enable_skills, enable_mcp) -> (options, MCP ids used)
+        self._options: OrderedDict[tuple, tuple[ClaudeAgentOptions, frozenset[str]]] = OrderedDict()
+        # mcp_id -> entry of ClaudeAgentOptions.mcp_servers
+        self._mcp_servers: dict[str, dict] = {}
+        # Bumped on invalidation so that builds started earlier are not cached
+        self._generation = 0
+
+    async def get_options(self, agent_config: dict, enable_skills: bool, enable_mcp: bool) -> ClaudeAgentOptions:
+        """Get the compiled options for an agent, building them on first use."""
+        key = (agent_config.get("id"), agent_config.get("updated_at"), enable_skills, enable_mcp)
+        cached = self._options.get(key)
+        if cached is not None:
+            self._options.move_to_end(key)
+            return cached[0]
+
+        generation = self._generation
+        mcp_ids = frozenset(agent_config.get("mcp_ids") or []) if enable_mcp else frozenset()
+        mcp_servers = await self._load_mcp_servers(agent_config.get("mcp_ids") or []) if mcp_ids else {}
+        options = self._build_options(agent_config, enable_skills, enable_mcp, mcp_servers)
+        if generation == self._generation:
+            self._options[key] = (options, mcp_ids)
+            while len(self._options) > self.max_cached_options:
+                self._options.popitem(last=False)
+        return options
+
+    async def _load_mcp_servers(self, mcp_ids: list[str]) -> dict[str, dict]:
+        """Get MCP server configs, fetching the uncached ones in one batch."""
+        servers = {mcp_id: self._mcp_servers[mcp_id] for mcp_id in mcp_ids if mcp_id in self._mcp_servers}
+        missing = [mcp_id for mcp_id in mcp_ids if mcp_id not in servers]
+        if missing:
+            generation = self._generation
+            fetched = {}
+            for mcp_config in await db.mcp_servers.get_batch(missing):
+                server = _mcp_server_config(mcp_config)
+                if server:
+                    fetched[mcp_config["id"]] = server
+            if generation == self._generation:
+                self._mcp_servers.update(fetched)
+            servers.update(fetched)
+        # Keep the agent's ordering of MCP servers
+        return {mcp_id: servers[mcp_id] for mcp_id in mcp_ids if mcp_id in servers}
+
+    def invalidate_agent(self, agent_id: str) -> None:
+        """Drop compiled options of an agent after it changed."""
+        self._generation += 1
+        for key in [key for key in self._options if key[0] == agent_id]:
+            del self._options[key]
+
+    def invalidate_mcp(self, mcp_id: str) -> None:
+        """Drop an MCP server config and the options that use it."""
+        self._generation += 1
+        self._mcp_servers.pop(mcp_id, None)
+        for key in [key for key, (_, mcp_ids) in self._options.items() if mcp_id in mcp_ids]:
+            del self._options[key]
+
+    def clear_options_cache(self) -> None:
+        """Drop all compiled options and MCP server configs."""
+        self._generation += 1
+        self._options.clear()
+        self._mcp_servers.clear()
+
+    def _build_options(
+        self,
+        agent_config: dict,
+        enable_skills: bool,
+        enable_mcp: bool,
+        mcp_servers: Optional[dict[str, dict]] = None,
+    ) -> ClaudeAgentOptions:
+        """Build ClaudeAgentOptions from agent configuration.
+
+        Args:
+            mcp_servers: MCP server entries by ID, from _load_mcp_servers()
+        """
 
         # Build allowed tools list
         allowed_tools = list(agent_config.get("allowed_tools", []))
@@ -126,33 +228,8 @@ class AgentManager:
         # Always allow Skill tool
         allowed_tools.append("Skill")
 
-        # MCP servers configuration
-        mcp_servers = {}
-
-        # Add external MCP servers if enabled
-        if enable_mcp and agent_config.get("mcp_ids"):
-            for mcp_id in agent_config["mcp_ids"]:
-                mcp_config = db.mcp_servers.get(mcp_id)
-                if mcp_config:
-                    connection_type = mcp_config.get("connection_type", "stdio")
-                    config = mcp_config.get("config", {})
-
-                    if connection_type == "stdio":
-                        mcp_servers[mcp_id] = {
-                            "type": "stdio",
-                            "command": config.get("command"),
-                            "args": config.get("args", []),
-                        }
-                    elif connection_type == "sse":
-                        mcp_servers[mcp_id] = {
-                            "type": "sse",
-                            "url": config.get("url"),
-                        }
-                    elif connection_type == "http":
-                        mcp_servers[mcp_id] = {
-                            "type": "http",
-                            "url": config.get("url"),
-                        }
+        # MCP servers configuration (external servers only if enabled)
+        mcp_servers = dict(mcp_servers or {}) if enable_mcp else {}
 
         # Build system prompt
         system_prompt = agent_config.get("system_prompt")
@@ -225,7 +302,7 @@ class AgentManager:
         _configure_claude_environment()
 
         # Build options
-        options = self._build_options(agent_config, enable_skills, enable_mcp)
+        options = await self.get_options(agent_config, enable_skills, enable_mcp)
 
         try:
             async with ClaudeSDKClient(options=options) as client:
@@ -104,26 +104,40 @@ def verify_token(token: str, token_type: str = "access") -> Optional[str]:
     Returns:
         User ID if token is valid, None otherwise
     """
+    payload = decode_verified_token(token)
+    if payload is None:
+        return None
+
+    # Check token type
+    if payload.get("type") != token_type:
+        return None
+
+    # Check expiration
+    exp = payload.get("exp")
+    if exp is None:
+        return None
+    if datetime.fromtimestamp(exp, tz=timezone.utc) < datetime.now(timezone.utc):
+        return None
+
+    return payload.get("sub")
+
+
+def decode_verified_token(token: str) -> Optional[dict]:
+    """Decode a JWT token after checking its signature and expiry.
+
+    Args:
+        token: The JWT token to decode
+
+    Returns:
+        Token payload dict or None if the signature is invalid or the
+        token has expired
+    """
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm],
         )
-
-        # Check token type
-        if payload.get("type") != token_type:
-            return None
-
-        # Check expiration
-        exp = payload.get("exp")
-        if exp is None:
-            return None
-        if datetime.fromtimestamp(exp, tz=timezone.utc) < datetime.now(timezone.utc):
-            return None
-
-        return payload.get("sub")
-
     except JWTError:
         return None
 
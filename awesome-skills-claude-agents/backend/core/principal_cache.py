@@ -0,0 +1,195 @@
+"""Short-lived cache of authenticated principals.
+
+Every authenticated request verifies its JWT and loads the user record.
+PrincipalCache memoises both steps for a short TTL:
+
+- Verified access tokens (keyed by a hash of the token) skip the signature
+  check on repeat requests. Expiry and token type are still checked on every
+  hit, so a memoised token stops working exactly when the JWT would.
+- User records are cached per (user_id, token iat) so that a token issued
+  after a change never sees a record cached for an older token.
+
+Anything that changes a user (login, password change, logout, profile
+update) must call invalidate_user(); this drops the user's records and
+memoised tokens, and discards lookups that were in flight at the time, so a
+change is visible to the next request. Changes made by other processes are
+picked up within the TTL.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from config import settings
+from core.auth import decode_verified_token
+
+
+@dataclass
+class _TokenEntry:
+    """Claims of a token whose signature has been verified."""
+
+    user_id: str
+    token_type: str
+    iat: int
+    exp: float
+
+
+class PrincipalCache:
+    """TTL cache of verified tokens and the users they authenticate."""
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._tokens: OrderedDict[str, _TokenEntry] = OrderedDict()
+        # (user_id, iat) -> (cached_at, user)
+        self._users: OrderedDict[tuple[str, int], tuple[float, dict]] = OrderedDict()
+        self._loads: dict[tuple[str, int], asyncio.Future] = {}
+        # Bumped on invalidation so that lookups started earlier are not stored
+        self._generations: dict[str, int] = {}
+        self._stats = {
+            "token_hits": 0,
+            "token_misses": 0,
+            "user_hits": 0,
+            "user_misses": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        # Bearer tokens are not kept in memory as-is
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str, token_type: str = "access") -> Optional[_TokenEntry]:
+        """Verify a token, skipping the signature check for memoised tokens.
+
+        Returns:
+            The token's claims, or None if it is invalid, expired or of
+            another type.
+        """
+        key = self._token_key(token)
+        entry = self._tokens.get(key) if self.enabled else None
+        if entry is not None:
+            self._stats["token_hits"] += 1
+            self._tokens.move_to_end(key)
+        else:
+            self._stats["token_misses"] += 1
+            payload = decode_verified_token(token)
+            if payload is None or payload.get("sub") is None or payload.get("exp") is None:
+                return None
+            entry = _TokenEntry(
+                user_id=payload["sub"],
+                token_type=payload.get("type", ""),
+                iat=int(payload.get("iat") or 0),
+                exp=float(payload["exp"]),
+            )
+            if self.enabled:
+                self._tokens[key] = entry
+                self._evict(self._tokens)
+
+        if entry.token_type != token_type:
+            return None
+        if entry.exp < datetime.now(timezone.utc).timestamp():
+            self._tokens.pop(key, None)
+            return None
+        return entry
+
+    async def get_user(
+        self, entry: _TokenEntry, load: Callable[[str], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        """Return the user a verified token belongs to.
+
+        Concurrent misses for the same principal share one load. Missing
+        users are not cached.
+
+        Args:
+            entry: Claims returned by verify()
+            load: Loads a user by id, e.g. db.users.get
+
+        Returns:
+            A copy of the user record, or None if the user does not exist
+        """
+        if not self.enabled:
+            return await load(entry.user_id)
+
+        key = (entry.user_id, entry.iat)
+        cached = self._users.get(key)
+        if cached is not None:
+            cached_at, user = cached
+            if time.monotonic() - cached_at < self.ttl_seconds:
+                self._stats["user_hits"] += 1
+                self._users.move_to_end(key)
+                return dict(user)
+            del self._users[key]
+
+        self._stats["user_misses"] += 1
+        pending = self._loads.get(key)
+        if pending is None:
+            generation = self._generations.get(entry.user_id, 0)
+            pending = asyncio.ensure_future(self._load(key, generation, load))
+            self._loads[key] = pending
+        user = await asyncio.shield(pending)
+        return dict(user) if user is not None else None
+
+    async def _load(
+        self, key: tuple[str, int], generation: int, load: Callable[[str], Awaitable[Optional[dict]]]
+    ):
+        user_id = key[0]
+        try:
+            user = await load(user_id)
+        finally:
+            if self._loads.get(key) is asyncio.current_task():
+                del self._loads[key]
+        if user is not None and self._generations.get(user_id, 0) == generation:
+            self._users[key] = (time.monotonic(), dict(user))
+            self._evict(self._users)
+        return user
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop everything cached for a user after the user changed."""
+        self._stats["invalidations"] += 1
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        for key in [key for key in self._users if key[0] == user_id]:
+            del self._users[key]
+        for key in [key for key in self._loads if key[0] == user_id]:
+            del self._loads[key]
+        for key in [key for key, entry in self._tokens.items() if entry.user_id == user_id]:
+            del self._tokens[key]
+
+    def clear(self) -> None:
+        """Drop all cached tokens and users and reset the counters."""
+        for user_id in {key[0] for key in self._loads}:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._tokens.clear()
+        self._users.clear()
+        self._loads.clear()
+        for name in self._stats:
+            self._stats[name] = 0
+
+    def _evict(self, entries: OrderedDict) -> None:
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current sizes."""
+        return {
+            **self._stats,
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    max_entries=settings.auth_cache_max_entries,
+)
@@ -1,12 +1,17 @@
 """Session management for chat conversations."""
 from __future__ import annotations
 
+import asyncio
+import logging
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import Optional
 
+from config import settings
 from database import db
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class SessionInfo:
@@ -44,11 +49,21 @@ class SessionInfo:
 
 
 class SessionManager:
-    """Manages conversation sessions with database persistence."""
+    """Manages conversation sessions with database persistence.
+
+    New sessions are written immediately. Later messages only touch the
+    cached session (last_accessed and title); touched sessions are written
+    back in one batch every `flush_interval` seconds by a background task,
+    and on shutdown.
+    """
 
-    def __init__(self):
+    def __init__(self, flush_interval: float = 5.0):
         # In-memory cache for performance
         self._cache: dict[str, SessionInfo] = {}
+        # Sessions touched since the last flush
+        self._dirty: set[str] = set()
+        self.flush_interval = flush_interval
+        self._flush_task: Optional[asyncio.Task] = None
 
     async def store_session(
         self,
@@ -57,34 +72,34 @@ class SessionManager:
         title: str = "New Chat",
         user_id: Optional[str] = None,
     ) -> SessionInfo:
-        """Store session information in database."""
+        """Store session information, creating it in the database if new."""
         now = datetime.now().isoformat()
 
-        # Check if session exists
-        existing = await db.sessions.get(session_id)
-        if existing:
-            # Update last_accessed
-            updates = {"last_accessed": now}
-            if title and title != "New Chat":
-                updates["title"] = title
-            await db.sessions.update(session_id, updates)
-            existing.update(updates)
+        session_info = self._cache.get(session_id)
+        if session_info is None:
+            existing = await db.sessions.get(session_id)
+            if existing is None:
+                # Create new session
+                session_data = {
+                    "id": session_id,
+                    "agent_id": agent_id,
+                    "title": title,
+                    "user_id": user_id,
+                    "created_at": now,
+                    "last_accessed": now,
+                }
+                await db.sessions.put(session_data)
+                session_info = SessionInfo.from_dict(session_data)
+                self._cache[session_id] = session_info
+                return session_info
             session_info = SessionInfo.from_dict(existing)
-        else:
-            # Create new session
-            session_data = {
-                "id": session_id,
-                "agent_id": agent_id,
-                "title": title,
-                "user_id": user_id,
-                "created_at": now,
-                "last_accessed": now,
-            }
-            await db.sessions.put(session_data)
-            session_info = SessionInfo.from_dict(session_data)
+            self._cache[session_id] = session_info
 
-        # Update cache
-        self._cache[session_id] = session_info
+        # Touch the cached session; the write is batched
+        session_info.last_accessed = now
+        if title and title != "New Chat":
+            session_info.title = title
+        self._dirty.add(session_id)
         return session_info
 
     async def session_exists(self, session_id: str) -> bool:
@@ -110,10 +125,10 @@ class SessionManager:
 
     async def delete_session(self, session_id: str) -> bool:
         """Delete session."""
-        deleted = await db.sessions.delete(session_id)
-        if session_id in self._cache:
-            del self._cache[session_id]
-        return deleted
+        # Drop pending touches first so a flush cannot recreate it
+        self._dirty.discard(session_id)
+        self._cache.pop(session_id, None)
+        return await db.sessions.delete(session_id)
 
     async def list_sessions(
         self,
@@ -121,11 +136,14 @@ class SessionManager:
         user_id: Optional[str] = None,
     ) -> list[SessionInfo]:
         """List all sessions, optionally filtered by agent_id or user_id."""
-        # Fetch from database with user_id filter if provided
-        sessions_data = await db.sessions.list(user_id=user_id)
+        # Fetch from database through the user_id or agent_id index
+        if user_id or not agent_id:
+            sessions_data = await db.sessions.list(user_id=user_id)
+        else:
+            sessions_data = await db.sessions.query("agent_id", agent_id)
 
-        # Convert to SessionInfo objects
-        sessions = [SessionInfo.from_dict(s) for s in sessions_data]
+        # Convert to SessionInfo objects, preferring cached (possibly unflushed) ones
+        sessions = [self._cache.get(s.get("id", "")) or SessionInfo.from_dict(s) for s in sessions_data]
 
         # Filter by agent_id if provided
         if agent_id:
@@ -143,6 +161,46 @@ class SessionManager:
             return True
         return False
 
+    async def flush(self) -> int:
+        """Write touched sessions to the database in one batch.
+
+        Returns:
+            The number of sessions written
+        """
+        if not self._dirty:
+            return 0
+        session_ids, self._dirty = self._dirty, set()
+        items = [self._cache[sid].to_dict() for sid in session_ids if sid in self._cache]
+        try:
+            await db.sessions.put_batch(items)
+        except Exception as e:
+            # Retry with the next flush, except sessions deleted meanwhile
+            self._dirty |= {sid for sid in session_ids if sid in self._cache}
+            logger.warning(f"Failed to flush {len(items)} session(s): {e}")
+            return 0
+        return len(items)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background flush task and flush pending touches."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
 
 # Global instance
-session_manager = SessionManager()
+session_manager = SessionManager(flush_interval=settings.session_flush_interval_seconds)
@@ -0,0 +1,441 @@
+"""Ingestion of uploaded skill packages.
+
+A skill package is a ZIP archive with a SKILL.md at its root (or in a single
+top-level folder) whose YAML frontmatter names and describes the skill.
+Packages can be large (fonts, templates, schemas), so an upload is handled
+without extracting or re-buffering it:
+
+1. The upload is read in chunks to compute its SHA-256 content hash and to
+   enforce the size cap. Starlette has already spooled the multipart body to
+   a temporary file, so that file is used as-is rather than copied again.
+2. A package with the same content hash as an existing skill is rejected
+   before anything else is done with it.
+3. The ZIP central directory is checked (entry count, total uncompressed
+   size, compression ratio, unsafe paths, encrypted entries and symlinks)
+   and SKILL.md is read straight from the archive. No other entry is
+   decompressed.
+4. The archive is streamed to object storage under a content-addressed key,
+   using multipart upload for large packages.
+
+The result is the skill's registry entry, ready to be stored in db.skills.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import shutil
+import stat
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Optional
+
+import yaml
+from fastapi import UploadFile
+
+from config import settings
+from core.exceptions import DuplicateException, ValidationException
+from database import db
+
+logger = logging.getLogger(__name__)
+
+# Chunk size for hashing the upload and copying it to local storage
+CHUNK_SIZE = 1024 * 1024
+# SKILL.md is instructions for the agent; anything larger is not a real one
+MAX_SKILL_MD_BYTES = 1024 * 1024
+
+SKILL_MD = "SKILL.md"
+
+
+@dataclass
+class SkillPackage:
+    """What was learned about a package while ingesting it."""
+
+    name: str
+    description: str
+    version: str
+    content_hash: str
+    size_bytes: int
+    file_count: int
+    uncompressed_bytes: int
+    # Path of SKILL.md inside the archive
+    skill_md_path: str
+    frontmatter: dict = field(default_factory=dict)
+
+    @property
+    def storage_key(self) -> str:
+        return storage_key(self.content_hash)
+
+    def index_entry(self, location: str, created_by: str = "user") -> dict:
+        """Registry entry for db.skills."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "version": self.version,
+            "created_by": created_by,
+            "is_system": False,
+            "s3_location": location,
+            "content_hash": self.content_hash,
+            "size_bytes": self.size_bytes,
+            "file_count": self.file_count,
+        }
+
+
+def storage_key(content_hash: str) -> str:
+    """Object key for a package; identical packages share one object."""
+    return f"skills/{content_hash}.zip"
+
+
+class ObjectStore(ABC):
+    """Where skill packages are kept."""
+
+    @abstractmethod
+    async def put(self, key: str, fileobj: BinaryIO, size: int) -> str:
+        """Store `size` bytes read from `fileobj` under `key`.
+
+        Returns:
+            The location of the stored object
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete the object under `key` if it exists."""
+
+
+class LocalObjectStore(ObjectStore):
+    """Packages kept as files under a directory (development and tests)."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    async def put(self, key: str, fileobj: BinaryIO, size: int) -> str:
+        path = self._path(key)
+        await asyncio.to_thread(self._copy, fileobj, path)
+        return path.resolve().as_uri()
+
+    @staticmethod
+    def _copy(fileobj: BinaryIO, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".partial")
+        with open(partial, "wb") as f:
+            shutil.copyfileobj(fileobj, f, CHUNK_SIZE)
+        partial.replace(path)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+
+class S3ObjectStore(ObjectStore):
+    """Packages kept in an S3 bucket or an S3-compatible server.
+
+    Packages up to `part_size` are sent with one PutObject; larger ones are
+    streamed with a multipart upload, one part in memory at a time, and the
+    upload is aborted if any part fails.
+
+    Args:
+        bucket: Bucket name
+        client: Returns an async context manager yielding an S3 client,
+            e.g. aioboto3.Session().client("s3", ...)
+        part_size: Multipart part size (S3 requires at least 5 MiB except
+            for the last part)
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        client: Callable[[], AbstractAsyncContextManager],
+        part_size: int = 8 * 1024 * 1024,
+    ):
+        self.bucket = bucket
+        self._client = client
+        self.part_size = part_size
+
+    async def put(self, key: str, fileobj: BinaryIO, size: int) -> str:
+        async with self._client() as s3:
+            if size <= self.part_size:
+                body = await asyncio.to_thread(fileobj.read)
+                await s3.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType="application/zip")
+            else:
+                await self._put_multipart(s3, key, fileobj)
+        return f"s3://{self.bucket}/{key}"
+
+    async def _put_multipart(self, s3, key: str, fileobj: BinaryIO) -> None:
+        upload = await s3.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType="application/zip")
+        upload_id = upload["UploadId"]
+        parts = []
+        try:
+            while chunk := await asyncio.to_thread(fileobj.read, self.part_size):
+                part_number = len(parts) + 1
+                response = await s3.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=chunk
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            await s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            await s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def delete(self, key: str) -> None:
+        async with self._client() as s3:
+            await s3.delete_object(Bucket=self.bucket, Key=key)
+
+
+def create_object_store() -> ObjectStore:
+    """Create the object store selected by settings.
+
+    SKILL_STORE_DIR selects local files. Otherwise packages go to S3 (or to
+    S3_ENDPOINT, e.g. a local MinIO), except with the mock database, where a
+    directory under the system temp dir is used.
+    """
+    if settings.skill_store_dir:
+        return LocalObjectStore(settings.skill_store_dir)
+    if settings.mock_db and not settings.s3_endpoint:
+        return LocalObjectStore(Path(tempfile.gettempdir()) / settings.s3_bucket)
+
+    import aioboto3
+
+    session = aioboto3.Session()
+    kwargs = {"region_name": settings.aws_region}
+    if settings.s3_endpoint:
+        kwargs["endpoint_url"] = settings.s3_endpoint
+    if settings.aws_access_key_id:
+        kwargs["aws_access_key_id"] = settings.aws_access_key_id
+        kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
+    return S3ObjectStore(settings.s3_bucket, lambda: session.client("s3", **kwargs))
+
+
+class SkillIngestor:
+    """Validates uploaded skill packages and stores them.
+
+    Args:
+        store: Where packages are kept
+        max_upload_bytes: Largest accepted archive
+        max_files: Most entries an archive may have
+        max_uncompressed_bytes: Largest total size of the archive's contents
+        max_compression_ratio: Largest uncompressed/compressed ratio of any
+            entry; higher ratios are treated as a ZIP bomb
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        max_upload_bytes: int = 50 * 1024 * 1024,
+        max_files: int = 1000,
+        max_uncompressed_bytes: int = 200 * 1024 * 1024,
+        max_compression_ratio: int = 100,
+    ):
+        self.store = store
+        self.max_upload_bytes = max_upload_bytes
+        self.max_files = max_files
+        self.max_uncompressed_bytes = max_uncompressed_bytes
+        self.max_compression_ratio = max_compression_ratio
+        # Content hashes being ingested, so concurrent duplicates are caught too
+        self._in_progress: set[str] = set()
+
+    async def ingest(self, file: UploadFile, name: Optional[str] = None) -> dict:
+        """Validate, deduplicate and store an uploaded package.
+
+        Args:
+            file: The uploaded ZIP archive
+            name: Skill name; defaults to the frontmatter name, then the
+                file name
+
+        Returns:
+            The stored skill record
+
+        Raises:
+            ValidationException: The package is not a valid skill package
+            DuplicateException: An identical package is already registered
+        """
+        content_hash, size = await self._hash_upload(file)
+        await self._check_duplicate(content_hash)
+
+        self._in_progress.add(content_hash)
+        try:
+            await file.seek(0)
+            package = await asyncio.to_thread(self.inspect, file.file, content_hash, size)
+            package.name = name or package.name or PurePosixPath(file.filename or "skill.zip").stem
+
+            await file.seek(0)
+            location = await self.store.put(package.storage_key, file.file, size)
+            try:
+                return await db.skills.put(package.index_entry(location))
+            except BaseException:
+                await self.store.delete(package.storage_key)
+                raise
+        finally:
+            self._in_progress.discard(content_hash)
+
+    async def remove(self, skill: dict) -> None:
+        """Delete the stored package of a skill record, if it has one."""
+        if not skill.get("content_hash"):
+            return
+        try:
+            await self.store.delete(storage_key(skill["content_hash"]))
+        except Exception as e:
+            logger.warning(f"Failed to delete package of skill {skill.get('id')}: {e}")
+
+    async def _hash_upload(self, file: UploadFile) -> tuple[str, int]:
+        if file.size is not None and file.size > self.max_upload_bytes:
+            raise self._too_large()
+        digest = hashlib.sha256()
+        size = 0
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_upload_bytes:
+                raise self._too_large()
+            digest.update(chunk)
+        if size == 0:
+            raise ValidationException(
+                message="Empty skill package",
+                detail="The uploaded file is empty",
+                suggested_action="Please upload a ZIP archive containing a SKILL.md",
+            )
+        return digest.hexdigest(), size
+
+    def _too_large(self) -> ValidationException:
+        return ValidationException(
+            message="Skill package too large",
+            detail=f"Skill packages may be at most {self.max_upload_bytes // (1024 * 1024)} MB",
+            suggested_action="Please remove unneeded files from the package and try again",
+        )
+
+    async def _check_duplicate(self, content_hash: str) -> None:
+        existing = await db.skills.query("content_hash", content_hash)
+        if existing or content_hash in self._in_progress:
+            detail = "This package is already being uploaded"
+            if existing:
+                detail = f"This package is already registered as skill '{existing[0]['name']}' ({existing[0]['id']})"
+            raise DuplicateException(
+                message="Skill package already uploaded",
+                detail=detail,
+                suggested_action="Use the existing skill, or change the package before uploading it again",
+            )
+
+    def inspect(self, fileobj: BinaryIO, content_hash: str, size: int) -> SkillPackage:
+        """Check an archive's central directory and read its SKILL.md.
+
+        Only the central directory and SKILL.md are read; no other entry is
+        decompressed.
+        """
+        try:
+            with zipfile.ZipFile(fileobj) as archive:
+                entries = archive.infolist()
+                self._check_entries(entries)
+                skill_md = self._find_skill_md(entries)
+                with archive.open(skill_md) as f:
+                    text = f.read().decode("utf-8")
+        except zipfile.BadZipFile:
+            raise _invalid("The file is not a valid ZIP archive")
+        except UnicodeDecodeError:
+            raise _invalid(f"{SKILL_MD} must be UTF-8 text")
+
+        frontmatter = parse_frontmatter(text)
+        description = frontmatter.get("description")
+        if not isinstance(description, str) or not description.strip():
+            raise _invalid(f"The {SKILL_MD} frontmatter must include a description")
+        metadata = frontmatter.get("metadata") if isinstance(frontmatter.get("metadata"), dict) else {}
+        files = [e for e in entries if not e.is_dir()]
+        return SkillPackage(
+            name=str(frontmatter.get("name") or ""),
+            description=description.strip(),
+            version=str(frontmatter.get("version") or metadata.get("version") or "1.0.0"),
+            content_hash=content_hash,
+            size_bytes=size,
+            file_count=len(files),
+            uncompressed_bytes=sum(e.file_size for e in files),
+            skill_md_path=skill_md.filename,
+            frontmatter=frontmatter,
+        )
+
+    def _check_entries(self, entries: list[zipfile.ZipInfo]) -> None:
+        if len(entries) > self.max_files:
+            raise _invalid(f"The package has {len(entries)} entries; at most {self.max_files} are allowed")
+        total = 0
+        for entry in entries:
+            path = PurePosixPath(entry.filename)
+            if (
+                entry.filename.startswith("/")
+                or "\\" in entry.filename
+                or ".." in path.parts
+                or (path.parts and ":" in path.parts[0])
+            ):
+                raise _invalid(f"Unsafe path in package: {entry.filename}")
+            if entry.flag_bits & 0x1:
+                raise _invalid(f"Encrypted entries are not supported: {entry.filename}")
+            if stat.S_ISLNK(entry.external_attr >> 16):
+                raise _invalid(f"Symbolic links are not allowed: {entry.filename}")
+            if entry.file_size > max(entry.compress_size, 1) * self.max_compression_ratio:
+                raise _invalid(f"Suspicious compression ratio for {entry.filename}")
+            total += entry.file_size
+        if total > self.max_uncompressed_bytes:
+            raise _invalid(
+                f"The package expands to {total} bytes; at most {self.max_uncompressed_bytes} are allowed"
+            )
+
+    @staticmethod
+    def _find_skill_md(entries: list[zipfile.ZipInfo]) -> zipfile.ZipInfo:
+        # SKILL.md at the root, or in the package's single top-level folder
+        candidates = [
+            e for e in entries
+            if not e.is_dir() and PurePosixPath(e.filename).name == SKILL_MD and e.filename.count("/") <= 1
+        ]
+        root = [e for e in candidates if e.filename == SKILL_MD]
+        if root:
+            candidates = root
+        if len(candidates) != 1:
+            raise _invalid(
+                f"The package must contain exactly one {SKILL_MD} at its root or in a single top-level folder"
+            )
+        if candidates[0].file_size > MAX_SKILL_MD_BYTES:
+            raise _invalid(f"{SKILL_MD} is larger than {MAX_SKILL_MD_BYTES // 1024} KB")
+        return candidates[0]
+
+
+def parse_frontmatter(text: str) -> dict:
+    """Parse the YAML frontmatter of a SKILL.md.
+
+    Returns:
+        The frontmatter mapping, or {} if the file has none
+    """
+    text = text.lstrip("\ufeff")
+    if not text.startswith("---"):
+        return {}
+    lines = text.splitlines()
+    try:
+        end = next(i for i, line in enumerate(lines[1:], start=1) if line.strip() == "---")
+    except StopIteration:
+        raise _invalid(f"The {SKILL_MD} frontmatter is not closed with ---")
+    try:
+        frontmatter = yaml.safe_load("\n".join(lines[1:end])) or {}
+    except yaml.YAMLError as e:
+        raise _invalid(f"The {SKILL_MD} frontmatter is not valid YAML: {e}")
+    if not isinstance(frontmatter, dict):
+        raise _invalid(f"The {SKILL_MD} frontmatter must be a mapping")
+    return frontmatter
+
+
+def _invalid(detail: str) -> ValidationException:
+    return ValidationException(
+        message="Invalid skill package",
+        detail=detail,
+        suggested_action=f"Please upload a ZIP archive with a {SKILL_MD} that has name and description frontmatter",
+    )
+
+
+# Global skill ingestor instance
+skill_ingestor = SkillIngestor(
+    store=create_object_store(),
+    max_upload_bytes=settings.skill_upload_max_mb * 1024 * 1024,
+    max_files=settings.skill_package_max_files,
+    max_uncompressed_bytes=settings.skill_package_max_uncompressed_mb * 1024 * 1024,
+)
@@ -16,7 +16,7 @@ from database.base import BaseDatabase, BaseTable
 # Conditionally import the appropriate database implementation
 if settings.mock_db:
     from database.mock_db import MockDatabase
-    _db_instance = MockDatabase()
+    _db_instance = MockDatabase(snapshot_dir=settings.mock_db_snapshot_dir or None)
 else:
     from database.dynamodb import DynamoDBDatabase
     _db_instance = DynamoDBDatabase()
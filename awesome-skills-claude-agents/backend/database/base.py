@@ -1,8 +1,9 @@
 """Abstract base class for database clients."""
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, TypeVar, Generic
+from typing import AsyncIterator, Optional, TypeVar, Generic
 
 T = TypeVar("T", bound=dict)
 
@@ -25,6 +26,37 @@ class BaseTable(ABC, Generic[T]):
         """List all items, optionally filtered by user_id."""
         pass
 
+    @abstractmethod
+    async def query(self, index_name: str, value: str) -> list[T]:
+        """List items whose `index_name` attribute equals `value`."""
+        pass
+
+    @abstractmethod
+    async def list_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> tuple[list[T], Optional[str]]:
+        """List one page of items, optionally filtered by user_id.
+
+        Returns:
+            The items and the cursor for the next page (None on the last
+            page). A page may hold fewer than `limit` items even when more
+            follow; keep going until the cursor is None.
+        """
+        pass
+
+    async def iter_items(self, page_size: int = 100, user_id: Optional[str] = None) -> AsyncIterator[T]:
+        """Iterate over all items page by page."""
+        cursor = None
+        while True:
+            items, cursor = await self.list_page(limit=page_size, cursor=cursor, user_id=user_id)
+            for item in items:
+                yield item
+            if cursor is None:
+                return
+
     @abstractmethod
     async def delete(self, item_id: str) -> bool:
         """Delete an item by ID."""
@@ -35,6 +67,25 @@ class BaseTable(ABC, Generic[T]):
         """Update an item."""
         pass
 
+    async def get_batch(self, item_ids: list[str]) -> list[T]:
+        """Get several items by ID.
+
+        Items are returned in the order of `item_ids`; missing IDs are
+        skipped. Tables that support batch reads override this; by default
+        the items are fetched concurrently.
+        """
+        items = await asyncio.gather(*(self.get(item_id) for item_id in dict.fromkeys(item_ids)))
+        return [item for item in items if item is not None]
+
+    async def put_batch(self, items: list[T]) -> None:
+        """Insert or replace several items.
+
+        Tables that support batch writes override this; by default the
+        items are put one by one.
+        """
+        for item in items:
+            await self.put(item)
+
 
 class BaseDatabase(ABC):
     """Abstract base class for database clients."""
@@ -73,3 +124,7 @@ class BaseDatabase(ABC):
     async def health_check(self) -> bool:
         """Check if the database is healthy."""
         pass
+
+    async def close(self) -> None:
+        """Release resources on shutdown."""
+        pass
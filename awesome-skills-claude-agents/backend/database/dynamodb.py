@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import aioboto3
+import base64
+import json
 from datetime import datetime
 from typing import Optional, TypeVar, Generic
 from uuid import uuid4
@@ -13,6 +15,28 @@ from database.base import BaseTable, BaseDatabase
 T = TypeVar("T", bound=dict)
 
 
+def _encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+
+async def _collect(operation, **kwargs) -> list:
+    """Run a scan or query to the end, following LastEvaluatedKey."""
+    items = []
+    while True:
+        response = await operation(**kwargs)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return items
+        kwargs["ExclusiveStartKey"] = last_key
+
+
 class DynamoDBTable(BaseTable[T], Generic[T]):
     """DynamoDB table implementation of BaseTable interface."""
 
@@ -21,17 +45,20 @@ class DynamoDBTable(BaseTable[T], Generic[T]):
         self._session = session
         self._resource = None
 
+    @staticmethod
+    def _connection_kwargs() -> dict:
+        kwargs = {"region_name": settings.aws_region}
+        if settings.dynamodb_endpoint:
+            kwargs["endpoint_url"] = settings.dynamodb_endpoint
+        if settings.aws_access_key_id:
+            kwargs["aws_access_key_id"] = settings.aws_access_key_id
+            kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
+        return kwargs
+
     async def _get_table(self):
         """Get the DynamoDB table resource."""
         if self._resource is None:
-            kwargs = {"region_name": settings.aws_region}
-            if settings.dynamodb_endpoint:
-                kwargs["endpoint_url"] = settings.dynamodb_endpoint
-            if settings.aws_access_key_id:
-                kwargs["aws_access_key_id"] = settings.aws_access_key_id
-                kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
-
-            async with self._session.resource("dynamodb", **kwargs) as dynamodb:
+            async with self._session.resource("dynamodb", **self._connection_kwargs()) as dynamodb:
                 self._resource = await dynamodb.Table(self.table_name)
         return self._resource
 
@@ -56,29 +83,81 @@ class DynamoDBTable(BaseTable[T], Generic[T]):
         except ClientError:
             return None
 
+    async def get_batch(self, item_ids: list[str]) -> list[T]:
+        """Get several items by ID with BatchGetItem, skipping missing IDs.
+
+        Keys are requested 100 at a time (the BatchGetItem limit) and
+        unprocessed keys are retried.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        found: dict[str, T] = {}
+        async with self._session.resource("dynamodb", **self._connection_kwargs()) as dynamodb:
+            for start in range(0, len(item_ids), 100):
+                request = {self.table_name: {"Keys": [{"id": item_id} for item_id in item_ids[start:start + 100]]}}
+                while request:
+                    response = await dynamodb.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(self.table_name, []):
+                        found[item["id"]] = item
+                    request = response.get("UnprocessedKeys")
+        return [found[item_id] for item_id in item_ids if item_id in found]
+
     async def list(self, user_id: Optional[str] = None) -> list[T]:
         """List all items, optionally filtered by user_id."""
         table = await self._get_table()
 
         if user_id:
-            # Use a GSI for user_id filtering if available
+            return await self.query("user_id", user_id)
+        return await _collect(table.scan)
+
+    async def query(self, index_name: str, value: str) -> list[T]:
+        """List items whose `index_name` attribute equals `value`.
+
+        Uses the GSI named "<index_name>-index", or a filtered scan if the
+        table has no such index.
+        """
+        table = await self._get_table()
+        names = {"#attr": index_name}
+        values = {":value": value}
+        try:
+            return await _collect(
+                table.query,
+                IndexName=f"{index_name}-index",
+                KeyConditionExpression="#attr = :value",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError:
+            # Fall back to scan with filter if GSI doesn't exist
+            return await _collect(
+                table.scan,
+                FilterExpression="#attr = :value",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+
+    async def list_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> tuple[list[T], Optional[str]]:
+        """List one page of items, optionally filtered by user_id."""
+        table = await self._get_table()
+        kwargs = {"Limit": limit}
+        if cursor:
+            kwargs["ExclusiveStartKey"] = _decode_cursor(cursor)
+
+        if user_id:
+            kwargs["ExpressionAttributeValues"] = {":uid": user_id}
             try:
                 response = await table.query(
-                    IndexName="user_id-index",
-                    KeyConditionExpression="user_id = :uid",
-                    ExpressionAttributeValues={":uid": user_id}
+                    IndexName="user_id-index", KeyConditionExpression="user_id = :uid", **kwargs
                 )
-                return response.get("Items", [])
             except ClientError:
-                # Fall back to scan with filter if GSI doesn't exist
-                response = await table.scan(
-                    FilterExpression="user_id = :uid",
-                    ExpressionAttributeValues={":uid": user_id}
-                )
-                return response.get("Items", [])
+                response = await table.scan(FilterExpression="user_id = :uid", **kwargs)
         else:
-            response = await table.scan()
-            return response.get("Items", [])
+            response = await table.scan(**kwargs)
+        return response.get("Items", []), _encode_cursor(response.get("LastEvaluatedKey"))
 
     async def delete(self, item_id: str) -> bool:
         """Delete an item by ID."""
@@ -131,6 +210,21 @@ class DynamoDBTable(BaseTable[T], Generic[T]):
                 return None
             raise
 
+    async def put_batch(self, items: list[T]) -> None:
+        """Insert or replace several items with BatchWriteItem.
+
+        The batch writer sends up to 25 items per request and retries
+        unprocessed items.
+        """
+        if not items:
+            return
+        now = datetime.now().isoformat()
+        table = await self._get_table()
+        async with table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+            for item in items:
+                item["updated_at"] = now
+                await batch.put_item(Item=item)
+
 
 class DynamoDBDatabase(BaseDatabase):
     """DynamoDB database client implementing BaseDatabase interface."""
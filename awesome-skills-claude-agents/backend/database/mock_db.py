@@ -1,8 +1,12 @@
 """In-memory mock database for development."""
 from __future__ import annotations
 
+import bisect
+import json
+import os
 from datetime import datetime
-from typing import TypeVar, Generic, Optional
+from pathlib import Path
+from typing import Iterable, TypeVar, Generic, Optional
 from uuid import uuid4
 
 from config import settings
@@ -12,21 +16,88 @@ T = TypeVar("T", bound=dict)
 
 
 class MockTable(BaseTable[T], Generic[T]):
-    """Mock table for in-memory storage implementing BaseTable interface."""
+    """Mock table for in-memory storage implementing BaseTable interface.
 
-    def __init__(self, name: str):
+    Items are kept by id in insertion order, with the ids also held sorted
+    for cursor pagination. Each declared index maps an attribute value to
+    the ids of the items holding it, kept up to date by put/update/delete,
+    so indexed list/query calls cost O(k) for k matching items instead of a
+    scan.
+
+    Args:
+        name: Table name, also the snapshot file name
+        indexes: Attributes to index, e.g. ("user_id", "agent_id")
+    """
+
+    def __init__(self, name: str, indexes: Iterable[str] = ()):
         self.name = name
         self._data: dict[str, T] = {}
+        self._ids: list[str] = []
+        # attribute -> value -> ids (a dict, to keep insertion order)
+        self._indexes: dict[str, dict[object, dict[str, None]]] = {attr: {} for attr in indexes}
+
+    # Index maintenance
+
+    def _store(self, item: T) -> None:
+        item_id = item["id"]
+        previous = self._data.get(item_id)
+        if previous is None:
+            bisect.insort(self._ids, item_id)
+        else:
+            self._unindex(previous)
+        self._data[item_id] = item
+        self._index(item)
+
+    def _index(self, item: T) -> None:
+        for attr, index in self._indexes.items():
+            value = item.get(attr)
+            if value is not None:
+                index.setdefault(value, {})[item["id"]] = None
+
+    def _unindex(self, item: T) -> None:
+        for attr, index in self._indexes.items():
+            ids = index.get(item.get(attr))
+            if ids is not None:
+                ids.pop(item["id"], None)
+                if not ids:
+                    del index[item.get(attr)]
+
+    def _matching_ids(self, attr: str, value) -> list[str]:
+        """Ids of items whose `attr` equals `value`, in insertion order."""
+        if attr in self._indexes:
+            return list(self._indexes[attr].get(value, ()))
+        return [item_id for item_id, item in self._data.items() if item.get(attr) == value]
+
+    def load(self, items: Iterable[T]) -> None:
+        """Replace the table contents, rebuilding the indexes."""
+        self._data = {}
+        self._ids = []
+        self._indexes = {attr: {} for attr in self._indexes}
+        for item in items:
+            self._store(item)
+
+    # Snapshots
+
+    def snapshot(self, path: str | Path) -> None:
+        """Write all items to a JSON lines file (atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item in self._data.values():
+                f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str | Path) -> None:
+        """Replace the table contents with a snapshot written by snapshot()."""
+        with open(path, encoding="utf-8") as f:
+            self.load(json.loads(line) for line in f if line.strip())
+
+    # BaseTable API
 
     async def put(self, item: T) -> T:
         """Insert or update an item."""
-        if "id" not in item:
-            item["id"] = str(uuid4())
-        if "created_at" not in item:
-            item["created_at"] = datetime.now().isoformat()
-        item["updated_at"] = datetime.now().isoformat()
-        self._data[item["id"]] = item
-        return item
+        return self.put_sync(item)
 
     async def get(self, item_id: str) -> Optional[T]:
         """Get an item by ID."""
@@ -34,28 +105,41 @@ class MockTable(BaseTable[T], Generic[T]):
 
     async def list(self, user_id: Optional[str] = None) -> list[T]:
         """List all items, optionally filtered by user_id."""
-        items = list(self._data.values())
-        if user_id:
-            items = [item for item in items if item.get("user_id") == user_id]
-        return items
+        return self.list_sync(user_id)
+
+    async def get_batch(self, item_ids: list[str]) -> list[T]:
+        """Get several items by ID, skipping missing IDs."""
+        return [self._data[item_id] for item_id in dict.fromkeys(item_ids) if item_id in self._data]
+
+    async def query(self, index_name: str, value: str) -> list[T]:
+        """List items whose `index_name` attribute equals `value`."""
+        return [self._data[item_id] for item_id in self._matching_ids(index_name, value)]
+
+    async def list_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> tuple[list[T], Optional[str]]:
+        """List one page of items in id order, optionally filtered by user_id."""
+        ids = sorted(self._matching_ids("user_id", user_id)) if user_id else self._ids
+        start = bisect.bisect_right(ids, cursor) if cursor else 0
+        page_ids = ids[start:start + limit]
+        next_cursor = page_ids[-1] if start + limit < len(ids) else None
+        return [self._data[item_id] for item_id in page_ids], next_cursor
 
     async def delete(self, item_id: str) -> bool:
         """Delete an item by ID."""
-        if item_id in self._data:
-            del self._data[item_id]
-            return True
-        return False
+        return self.delete_sync(item_id)
 
     async def update(self, item_id: str, updates: dict) -> Optional[T]:
         """Update an item."""
-        if item_id not in self._data:
-            return None
-        item = self._data[item_id]
-        for key, value in updates.items():
-            if value is not None:
-                item[key] = value
-        item["updated_at"] = datetime.now().isoformat()
-        return item
+        return self.update_sync(item_id, updates)
+
+    async def put_batch(self, items: list[T]) -> None:
+        """Insert or replace several items."""
+        for item in items:
+            self.put_sync(item)
 
     # Synchronous versions for backward compatibility
     def put_sync(self, item: T) -> T:
@@ -65,7 +149,7 @@ class MockTable(BaseTable[T], Generic[T]):
         if "created_at" not in item:
             item["created_at"] = datetime.now().isoformat()
         item["updated_at"] = datetime.now().isoformat()
-        self._data[item["id"]] = item
+        self._store(item)
         return item
 
     def get_sync(self, item_id: str) -> Optional[T]:
@@ -74,41 +158,61 @@ class MockTable(BaseTable[T], Generic[T]):
 
     def list_sync(self, user_id: Optional[str] = None) -> list[T]:
         """Synchronous version of list."""
-        items = list(self._data.values())
         if user_id:
-            items = [item for item in items if item.get("user_id") == user_id]
-        return items
+            return [self._data[item_id] for item_id in self._matching_ids("user_id", user_id)]
+        return list(self._data.values())
 
     def delete_sync(self, item_id: str) -> bool:
         """Synchronous version of delete."""
-        if item_id in self._data:
-            del self._data[item_id]
-            return True
-        return False
+        item = self._data.pop(item_id, None)
+        if item is None:
+            return False
+        self._unindex(item)
+        del self._ids[bisect.bisect_left(self._ids, item_id)]
+        return True
 
     def update_sync(self, item_id: str, updates: dict) -> Optional[T]:
         """Synchronous version of update."""
         if item_id not in self._data:
             return None
         item = self._data[item_id]
+        self._unindex(item)
         for key, value in updates.items():
             if value is not None:
                 item[key] = value
         item["updated_at"] = datetime.now().isoformat()
+        self._index(item)
         return item
 
 
 class MockDatabase(BaseDatabase):
     """Mock database with multiple tables implementing BaseDatabase interface."""
 
-    def __init__(self):
-        self._agents = MockTable[dict]("agents")
-        self._skills = MockTable[dict]("skills")
-        self._mcp_servers = MockTable[dict]("mcp_servers")
-        self._sessions = MockTable[dict]("sessions")
-        self._users = MockTable[dict]("users")
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        self._agents = MockTable[dict]("agents", indexes=("user_id",))
+        self._skills = MockTable[dict]("skills", indexes=("user_id", "content_hash"))
+        self._mcp_servers = MockTable[dict]("mcp_servers", indexes=("user_id",))
+        self._sessions = MockTable[dict]("sessions", indexes=("user_id", "agent_id"))
+        self._users = MockTable[dict]("users", indexes=("email",))
         self._init_sample_data()
 
+        # Reload tables saved by a previous run
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        if self.snapshot_dir:
+            for table in self._tables():
+                path = self.snapshot_dir / f"{table.name}.jsonl"
+                if path.exists():
+                    table.load_snapshot(path)
+
+    def _tables(self) -> list[MockTable]:
+        return [self._agents, self._skills, self._mcp_servers, self._sessions, self._users]
+
+    def snapshot(self) -> None:
+        """Write every table to <snapshot_dir>/<table>.jsonl."""
+        if self.snapshot_dir:
+            for table in self._tables():
+                table.snapshot(self.snapshot_dir / f"{table.name}.jsonl")
+
     @property
     def agents(self) -> MockTable:
         return self._agents
@@ -133,6 +237,10 @@ class MockDatabase(BaseDatabase):
         """Mock database is always healthy."""
         return True
 
+    async def close(self) -> None:
+        """Snapshot the tables if a snapshot directory is configured."""
+        self.snapshot()
+
     def _init_sample_data(self):
         """Initialize with sample data for demo."""
         # Sample agents
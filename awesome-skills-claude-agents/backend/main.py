@@ -1,16 +1,17 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 import logging
 
 from config import settings
 from routers import agents_router, skills_router, mcp_router, chat_router, auth_router
 from middleware.error_handler import setup_error_handlers
-from middleware.rate_limit import limiter
+from middleware.rate_limit import enforce_rate_limit, limiter
+from core.principal_cache import principal_cache
+from core.session_manager import session_manager
+from database import db
 
 # Configure logging
 logging.basicConfig(
@@ -26,10 +27,16 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Debug mode: {settings.debug}")
-    logger.info(f"Rate limit: {settings.rate_limit_per_minute}/minute")
+    logger.info(
+        f"Rate limit: {settings.rate_limit_per_minute}/minute, chat {settings.rate_limit_chat_per_minute}/minute "
+        f"({type(limiter.backend).__name__})"
+    )
+    session_manager.start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await session_manager.stop()
+    await db.close()
 
 
 # Create FastAPI application
@@ -38,12 +45,9 @@ app = FastAPI(
     version=settings.app_version,
     description="AI Agent Platform API - Manage agents, skills, and MCP servers",
     lifespan=lifespan,
+    dependencies=[Depends(enforce_rate_limit)],
 )
 
-# Configure rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Configure CORS
 # In production, you should set CORS_ORIGINS environment variable
 # to restrict origins to your domain(s)
@@ -98,6 +102,7 @@ async def health_check():
         "status": "healthy",
         "version": settings.app_version,
         "sdk": "claude-agent-sdk",
+        "auth_cache": principal_cache.stats(),
     }
 
 
@@ -6,7 +6,7 @@ from fastapi import Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from database import db
-from core.auth import verify_token
+from core.principal_cache import principal_cache
 from core.exceptions import (
     TokenMissingException,
     TokenInvalidException,
@@ -46,16 +46,16 @@ async def get_current_user(
 
     token = credentials.credentials
 
-    # Verify token and get user_id
-    user_id = verify_token(token, token_type="access")
-    if user_id is None:
+    # Verify token (memoised for repeat tokens)
+    claims = principal_cache.verify(token, token_type="access")
+    if claims is None:
         raise TokenExpiredException(
             message="Token expired or invalid",
             suggested_action="Please refresh your token or log in again",
         )
 
-    # Get user from database
-    user = await db.users.get(user_id)
+    # Get user from the principal cache or the database
+    user = await principal_cache.get_user(claims, db.users.get)
     if user is None:
         raise TokenInvalidException(
             message="User not found",
@@ -86,13 +86,13 @@ async def get_optional_user(
 
     token = credentials.credentials
 
-    # Verify token and get user_id
-    user_id = verify_token(token, token_type="access")
-    if user_id is None:
+    # Verify token (memoised for repeat tokens)
+    claims = principal_cache.verify(token, token_type="access")
+    if claims is None:
         return None
 
-    # Get user from database
-    return await db.users.get(user_id)
+    # Get user from the principal cache or the database
+    return await principal_cache.get_user(claims, db.users.get)
 
 
 def require_user_ownership(resource_user_id: Optional[str], current_user: dict) -> bool:
@@ -1,62 +1,244 @@
-"""Rate limiting middleware using slowapi."""
+"""Rate limiting for API requests.
+
+Requests are limited per caller and per route class: authenticated callers
+are keyed by the user id in their verified token, anonymous callers by IP
+address. Expensive routes (the chat stream) have their own bucket so that
+cheap polling cannot starve them, and vice versa.
+
+Two backends are available:
+
+- MemoryBackend (default): an exact token bucket per key, in process. Each
+  uvicorn worker enforces its own limit.
+- RedisBackend (RATE_LIMIT_REDIS_URL set): a sliding-window counter shared
+  by all workers through any Redis-compatible server.
+
+The limiter runs as an app-wide dependency and raises RateLimitException,
+which the error handlers turn into a 429 with a Retry-After header.
+"""
 from __future__ import annotations
 
-from fastapi import Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from fastapi import Request, Response
 
 from config import settings
+from core.exceptions import RateLimitException
+from core.principal_cache import principal_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A limit of `limit` requests per `period` seconds."""
+
+    limit: int
+    period: float
+
+    def __str__(self) -> str:
+        return f"{self.limit}/{self.period:g}s"
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one request against a rate."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the request would be allowed (0 when allowed)
+    retry_after: float
+    # Seconds until the bucket is full again
+    reset_after: float
+
+
+class RateLimitBackend(ABC):
+    """Storage and algorithm for rate limit buckets."""
+
+    @abstractmethod
+    async def hit(self, key: str, rate: Rate, cost: int = 1) -> RateLimitResult:
+        """Count a request of `cost` against the bucket `key`."""
+
+    async def reset(self) -> None:
+        """Drop all buckets."""
+
+
+class MemoryBackend(RateLimitBackend):
+    """Token bucket per key, kept in this process.
+
+    Each key holds two numbers (tokens, last update); the least recently
+    used keys are dropped past max_keys, which only forgets buckets that
+    have been idle the longest.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def hit(self, key: str, rate: Rate, cost: int = 1) -> RateLimitResult:
+        now = self._clock()
+        refill_per_second = rate.limit / rate.period
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(rate.limit), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(rate.limit, bucket[0] + (now - bucket[1]) * refill_per_second)
+            bucket[1] = now
+
+        allowed = bucket[0] >= cost
+        if allowed:
+            bucket[0] -= cost
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=int(bucket[0]),
+            retry_after=0.0 if allowed else (cost - bucket[0]) / refill_per_second,
+            reset_after=(rate.limit - bucket[0]) / refill_per_second,
+        )
+
+    async def reset(self) -> None:
+        self._buckets.clear()
+
+
+class RedisBackend(RateLimitBackend):
+    """Sliding-window counter shared through a Redis-compatible server.
+
+    Each key keeps one counter per fixed window (two live at a time). The
+    request count is the current window plus the previous window weighted
+    by how much of it still overlaps the sliding window. Only INCR, DECR,
+    GET and PEXPIRE are used, so every step is atomic on the server and the
+    limit holds across workers.
+
+    Args:
+        client: An asyncio Redis client, e.g. redis.asyncio.Redis
+        prefix: Prefix for the counter keys
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self._clock = clock
+
+    async def hit(self, key: str, rate: Rate, cost: int = 1) -> RateLimitResult:
+        now = self._clock()
+        window = int(now // rate.period)
+        elapsed = now - window * rate.period
+        current_key = f"{self.prefix}{key}:{window}"
+
+        current = await self.client.incr(current_key, cost)
+        if current == cost:
+            await self.client.pexpire(current_key, int(rate.period * 2000))
+        previous = int(await self.client.get(f"{self.prefix}{key}:{window - 1}") or 0)
+
+        previous_weight = 1 - elapsed / rate.period
+        count = previous * previous_weight + current
+        allowed = count <= rate.limit
+        if not allowed:
+            # Rejected requests do not use up the window
+            await self.client.decr(current_key, cost)
+            count -= cost
+        until_next_window = rate.period - elapsed
+        if allowed:
+            retry_after = 0.0
+        elif previous:
+            retry_after = min((count + cost - rate.limit) * rate.period / previous, until_next_window)
+        else:
+            retry_after = until_next_window
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=max(0, math.floor(rate.limit - count)),
+            retry_after=retry_after,
+            # Both live windows have expired by then
+            reset_after=until_next_window + rate.period,
+        )
+
+
+class RateLimiter:
+    """Applies per-route-class rates to callers.
+
+    Args:
+        backend: Where buckets are kept
+        rules: Rate per rule name; "default" applies to unlisted routes
+        routes: Rule name per request path, e.g. {"/api/chat/stream": "chat"}
+    """
+
+    def __init__(self, backend: RateLimitBackend, rules: dict[str, Rate], routes: dict[str, str]):
+        self.backend = backend
+        self.rules = rules
+        self.routes = routes
+
+    def rule_for(self, path: str) -> str:
+        return self.routes.get(path, "default")
+
+    async def hit(self, request: Request) -> tuple[str, RateLimitResult]:
+        """Count the request against its caller's bucket for its route class."""
+        rule = self.rule_for(request.url.path)
+        result = await self.backend.hit(f"{rule}:{get_user_identifier(request)}", self.rules[rule])
+        return rule, result
+
+    async def reset(self) -> None:
+        await self.backend.reset()
 
 
 def get_user_identifier(request: Request) -> str:
     """Get unique identifier for rate limiting.
 
-    Uses authenticated user_id if available, otherwise falls back to IP address.
-    This allows rate limiting per user when authenticated, or per IP when not.
+    Uses the user id of a valid access token if present (verified through
+    the principal cache, so repeat tokens are cheap), otherwise the client
+    IP address. Invalid tokens fall back to the IP address, so random
+    tokens cannot mint fresh buckets.
     """
     # Check for authenticated user in request state
     if hasattr(request.state, "user") and request.state.user:
         return f"user:{request.state.user.get('id', '')}"
 
-    # Try to get user from Authorization header (for JWT)
     auth_header = request.headers.get("Authorization", "")
     if auth_header.startswith("Bearer "):
-        # Use a hash of the token for rate limiting (not the full token)
-        token = auth_header[7:]
-        if len(token) > 10:
-            return f"token:{token[:10]}"
+        claims = principal_cache.verify(auth_header[7:], token_type="access")
+        if claims is not None:
+            return f"user:{claims.user_id}"
 
     # Fall back to IP address
-    return get_remote_address(request)
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def create_backend() -> RateLimitBackend:
+    """Create the backend selected by settings."""
+    if not settings.rate_limit_redis_url:
+        return MemoryBackend()
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise ImportError("RATE_LIMIT_REDIS_URL requires the redis package: pip install redis") from e
+    return RedisBackend(redis.from_url(settings.rate_limit_redis_url))
 
 
-# Create limiter with default rate limit
-limiter = Limiter(
-    key_func=get_user_identifier,
-    default_limits=[f"{settings.rate_limit_per_minute}/minute"],
+limiter = RateLimiter(
+    backend=create_backend(),
+    rules={
+        "default": Rate(settings.rate_limit_per_minute, 60),
+        "chat": Rate(settings.rate_limit_chat_per_minute, 60),
+    },
+    routes={"/api/chat/stream": "chat"},
 )
 
 
-def get_limiter() -> Limiter:
+def get_limiter() -> RateLimiter:
     """Get the rate limiter instance."""
     return limiter
 
 
-# Decorator for rate-limited endpoints
-def rate_limit(limit: str):
-    """Rate limit decorator for specific endpoints.
-
-    Usage:
-        @router.get("/endpoint")
-        @rate_limit("10/minute")
-        async def endpoint():
-            ...
-    """
-    return limiter.limit(limit)
-
-
 # Exemptions for specific paths (like health checks)
 EXEMPT_PATHS = {
     "/health",
@@ -69,4 +251,29 @@ EXEMPT_PATHS = {
 
 def should_exempt(request: Request) -> bool:
     """Check if request path should be exempt from rate limiting."""
-    return request.url.path in EXEMPT_PATHS
+    return request.url.path in EXEMPT_PATHS or request.method == "OPTIONS"
+
+
+async def enforce_rate_limit(request: Request, response: Response) -> None:
+    """App-wide dependency that limits each caller per route class.
+
+    Sets X-RateLimit-* headers on the response and raises
+    RateLimitException once the caller's bucket is empty. If the backend
+    is unreachable the request is let through.
+    """
+    if not settings.rate_limit_enabled or should_exempt(request):
+        return
+    try:
+        rule, result = await limiter.hit(request)
+    except Exception as e:
+        logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+        return
+
+    response.headers["X-RateLimit-Limit"] = str(result.limit)
+    response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+    response.headers["X-RateLimit-Reset"] = str(math.ceil(result.reset_after))
+    if not result.allowed:
+        raise RateLimitException(
+            retry_after=max(1, math.ceil(result.retry_after)),
+            detail=f"Limit for {rule} requests is {limiter.rules[rule]}",
+        )
@@ -2,6 +2,7 @@
 from fastapi import APIRouter
 from schemas.agent import AgentCreateRequest, AgentUpdateRequest, AgentResponse
 from database import db
+from core.agent_manager import agent_manager
 from core.exceptions import (
     AgentNotFoundException,
     ValidationException,
@@ -79,6 +80,7 @@ async def update_agent(agent_id: str, request: AgentUpdateRequest):
 
     updates = request.model_dump(exclude_unset=True)
     agent = await db.agents.update(agent_id, updates)
+    agent_manager.invalidate_agent(agent_id)
     return agent
 
 
@@ -93,6 +95,7 @@ async def delete_agent(agent_id: str):
         )
 
     deleted = await db.agents.delete(agent_id)
+    agent_manager.invalidate_agent(agent_id)
     if not deleted:
         raise AgentNotFoundException(
             detail=f"Agent with ID '{agent_id}' does not exist",
@@ -21,6 +21,7 @@ from core.auth import (
     verify_token,
     create_token_pair,
 )
+from core.principal_cache import principal_cache
 from core.exceptions import (
     ValidationException,
     DuplicateException,
@@ -92,6 +93,7 @@ async def login(request: LoginRequest):
 
     # Update last login
     await db.users.update(user["id"], {"last_login": datetime.now().isoformat()})
+    principal_cache.invalidate_user(user["id"])
 
     # Generate tokens
     access_token, refresh_token, expires_in = create_token_pair(user["id"])
@@ -142,6 +144,7 @@ async def logout(current_user: dict = Depends(get_current_user)):
     """
     # JWT tokens are stateless, so we just return success
     # In production, you might want to add the token to a blacklist
+    principal_cache.invalidate_user(current_user["id"])
     return None
 
 
@@ -175,5 +178,6 @@ async def change_password(
         current_user["id"],
         {"password_hash": hash_password(request.new_password)},
     )
+    principal_cache.invalidate_user(current_user["id"])
 
     return None
@@ -4,6 +4,7 @@ from fastapi.responses import StreamingResponse
 from schemas.message import ChatRequest, ChatSessionResponse
 from database import db
 from core.agent_manager import agent_manager
+from core.session_manager import session_manager
 from core.exceptions import (
     AgentNotFoundException,
     SessionNotFoundException,
@@ -110,17 +111,15 @@ async def chat_stream(request: Request):
 
 @router.get("/sessions", response_model=list[ChatSessionResponse])
 async def list_sessions(agent_id: str | None = None):
-    """List chat sessions."""
-    sessions = await db.sessions.list()
-    if agent_id:
-        sessions = [s for s in sessions if s.get("agent_id") == agent_id]
-    return sessions
+    """List chat sessions, most recently used first."""
+    sessions = await session_manager.list_sessions(agent_id=agent_id)
+    return [{**s.to_dict(), "last_accessed_at": s.last_accessed} for s in sessions]
 
 
 @router.delete("/sessions/{session_id}", status_code=204)
 async def delete_session(session_id: str):
     """Delete a chat session."""
-    deleted = await db.sessions.delete(session_id)
+    deleted = await session_manager.delete_session(session_id)
     if not deleted:
         raise SessionNotFoundException(
             detail=f"Session with ID '{session_id}' does not exist",
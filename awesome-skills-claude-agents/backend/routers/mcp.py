@@ -2,6 +2,7 @@
 from fastapi import APIRouter
 from schemas.mcp import MCPCreateRequest, MCPUpdateRequest, MCPResponse, MCPTestResult
 from database import db
+from core.agent_manager import agent_manager
 from core.exceptions import (
     MCPServerNotFoundException,
     ValidationException,
@@ -116,6 +117,7 @@ async def update_mcp_server(mcp_id: str, request: MCPUpdateRequest):
             updates["endpoint"] = url.replace("http://", "").replace("https://", "")
 
     server = await db.mcp_servers.update(mcp_id, updates)
+    agent_manager.invalidate_mcp(mcp_id)
     return server
 
 
@@ -123,6 +125,7 @@ async def update_mcp_server(mcp_id: str, request: MCPUpdateRequest):
 async def delete_mcp_server(mcp_id: str):
     """Delete an MCP server configuration."""
     deleted = await db.mcp_servers.delete(mcp_id)
+    agent_manager.invalidate_mcp(mcp_id)
     if not deleted:
         raise MCPServerNotFoundException(
             detail=f"MCP server with ID '{mcp_id}' does not exist",
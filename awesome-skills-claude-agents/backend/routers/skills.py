@@ -2,6 +2,7 @@
 from fastapi import APIRouter, UploadFile, File, Form
 from schemas.skill import SkillCreateRequest, SkillGenerateRequest, SkillResponse
 from database import db
+from core.skill_ingest import skill_ingestor
 from core.exceptions import (
     SkillNotFoundException,
     ValidationException,
@@ -41,7 +42,7 @@ async def upload_skill(
     file: UploadFile = File(...),
     name: str = Form(None),
 ):
-    """Upload a skill package (ZIP file)."""
+    """Upload a skill package (ZIP file) containing a SKILL.md."""
     if not file.filename or not file.filename.endswith(".zip"):
         raise ValidationException(
             message="Invalid file format",
@@ -49,22 +50,7 @@ async def upload_skill(
             suggested_action="Please ensure your file has a .zip extension and try again"
         )
 
-    # In production, this would:
-    # 1. Upload to S3
-    # 2. Extract and validate SKILL.md
-    # 3. Store metadata in DynamoDB
-
-    skill_name = name or file.filename.replace(".zip", "")
-    skill_data = {
-        "name": skill_name,
-        "description": f"Uploaded skill package: {file.filename}",
-        "created_by": "user",
-        "version": "1.0.0",
-        "is_system": False,
-        "s3_location": f"s3://agent-platform-skills/{skill_name}.zip",
-    }
-    skill = await db.skills.put(skill_data)
-    return skill
+    return await skill_ingestor.ingest(file, name=name)
 
 
 @router.post("/generate", response_model=SkillResponse, status_code=201)
@@ -106,3 +92,4 @@ async def delete_skill(skill_id: str):
         )
 
     await db.skills.delete(skill_id)
+    await skill_ingestor.remove(skill)
@@ -48,3 +48,6 @@ class SkillResponse(BaseModel):
     updated_at: str
     version: str
     is_system: bool
+    content_hash: str | None = None
+    size_bytes: int | None = None
+    file_count: int | None = None
@@ -3,10 +3,14 @@ import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
 import asyncio
+import zipfile
+from io import BytesIO
 from typing import Generator, AsyncGenerator
 
 from main import app
 from database import db
+from middleware.rate_limit import limiter
+from core.skill_ingest import LocalObjectStore, skill_ingestor
 
 
 @pytest.fixture(scope="session")
@@ -44,10 +48,25 @@ def reset_database():
     yield
 
     # Restore original data after test
-    db._agents._data = original_agents
-    db._skills._data = original_skills
-    db._mcp_servers._data = original_mcp_servers
-    db._sessions._data = original_sessions
+    db._agents.load(original_agents.values())
+    db._skills.load(original_skills.values())
+    db._mcp_servers.load(original_mcp_servers.values())
+    db._sessions.load(original_sessions.values())
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Give each test fresh rate limit buckets."""
+    asyncio.run(limiter.reset())
+
+
+@pytest.fixture(autouse=True)
+def skill_store(tmp_path):
+    """Keep uploaded skill packages in a per-test directory."""
+    original_store = skill_ingestor.store
+    skill_ingestor.store = LocalObjectStore(tmp_path / "skill-store")
+    yield skill_ingestor.store
+    skill_ingestor.store = original_store
 
 
 # Sample test data fixtures
@@ -80,6 +99,20 @@ def sample_skill_data():
     }
 
 
+@pytest.fixture
+def skill_zip():
+    """Build an in-memory skill package from {path: content}."""
+    def build(files: dict[str, str | bytes] | None = None) -> bytes:
+        if files is None:
+            files = {"SKILL.md": "---\nname: test-skill\ndescription: A test skill\n---\n\n# Test skill\n"}
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for path, content in files.items():
+                archive.writestr(path, content)
+        return buffer.getvalue()
+    return build
+
+
 @pytest.fixture
 def sample_mcp_data():
     """Sample MCP server data for tests."""
@@ -0,0 +1,146 @@
+"""Tests for compiled agent options in AgentManager."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.agent_manager import AgentManager, agent_manager
+from database import db
+
+
+@pytest.fixture
+def manager() -> AgentManager:
+    """An agent manager with empty caches."""
+    return AgentManager()
+
+
+@pytest.fixture
+def agent_with_mcp() -> dict:
+    """An agent using a stdio and an SSE MCP server."""
+    db.mcp_servers.put_sync({
+        "id": "mcp-test-stdio",
+        "name": "Test stdio",
+        "connection_type": "stdio",
+        "config": {"command": "npx", "args": ["server"]},
+        "status": "online",
+        "agent_count": 1,
+    })
+    db.mcp_servers.put_sync({
+        "id": "mcp-test-sse",
+        "name": "Test SSE",
+        "connection_type": "sse",
+        "config": {"url": "http://localhost:9000/sse"},
+        "status": "online",
+        "agent_count": 1,
+    })
+    return db.agents.put_sync({
+        "id": "agent-test-mcp",
+        "name": "MCP agent",
+        "description": "Uses MCP servers",
+        "mcp_ids": ["mcp-test-stdio", "mcp-test-sse", "mcp-missing"],
+        "enable_bash_tool": False,
+    })
+
+
+@pytest.fixture
+def count_mcp_reads():
+    """Record the IDs of every get/get_batch on the MCP servers table."""
+    calls = []
+    table = db.mcp_servers
+    original_get, original_get_batch = table.get, table.get_batch
+
+    async def get(mcp_id):
+        calls.append(("get", [mcp_id]))
+        return await original_get(mcp_id)
+
+    async def get_batch(mcp_ids):
+        calls.append(("get_batch", list(mcp_ids)))
+        return await original_get_batch(mcp_ids)
+
+    with patch.multiple(table, get=get, get_batch=get_batch):
+        yield calls
+
+
+class TestCompiledOptions:
+    """Tests for AgentManager.get_options."""
+
+    async def test_options_shared_until_agent_changes(self, manager: AgentManager, agent_with_mcp: dict):
+        """Test options are compiled once per agent version and flags."""
+        first = await manager.get_options(agent_with_mcp, enable_skills=True, enable_mcp=True)
+        again = await manager.get_options(dict(agent_with_mcp), enable_skills=True, enable_mcp=True)
+        without_mcp = await manager.get_options(agent_with_mcp, enable_skills=True, enable_mcp=False)
+
+        assert again is first
+        assert without_mcp is not first
+        assert without_mcp.mcp_servers is None
+
+        changed = await manager.get_options(
+            {**agent_with_mcp, "updated_at": "2099-01-01T00:00:00", "enable_bash_tool": True},
+            enable_skills=True,
+            enable_mcp=True,
+        )
+        assert changed is not first
+        assert "Bash" in changed.allowed_tools
+
+    async def test_mcp_servers_batch_fetched_once(
+        self, manager: AgentManager, agent_with_mcp: dict, count_mcp_reads
+    ):
+        """Test MCP configs are fetched in one awaited batch and then cached."""
+        options = await manager.get_options(agent_with_mcp, enable_skills=False, enable_mcp=True)
+        await manager.get_options(agent_with_mcp, enable_skills=True, enable_mcp=True)
+
+        assert options.mcp_servers == {
+            "mcp-test-stdio": {"type": "stdio", "command": "npx", "args": ["server"]},
+            "mcp-test-sse": {"type": "sse", "url": "http://localhost:9000/sse"},
+        }
+        # The missing server is looked up again, the found ones are not
+        assert count_mcp_reads == [
+            ("get_batch", ["mcp-test-stdio", "mcp-test-sse", "mcp-missing"]),
+            ("get_batch", ["mcp-missing"]),
+        ]
+
+    async def test_invalidation_during_build_is_not_cached(self, manager: AgentManager, agent_with_mcp: dict):
+        """Test options built from data read before an invalidation are not kept."""
+        original_get_batch = db.mcp_servers.get_batch
+
+        async def slow_get_batch(mcp_ids):
+            items = await original_get_batch(mcp_ids)
+            await asyncio.sleep(0.01)
+            return items
+
+        with patch.object(db.mcp_servers, "get_batch", slow_get_batch):
+            build = asyncio.ensure_future(manager.get_options(agent_with_mcp, False, True))
+            await asyncio.sleep(0)
+            manager.invalidate_mcp("mcp-test-sse")
+            stale = await build
+
+        assert await manager.get_options(agent_with_mcp, False, True) is not stale
+
+
+class TestInvalidationRoutes:
+    """Tests for invalidation through the agents and MCP routes."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        agent_manager.clear_options_cache()
+        yield
+        agent_manager.clear_options_cache()
+
+    def test_mcp_update_recompiles_options(self, client: TestClient, agent_with_mcp: dict):
+        """Test updating an MCP server rebuilds the options of agents using it."""
+        before = asyncio.run(agent_manager.get_options(agent_with_mcp, False, True))
+
+        response = client.put("/api/mcp/mcp-test-sse", json={"config": {"url": "http://localhost:9001/sse"}})
+        assert response.status_code == 200
+
+        after = asyncio.run(agent_manager.get_options(agent_with_mcp, False, True))
+        assert after is not before
+        assert after.mcp_servers["mcp-test-sse"]["url"] == "http://localhost:9001/sse"
+
+    def test_agent_delete_drops_options(self, client: TestClient, agent_with_mcp: dict):
+        """Test deleting an agent drops its compiled options."""
+        asyncio.run(agent_manager.get_options(agent_with_mcp, False, False))
+
+        assert client.delete("/api/agents/agent-test-mcp").status_code == 204
+        assert not any(key[0] == "agent-test-mcp" for key in agent_manager._options)
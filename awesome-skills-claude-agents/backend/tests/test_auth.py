@@ -0,0 +1,195 @@
+"""Tests for auth API endpoints and the principal cache."""
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.auth import create_access_token, create_token_pair, decode_token
+from core.principal_cache import PrincipalCache, principal_cache
+from database import db
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    """Start each test with an empty principal cache."""
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture
+def registered_user() -> dict:
+    """Store a fresh user and return its id, email and auth headers."""
+    user_id = str(uuid4())
+    email = f"user-{user_id[:8]}@example.com"
+    db.users.put_sync({"id": user_id, "email": email, "name": "Test User", "password_hash": "hash:Password123!"})
+    access_token, _, _ = create_token_pair(user_id)
+    yield {"id": user_id, "email": email, "headers": {"Authorization": f"Bearer {access_token}"}}
+    db.users.delete_sync(user_id)
+
+
+@pytest.fixture
+def plain_passwords():
+    """Replace bcrypt with a readable scheme; these tests are about caching."""
+    with patch("routers.auth.hash_password", side_effect=lambda password: f"hash:{password}"), \
+            patch("routers.auth.verify_password", side_effect=lambda password, hashed: hashed == f"hash:{password}"):
+        yield
+
+
+@pytest.fixture
+def count_user_loads():
+    """Count db.users.get calls."""
+    calls = []
+    original_get = db.users.get
+
+    async def counting_get(user_id):
+        calls.append(user_id)
+        return await original_get(user_id)
+
+    with patch.object(db.users, "get", side_effect=counting_get):
+        yield calls
+
+
+class TestCurrentUser:
+    """Tests for GET /api/auth/me endpoint."""
+
+    def test_me_success(self, client: TestClient, registered_user: dict):
+        """Test an access token returns its user."""
+        response = client.get("/api/auth/me", headers=registered_user["headers"])
+        assert response.status_code == 200
+        assert response.json()["email"] == registered_user["email"]
+
+    def test_me_without_token(self, client: TestClient):
+        """Test a request without a token returns 401."""
+        response = client.get("/api/auth/me")
+        assert response.status_code == 401
+
+    def test_me_with_refresh_token(self, client: TestClient, registered_user: dict):
+        """Test a refresh token is not accepted as an access token."""
+        _, refresh_token, _ = create_token_pair(registered_user["id"])
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {refresh_token}"})
+        assert response.status_code == 401
+
+
+class TestPrincipalCache:
+    """Tests for the principal cache behind get_current_user."""
+
+    def test_repeat_requests_load_user_once(self, client: TestClient, registered_user: dict, count_user_loads):
+        """Test repeat requests with one token skip the token check and user load."""
+        for _ in range(3):
+            assert client.get("/api/auth/me", headers=registered_user["headers"]).status_code == 200
+
+        assert len(count_user_loads) == 1
+        stats = principal_cache.stats()
+        # The signature is checked once; the rate limiter reuses the result too
+        assert stats["token_misses"] == 1
+        assert stats["user_hits"] == 2
+
+    def test_password_change_invalidates(
+        self, client: TestClient, registered_user: dict, count_user_loads, plain_passwords
+    ):
+        """Test a password change is seen by the next request."""
+        headers = registered_user["headers"]
+        client.get("/api/auth/me", headers=headers)
+        response = client.put(
+            "/api/auth/password",
+            json={"current_password": "Password123!", "new_password": "NewPassword456!"},
+            headers=headers,
+        )
+        assert response.status_code == 204
+
+        loads_before = len(count_user_loads)
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        assert len(count_user_loads) == loads_before + 1
+        # The cached user is not the stale record with the old hash
+        response = client.put(
+            "/api/auth/password",
+            json={"current_password": "Password123!", "new_password": "Another789!"},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+    def test_logout_invalidates(self, client: TestClient, registered_user: dict, count_user_loads):
+        """Test logout drops the cached user."""
+        headers = registered_user["headers"]
+        client.get("/api/auth/me", headers=headers)
+        assert client.post("/api/auth/logout", headers=headers).status_code == 204
+
+        assert principal_cache.stats()["users"] == 0
+        loads_before = len(count_user_loads)
+        client.get("/api/auth/me", headers=headers)
+        assert len(count_user_loads) == loads_before + 1
+
+    def test_memoised_token_still_expires(self, client: TestClient, registered_user: dict):
+        """Test a memoised token is rejected once it expires."""
+        token = create_access_token(registered_user["id"], expires_delta=timedelta(seconds=2))
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+        time.sleep(max(0.0, decode_token(token)["exp"] - time.time()) + 0.05)
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    def test_deleted_user_rejected_after_invalidation(self, client: TestClient, registered_user: dict):
+        """Test a user deleted and invalidated can no longer authenticate."""
+        headers = registered_user["headers"]
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        db.users.delete_sync(registered_user["id"])
+        principal_cache.invalidate_user(registered_user["id"])
+
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    async def test_concurrent_misses_share_one_load(self):
+        """Test concurrent requests for one principal load the user once."""
+        cache = PrincipalCache(ttl_seconds=30)
+        access_token, _, _ = create_token_pair("user-1")
+        calls = []
+
+        async def load(user_id):
+            calls.append(user_id)
+            await asyncio.sleep(0.01)
+            return {"id": user_id}
+
+        claims = cache.verify(access_token)
+        users = await asyncio.gather(*(cache.get_user(claims, load) for _ in range(10)))
+
+        assert calls == ["user-1"]
+        assert all(user == {"id": "user-1"} for user in users)
+
+    async def test_invalidation_discards_inflight_load(self):
+        """Test a load started before an invalidation is not cached."""
+        cache = PrincipalCache(ttl_seconds=30)
+        access_token, _, _ = create_token_pair("user-1")
+        claims = cache.verify(access_token)
+        versions = iter(["old", "new"])
+
+        async def load(user_id):
+            version = next(versions)
+            await asyncio.sleep(0.01)
+            return {"id": user_id, "version": version}
+
+        first = asyncio.ensure_future(cache.get_user(claims, load))
+        await asyncio.sleep(0)
+        cache.invalidate_user("user-1")
+        assert (await first)["version"] == "old"
+
+        assert (await cache.get_user(claims, load))["version"] == "new"
+
+    def test_disabled_cache_always_loads(self):
+        """Test a zero TTL disables caching."""
+        cache = PrincipalCache(ttl_seconds=0)
+        access_token, _, _ = create_token_pair("user-1")
+        calls = []
+
+        async def load(user_id):
+            calls.append(user_id)
+            return {"id": user_id}
+
+        for _ in range(2):
+            asyncio.run(cache.get_user(cache.verify(access_token), load))
+
+        assert len(calls) == 2
+        assert cache.stats()["tokens"] == 0
@@ -0,0 +1,113 @@
+"""Tests for the in-memory mock database."""
+import pytest
+
+from database.mock_db import MockDatabase, MockTable
+
+
+@pytest.fixture
+def table() -> MockTable:
+    """A sessions-like table indexed by user_id and agent_id."""
+    table = MockTable[dict]("sessions", indexes=("user_id", "agent_id"))
+    for i in range(10):
+        table.put_sync({"id": f"s{i:02d}", "user_id": f"u{i % 2}", "agent_id": f"a{i % 3}"})
+    return table
+
+
+class TestMockTableIndexes:
+    """Tests for secondary index maintenance."""
+
+    async def test_query_and_list_use_indexes(self, table: MockTable):
+        """Test indexed lookups return exactly the matching items."""
+        assert [s["id"] for s in await table.list(user_id="u1")] == ["s01", "s03", "s05", "s07", "s09"]
+        assert [s["id"] for s in await table.query("agent_id", "a0")] == ["s00", "s03", "s06", "s09"]
+        assert await table.query("agent_id", "missing") == []
+
+    async def test_update_moves_item_between_index_values(self, table: MockTable):
+        """Test updating an indexed attribute re-indexes the item."""
+        await table.update("s00", {"agent_id": "a9"})
+
+        assert "s00" not in [s["id"] for s in await table.query("agent_id", "a0")]
+        assert [s["id"] for s in await table.query("agent_id", "a9")] == ["s00"]
+
+    async def test_put_replacing_item_reindexes(self, table: MockTable):
+        """Test putting an existing id replaces its index entries."""
+        await table.put({"id": "s00", "user_id": "u7"})
+
+        assert [s["id"] for s in await table.list(user_id="u7")] == ["s00"]
+        assert await table.query("agent_id", "a0") == [await table.get("s03"), await table.get("s06"),
+                                                       await table.get("s09")]
+
+    async def test_delete_removes_index_entries(self, table: MockTable):
+        """Test deleted items disappear from indexes and pages."""
+        assert await table.delete("s01")
+
+        assert "s01" not in [s["id"] for s in await table.list(user_id="u1")]
+        items, _ = await table.list_page(limit=2)
+        assert [s["id"] for s in items] == ["s00", "s02"]
+
+    async def test_unindexed_attribute_falls_back_to_scan(self, table: MockTable):
+        """Test querying an attribute without an index still works."""
+        await table.update("s04", {"title": "Hello"})
+        assert [s["id"] for s in await table.query("title", "Hello")] == ["s04"]
+
+
+class TestMockTablePagination:
+    """Tests for list_page and iter_items."""
+
+    async def test_pages_follow_cursor(self, table: MockTable):
+        """Test pages cover every item once and end with a None cursor."""
+        seen, cursor = [], None
+        while True:
+            items, cursor = await table.list_page(limit=4, cursor=cursor)
+            seen.extend(s["id"] for s in items)
+            if cursor is None:
+                break
+
+        assert seen == [f"s{i:02d}" for i in range(10)]
+
+    async def test_pages_filtered_by_user(self, table: MockTable):
+        """Test user_id filtered pages."""
+        first, cursor = await table.list_page(limit=3, user_id="u0")
+        second, last_cursor = await table.list_page(limit=3, cursor=cursor, user_id="u0")
+
+        assert [s["id"] for s in first + second] == ["s00", "s02", "s04", "s06", "s08"]
+        assert last_cursor is None
+
+    async def test_cursor_survives_deleting_last_seen_item(self, table: MockTable):
+        """Test a cursor stays valid when its item is deleted."""
+        _, cursor = await table.list_page(limit=3)
+        await table.delete(cursor)
+
+        items, _ = await table.list_page(limit=2, cursor=cursor)
+        assert [s["id"] for s in items] == ["s03", "s04"]
+
+    async def test_iter_items(self, table: MockTable):
+        """Test iterating over all items page by page."""
+        assert [s["id"] async for s in table.iter_items(page_size=3, user_id="u1")] == [
+            "s01", "s03", "s05", "s07", "s09"
+        ]
+
+
+class TestMockSnapshots:
+    """Tests for snapshot and reload."""
+
+    async def test_table_snapshot_round_trip(self, table: MockTable, tmp_path):
+        """Test a snapshot reloads items and rebuilds indexes."""
+        table.snapshot(tmp_path / "sessions.jsonl")
+        restored = MockTable[dict]("sessions", indexes=("user_id", "agent_id"))
+        restored.load_snapshot(tmp_path / "sessions.jsonl")
+
+        assert await restored.list() == await table.list()
+        assert [s["id"] for s in await restored.query("agent_id", "a1")] == ["s01", "s04", "s07"]
+
+    async def test_database_reloads_snapshot_dir(self, tmp_path):
+        """Test a database with a snapshot dir keeps data across restarts."""
+        first = MockDatabase(snapshot_dir=str(tmp_path))
+        await first.sessions.put({"id": "kept", "agent_id": "default", "user_id": "u1"})
+        await first.agents.delete("agent-1")
+        await first.close()
+
+        second = MockDatabase(snapshot_dir=str(tmp_path))
+        assert await second.sessions.get("kept") is not None
+        assert await second.agents.get("agent-1") is None
+        assert [s["id"] for s in await second.sessions.list(user_id="u1")] == ["kept"]
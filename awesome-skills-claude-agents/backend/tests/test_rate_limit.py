@@ -0,0 +1,178 @@
+"""Tests for the rate limiter and its backends."""
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.auth import create_access_token
+from database import db
+from middleware.rate_limit import MemoryBackend, Rate, RedisBackend, limiter
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-process stand-in for the Redis commands RedisBackend uses."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.values: dict[str, int] = {}
+        self.expires: dict[str, float] = {}
+
+    def _expire_old(self, key: str) -> None:
+        if key in self.expires and self.expires[key] <= self.clock():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        self._expire_old(key)
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    async def decr(self, key: str, amount: int = 1) -> int:
+        return await self.incr(key, -amount)
+
+    async def get(self, key: str):
+        self._expire_old(key)
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    async def pexpire(self, key: str, milliseconds: int) -> bool:
+        self.expires[key] = self.clock() + milliseconds / 1000
+        return key in self.values
+
+
+@pytest.fixture
+def small_limits():
+    """Limit default routes to 5/minute and the chat stream to 2/minute."""
+    original_rules = limiter.rules
+    limiter.rules = {"default": Rate(5, 60), "chat": Rate(2, 60)}
+    yield
+    limiter.rules = original_rules
+
+
+def _user_headers() -> dict:
+    user_id = str(uuid4())
+    db.users.put_sync({"id": user_id, "email": f"{user_id[:8]}@example.com"})
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+class TestMemoryBackend:
+    """Tests for the in-process token bucket."""
+
+    async def test_allows_burst_then_rejects(self):
+        """Test a full bucket allows `limit` requests, then rejects."""
+        backend = MemoryBackend(clock=FakeClock())
+        rate = Rate(3, 60)
+
+        results = [await backend.hit("k", rate) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert results[3].retry_after == pytest.approx(20)
+
+    async def test_refills_continuously(self):
+        """Test tokens come back at limit/period per second."""
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        rate = Rate(3, 60)
+        for _ in range(3):
+            await backend.hit("k", rate)
+
+        clock.now += 20
+        assert (await backend.hit("k", rate)).allowed
+        assert not (await backend.hit("k", rate)).allowed
+
+    async def test_keys_are_bounded(self):
+        """Test the least recently used keys are dropped past max_keys."""
+        backend = MemoryBackend(max_keys=2, clock=FakeClock())
+        for key in ("a", "b", "a", "c"):
+            await backend.hit(key, Rate(3, 60))
+
+        assert list(backend._buckets) == ["a", "c"]
+
+
+class TestRedisBackend:
+    """Tests for the shared sliding-window backend against a fake Redis."""
+
+    async def test_limit_shared_across_workers(self):
+        """Test two workers on one store enforce a single combined limit."""
+        clock = FakeClock(now=6000.0)
+        redis = FakeRedis(clock)
+        workers = [RedisBackend(redis, clock=clock), RedisBackend(redis, clock=clock)]
+        rate = Rate(4, 60)
+
+        results = [await workers[i % 2].hit("user:1", rate) for i in range(6)]
+
+        assert [r.allowed for r in results] == [True] * 4 + [False] * 2
+        assert results[-1].retry_after > 0
+
+    async def test_rejected_requests_are_not_counted(self):
+        """Test retries while limited do not push the window further out."""
+        clock = FakeClock(now=6000.0)
+        backend = RedisBackend(FakeRedis(clock), clock=clock)
+        rate = Rate(2, 60)
+        for _ in range(10):
+            await backend.hit("k", rate)
+
+        # Two windows later the previous window is empty again
+        clock.now += 120
+        assert (await backend.hit("k", rate)).allowed
+
+    async def test_previous_window_is_weighted(self):
+        """Test requests from the previous window count by their overlap."""
+        clock = FakeClock(now=6000.0)
+        backend = RedisBackend(FakeRedis(clock), clock=clock)
+        rate = Rate(4, 60)
+        for _ in range(4):
+            await backend.hit("k", rate)
+
+        # Halfway into the next window half of the previous 4 still count
+        clock.now += 90
+        results = [await backend.hit("k", rate) for _ in range(3)]
+        assert [r.allowed for r in results] == [True, True, False]
+
+
+class TestRateLimitedRoutes:
+    """Tests for the app-wide rate limit dependency."""
+
+    def test_rejects_with_429_and_retry_after(self, client: TestClient, small_limits):
+        """Test exceeding the limit returns a structured 429."""
+        headers = _user_headers()
+        responses = [client.get("/api/agents", headers=headers) for _ in range(6)]
+
+        assert [r.status_code for r in responses] == [200] * 5 + [429]
+        assert responses[0].headers["X-RateLimit-Limit"] == "5"
+        assert responses[4].headers["X-RateLimit-Remaining"] == "0"
+        assert int(responses[5].headers["Retry-After"]) >= 1
+        assert responses[5].json()["code"] == "RATE_LIMIT_EXCEEDED"
+
+    def test_users_have_separate_buckets(self, client: TestClient, small_limits):
+        """Test users whose tokens share a prefix are limited separately."""
+        first, second = _user_headers(), _user_headers()
+        for _ in range(5):
+            client.get("/api/agents", headers=first)
+
+        assert client.get("/api/agents", headers=first).status_code == 429
+        assert client.get("/api/agents", headers=second).status_code == 200
+
+    def test_chat_stream_has_own_bucket(self, client: TestClient, small_limits, invalid_agent_id: str):
+        """Test the chat stream is limited separately from cheap routes."""
+        headers = _user_headers()
+        payload = {"agent_id": invalid_agent_id, "message": "hi"}
+        statuses = [client.post("/api/chat/stream", json=payload, headers=headers).status_code for _ in range(3)]
+
+        assert statuses == [404, 404, 429]
+        assert client.get("/api/agents", headers=headers).status_code == 200
+
+    def test_health_is_exempt(self, client: TestClient, small_limits):
+        """Test health checks are never limited."""
+        assert all(client.get("/health").status_code == 200 for _ in range(10))
@@ -0,0 +1,131 @@
+"""Tests for session persistence and write-behind touches."""
+import asyncio
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.session_manager import SessionManager
+from database import db
+
+
+@pytest.fixture
+def manager() -> SessionManager:
+    """A session manager with an empty cache."""
+    return SessionManager(flush_interval=0.01)
+
+
+@pytest.fixture
+def count_session_calls():
+    """Count reads and writes on the sessions table."""
+    calls = []
+    table = db.sessions
+    originals = {name: getattr(table, name) for name in ("get", "put", "update", "put_batch")}
+
+    def counting(name):
+        async def call(*args, **kwargs):
+            calls.append(name)
+            return await originals[name](*args, **kwargs)
+        return call
+
+    with patch.multiple(table, **{name: counting(name) for name in originals}):
+        yield calls
+
+
+class TestSessionManager:
+    """Tests for SessionManager."""
+
+    async def test_new_session_written_immediately(self, manager: SessionManager):
+        """Test the first message of a session persists it synchronously."""
+        session_id = str(uuid4())
+        await manager.store_session(session_id, "default", "Hello")
+
+        stored = await db.sessions.get(session_id)
+        assert stored["title"] == "Hello"
+
+    async def test_touches_are_batched(self, manager: SessionManager, count_session_calls):
+        """Test later messages only touch the cache until the next flush."""
+        session_id = str(uuid4())
+        await manager.store_session(session_id, "default", "First")
+        created = (await db.sessions.get(session_id))["last_accessed"]
+        count_session_calls.clear()
+
+        for i in range(5):
+            await manager.store_session(session_id, "default", f"Message {i}")
+        assert count_session_calls == []
+
+        assert await manager.flush() == 1
+        assert count_session_calls == ["put_batch"]
+        stored = await db.sessions.get(session_id)
+        assert stored["title"] == "Message 4"
+        assert stored["last_accessed"] > created
+
+    async def test_list_includes_unflushed_touches(self, manager: SessionManager):
+        """Test listing sessions reflects touches that are not flushed yet."""
+        agent_id = f"agent-{uuid4()}"
+        first, second = str(uuid4()), str(uuid4())
+        await manager.store_session(first, agent_id, "First")
+        await manager.store_session(second, agent_id, "Second")
+        await manager.store_session(first, agent_id, "First again")
+
+        sessions = await manager.list_sessions(agent_id=agent_id)
+        assert [s.title for s in sessions] == ["First again", "Second"]
+
+    async def test_delete_drops_pending_touch(self, manager: SessionManager):
+        """Test a flush after delete does not recreate the session."""
+        session_id = str(uuid4())
+        await manager.store_session(session_id, "default", "Hello")
+        await manager.store_session(session_id, "default", "Again")
+
+        assert await manager.delete_session(session_id)
+        await manager.flush()
+        assert await db.sessions.get(session_id) is None
+
+    async def test_background_flush_and_stop(self, manager: SessionManager):
+        """Test the background task flushes touches, and stop flushes the rest."""
+        first, second = str(uuid4()), str(uuid4())
+        await manager.store_session(first, "default", "Hello")
+        await manager.store_session(second, "default", "Hello")
+        manager.start()
+
+        await manager.store_session(first, "default", "Background")
+        await asyncio.sleep(0.05)
+        assert (await db.sessions.get(first))["title"] == "Background"
+
+        manager.flush_interval = 60
+        await asyncio.sleep(0.02)
+        await manager.store_session(second, "default", "Shutdown")
+        await manager.stop()
+        assert (await db.sessions.get(second))["title"] == "Shutdown"
+
+    async def test_failed_flush_is_retried(self, manager: SessionManager):
+        """Test touches are kept when a batch write fails."""
+        session_id = str(uuid4())
+        await manager.store_session(session_id, "default", "Hello")
+        await manager.store_session(session_id, "default", "Again")
+
+        with patch.object(db.sessions, "put_batch", side_effect=RuntimeError("unavailable")):
+            assert await manager.flush() == 0
+        assert await manager.flush() == 1
+        assert (await db.sessions.get(session_id))["title"] == "Again"
+
+
+class TestSessionsEndpoint:
+    """Tests for GET /api/chat/sessions."""
+
+    def test_list_sessions_response_fields(self, client: TestClient):
+        """Test listed sessions include last_accessed_at."""
+        session_id = str(uuid4())
+        db.sessions.put_sync({
+            "id": session_id,
+            "agent_id": "default",
+            "title": "Hello",
+            "created_at": "2025-01-01T00:00:00",
+            "last_accessed": "2025-01-02T00:00:00",
+        })
+
+        response = client.get("/api/chat/sessions?agent_id=default")
+        assert response.status_code == 200
+        listed = next(s for s in response.json() if s["id"] == session_id)
+        assert listed["last_accessed_at"] == "2025-01-02T00:00:00"
@@ -0,0 +1,227 @@
+"""Tests for skill package ingestion and object stores."""
+import hashlib
+import os
+import stat
+import zipfile
+from contextlib import asynccontextmanager
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from core.skill_ingest import S3ObjectStore, parse_frontmatter, skill_ingestor
+from core.exceptions import ValidationException
+from database import db
+
+
+class FakeS3:
+    """In-process stand-in for the S3 calls S3ObjectStore makes."""
+
+    def __init__(self, fail_on_part: int | None = None):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.part_calls = 0
+        self.aborted: list[str] = []
+        self.fail_on_part = fail_on_part
+
+    async def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    async def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.part_calls += 1
+        if PartNumber == self.fail_on_part:
+            raise ConnectionError("connection reset")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(UploadId)
+
+    async def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def client(self):
+        @asynccontextmanager
+        async def open_client():
+            yield self
+        return open_client()
+
+
+def _upload(client: TestClient, content: bytes, filename: str = "skill.zip", **data):
+    return client.post(
+        "/api/skills/upload",
+        files={"file": (filename, BytesIO(content), "application/zip")},
+        data=data,
+    )
+
+
+class TestUploadPipeline:
+    """Tests for POST /api/skills/upload through the ingestion pipeline."""
+
+    def test_registry_entry_and_stored_object(self, client: TestClient, skill_zip, skill_store):
+        """Test the stored record describes the package and points at its object."""
+        content = skill_zip({
+            "pdf/SKILL.md": "---\nname: pdf\ndescription: Work with PDFs\nversion: 2.1.0\n---\n",
+            "pdf/fonts/Inter.ttf": os.urandom(2048),
+            "pdf/templates/": "",
+        })
+        response = _upload(client, content)
+
+        assert response.status_code == 201
+        data = response.json()
+        content_hash = hashlib.sha256(content).hexdigest()
+        assert (data["name"], data["description"], data["version"]) == ("pdf", "Work with PDFs", "2.1.0")
+        assert data["content_hash"] == content_hash
+        assert data["size_bytes"] == len(content)
+        assert data["file_count"] == 2
+        stored = skill_store.root / f"skills/{content_hash}.zip"
+        assert data["s3_location"] == stored.resolve().as_uri()
+        assert stored.read_bytes() == content
+
+    def test_identical_package_is_rejected(self, client: TestClient, skill_zip, skill_store):
+        """Test a package is stored once however it is named."""
+        content = skill_zip()
+        first = _upload(client, content, name="First")
+        second = _upload(client, content, filename="renamed.zip", name="Second")
+
+        assert first.status_code == 201
+        assert second.status_code == 409
+        assert second.json()["code"] == "DUPLICATE_RESOURCE"
+        assert first.json()["id"] in second.json()["detail"]
+        assert len(list((skill_store.root / "skills").iterdir())) == 1
+
+    def test_delete_removes_stored_package(self, client: TestClient, skill_zip, skill_store):
+        """Test deleting the skill deletes its package, so it can be uploaded again."""
+        content = skill_zip()
+        skill = _upload(client, content).json()
+
+        assert client.delete(f"/api/skills/{skill['id']}").status_code == 204
+        assert list((skill_store.root / "skills").iterdir()) == []
+        assert _upload(client, content).status_code == 201
+
+    @pytest.mark.parametrize("files, message", [
+        ({"README.md": "no skill here"}, "exactly one SKILL.md"),
+        ({"a/SKILL.md": "---\ndescription: a\n---\n", "b/SKILL.md": "---\ndescription: b\n---\n"},
+         "exactly one SKILL.md"),
+        ({"SKILL.md": "# No frontmatter"}, "must include a description"),
+        ({"SKILL.md": "---\nname: [unclosed\n---\n"}, "not valid YAML"),
+        ({"SKILL.md": "---\ndescription: ok\n---\n", "../escape.sh": "rm -rf /"}, "Unsafe path"),
+        ({"SKILL.md": "---\ndescription: ok\n---\n", "/etc/passwd": "x"}, "Unsafe path"),
+        ({"SKILL.md": "---\ndescription: ok\n---\n", "zeros.bin": b"\0" * (4 * 1024 * 1024)}, "compression ratio"),
+    ])
+    def test_invalid_packages(self, client: TestClient, skill_zip, skill_store, files, message):
+        """Test invalid packages are rejected with a reason and nothing is stored."""
+        response = _upload(client, skill_zip(files))
+
+        assert response.status_code == 400
+        assert message in response.json()["detail"]
+        assert not (skill_store.root / "skills").exists()
+
+    def test_symlink_is_rejected(self, client: TestClient, skill_zip):
+        """Test archives containing symbolic links are rejected."""
+        buffer = BytesIO(skill_zip())
+        with zipfile.ZipFile(buffer, "a") as archive:
+            link = zipfile.ZipInfo("passwd")
+            link.external_attr = (stat.S_IFLNK | 0o777) << 16
+            archive.writestr(link, "/etc/passwd")
+
+        response = _upload(client, buffer.getvalue())
+        assert response.status_code == 400
+        assert "Symbolic links" in response.json()["detail"]
+
+    def test_limits(self, client: TestClient, skill_zip, monkeypatch):
+        """Test the upload size, entry count and uncompressed size caps."""
+        files = {"SKILL.md": "---\ndescription: ok\n---\n", **{f"data/{i}.txt": os.urandom(512) for i in range(5)}}
+        content = skill_zip(files)
+
+        monkeypatch.setattr(skill_ingestor, "max_upload_bytes", len(content) - 1)
+        assert "too large" in _upload(client, content).json()["message"]
+        monkeypatch.setattr(skill_ingestor, "max_upload_bytes", len(content))
+
+        monkeypatch.setattr(skill_ingestor, "max_files", 5)
+        assert "at most 5 are allowed" in _upload(client, content).json()["detail"]
+        monkeypatch.setattr(skill_ingestor, "max_files", 6)
+
+        monkeypatch.setattr(skill_ingestor, "max_uncompressed_bytes", 2048)
+        assert "expands to" in _upload(client, content).json()["detail"]
+        monkeypatch.setattr(skill_ingestor, "max_uncompressed_bytes", 4096)
+
+        assert _upload(client, content).status_code == 201
+
+    async def test_failed_store_leaves_no_record(self, skill_zip, skill_store, monkeypatch):
+        """Test nothing is registered when the package cannot be stored."""
+        async def unavailable(*args):
+            raise ConnectionError("store unavailable")
+
+        monkeypatch.setattr(skill_store, "put", unavailable)
+        content = skill_zip()
+        with pytest.raises(ConnectionError):
+            await skill_ingestor.ingest(UploadFile(BytesIO(content), filename="skill.zip"))
+
+        assert await db.skills.query("content_hash", hashlib.sha256(content).hexdigest()) == []
+        assert skill_ingestor._in_progress == set()
+
+
+class TestFrontmatter:
+    """Tests for SKILL.md frontmatter parsing."""
+
+    def test_parses_mapping(self):
+        """Test frontmatter is parsed and the body ignored."""
+        text = "\ufeff---\nname: docx\ndescription: >\n  Edit Word\n  documents\n---\n# Body\n---\n"
+        assert parse_frontmatter(text) == {"name": "docx", "description": "Edit Word documents"}
+
+    def test_missing_and_unclosed(self):
+        """Test files without frontmatter give {} and unclosed frontmatter is an error."""
+        assert parse_frontmatter("# Just markdown") == {}
+        with pytest.raises(ValidationException):
+            parse_frontmatter("---\nname: x\n")
+
+
+class TestS3ObjectStore:
+    """Tests for S3ObjectStore against a fake S3."""
+
+    async def test_small_object_single_put(self):
+        """Test packages up to one part use a single PutObject."""
+        s3 = FakeS3()
+        store = S3ObjectStore("bucket", s3.client, part_size=1024)
+
+        location = await store.put("skills/a.zip", BytesIO(b"x" * 1024), 1024)
+
+        assert location == "s3://bucket/skills/a.zip"
+        assert s3.objects["skills/a.zip"] == b"x" * 1024
+        assert s3.part_calls == 0
+
+    async def test_large_object_multipart(self):
+        """Test larger packages are streamed part by part and reassembled."""
+        s3 = FakeS3()
+        store = S3ObjectStore("bucket", s3.client, part_size=1024)
+        content = os.urandom(2500)
+
+        await store.put("skills/b.zip", BytesIO(content), len(content))
+
+        assert s3.objects["skills/b.zip"] == content
+        assert s3.part_calls == 3
+        assert s3.uploads == {}
+
+    async def test_failed_part_aborts_upload(self):
+        """Test a failed part aborts the multipart upload."""
+        s3 = FakeS3(fail_on_part=2)
+        store = S3ObjectStore("bucket", s3.client, part_size=1024)
+
+        with pytest.raises(ConnectionError):
+            await store.put("skills/c.zip", BytesIO(os.urandom(3000)), 3000)
+
+        assert s3.aborted == ["upload-0"]
+        assert "skills/c.zip" not in s3.objects
+        assert s3.uploads == {}
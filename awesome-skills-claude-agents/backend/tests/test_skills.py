@@ -43,11 +43,9 @@ class TestGetSkill:
 class TestUploadSkill:
     """Tests for POST /api/skills/upload endpoint."""
 
-    def test_upload_skill_success(self, client: TestClient):
+    def test_upload_skill_success(self, client: TestClient, skill_zip):
         """Test uploading skill ZIP returns 201."""
-        # Create a mock ZIP file
-        zip_content = BytesIO(b"PK\x03\x04" + b"\x00" * 100)  # Minimal ZIP header
-        zip_content.name = "test_skill.zip"
+        zip_content = BytesIO(skill_zip())
 
         response = client.post(
             "/api/skills/upload",
@@ -57,19 +55,25 @@ class TestUploadSkill:
         assert response.status_code == 201
         data = response.json()
         assert data["name"] == "UploadedSkill"
+        assert data["description"] == "A test skill"
         assert "id" in data
 
-    def test_upload_skill_without_name(self, client: TestClient):
-        """Test uploading skill ZIP uses filename as name."""
-        zip_content = BytesIO(b"PK\x03\x04" + b"\x00" * 100)
+    def test_upload_skill_without_name(self, client: TestClient, skill_zip):
+        """Test uploading skill ZIP uses the frontmatter name, then the filename."""
+        response = client.post(
+            "/api/skills/upload",
+            files={"file": ("my_skill.zip", BytesIO(skill_zip()), "application/zip")}
+        )
+        assert response.status_code == 201
+        assert response.json()["name"] == "test-skill"
 
+        unnamed = skill_zip({"SKILL.md": "---\ndescription: No name here\n---\n"})
         response = client.post(
             "/api/skills/upload",
-            files={"file": ("my_skill.zip", zip_content, "application/zip")}
+            files={"file": ("my_skill.zip", BytesIO(unnamed), "application/zip")}
         )
         assert response.status_code == 201
-        data = response.json()
-        assert data["name"] == "my_skill"
+        assert response.json()["name"] == "my_skill"
 
     def test_upload_skill_invalid_format(self, client: TestClient):
         """Test uploading non-ZIP file returns error."""
@@ -83,6 +87,15 @@ class TestUploadSkill:
         data = response.json()
         assert "code" in data
 
+    def test_upload_skill_not_a_zip(self, client: TestClient):
+        """Test uploading a .zip that is not a ZIP archive returns 400."""
+        response = client.post(
+            "/api/skills/upload",
+            files={"file": ("test_skill.zip", BytesIO(b"PK\x03\x04" + b"\x00" * 100), "application/zip")}
+        )
+        assert response.status_code == 400
+        assert response.json()["code"] == "VALIDATION_FAILED"
+
 
 class TestGenerateSkill:
     """Tests for POST /api/skills/generate endpoint."""
@@ -2,7 +2,7 @@
  * Chat API service with streaming support
  */
 import { apiClient } from '../lib/api';
-import type { ChatRequest, ChatResponse, Conversation } from '../types';
+import type { ChatRequest, ChatResponse, Conversation, ConversationPage } from '../types';
 
 export interface StreamEvent {
   type: 'start' | 'text' | 'thinking' | 'tool_use' | 'tool_result' | 'done' | 'error';
@@ -101,10 +101,12 @@ export const chatApi = {
   streamMessage: streamChatMessage,
 
   /**
-   * Get all conversations
+   * Get a page of conversations, most recently updated first
    */
-  getConversations: async (): Promise<Conversation[]> => {
-    const response = await apiClient.get<Conversation[]>('/api/chat/conversations');
+  getConversations: async (limit = 50, cursor?: string): Promise<ConversationPage> => {
+    const response = await apiClient.get<ConversationPage>('/api/chat/conversations', {
+      params: { limit, cursor },
+    });
     return response.data;
   },
 
@@ -69,6 +69,11 @@ export interface Conversation {
   messageCount: number;
 }
 
+export interface ConversationPage {
+  conversations: Conversation[];
+  nextCursor: string | null;
+}
+
 // Chat API types
 export interface ChatMessage {
   role: 'user' | 'assistant' | 'system';
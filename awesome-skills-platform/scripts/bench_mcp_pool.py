@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the pooled MCP clients in MCPManager.
+
+Runs local stub stdio MCP servers (this file with --serve-stub) whose startup
+delay stands in for package resolution and handshakes, so no network or
+DynamoDB is needed:
+
+    python scripts/bench_mcp_pool.py --servers 5 --startup-delay 1.0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_stub_server(startup_delay: float, call_delay: float):
+    """Serve a stub MCP server over stdio."""
+    from mcp.server.fastmcp import FastMCP
+
+    time.sleep(startup_delay)
+    mcp = FastMCP("stub", log_level="WARNING")
+
+    @mcp.tool()
+    async def work(n: int) -> str:
+        """Pretend to do some work."""
+        await asyncio.sleep(call_delay)
+        return f"done {n}"
+
+    @mcp.tool()
+    def crash() -> str:
+        """Kill the server process."""
+        os._exit(1)
+
+    mcp.run()
+
+
+def stub_config(mcp_id: str, args) -> dict:
+    return {
+        "id": mcp_id,
+        "name": mcp_id,
+        "connectionType": "stdio",
+        "config": {
+            "command": sys.executable,
+            "args": [
+                os.path.abspath(__file__), "--serve-stub",
+                "--startup-delay", str(args.startup_delay),
+                "--call-delay", str(args.call_delay),
+            ],
+        },
+    }
+
+
+def new_manager(mcp_ids, args):
+    from src.core.mcp_manager import MCPManager
+
+    manager = MCPManager()
+    manager.max_concurrent_calls = args.max_concurrent_calls
+    manager.ping_interval = 0  # Health checks are driven by hand below
+    for mcp_id in mcp_ids:
+        client = manager._create_mcp_client(stub_config(mcp_id, args))
+        manager._limit_concurrent_calls(mcp_id, client)
+        manager._mcp_clients[mcp_id] = client
+    return manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=5, help="MCP servers attached to the agent")
+    parser.add_argument("--startup-delay", type=float, default=1.0, help="Seconds each stub sleeps before serving")
+    parser.add_argument("--call-delay", type=float, default=0.1, help="Seconds each stub tool call takes")
+    parser.add_argument("--calls", type=int, default=32, help="Concurrent tool calls for the limit test")
+    parser.add_argument("--max-concurrent-calls", type=int, default=4, help="Per-server call limit")
+    parser.add_argument("--serve-stub", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_stub:
+        return run_stub_server(args.startup_delay, args.call_delay)
+
+    import logging
+    logging.basicConfig(level=logging.WARNING)
+
+    mcp_ids = [f"stub-{i}" for i in range(args.servers)]
+
+    # Previous behaviour: the agent's tool registry starts each client in turn
+    manager = new_manager(mcp_ids, args)
+    start = time.perf_counter()
+    for mcp_id in mcp_ids:
+        asyncio.run(manager._mcp_clients[mcp_id].load_tools())
+    sequential = time.perf_counter() - start
+    for mcp_id in mcp_ids:
+        manager._mcp_clients[mcp_id].stop(None, None, None)
+    print(f"sequential start   {sequential:6.2f}s for {args.servers} servers")
+
+    manager = new_manager(mcp_ids, args)
+    start = time.perf_counter()
+    errors = manager.warm_up(mcp_ids)
+    parallel = time.perf_counter() - start
+    assert not any(errors.values()), errors
+    print(f"parallel warm-up   {parallel:6.2f}s ({sequential / parallel:.1f}x faster)")
+
+    start = time.perf_counter()
+    manager.warm_up(mcp_ids)
+    print(f"second agent       {(time.perf_counter() - start) * 1000:6.1f}ms (pooled clients reused)")
+
+    # Tool call limit: all calls share one server
+    client = manager._mcp_clients[mcp_ids[0]]
+    tool = manager.get_mcp_tools(mcp_ids[0])[0]
+
+    async def call_all():
+        return await asyncio.gather(*(
+            client.call_tool_async(f"call-{n}", tool.tool_name, {"n": n}) for n in range(args.calls)
+        ))
+
+    start = time.perf_counter()
+    results = asyncio.run(call_all())
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r["status"] == "success")
+    expected = args.calls / max(args.max_concurrent_calls, 1) * args.call_delay
+    print(
+        f"{args.calls} calls, limit {args.max_concurrent_calls}  {elapsed:6.2f}s "
+        f"({ok} ok, ~{expected:.2f}s expected at the limit)"
+    )
+
+    # Crash one server and let the health check restart it
+    try:
+        client.call_tool_sync("crash", "crash", {})
+    except Exception:
+        pass
+    time.sleep(0.2)
+    start = time.perf_counter()
+    manager.check_health()
+    restart = time.perf_counter() - start
+    stats = manager.pool_stats()["servers"][mcp_ids[0]]
+    result = client.call_tool_sync("after-restart", tool.tool_name, {"n": 0})
+    print(
+        f"crash recovery     {restart:6.2f}s (restarts={stats['restarts']}, "
+        f"call after restart: {result['status']})"
+    )
+
+    manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark SSE frame coalescing on the two streaming paths:
+
+- chat:    /api/chat/stream (src/api/routers/chat.py), driven by a fake agent
+- runtime: pull_queue_stream (src/agentcore_runtime/streaming_utils.py)
+
+Each stream emits --tokens small text deltas --token-interval seconds apart;
+--streams of them run concurrently. Reports process CPU per stream, frames and
+bytes on the wire with coalescing off (one frame per delta) and on:
+
+    python scripts/bench_sse_stream.py --streams 100 --tokens 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src", "agentcore_runtime"))
+
+TOKEN = "lore"
+
+
+async def fake_agent_stream(tokens: int, interval: float):
+    yield {"thinking": "Let me think."}
+    for _ in range(tokens):
+        await asyncio.sleep(interval)
+        yield {"data": TOKEN}
+
+
+async def run_chat_stream(args) -> tuple:
+    from src.api.routers import chat
+    from src.schemas.chat import ChatRequest
+
+    agent = MagicMock()
+    agent.stream_async = lambda message: fake_agent_stream(args.tokens, args.token_interval)
+    chat.agent_manager.get_or_create_agent = MagicMock(return_value=agent)
+    chat.agent_manager.get_model_id = MagicMock(return_value="bench-model")
+
+    response = await chat.stream_message(ChatRequest(agentId="bench", message="hi"))
+    frames = size = 0
+    async for chunk in response.body_iterator:
+        frames += chunk.count("data: ")
+        size += len(chunk.encode())
+    return frames, size
+
+
+async def run_runtime_stream(args, flush_interval_ms: float) -> tuple:
+    from streaming_utils import StreamingQueue, pull_queue_stream
+
+    queue = StreamingQueue()
+
+    async def produce():
+        await queue.put({"type": "block_start", "data": {"start": {}}})
+        for _ in range(args.tokens):
+            await asyncio.sleep(args.token_interval)
+            await queue.put({"type": "block_delta", "data": {"delta": {"text": TOKEN}}})
+        await queue.put({"type": "block_stop", "data": {}})
+        await queue.put({"type": "message_stop", "data": {"stopReason": "end_turn"}})
+
+    producer = asyncio.create_task(produce())
+    frames = size = 0
+    async for chunk in pull_queue_stream(queue, "bench-model", flush_interval_ms=flush_interval_ms):
+        frames += chunk.count("data: ")
+        size += len(chunk.encode())
+    await producer
+    return frames, size
+
+
+async def measure(name: str, args, make_stream) -> None:
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    results = await asyncio.gather(*(make_stream() for _ in range(args.streams)))
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    frames = sum(r[0] for r in results)
+    size = sum(r[1] for r in results)
+    print(
+        f"{name:<22} cpu/stream={cpu / args.streams * 1000:7.2f}ms  "
+        f"frames/stream={frames / args.streams:7.1f}  bytes/stream={size / args.streams:9.0f}  "
+        f"wall={wall:5.2f}s"
+    )
+
+
+async def main(args) -> None:
+    from src.core.config import settings
+
+    print(f"{args.streams} concurrent streams x {args.tokens} deltas, {args.token_interval * 1000:.0f}ms apart")
+    for interval in (0, args.flush_interval_ms):
+        settings.sse_flush_interval_ms = interval
+        label = "off" if interval == 0 else f"{interval:g}ms"
+        await measure(f"chat     coalesce={label}", args, lambda: run_chat_stream(args))
+    for interval in (0, args.flush_interval_ms):
+        label = "off" if interval == 0 else f"{interval:g}ms"
+        await measure(f"runtime  coalesce={label}", args, lambda: run_runtime_stream(args, interval))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=100, help="Concurrent streams")
+    parser.add_argument("--tokens", type=int, default=500, help="Text deltas per stream")
+    parser.add_argument("--token-interval", type=float, default=0.005, help="Seconds between deltas")
+    parser.add_argument("--flush-interval-ms", type=float, default=50, help="Coalescing interval to compare")
+    args = parser.parse_args()
+
+    import logging
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
@@ -40,8 +40,25 @@ TABLES = [
         ],
         "BillingMode": "PAY_PER_REQUEST",
     },
+    {
+        "TableName": "agent-platform-conversations",
+        "KeySchema": [
+            {"AttributeName": "pk", "KeyType": "HASH"},
+            {"AttributeName": "sk", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "pk", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"},
+        ],
+        "BillingMode": "PAY_PER_REQUEST",
+    },
 ]
 
+# Tables whose items expire through DynamoDB TTL, and the attribute holding the expiry
+TTL_ATTRIBUTES = {
+    "agent-platform-conversations": "expiresAt",
+}
+
 
 def create_tables():
     """Create DynamoDB tables."""
@@ -73,6 +90,13 @@ def create_tables():
             waiter.wait(TableName=table_name)
             print(f"✓ Active")
 
+            if table_name in TTL_ATTRIBUTES:
+                dynamodb.update_time_to_live(
+                    TableName=table_name,
+                    TimeToLiveSpecification={"Enabled": True, "AttributeName": TTL_ATTRIBUTES[table_name]},
+                )
+                print(f"   ✓ TTL enabled on {TTL_ATTRIBUTES[table_name]}")
+
         except ClientError as e:
             print(f"✗ Error: {e.response['Error']['Message']}")
             return False
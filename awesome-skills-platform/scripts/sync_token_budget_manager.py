@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Copy the canonical token_budget_manager.py into the other deployables.
+
+src/agentcore_runtime/token_budget_manager.py is the copy that is edited and
+tested. Each of the other apps builds its own image from its own directory,
+so it carries a copy of the module next to its entry point; run this after
+changing the canonical copy:
+
+    python scripts/sync_token_budget_manager.py           # update the copies
+    python scripts/sync_token_budget_manager.py --check   # exit 1 if stale
+
+Copies whose app directory is not checked out are skipped.
+"""
+import argparse
+import os
+import shutil
+import sys
+
+PLATFORM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(PLATFORM_ROOT)
+CANONICAL = os.path.join(PLATFORM_ROOT, "src", "agentcore_runtime", "token_budget_manager.py")
+COPIES = [
+    os.path.join(REPO_ROOT, "a2a-agent-ui", "backend", "token_budget_manager.py"),
+    os.path.join(REPO_ROOT, "strands_skills_demo", "token_budget_manager.py"),
+    os.path.join(
+        REPO_ROOT, "deployment", "01.restaurant_assistant_fargate", "docker", "app", "token_budget_manager.py"
+    ),
+]
+
+
+def stale_copies() -> list[str]:
+    """Return the copies that differ from the canonical module."""
+    with open(CANONICAL, "rb") as f:
+        source = f.read()
+    stale = []
+    for path in COPIES:
+        if not os.path.isdir(os.path.dirname(path)):
+            continue
+        try:
+            with open(path, "rb") as f:
+                if f.read() == source:
+                    continue
+        except FileNotFoundError:
+            pass
+        stale.append(path)
+    return stale
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report stale copies")
+    args = parser.parse_args()
+
+    stale = stale_copies()
+    for path in stale:
+        rel = os.path.relpath(path, REPO_ROOT)
+        if args.check:
+            print(f"stale: {rel}", file=sys.stderr)
+        else:
+            shutil.copyfile(CANONICAL, path)
+            print(f"updated: {rel}")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 # legal-agent.py
+# Times the imports below when STARTUP_PROFILE=1
+import startup_profile
+startup_profile.start()
+
 import asyncio
 import json
 import os
-import boto3
-from botocore.exceptions import ClientError
 from claude_agent_sdk import CLINotFoundError, ProcessError,CLIJSONDecodeError,CLIConnectionError
 from claude_agent_sdk import (
     AssistantMessage,
@@ -40,6 +42,8 @@ logging.basicConfig(
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+startup_profile.mark("imports")
+
 app = BedrockAgentCoreApp()
 claude_client = None
 cleanup_signal = None
@@ -106,6 +110,8 @@ current_agent_task: Optional[asyncio.Task] = None
      
 def get_aws_account_id():
     """Get AWS account ID from STS."""
+    import boto3
+
     try:
         sts = boto3.client('sts')
         return sts.get_caller_identity()['Account']
@@ -598,4 +604,6 @@ async def agent_invocation(payload:OperationsRequest):
         
 
 if __name__ == "__main__":
+    startup_profile.mark("app setup")
+    startup_profile.report()
     app.run()
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Incremental context pruning for long agent transcripts.
+
+ContextPruner is a hook provider that indexes the long tool-result texts and
+the tool-result images of an agent's messages as they are added, so each turn
+only looks at the new message instead of rescanning the whole transcript.
+Before a model call it redacts the oldest long texts and replaces the oldest
+images beyond a recent window, in batches: the transcript prefix (and the
+prompt cache built on it) then changes once per batch rather than every turn.
+
+It applies the same policy as utils.maybe_redact_old_text_content and
+utils.maybe_filter_to_n_most_recent_images, which remain for one-shot use.
+"""
+import logging
+from collections import deque
+from typing import Optional
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+    MessageAddedEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+REDACTED_MARKER = " <redacted content>"
+IMAGE_PLACEHOLDER = "<image removed from context>"
+
+# Rough token estimates; good enough to report savings, not to bill on
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1600
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class ContextPruner(HookProvider):
+    """
+    Stateful, incremental pruner for one agent's messages.
+
+    Use one instance per agent; it keeps references into that agent's
+    message list.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 10,
+        text_length_threshold: int = 1000,
+        redaction_batch: int = 5,
+        images_to_keep: int = 5,
+        image_batch: int = 5,
+    ):
+        """
+        Args:
+            window_size: Most recent long tool-result texts kept in full
+            text_length_threshold: Texts longer than this are "long"; redacted
+                texts keep this many leading characters
+            redaction_batch: Redact long texts this many at a time
+            images_to_keep: Most recent tool-result images kept
+            image_batch: Remove images this many at a time
+        """
+        self.window_size = window_size
+        self.text_length_threshold = text_length_threshold
+        self.redaction_batch = max(1, redaction_batch)
+        self.images_to_keep = images_to_keep
+        self.image_batch = max(1, image_batch)
+
+        # Unpruned long text blocks and (toolResult, image block) pairs, oldest first
+        self._texts: deque = deque()
+        self._images: deque = deque()
+        self._indexed_count = 0
+        self._first_message: Optional[dict] = None
+
+        self.turn_tokens_saved = 0
+        self.last_turn_tokens_saved = 0
+        self.total_tokens_saved = 0
+
+    def register_hooks(self, registry: HookRegistry) -> None:
+        registry.add_callback(MessageAddedEvent, self.index_message)
+        registry.add_callback(BeforeModelCallEvent, self.prune)
+        registry.add_callback(AfterInvocationEvent, self.report_turn)
+
+    def _index(self, message: dict) -> None:
+        content = message.get("content")
+        if not isinstance(content, list):
+            return
+        for item in content:
+            if not isinstance(item, dict) or "toolResult" not in item:
+                continue
+            tool_result = item["toolResult"]
+            for block in tool_result.get("content") or []:
+                if not isinstance(block, dict):
+                    continue
+                if "image" in block:
+                    self._images.append((tool_result, block))
+                elif (
+                    "text" in block
+                    and len(block["text"]) > self.text_length_threshold
+                    and not block["text"].endswith(REDACTED_MARKER)
+                ):
+                    self._texts.append(block)
+
+    def _in_sync(self, messages: list, added: int = 0) -> bool:
+        # Conversation managers trim or summarize from the front, which
+        # changes the first message; appends only change the length
+        return len(messages) == self._indexed_count + added and (
+            not self._indexed_count or messages[0] is self._first_message
+        )
+
+    def _rebuild(self, messages: list) -> None:
+        """Re-index from scratch, e.g. after the conversation manager reduced the context."""
+        self._texts.clear()
+        self._images.clear()
+        for message in messages:
+            self._index(message)
+        self._indexed_count = len(messages)
+        self._first_message = messages[0] if messages else None
+
+    def index_message(self, event: MessageAddedEvent) -> None:
+        """Index a newly added message."""
+        messages = event.agent.messages
+        if not self._in_sync(messages, added=1):
+            self._rebuild(messages)
+            return
+        self._index(event.message)
+        self._indexed_count = len(messages)
+        self._first_message = messages[0]
+
+    def prune(self, event: BeforeModelCallEvent) -> int:
+        """
+        Redact and remove what fell out of the windows, a batch at a time.
+
+        Returns:
+            Estimated tokens saved by this call
+        """
+        messages = event.agent.messages
+        if not self._in_sync(messages):
+            self._rebuild(messages)
+
+        saved = 0
+        excess = len(self._texts) - self.window_size
+        for _ in range(excess - excess % self.redaction_batch if excess > 0 else 0):
+            block = self._texts.popleft()
+            text = block["text"]
+            block["text"] = text[:self.text_length_threshold] + REDACTED_MARKER
+            saved += estimate_tokens(text) - estimate_tokens(block["text"])
+
+        excess = len(self._images) - self.images_to_keep
+        for _ in range(excess - excess % self.image_batch if excess > 0 else 0):
+            tool_result, image = self._images.popleft()
+            tool_result["content"] = [
+                {"text": IMAGE_PLACEHOLDER} if block is image else block
+                for block in tool_result["content"]
+            ]
+            saved += IMAGE_TOKENS - estimate_tokens(IMAGE_PLACEHOLDER)
+
+        self.turn_tokens_saved += saved
+        return saved
+
+    def report_turn(self, event: Optional[AfterInvocationEvent] = None) -> int:
+        """Log and return the estimated tokens saved during the finished turn."""
+        saved = self.last_turn_tokens_saved = self.turn_tokens_saved
+        self.total_tokens_saved += saved
+        self.turn_tokens_saved = 0
+        if saved:
+            logger.info(f"Context pruning saved ~{saved} tokens this turn (~{self.total_tokens_saved} total)")
+        return saved
+
+    def stats(self) -> dict:
+        """Return pruning counters."""
+        return {
+            "indexed_messages": self._indexed_count,
+            "tracked_long_texts": len(self._texts),
+            "tracked_images": len(self._images),
+            "last_turn_tokens_saved": self.last_turn_tokens_saved,
+            "total_tokens_saved": self.total_tokens_saved,
+        }
@@ -0,0 +1,117 @@
+"""Server-Sent Events writer that coalesces streamed text deltas into frames.
+
+Model streams produce one event per few characters of text. Encoding each of
+them as its own ``data: {...}`` frame costs a JSON encode plus the full
+envelope on the wire per token. ``SSEWriter`` buffers consecutive deltas of
+the same kind and emits them as one frame every ``flush_interval_ms`` or
+``flush_bytes``, whichever comes first. Any other event (tool use, thinking
+switch, stop) flushes the buffer before it is written, so ordering is kept.
+
+The envelope around a delta is encoded once per stream: ``envelope`` renders
+a template payload with a placeholder and splits it into a prefix and suffix,
+so a coalesced frame is just ``prefix + dumps(text) + suffix``.
+
+Kept free of package-relative imports so both the API (``src.agentcore_runtime``)
+and the AgentCore runtime container (flat imports) can use it.
+"""
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Placeholder marking where the delta text goes in an envelope template
+SLOT = "\x00sse-slot\x00"
+
+
+def dumps(obj: Any) -> str:
+    """Encode ``obj`` as compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson is stricter (e.g. non-str keys); fall back to the stdlib
+            pass
+    return _json_encode(obj)
+
+
+def frame(payload: Any) -> str:
+    """Encode a single SSE ``data:`` frame."""
+    return f"data: {dumps(payload)}\n\n"
+
+
+def envelope(template: Dict[str, Any]) -> Tuple[str, str]:
+    """Split the frame for ``template`` around its ``SLOT`` value.
+
+    Returns:
+        (prefix, suffix) such that ``prefix + dumps(text) + suffix`` equals
+        ``frame(template)`` with ``SLOT`` replaced by ``text``.
+    """
+    prefix, suffix = frame(template).split(dumps(SLOT))
+    return prefix, suffix
+
+
+class SSEWriter:
+    """Buffers text deltas per kind and emits them as coalesced SSE frames.
+
+    Every method returns the SSE text to send now ("" when nothing is due), so
+    a generator can ``yield`` it whenever it is non-empty.
+    """
+
+    def __init__(
+        self,
+        envelopes: Dict[str, Tuple[str, str]],
+        flush_interval_ms: float = 50,
+        flush_bytes: int = 1024,
+    ):
+        """
+        Args:
+            envelopes: Delta kind -> (prefix, suffix), see ``envelope``
+            flush_interval_ms: Emit buffered text at least this often; 0 sends
+                every delta as its own frame
+            flush_bytes: Emit once this much text is buffered
+        """
+        self.envelopes = envelopes
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_bytes = flush_bytes
+        self._kind: Optional[str] = None
+        self._parts: list = []
+        self._size = 0
+        self._last_flush = 0.0
+
+    def delta(self, kind: str, text: str) -> str:
+        """Buffer a text delta of ``kind``; switching kind flushes the previous one."""
+        out = self.flush() if kind != self._kind else ""
+        self._kind = kind
+        self._parts.append(text)
+        self._size += len(text)
+        now = time.monotonic()
+        # A delta after a quiet period goes out at once; only bursts are held
+        if now - self._last_flush >= self.flush_interval or self._size >= self.flush_bytes:
+            out += self.flush(now)
+        return out
+
+    def event(self, payload: Any) -> str:
+        """Flush buffered text, then encode ``payload`` as its own frame."""
+        return self.raw(frame(payload))
+
+    def raw(self, data: str) -> str:
+        """Flush buffered text, then send pre-encoded SSE ``data``."""
+        return self.flush() + data
+
+    def flush(self, now: Optional[float] = None) -> str:
+        """Return the buffered text as one frame, or "" if nothing is buffered."""
+        if not self._parts:
+            return ""
+        prefix, suffix = self.envelopes[self._kind]
+        text = self._parts[0] if len(self._parts) == 1 else "".join(self._parts)
+        out = prefix + dumps(text) + suffix
+        self._parts = []
+        self._size = 0
+        self._last_flush = time.monotonic() if now is None else now
+        return out
@@ -1,3 +1,7 @@
+# Times the imports below when STARTUP_PROFILE=1
+import startup_profile
+startup_profile.start()
+
 from fastapi import FastAPI, HTTPException, Header,Request
 from pydantic import BaseModel
 from typing import Dict, Any,Optional
@@ -8,16 +12,16 @@ import asyncio
 from streaming_utils import StreamingQueue,pull_queue_stream,process_stream_response
 import logging
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from strands.models import BedrockModel
 from botocore.config import Config
-import psutil
 import os
 from constant_helper import is_interleaved_claude_thinking,is_claude_thinking,is_prompt_cache
-from strands.agent.conversation_manager import SummarizingConversationManager
+from token_budget_manager import TokenBudgetConversationManager
 from skill_tool import generate_skill_tool,SkillToolInterceptor 
+from context_pruner import ContextPruner
 from ask_user_tool import ask_user
 from pathlib import Path
-from strands_tools import file_read, shell, editor,file_write
 from fastapi.responses import JSONResponse, StreamingResponse
 import uuid
 from data_types import RequestContext
@@ -32,9 +36,11 @@ logger = logging.getLogger(__name__)
 MODEL_ID = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
 MAX_TOKENS = 16000
 TEMPERATURE = 0.7
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "120000"))
 
 # Save agents instances
 agent_pool = {}
+startup_profile.mark("imports")
 
 
 ROOT = Path(__file__).parent
@@ -75,6 +81,8 @@ async def lifespan(_app: FastAPI):
     """
     # Startup
     logger.info(f"Starting Strands Agent Server with {MAX_WORKERS} worker threads")
+    startup_profile.mark("app startup")
+    startup_profile.report()
     yield
     # Shutdown
     logger.info("Shutting down thread pool...")
@@ -110,6 +118,17 @@ async def remove_active_task(request_id: str):
             last_status_update_time = datetime.now(timezone.utc)
             logger.debug(f"Active tasks count: {len(active_tasks)}")
 
+@lru_cache(maxsize=None)
+def agent_tools() -> tuple:
+    """
+    The strands_tools used by every agent, imported on first use: they pull
+    in rich, prompt_toolkit and friends, which the server does not need to
+    answer /ping.
+    """
+    from strands_tools import file_read, shell, editor, file_write
+    return file_read, shell, editor, file_write
+
+
 def init_agent(model_id:str,
                      system:str,
                      max_tokens:int,
@@ -157,10 +176,11 @@ def init_agent(model_id:str,
         max_tokens=10000,
         temperature=0.1,  # Low temperature for consistent summaries
     )
-    conversation_manager = SummarizingConversationManager(
-            summary_ratio=0.4,
+    # Summarize only when the history exceeds the token budget, not after a fixed message count
+    conversation_manager = TokenBudgetConversationManager(
+            max_tokens=CONTEXT_TOKEN_BUDGET,
             preserve_recent_messages=20,
-            summarization_agent=Agent(model=summarization_model)
+            summarization_agent=Agent(model=summarization_model, callback_handler=None)
     )
 
     # Dynamically create skill tools, as it should read Skills folders when agent starts.
@@ -178,9 +198,9 @@ def init_agent(model_id:str,
     - Use 'AskUserQuestion' tool when you need to ask the user questions during execution. 
     </IMPORTANT>
     """,
-            tools=[file_read, shell, editor,file_write, skill_tool,ask_user],
+            tools=[*agent_tools(), skill_tool,ask_user],
             conversation_manager=conversation_manager,
-            hooks=[SkillToolInterceptor(cache_enabled=True if not cache_prompt else False)],
+            hooks=[SkillToolInterceptor(cache_enabled=True if not cache_prompt else False), ContextPruner()],
             callback_handler=None
             )
 
@@ -222,6 +242,9 @@ async def get_stats_data() -> Dict[str, Any]:
     async with active_tasks_lock:
         active_count = len(active_tasks)
 
+    # Only needed for stats, so not imported at startup
+    import psutil
+
     # Get current process
     process = psutil.Process(os.getpid())
 
@@ -312,12 +335,13 @@ async def invoke_agent(invocation_request: InvocationRequest,request: Request):
             )
         session_id = request_context.session_id
         if session_id not in agent_pool:
-            agent = init_agent(system=system,
-                                     temperature=temperature,
-                                     thinking=thinking,
-                                     thinking_budget=thinking_budget,
-                                     model_id=model_id,
-                                     max_tokens=max_tokens)
+            with startup_profile.phase("init_agent"):
+                agent = init_agent(system=system,
+                                         temperature=temperature,
+                                         thinking=thinking,
+                                         thinking_budget=thinking_budget,
+                                         model_id=model_id,
+                                         max_tokens=max_tokens)
             agent_pool[session_id] = agent
             
         # get unique request ID for tracking
@@ -328,6 +352,9 @@ async def invoke_agent(invocation_request: InvocationRequest,request: Request):
         try:
 
             # loop = asyncio.get_event_loop()
+            # The previous stream stops at end_turn without reading the queue's
+            # end sentinel, which would otherwise end this stream at once
+            stream_queue.reset()
             task = asyncio.create_task(process_agent_request(user_message,session_id, request_id))
             # Add task to active tasks tracking
             await add_active_task(request_id,task)
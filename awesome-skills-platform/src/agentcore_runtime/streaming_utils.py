@@ -1,6 +1,7 @@
 import json
 import time
 import asyncio
+from sse_writer import SLOT, SSEWriter, envelope
 
 
 
@@ -121,12 +122,45 @@ async def  process_stream_response(response):
                 
                 
             
-async def pull_queue_stream(stream_queue:StreamingQueue,model_id:str):
+async def pull_queue_stream(stream_queue:StreamingQueue,model_id:str,flush_interval_ms:float=50,flush_bytes:int=1024):
     current_content = ""
     thinking_start = False
     thinking_text_index = 0
     tooluse_start = False
+    # text / reasoning deltas are coalesced into one chunk per interval or size;
+    # their envelopes are encoded once per stream
+    created = int(time.time())
+    writer = SSEWriter({
+        kind: envelope({
+            "id": f"chat{time.time_ns()}",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model_id,
+            "choices": [{
+                "index": 0,
+                "delta": {kind: SLOT},
+                "finish_reason": None
+            }]
+        })
+        for kind in ("content", "reasoning_content")
+    }, flush_interval_ms=flush_interval_ms, flush_bytes=flush_bytes)
     async for item in stream_queue.stream():
+        if item["type"] == "block_delta":
+            delta = item["data"]["delta"]
+            if "text" in delta:
+                text = str(delta["text"])
+                current_content += text
+                thinking_text_index = 0
+                out = writer.delta("content", text)
+                if out:
+                    yield out
+                continue
+            if "text" in delta.get("reasoningContent", {}):
+                out = writer.delta("reasoning_content", delta["reasoningContent"]["text"])
+                if out:
+                    yield out
+                continue
+
         event_data = {
             "id": f"chat{time.time_ns()}",
             "object": "chat.completion.chunk",
@@ -150,21 +184,10 @@ async def pull_queue_stream(stream_queue:StreamingQueue,model_id:str):
                 }
             
         elif item["type"] == "block_delta":
-            if "text" in item["data"]["delta"]:
-                text = ""
-                text += str(item["data"]["delta"]["text"])
-                current_content += text
-                event_data["choices"][0]["delta"] = {"content": text}
-                thinking_text_index = 0
-                
             if "toolUse" in item["data"]["delta"]:
                 if not tooluse_start:    
                     tooluse_start = True
                 event_data["choices"][0]["delta"] = {"toolinput_content": json.dumps(item["data"]["delta"]["toolUse"]['input'],ensure_ascii=False)}
-                
-            if "reasoningContent" in item["data"]["delta"]:
-                if 'text' in item["data"]["delta"]["reasoningContent"]:
-                    event_data["choices"][0]["delta"] = {"reasoning_content": item["data"]["delta"]["reasoningContent"]["text"]}
 
         elif item["type"] == "block_stop":
             if tooluse_start:
@@ -189,12 +212,12 @@ async def pull_queue_stream(stream_queue:StreamingQueue,model_id:str):
                         "finish_reason": "end_turn"
                     }]
                 }     
-                yield f"data: [DONE]\n\n"     
+                yield writer.raw(f"data: [DONE]\n\n")
                 break
                 # return
-        # 发送事件
+        # 发送事件 (flushes any buffered text first)
         # logger.info(event_data)
-        yield f"data: {json.dumps(event_data)}\n\n"
+        yield writer.event(event_data)
         
         # 手动停止流式响应
         if item["type"] == "stopped":
@@ -209,6 +232,6 @@ async def pull_queue_stream(stream_queue:StreamingQueue,model_id:str):
                     "finish_reason": "stop_requested"
                 }]
             }
-            yield f"data: {json.dumps(event_data)}\n\n"
+            yield writer.event(event_data)
             yield f"data: [DONE]\n\n"
             break
\ No newline at end of file
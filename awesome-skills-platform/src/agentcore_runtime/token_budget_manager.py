@@ -0,0 +1,270 @@
+"""
+Token-budget conversation manager.
+
+SlidingWindowConversationManager and SummarizingConversationManager reduce the
+history by message count: one huge tool result can still overflow the context,
+while a short chat gets trimmed or summarized (an extra model call) for no
+reason. TokenBudgetConversationManager keeps a cheap token estimate per
+message and only acts when the estimate for the whole history exceeds a
+budget. It then brings the history back under the target in this order:
+
+1. truncate large tool results (and drop tool-result images), oldest first;
+2. evict the oldest dialogue turns, optionally folding them into a summary
+   made by a summarization agent.
+
+The most recent messages are never touched unless the model reports a
+context overflow.
+
+Only the ConversationManager base API is used. Releases before 0.2 pass the
+message list instead of the agent to apply_management/reduce_context; both
+are accepted.
+
+The canonical copy is awesome-skills-platform/src/agentcore_runtime/; the
+copies in the other apps are generated from it by
+awesome-skills-platform/scripts/sync_token_budget_manager.py. Edit the
+canonical copy and run the script.
+"""
+import json
+import logging
+from typing import Any, Optional
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1600
+TRUNCATED_MARKER = "... [truncated]"
+IMAGE_PLACEHOLDER = "[image removed from context]"
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Approximate the token count of a text without a tokenizer.
+
+    About 4 characters per token for ASCII text and one token per character
+    for CJK text (3 UTF-8 bytes per character), computed in C-speed passes.
+    """
+    if text.isascii():
+        return -(-len(text) // CHARS_PER_TOKEN)
+    wide = (len(text.encode("utf-8")) - len(text)) // 2
+    return -(-(len(text) - wide) // CHARS_PER_TOKEN) + wide
+
+
+def _block_tokens(block: dict) -> int:
+    if "text" in block:
+        return estimate_text_tokens(block["text"])
+    if "image" in block:
+        return IMAGE_TOKENS
+    if "toolResult" in block:
+        return 8 + sum(_block_tokens(item) for item in block["toolResult"].get("content") or [])
+    if "toolUse" in block:
+        tool_use = block["toolUse"]
+        return 8 + estimate_text_tokens(tool_use.get("name", "") + json.dumps(tool_use.get("input"), default=str))
+    if "reasoningContent" in block:
+        reasoning = block["reasoningContent"].get("reasoningText") or {}
+        return estimate_text_tokens(reasoning.get("text", ""))
+    if "document" in block:
+        source = block["document"].get("source") or {}
+        return len(source.get("bytes") or b"") // CHARS_PER_TOKEN
+    if "json" in block:
+        return estimate_text_tokens(json.dumps(block["json"], default=str))
+    return 0
+
+
+def estimate_message_tokens(message: dict) -> int:
+    """Approximate the token count of one message."""
+    content = message.get("content")
+    if not isinstance(content, list):
+        return 4
+    return 4 + sum(_block_tokens(block) for block in content if isinstance(block, dict))
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """Keeps the conversation under a token budget, evicting tool output before dialogue."""
+
+    def __init__(
+        self,
+        max_tokens: int = 100_000,
+        target_ratio: float = 0.75,
+        preserve_recent_messages: int = 6,
+        tool_result_keep_chars: int = 500,
+        summarization_agent: Optional[Any] = None,
+    ):
+        """
+        Args:
+            max_tokens: Token budget for the history; nothing happens below it
+            target_ratio: Once over budget, reduce to max_tokens * target_ratio
+                so the next turns do not trigger another reduction right away
+            preserve_recent_messages: Most recent messages left untouched
+            tool_result_keep_chars: Leading characters kept of a truncated tool result
+            summarization_agent: Optional agent that summarizes evicted turns;
+                without it evicted turns are dropped
+        """
+        super().__init__()
+        self.removed_message_count = 0
+        self.max_tokens = max_tokens
+        self.target_tokens = int(max_tokens * target_ratio)
+        self.preserve_recent_messages = preserve_recent_messages
+        self.tool_result_keep_chars = tool_result_keep_chars
+        self.summarization_agent = summarization_agent
+        # id(message) -> (message, content list, content length, tokens)
+        self._estimates: dict[int, tuple] = {}
+
+    def message_tokens(self, message: dict) -> int:
+        """
+        Token estimate for a message, cached until its content list is
+        replaced or changes length.
+        """
+        content = message.get("content")
+        size = len(content) if isinstance(content, list) else 0
+        cached = self._estimates.get(id(message))
+        if cached and cached[0] is message and cached[1] is content and cached[2] == size:
+            return cached[3]
+        tokens = estimate_message_tokens(message)
+        self._estimates[id(message)] = (message, content, size, tokens)
+        return tokens
+
+    def _forget(self, message: dict) -> None:
+        self._estimates.pop(id(message), None)
+
+    def total_tokens(self, messages: list) -> int:
+        """Token estimate for the whole history."""
+        total = sum(self.message_tokens(m) for m in messages)
+        # Drop cache entries for messages that are no longer in the history
+        if len(self._estimates) > 2 * len(messages):
+            live = {id(m) for m in messages}
+            self._estimates = {k: v for k, v in self._estimates.items() if k in live}
+        return total
+
+    @staticmethod
+    def _messages(agent: Any) -> list:
+        return agent if isinstance(agent, list) else agent.messages
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        """Reduce the history only if it is over the token budget."""
+        total = self.total_tokens(self._messages(agent))
+        if total <= self.max_tokens:
+            logger.debug(f"~{total} tokens within budget {self.max_tokens}, nothing to reduce")
+            return
+        self.reduce_context(agent)
+
+    def reduce_context(self, agent: Any, e: Optional[Exception] = None, **kwargs: Any) -> None:
+        """
+        Bring the history under the target: truncate old tool results first,
+        then evict (or summarize) the oldest turns.
+
+        On a context overflow (e is set) the recent messages are truncated as
+        well, the target is at most half of the current estimate, and the
+        overflow is re-raised if nothing could be removed.
+        """
+        messages = self._messages(agent)
+        total = self.total_tokens(messages)
+        target = self.target_tokens if e is None else min(self.target_tokens, total // 2)
+        protected = 0 if e is not None else self.preserve_recent_messages
+        before = total
+
+        total = self._truncate_tool_results(messages, total, target, protected)
+        if total > target:
+            total = self._evict_turns(messages, total, target, protected)
+
+        if e is not None and total >= before:
+            raise ContextWindowOverflowException("Unable to reduce conversation context under the token budget") from e
+        logger.info(f"Reduced conversation context from ~{before} to ~{total} tokens (target {target})")
+
+    def _truncate_tool_results(self, messages: list, total: int, target: int, protected: int) -> int:
+        for message in messages[:max(0, len(messages) - protected)]:
+            if total <= target:
+                break
+            content = message.get("content")
+            if not isinstance(content, list) or not any(isinstance(b, dict) and "toolResult" in b for b in content):
+                continue
+            changed = False
+            for block in content:
+                if not isinstance(block, dict) or "toolResult" not in block:
+                    continue
+                items = [self._truncate_item(item) for item in block["toolResult"].get("content") or []]
+                if any(new is not old for new, old in zip(items, block["toolResult"].get("content") or [])):
+                    block["toolResult"] = {**block["toolResult"], "content": items}
+                    changed = True
+            if changed:
+                old = self.message_tokens(message)
+                self._forget(message)
+                total += self.message_tokens(message) - old
+        return total
+
+    def _truncate_item(self, item: dict) -> dict:
+        """Return a smaller replacement for a tool-result item, or the item itself."""
+        if "image" in item:
+            return {"text": IMAGE_PLACEHOLDER}
+        text = item.get("text")
+        if (
+            text is not None
+            and len(text) > self.tool_result_keep_chars + len(TRUNCATED_MARKER)
+            and not text.endswith(TRUNCATED_MARKER)
+        ):
+            return {"text": text[:self.tool_result_keep_chars] + TRUNCATED_MARKER}
+        return item
+
+    @staticmethod
+    def _is_turn_start(messages: list, index: int) -> bool:
+        """A plain user message (not a tool result) can start the history."""
+        message = messages[index]
+        return message["role"] == "user" and not any(
+            isinstance(b, dict) and ("toolResult" in b or "toolUse" in b) for b in message["content"]
+        )
+
+    def _evict_turns(self, messages: list, total: int, target: int, protected: int) -> int:
+        # Find the earliest turn boundary that brings the estimate under target
+        limit = len(messages) - protected
+        cut, remaining = 0, total
+        for index in range(1, limit + 1):
+            remaining -= self.message_tokens(messages[index - 1])
+            if index < len(messages) and self._is_turn_start(messages, index):
+                cut = index
+                if remaining <= target:
+                    break
+        if not cut:
+            logger.warning("No turn boundary outside the preserved messages; unable to evict dialogue")
+            return total
+
+        evicted = messages[:cut]
+        summary = self._summarize(evicted) if self.summarization_agent is not None else None
+        del messages[:cut]
+        self.removed_message_count += cut
+        for message in evicted:
+            self._forget(message)
+
+        if summary:
+            first = messages[0]
+            first["content"] = [{"text": SUMMARY_PREFIX + summary}] + list(first["content"])
+            self._forget(first)
+        return self.total_tokens(messages)
+
+    def _summarize(self, messages: list) -> Optional[str]:
+        """Summarize evicted messages with the summarization agent; None on failure."""
+        lines = []
+        for message in messages:
+            for block in message.get("content") or []:
+                if "text" in block:
+                    lines.append(f"{message['role']}: {block['text']}")
+                elif "toolUse" in block:
+                    lines.append(f"tool call {block['toolUse'].get('name')}: "
+                                 f"{json.dumps(block['toolUse'].get('input'), default=str)[:self.tool_result_keep_chars]}")
+                elif "toolResult" in block:
+                    texts = [i["text"] for i in block["toolResult"].get("content") or [] if "text" in i]
+                    lines.append(f"tool result: {' '.join(texts)[:self.tool_result_keep_chars]}")
+        try:
+            self.summarization_agent.messages = []
+            result = self.summarization_agent(
+                "Summarize this conversation concisely, keeping facts, decisions and open tasks:\n\n"
+                + "\n".join(lines)
+            )
+            return str(result).strip() or None
+        except Exception as e:
+            logger.error(f"Conversation summarization failed, dropping evicted turns: {e}")
+            return None
+        finally:
+            self.summarization_agent.messages = []
@@ -7,8 +7,10 @@ DynamoDB utility functions for the FastAPI server
 """
 import os
 import json
+import asyncio
+import functools
 import logging
-import boto3
+import time
 from datetime import datetime
 from typing import Dict
 import hashlib
@@ -16,7 +18,7 @@ import re
 import threading
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 import uuid
 from data_types import RequestContext
 # Initialize logger
@@ -28,8 +30,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 # 全局模型和服务器配置
 load_dotenv()  # load env vars from .env
-# DynamoDB 客户端
-dynamodb_client = None
 DDB_TABLE = os.environ.get("ddb_table","agent_user_config_table")  # DynamoDB表名，用于存储用户配置
 user_mcp_server_configs = {}  # 用户特有的MCP服务器配置 user_id -> {server_id: config}
 global_mcp_server_configs = {}  # 全局MCP服务器配置 server_id -> config
@@ -40,6 +40,9 @@ active_streams_lock = threading.RLock()
 session_lock = threading.RLock()
 
 def get_secret(secret_name):
+    import boto3
+    from botocore.exceptions import ClientError
+
     # Create a Secrets Manager client
     session = boto3.session.Session()
     client = session.client(
@@ -61,13 +64,108 @@ def get_secret(secret_name):
     secret_json = json.loads(secret)
     return secret_json
 
-if DDB_TABLE:
-    try:
+# 是否启用 DynamoDB 持久化。Table 在各工作线程首次使用时创建（见 _table），
+# 启动时不加载 boto3/botocore
+dynamodb_enabled = bool(DDB_TABLE)
+if dynamodb_enabled:
+    logger.info(f"使用DynamoDB, 表名: {DDB_TABLE}")
+
+# DynamoDB 调用都在专用线程池中执行，避免阻塞正在推送流式响应的事件循环。
+# boto3 resource 不是线程安全的，每个工作线程持有自己的 Table（连接池按线程复用）。
+DDB_MAX_WORKERS = int(os.environ.get("DDB_MAX_WORKERS", "16"))
+ddb_executor = ThreadPoolExecutor(max_workers=DDB_MAX_WORKERS, thread_name_prefix="ddb")
+_ddb_local = threading.local()
+
+# get_user_server_configs 的读穿透缓存: user_id -> (过期时间, 配置)
+USER_CONFIG_CACHE_TTL = float(os.environ.get("USER_CONFIG_CACHE_TTL", "30"))
+_user_config_cache: Dict[str, tuple] = {}
+# 同一用户并发加载时共享同一个 DynamoDB 请求
+_user_config_loads: Dict[str, asyncio.Task] = {}
+
+
+def _table():
+    """Return this thread's DynamoDB Table, creating it on first use."""
+    table = getattr(_ddb_local, "table", None)
+    if table is None:
+        import boto3
+        from botocore.config import Config
+
         region = os.environ.get('AWS_REGION', 'us-east-1')
-        dynamodb_client = boto3.resource('dynamodb', region_name=region)
-        logger.info(f"已连接到DynamoDB, 表名: {DDB_TABLE}")
-    except Exception as e:
-        logger.error(f"DynamoDB连接失败: {e}")
+        resource = boto3.session.Session().resource(
+            'dynamodb', region_name=region, config=Config(max_pool_connections=4)
+        )
+        table = _ddb_local.table = resource.Table(DDB_TABLE)
+    return table
+
+
+async def run_in_ddb_executor(func, *args, **kwargs):
+    """Run a blocking DynamoDB call on the DynamoDB thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ddb_executor, functools.partial(func, *args, **kwargs))
+
+
+def _put_item(user_id: str, data: dict):
+    _table().put_item(
+        Item={
+            'userId': user_id,
+            'data': json.dumps(data),
+            'timestamp': datetime.now().isoformat()
+        }
+    )
+
+
+def _get_item(user_id: str) -> dict:
+    response = _table().get_item(
+        Key={
+            'userId': user_id
+        }
+    )
+    if 'Item' in response:
+        return json.loads(response['Item'].get('data', '{}'))
+    logger.info(f"id {user_id} 在DynamoDB中无配置")
+    return {}
+
+
+def _delete_item(user_id: str):
+    _table().delete_item(
+        Key={
+            'userId': user_id
+        }
+    )
+
+
+def _scan_all() -> dict:
+    table = _table()
+    configs = {}
+
+    # 初始化扫描参数
+    scan_params = {}
+    done = False
+    start_key = None
+
+    # 处理分页
+    while not done:
+        if start_key:
+            scan_params['ExclusiveStartKey'] = start_key
+
+        response = table.scan(**scan_params)
+        items = response.get('Items', [])
+
+        # 处理当前页的结果
+        for item in items:
+            if 'userId' in item and 'data' in item:
+                user_id = item['userId']
+                try:
+                    user_data = json.loads(item['data'])
+                    configs[user_id] = user_data
+                except json.JSONDecodeError as e:
+                    logger.error(f"解析用户 {user_id} 的DynamoDB数据失败: {e}")
+
+        # 检查是否有更多页
+        start_key = response.get('LastEvaluatedKey')
+        done = start_key is None
+    return configs
+
 
 def save_configs_to_json(configs:dict):
     config_file = os.environ.get('USER_MCP_CONFIG_FILE', 'conf/user_mcp_configs.json')
@@ -94,18 +192,11 @@ async def delete_user_session(user_id: str) ->dict:
     
 async def save_to_ddb(user_id: str, data: dict):
     """将用户配置保存到DynamoDB"""
-    if not dynamodb_client or not DDB_TABLE:
+    if not dynamodb_enabled:
         return False
     
     try:
-        table = dynamodb_client.Table(DDB_TABLE)
-        response = table.put_item(
-            Item={
-                'userId': user_id,
-                'data': json.dumps(data),
-                'timestamp': datetime.now().isoformat()
-            }
-        )
+        await run_in_ddb_executor(_put_item, user_id, data)
         logger.info(f"保存用户 {user_id} 配置到DynamoDB成功")
         return True
     except Exception as e:
@@ -114,63 +205,33 @@ async def save_to_ddb(user_id: str, data: dict):
 
 def get_from_ddb_sync(user_id: str) -> dict:
     """从DynamoDB获取用户配置"""
-    if not dynamodb_client or not DDB_TABLE:
+    if not dynamodb_enabled:
         return {}
     
     try:
-        table = dynamodb_client.Table(DDB_TABLE)
-        response = table.get_item(
-            Key={
-                'userId': user_id
-            }
-        )
-        
-        if 'Item' in response:
-            data = json.loads(response['Item'].get('data', '{}'))
-            return data
-        else:
-            logger.info(f"id {user_id} 在DynamoDB中无配置")
-            return {}
+        return _get_item(user_id)
     except Exception as e:
         logger.warning(f"从DynamoDB获取用户 {user_id} 配置失败: {e}")
         return {}
     
 async def get_from_ddb(user_id: str) -> dict:
     """从DynamoDB获取用户配置"""
-    if not dynamodb_client or not DDB_TABLE:
+    if not dynamodb_enabled:
         return {}
     
     try:
-        table = dynamodb_client.Table(DDB_TABLE)
-        response = table.get_item(
-            Key={
-                'userId': user_id
-            }
-        )
-        
-        if 'Item' in response:
-            data = json.loads(response['Item'].get('data', '{}'))
-            # logger.info(f"从DynamoDB获取用户 {user_id} 配置成功")
-            return data
-        else:
-            logger.info(f"用户 {user_id} 在DynamoDB中无配置")
-            return {}
+        return await run_in_ddb_executor(_get_item, user_id)
     except Exception as e:
         logger.warning(f"从DynamoDB获取用户 {user_id} 配置失败: {e}")
         return {}
         
 async def delete_from_ddb(user_id: str) -> bool:
     """从DynamoDB删除用户配置"""
-    if not dynamodb_client or not DDB_TABLE:
+    if not dynamodb_enabled:
         return False
     
     try:
-        table = dynamodb_client.Table(DDB_TABLE)
-        response = table.delete_item(
-            Key={
-                'userId': user_id
-            }
-        )
+        await run_in_ddb_executor(_delete_item, user_id)
         return True
     except Exception as e:
         logger.warning(f"delete_from_ddb failed: {e}")
@@ -178,41 +239,12 @@ async def delete_from_ddb(user_id: str) -> bool:
 
 async def scan_all_from_ddb() -> dict:
     """从DynamoDB扫描所有用户配置，处理分页"""
-    if not dynamodb_client or not DDB_TABLE:
+    if not dynamodb_enabled:
         return {}
     
     try:
         # 使用scan操作获取所有用户的配置，并处理分页
-        table = dynamodb_client.Table(DDB_TABLE)
-        configs = {}
-        
-        # 初始化扫描参数
-        scan_params = {}
-        done = False
-        start_key = None
-        
-        # 处理分页
-        while not done:
-            if start_key:
-                scan_params['ExclusiveStartKey'] = start_key
-            
-            response = table.scan(**scan_params)
-            items = response.get('Items', [])
-            
-            # 处理当前页的结果
-            for item in items:
-                if 'userId' in item and 'data' in item:
-                    user_id = item['userId']
-                    try:
-                        user_data = json.loads(item['data'])
-                        configs[user_id] = user_data
-                    except json.JSONDecodeError as e:
-                        logger.error(f"解析用户 {user_id} 的DynamoDB数据失败: {e}")
-            
-            # 检查是否有更多页
-            start_key = response.get('LastEvaluatedKey')
-            done = start_key is None
-        
+        configs = await run_in_ddb_executor(_scan_all)
         logger.info(f"已从DynamoDB扫描到 {len(configs)} 个用户的配置")
         return configs
     except Exception as e:
@@ -223,7 +255,7 @@ async def scan_all_from_ddb() -> dict:
 async def save_stream_id(stream_id:str,user_id:str):
     global active_streams
     with active_streams_lock:
-        if DDB_TABLE and dynamodb_client:
+        if dynamodb_enabled:
             # 获取当前用户的所有配置
             await save_to_ddb(stream_id, dict(user_id=user_id))
             active_streams[stream_id]=user_id
@@ -233,7 +265,7 @@ async def save_stream_id(stream_id:str,user_id:str):
 # Get stream id
 async def get_stream_id(stream_id:str):
     with active_streams_lock:
-        if DDB_TABLE and dynamodb_client:
+        if dynamodb_enabled:
             # 尝试从DynamoDB获取
             ddb_config = await get_from_ddb(stream_id)
             if ddb_config:
@@ -245,7 +277,7 @@ async def get_stream_id(stream_id:str):
     
 def get_stream_id_sync(stream_id:str):
     with active_streams_lock:
-        if DDB_TABLE and dynamodb_client:
+        if dynamodb_enabled:
             # 尝试从DynamoDB获取
             ddb_config = get_from_ddb_sync(stream_id)
             if ddb_config:
@@ -259,7 +291,7 @@ def get_stream_id_sync(stream_id:str):
 # delete stream id
 async def delete_stream_id(stream_id:str):
     with active_streams_lock:
-        if DDB_TABLE and dynamodb_client:
+        if dynamodb_enabled:
             # 尝试从DynamoDB获取
             await delete_from_ddb(stream_id)
 
@@ -284,13 +316,14 @@ async def delete_user_server_config(user_id: str, server_id: str):
         if user_id in user_mcp_server_configs and server_id in user_mcp_server_configs[user_id]:
             del user_mcp_server_configs[user_id][server_id]
             # 如果配置了DynamoDB，也从DDB中更新用户配置
-            if DDB_TABLE and dynamodb_client:
-                # 获取当前用户的所有配置
-                user_configs = await get_user_server_configs(user_id)
+            if dynamodb_enabled:
+                # 获取当前用户的所有配置（绕过缓存，读取最新值）
+                user_configs = await get_from_ddb(user_id)
                 if server_id in user_configs:
                     del user_configs[server_id]
                     # 保存更新后的配置到DynamoDB
                     await save_to_ddb(user_id, user_configs)
+                    invalidate_user_server_configs(user_id)
                     logger.info(f"已更新用户 {user_id} 在DynamoDB中的配置")
             else:
                 try:
@@ -311,11 +344,12 @@ async def save_user_server_config(user_id: str, server_id: str, config: dict):
         
         user_mcp_server_configs[user_id][server_id] = config
         # 如果配置了DynamoDB，也保存到DDB中
-        if DDB_TABLE and dynamodb_client:
+        if dynamodb_enabled:
             #获取原有的记录
             ddb_config = await get_from_ddb(user_id)
             ddb_config[server_id] = config
             await save_to_ddb(user_id, ddb_config)
+            invalidate_user_server_configs(user_id)
             logger.info(f"已保存用户 {user_id} 配置到DynamoDB")
         else:
             try:
@@ -324,20 +358,46 @@ async def save_user_server_config(user_id: str, server_id: str, config: dict):
             except Exception as e:
                 logger.error(f"保存用户MCP配置到文件失败: {e}")
 
+def invalidate_user_server_configs(user_id: str):
+    """使用户配置缓存失效（包括正在进行的加载）"""
+    _user_config_cache.pop(user_id, None)
+    _user_config_loads.pop(user_id, None)
+
+
+async def _load_user_server_configs(user_id: str) -> dict:
+    """从DynamoDB加载用户配置并写入缓存；读取失败时不缓存"""
+    try:
+        ddb_config = await run_in_ddb_executor(_get_item, user_id)
+    except Exception as e:
+        logger.warning(f"从DynamoDB获取用户 {user_id} 配置失败: {e}")
+        return {}
+    # 加载期间配置被修改过（缓存已失效）时，不写入可能过期的结果
+    if _user_config_loads.get(user_id) is asyncio.current_task():
+        _user_config_cache[user_id] = (time.monotonic() + USER_CONFIG_CACHE_TTL, ddb_config)
+        with session_lock:
+            user_mcp_server_configs[user_id] = ddb_config
+    return ddb_config
+
+
 # 获取用户MCP服务器配置
 async def get_user_server_configs(user_id: str) -> dict:
     """获取指定用户的所有MCP服务器配置"""
-    # 如果设置了DynamoDB表名，优先从DynamoDB读取
-    if DDB_TABLE and dynamodb_client:
-        # 尝试从DynamoDB获取
-        ddb_config = await get_from_ddb(user_id)
-        if ddb_config:
-            # 如果DynamoDB中有数据，更新内存缓存并返回
-            with session_lock:
-                user_mcp_server_configs[user_id] = ddb_config
-            return ddb_config
-        else:
-            return {}
+    # 如果设置了DynamoDB表名，优先从DynamoDB读取（带读穿透缓存）
+    if dynamodb_enabled:
+        cached = _user_config_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+
+        load = _user_config_loads.get(user_id)
+        if load is None:
+            load = asyncio.ensure_future(_load_user_server_configs(user_id))
+            _user_config_loads[user_id] = load
+            load.add_done_callback(
+                lambda task: _user_config_loads.pop(user_id, None)
+                if _user_config_loads.get(user_id) is task else None
+            )
+        # shield: 一个调用方被取消时不影响其他等待同一加载的调用方
+        return dict(await asyncio.shield(load))
     else: 
         # 如果没有设置DynamoDB或无法从DynamoDB获取，从内存中读取
         return user_mcp_server_configs.get(user_id, {})
@@ -346,7 +406,7 @@ async def load_user_mcp_configs():
     """加载用户MCP服务器配置"""
     global user_mcp_server_configs
     # 如果设置了DynamoDB表名，从DynamoDB加载所有用户配置
-    if DDB_TABLE and dynamodb_client:
+    if dynamodb_enabled:
         logger.info(f"从DynamoDB加载所有用户MCP配置")
         try:
             # 使用scan_all_from_ddb扫描所有用户配置
@@ -1,9 +1,12 @@
 """
 FastAPI main application.
 """
+import asyncio
 import logging
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from typing import Callable
 from uuid import uuid4
 
@@ -14,6 +17,8 @@ from pydantic import ValidationError
 
 from src.core.config import settings
 from src.api.routers import agents, skills, mcp, chat
+from src.core.agent_manager import agent_manager
+from src.core.mcp_manager import mcp_manager
 
 # Configure logging
 logging.basicConfig(
@@ -22,11 +27,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Size the default executor for model streams.
+
+    The default is min(32, cpus + 4) threads, which would limit a small
+    container to a handful of concurrent chats.
+    """
+    executor = ThreadPoolExecutor(max_workers=settings.model_stream_workers, thread_name_prefix="model-stream")
+    asyncio.get_running_loop().set_default_executor(executor)
+    logger.info(f"Default executor set to {settings.model_stream_workers} workers")
+    yield
+    executor.shutdown(wait=False)
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="AI Agent Platform API with Strands Agents and AWS Bedrock AgentCore",
+    lifespan=lifespan,
 )
 
 
@@ -128,6 +150,8 @@ def health_check():
         "status": "healthy",
         "app_name": settings.app_name,
         "version": settings.app_version,
+        "agent_cache": agent_manager.cache_stats(),
+        "mcp_pool": mcp_manager.pool_stats(),
     }
 
 
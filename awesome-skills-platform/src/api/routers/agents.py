@@ -6,6 +6,7 @@ from typing import List
 
 from src.schemas.agent import AgentCreate, AgentUpdate, AgentResponse
 from src.database.dynamodb import db_client
+from src.core.agent_manager import agent_manager
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -58,6 +59,9 @@ def update_agent(agent_id: str, agent: AgentUpdate):
             detail="Failed to update agent"
         )
 
+    # Drop cached agents built from the old config
+    agent_manager.clear_cache(agent_id)
+
     return AgentResponse(**updated_agent)
 
 
@@ -79,3 +83,5 @@ def delete_agent(agent_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete agent"
         )
+
+    agent_manager.clear_cache(agent_id)
@@ -1,21 +1,50 @@
 """
 Chat API endpoints for synchronous and streaming conversations.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from datetime import datetime
+from typing import Optional
 import uuid
 import logging
-import json
 
-from src.schemas.chat import ChatRequest, ChatResponse, Conversation, ChatMessage
+from src.schemas.chat import (
+    ChatRequest, ChatResponse, Conversation, ChatMessage,
+    ConversationPage, ConversationSummary, MessagePage,
+)
 from src.core.agent_manager import agent_manager
+from src.core.config import settings
+from src.core.conversation_store import get_conversation_store, to_datetime
+from src.agentcore_runtime.sse_writer import SLOT, SSEWriter, envelope
+
+# Envelopes for coalesced text/thinking deltas, encoded once
+_DELTA_ENVELOPES = {
+    kind: envelope({"type": kind, "content": SLOT}) for kind in ("text", "thinking")
+}
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 logger = logging.getLogger(__name__)
 
-# In-memory conversation storage (lightweight cache, AgentCore Memory handles persistence)
-_conversations: dict[str, Conversation] = {}
+
+
+def _summary_model(summary: dict) -> ConversationSummary:
+    return ConversationSummary(
+        id=summary["id"],
+        agentId=summary["agentId"],
+        title=summary["title"],
+        messageCount=summary["messageCount"],
+        createdAt=to_datetime(summary["createdAt"]),
+        updatedAt=to_datetime(summary["updatedAt"]),
+    )
+
+
+def _message_model(message: dict) -> ChatMessage:
+    return ChatMessage(
+        role=message["role"],
+        content=message["content"],
+        thinking=message["thinking"],
+        timestamp=to_datetime(message["timestamp"]),
+    )
 
 
 @router.post("", response_model=ChatResponse, status_code=status.HTTP_200_OK)
@@ -36,7 +65,8 @@ async def send_message(request: ChatRequest):
         # Log request
         logger.info(f"Chat request - Agent: {request.agent_id}, Conversation: {conversation_id}")
 
-        # Run agent with memory session (conversation_id serves as session_id)
+        # Run agent with memory session (conversation_id serves as session_id);
+        # run_async records both messages in the conversation store
         result = await agent_manager.run_async(
             agent_id=request.agent_id,
             user_message=request.message,
@@ -56,32 +86,6 @@ async def send_message(request: ChatRequest):
             timestamp=timestamp,
         )
 
-        # Store conversation in memory (simplified for Phase 4)
-        if conversation_id not in _conversations:
-            _conversations[conversation_id] = Conversation(
-                id=conversation_id,
-                agentId=request.agent_id,
-                title=request.message[:50] + "..." if len(request.message) > 50 else request.message,
-                messages=[],
-                createdAt=timestamp,
-                updatedAt=timestamp,
-            )
-
-        # Add messages to conversation
-        conversation = _conversations[conversation_id]
-        conversation.messages.append(ChatMessage(
-            role="user",
-            content=request.message,
-            timestamp=timestamp,
-        ))
-        conversation.messages.append(ChatMessage(
-            role="assistant",
-            content=result["message"],
-            thinking=result.get("thinking"),
-            timestamp=timestamp,
-        ))
-        conversation.updated_at = timestamp
-
         logger.info(f"Chat response sent - {len(result['message'])} chars")
 
         return response
@@ -115,16 +119,20 @@ async def stream_message(request: ChatRequest):
     """
     async def generate_sse_stream():
         """Generate Server-Sent Events stream."""
+        writer = SSEWriter(
+            _DELTA_ENVELOPES,
+            flush_interval_ms=settings.sse_flush_interval_ms,
+            flush_bytes=settings.sse_flush_bytes,
+        )
         try:
             # Generate or use existing conversation ID
             conversation_id = request.conversation_id or str(uuid.uuid4())
-            timestamp = datetime.utcnow()
 
             # Log request
             logger.info(f"Streaming chat request - Agent: {request.agent_id}, Conversation: {conversation_id}")
 
             # Send conversation metadata
-            yield f"data: {json.dumps({'type': 'start', 'conversationId': conversation_id, 'agentId': request.agent_id})}\n\n"
+            yield writer.event({'type': 'start', 'conversationId': conversation_id, 'agentId': request.agent_id})
 
             # Get agent with memory session (conversation_id serves as session_id)
             agent = agent_manager.get_or_create_agent(
@@ -133,6 +141,8 @@ async def stream_message(request: ChatRequest):
                 actor_id="default-user",  # TODO: Replace with actual user ID when auth is implemented
             )
 
+            model_id = agent_manager.get_model_id(request.agent_id, conversation_id)
+
             # Stream agent response
             accumulated_text = ""
             accumulated_thinking = []
@@ -142,67 +152,55 @@ async def stream_message(request: ChatRequest):
                 if "data" in event:
                     chunk = event["data"]
                     accumulated_text += chunk
-                    # Send text chunk
-                    yield f"data: {json.dumps({'type': 'text', 'content': chunk})}\n\n"
+                    # Buffer text chunk; sent once the flush interval or size is reached
+                    out = writer.delta("text", chunk)
+                    if out:
+                        yield out
 
                 elif "thinking" in event:
                     thinking_content = event["thinking"]
                     accumulated_thinking.append(thinking_content)
-                    # Send thinking chunk
-                    yield f"data: {json.dumps({'type': 'thinking', 'content': thinking_content})}\n\n"
+                    # Buffer thinking chunk; switching to text flushes it
+                    out = writer.delta("thinking", thinking_content)
+                    if out:
+                        yield out
 
                 elif "tool_use" in event:
                     # Send tool use event
                     tool_use = event["tool_use"]
-                    yield f"data: {json.dumps({'type': 'tool_use', 'tool': tool_use})}\n\n"
+                    yield writer.event({'type': 'tool_use', 'tool': tool_use})
 
                 elif "tool_result" in event:
                     # Send tool result event
                     tool_result = event["tool_result"]
-                    yield f"data: {json.dumps({'type': 'tool_result', 'result': tool_result})}\n\n"
+                    yield writer.event({'type': 'tool_result', 'result': tool_result})
 
             # Send completion event
-            cache_key = f"{request.agent_id}:{conversation_id}"
-            model_id = agent_manager._agents[cache_key]["model_id"]
-            yield f"data: {json.dumps({'type': 'done', 'modelId': model_id})}\n\n"
-
-            # Store conversation in memory
-            if conversation_id not in _conversations:
-                _conversations[conversation_id] = Conversation(
-                    id=conversation_id,
-                    agentId=request.agent_id,
-                    title=request.message[:50] + "..." if len(request.message) > 50 else request.message,
-                    messages=[],
-                    createdAt=timestamp,
-                    updatedAt=timestamp,
+            yield writer.event({'type': 'done', 'modelId': model_id})
+
+            # Store conversation (persisted by the store's write-behind flusher)
+            store = get_conversation_store()
+            await store.append_async(conversation_id, "user", request.message, agent_id=request.agent_id)
+            if accumulated_text:
+                await store.append_async(
+                    conversation_id,
+                    "assistant",
+                    accumulated_text,
+                    agent_id=request.agent_id,
+                    thinking=accumulated_thinking if accumulated_thinking else None,
                 )
 
-            # Add messages to conversation
-            conversation = _conversations[conversation_id]
-            conversation.messages.append(ChatMessage(
-                role="user",
-                content=request.message,
-                timestamp=timestamp,
-            ))
-            conversation.messages.append(ChatMessage(
-                role="assistant",
-                content=accumulated_text,
-                thinking=accumulated_thinking if accumulated_thinking else None,
-                timestamp=datetime.utcnow(),
-            ))
-            conversation.updated_at = datetime.utcnow()
-
             logger.info(f"Streaming complete - {len(accumulated_text)} chars")
 
         except ValueError as e:
             # Agent not found
             logger.error(f"Agent not found: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            yield writer.event({'type': 'error', 'error': str(e)})
 
         except Exception as e:
             # Other errors
             logger.error(f"Streaming error: {e}", exc_info=True)
-            yield f"data: {json.dumps({'type': 'error', 'error': f'Failed to process request: {str(e)}'})}\n\n"
+            yield writer.event({'type': 'error', 'error': f'Failed to process request: {str(e)}'})
 
     return StreamingResponse(
         generate_sse_stream(),
@@ -215,15 +213,29 @@ async def stream_message(request: ChatRequest):
     )
 
 
-@router.get("/conversations", response_model=list[Conversation])
-def list_conversations():
+@router.get("/conversations", response_model=ConversationPage)
+def list_conversations(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
     """
-    List all conversations.
+    List conversation summaries, most recently updated first.
+
+    Args:
+        limit: Page size
+        cursor: nextCursor from the previous page
 
     Returns:
-        List of conversations
+        Page of conversation summaries (without messages)
     """
-    return list(_conversations.values())
+    try:
+        summaries, next_cursor = get_conversation_store().list_summaries(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ConversationPage(
+        conversations=[_summary_model(s) for s in summaries],
+        nextCursor=next_cursor,
+    )
 
 
 @router.get("/conversations/{conversation_id}", response_model=Conversation)
@@ -235,15 +247,54 @@ def get_conversation(conversation_id: str):
         conversation_id: The conversation ID
 
     Returns:
-        Conversation with messages
+        Conversation with its retained messages
+    """
+    store = get_conversation_store()
+    summary = store.get_summary(conversation_id)
+    if not summary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation {conversation_id} not found"
+        )
+    messages, _ = store.get_messages(conversation_id)
+    return Conversation(
+        id=summary["id"],
+        agentId=summary["agentId"],
+        title=summary["title"],
+        messages=[_message_model(m) for m in messages],
+        createdAt=to_datetime(summary["createdAt"]),
+        updatedAt=to_datetime(summary["updatedAt"]),
+    )
+
+
+@router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
+def list_conversation_messages(
+    conversation_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    Get a page of a conversation's messages, oldest first.
+
+    Args:
+        conversation_id: The conversation ID
+        limit: Page size
+        cursor: nextCursor from the previous page
+
+    Returns:
+        Page of messages
     """
-    conversation = _conversations.get(conversation_id)
-    if not conversation:
+    store = get_conversation_store()
+    if not store.get_summary(conversation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation {conversation_id} not found"
         )
-    return conversation
+    try:
+        messages, next_cursor = store.get_messages(conversation_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return MessagePage(messages=[_message_model(m) for m in messages], nextCursor=next_cursor)
 
 
 @router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -254,13 +305,12 @@ def delete_conversation(conversation_id: str):
     Args:
         conversation_id: The conversation ID to delete
     """
-    if conversation_id not in _conversations:
+    if not get_conversation_store().delete(conversation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation {conversation_id} not found"
         )
 
-    del _conversations[conversation_id]
     logger.info(f"Deleted conversation {conversation_id}")
 
 
@@ -272,13 +322,10 @@ def clear_conversation(conversation_id: str):
     Args:
         conversation_id: The conversation ID to clear
     """
-    conversation = _conversations.get(conversation_id)
-    if not conversation:
+    if not get_conversation_store().clear(conversation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation {conversation_id} not found"
         )
 
-    conversation.messages.clear()
-    conversation.updated_at = datetime.utcnow()
     logger.info(f"Cleared conversation {conversation_id}")
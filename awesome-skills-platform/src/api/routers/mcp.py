@@ -7,6 +7,7 @@ from typing import List
 from src.schemas.mcp import MCPServerCreate, MCPServerUpdate, MCPServerResponse
 from src.database.dynamodb import db_client
 from src.core.mcp_manager import mcp_manager
+from src.core.agent_manager import agent_manager
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
@@ -59,6 +60,11 @@ def update_mcp_server(mcp_id: str, mcp_server: MCPServerUpdate):
             detail="Failed to update MCP server"
         )
 
+    # Restart the pooled client with the new config; cached agents using the
+    # server still hold the old client, so rebuild them too
+    mcp_manager.clear_cache(mcp_id)
+    agent_manager.invalidate_mcp(mcp_id)
+
     return MCPServerResponse(**updated_mcp)
 
 
@@ -81,6 +87,9 @@ def delete_mcp_server(mcp_id: str):
             detail="Failed to delete MCP server"
         )
 
+    mcp_manager.clear_cache(mcp_id)
+    agent_manager.invalidate_mcp(mcp_id)
+
 
 @router.post("/{mcp_id}/test")
 def test_mcp_connection(mcp_id: str):
@@ -0,0 +1,176 @@
+"""
+Bounded cache of live Strands agents.
+
+Entries are keyed by ``agent_id:session_id`` and evicted by LRU order and idle
+TTL, so a long-running API process keeps a bounded number of agents (and
+their message histories) in memory. Secondary indexes from agent_id and from
+MCP server ID to cache keys make per-agent and per-server invalidation O(k)
+in the number of matching entries instead of a scan over every key.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AgentCache:
+    """LRU + idle-TTL cache of agent entries with per-agent invalidation."""
+
+    def __init__(self, max_entries: int = 256, idle_ttl_seconds: float = 1800):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached agents before LRU eviction
+            idle_ttl_seconds: Evict entries not used for this many seconds
+        """
+        self.max_entries = max_entries
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._by_agent: dict[str, set[str]] = {}
+        self._by_mcp: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions_lru": 0,
+            "evictions_idle": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get a cache entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The entry dict, or None if missing or idle-expired
+        """
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry["last_used"] = time.monotonic()
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, agent_id: str, **values: Any) -> dict:
+        """
+        Insert or replace an entry, evicting least recently used entries.
+
+        Args:
+            key: Cache key
+            agent_id: Agent the entry belongs to (for invalidation)
+            **values: Entry fields, e.g. agent, model_id, updated_at; an
+                ``mcp_ids`` field indexes the entry for invalidate_mcp
+
+        Returns:
+            The stored entry dict
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = {**values, "agent_id": agent_id, "last_used": time.monotonic()}
+            self._entries[key] = entry
+            self._by_agent.setdefault(agent_id, set()).add(key)
+            for mcp_id in entry.get("mcp_ids") or ():
+                self._by_mcp.setdefault(mcp_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions_lru"] += 1
+                logger.debug(f"Evicted agent cache entry {oldest} (LRU)")
+            return entry
+
+    def invalidate_agent(self, agent_id: str) -> int:
+        """
+        Remove every entry belonging to an agent.
+
+        Args:
+            agent_id: The agent ID
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._by_agent.get(agent_id, set()).copy()
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def invalidate_mcp(self, mcp_id: str) -> int:
+        """
+        Remove every entry whose agent uses an MCP server.
+
+        Args:
+            mcp_id: The MCP server ID
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._by_mcp.get(mcp_id, set()).copy()
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._by_agent.clear()
+            self._by_mcp.clear()
+
+    def stats(self) -> dict:
+        """Return cache size and hit/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                **self._stats,
+            }
+
+    def _evict_idle(self) -> None:
+        # Entries are kept in last-used order, so expired ones sit at the front
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry["last_used"] > cutoff:
+                break
+            self._remove(key)
+            self._stats["evictions_idle"] += 1
+            logger.debug(f"Evicted agent cache entry {key} (idle)")
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        keys = self._by_agent.get(entry["agent_id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_agent[entry["agent_id"]]
+        for mcp_id in entry.get("mcp_ids") or ():
+            keys = self._by_mcp.get(mcp_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_mcp[mcp_id]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> dict:
+        return self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
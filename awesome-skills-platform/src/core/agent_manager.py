@@ -6,10 +6,14 @@ Simplified version - runs agents directly in the FastAPI backend without AgentCo
 from strands import Agent
 from strands.models import BedrockModel
 from typing import Optional
+import asyncio
 import logging
 
 from src.database.dynamodb import db_client
+from src.core.agent_cache import AgentCache
+from src.core.config import settings
 from src.skill_tool import generate_skill_tool, SkillToolInterceptor
+from src.agentcore_runtime.context_pruner import ContextPruner
 from src.core.mcp_manager import mcp_manager
 from src.core.memory_manager import get_memory_manager
 
@@ -21,7 +25,10 @@ class AgentManager:
 
     def __init__(self):
         """Initialize agent manager."""
-        self._agents: dict[str, dict] = {}
+        self._agents = AgentCache(
+            max_entries=settings.agent_cache_max_entries,
+            idle_ttl_seconds=settings.agent_cache_idle_ttl_seconds,
+        )
         self._models: dict[str, dict] = {}
         self._skill_tool = None
         self._skill_interceptor = None
@@ -46,27 +53,59 @@ class AgentManager:
         Raises:
             ValueError: If agent not found in database
         """
-        # Build cache key that includes session_id
-        cache_key = f"{agent_id}:{session_id}" if session_id else agent_id
-
-        # Return cached agent if exists
-        if cache_key in self._agents:
-            return self._agents[cache_key]["agent"]
+        cache_key = self._cache_key(agent_id, session_id)
 
-        # Load agent config from database
+        # Load agent config (served from the DynamoDB client's TTL cache) so
+        # a changed updatedAt invalidates agents built from the old config
         agent_config = db_client.get_agent(agent_id)
         if not agent_config:
+            self._agents.invalidate_agent(agent_id)
             raise ValueError(f"Agent {agent_id} not found")
+        updated_at = agent_config.get("updatedAt", agent_config.get("updated_at"))
+
+        # Return cached agent if its config is still current
+        cached = self._agents.get(cache_key)
+        if cached is not None:
+            if cached["updated_at"] == updated_at:
+                return cached["agent"]
+            removed = self._agents.invalidate_agent(agent_id)
+            logger.info(f"Agent {agent_id} config changed, invalidated {removed} cached sessions")
 
         # Create agent
         agent = self._create_agent_from_config(agent_config)
 
-        # Cache agent with model_id
+        # Cache agent with model_id and config version
         model_id = agent_config.get("modelId", agent_config.get("model_id"))
-        self._agents[cache_key] = {"agent": agent, "model_id": model_id}
+        mcp_ids = tuple(agent_config.get("mcpIds", agent_config.get("mcp_ids")) or ())
+        self._agents.put(
+            cache_key, agent_id, agent=agent, model_id=model_id, updated_at=updated_at, mcp_ids=mcp_ids
+        )
 
         return agent
 
+    @staticmethod
+    def _cache_key(agent_id: str, session_id: Optional[str]) -> str:
+        """Build the agent cache key, which includes session_id when given."""
+        return f"{agent_id}:{session_id}" if session_id else agent_id
+
+    def get_model_id(self, agent_id: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Get the model ID of a cached agent.
+
+        Args:
+            agent_id: The agent ID
+            session_id: Optional session ID
+
+        Returns:
+            The model ID, or None if the agent is not cached
+        """
+        entry = self._agents.get(self._cache_key(agent_id, session_id))
+        return entry["model_id"] if entry else None
+
+    def cache_stats(self) -> dict:
+        """Return agent cache size and eviction metrics."""
+        return self._agents.stats()
+
     def _create_agent_from_config(self, config: dict) -> Agent:
         """
         Create a Strands Agent from configuration.
@@ -88,9 +127,9 @@ class AgentManager:
         skill_ids = config.get("skillIds", config.get("skill_ids", []))
         mcp_ids = config.get("mcpIds", config.get("mcp_ids", []))
 
-        # Prepare tools and hooks
+        # Prepare tools and hooks; the pruner is per agent as it indexes its messages
         tools = []
-        hooks = []
+        hooks = [ContextPruner()]
 
         # Load skills if enabled
         if skill_ids:
@@ -110,7 +149,13 @@ class AgentManager:
         # Load MCP clients if enabled
         if mcp_ids:
             logger.info(f"Agent {agent_id} has {len(mcp_ids)} MCP servers enabled: {mcp_ids}")
+            # Start all servers concurrently; a server that fails to start is
+            # skipped instead of failing agent creation
+            errors = mcp_manager.warm_up(mcp_ids)
             for mcp_id in mcp_ids:
+                if errors.get(mcp_id):
+                    logger.error(f"Skipping MCP server {mcp_id}: {errors[mcp_id]}")
+                    continue
                 try:
                     mcp_client = mcp_manager.get_mcp_client(mcp_id)
                     if mcp_client:
@@ -127,7 +172,7 @@ class AgentManager:
             system_prompt=system_prompt or "You are a helpful AI assistant.",
             agent_id=agent_id,
             tools=tools if tools else None,
-            hooks=hooks if hooks else None,
+            hooks=hooks,
         )
 
         logger.info(f"Created agent {agent_id} with model {model_id}, {len(tools)} tools")
@@ -202,16 +247,24 @@ class AgentManager:
             agent_id: If provided, clear only this agent. Otherwise clear all.
         """
         if agent_id:
-            # Clear all cache keys that start with this agent_id
-            keys_to_remove = [k for k in self._agents if k.startswith(f"{agent_id}:") or k == agent_id]
-            for key in keys_to_remove:
-                del self._agents[key]
-            logger.info(f"Cleared cache for agent {agent_id}")
+            removed = self._agents.invalidate_agent(agent_id)
+            logger.info(f"Cleared cache for agent {agent_id} ({removed} entries)")
         else:
             self._agents.clear()
             self._models.clear()
             logger.info("Cleared all agent caches")
 
+    def invalidate_mcp(self, mcp_id: str):
+        """
+        Drop cached agents that use an MCP server, so they are rebuilt with
+        its new client. Agents without the server are kept.
+
+        Args:
+            mcp_id: The MCP server ID
+        """
+        removed = self._agents.invalidate_mcp(mcp_id)
+        logger.info(f"Cleared {removed} cached agents using MCP server {mcp_id}")
+
     async def run_async(
         self,
         agent_id: str,
@@ -234,20 +287,21 @@ class AgentManager:
         agent = self.get_or_create_agent(agent_id, session_id=session_id, actor_id=actor_id)
 
         # Get model_id from cache
-        cache_key = f"{agent_id}:{session_id}" if session_id else agent_id
-        model_id = self._agents[cache_key]["model_id"]
+        model_id = self.get_model_id(agent_id, session_id)
 
         # Get or create conversation session for history tracking
         memory_manager = get_memory_manager()
         session = None
         if session_id:
-            session = memory_manager.get_or_create_session(
+            # The store may read the conversation from its backend
+            session = await asyncio.to_thread(
+                memory_manager.get_or_create_session,
                 session_id=session_id,
                 agent_id=agent_id,
                 actor_id=actor_id,
             )
             # Add user message to history
-            session.add_message("user", user_message)
+            await session.add_message_async("user", user_message)
 
         # Run agent with user message
         result = await agent.invoke_async(user_message)
@@ -257,7 +311,7 @@ class AgentManager:
 
         # Save assistant response to history
         if session:
-            session.add_message("assistant", response_text)
+            await session.add_message_async("assistant", response_text)
 
         return {
             "message": response_text,
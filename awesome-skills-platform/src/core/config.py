@@ -25,6 +25,34 @@ class Settings(BaseSettings):
     skills_table_name: str = "agent-platform-skills"
     mcp_table_name: str = "agent-platform-mcp-servers"
 
+    # Agent cache
+    agent_cache_max_entries: int = 256
+    agent_cache_idle_ttl_seconds: int = 1800
+
+    # MCP client pool
+    mcp_max_concurrent_calls: int = 8  # Per server; 0 disables the limit
+    mcp_ping_interval_seconds: float = 30
+    mcp_ping_timeout_seconds: float = 5
+    mcp_restart_backoff_base_seconds: float = 1
+    mcp_restart_backoff_max_seconds: float = 60
+
+    # Conversation store
+    conversation_backend: str = "sqlite"  # memory | sqlite | dynamodb
+    conversation_sqlite_path: str = "conversations.db"
+    conversations_table_name: str = "agent-platform-conversations"
+    conversation_max_messages: int = 200  # Per conversation; older messages are dropped
+    conversation_max_cached: int = 1000  # Conversations kept in memory
+    conversation_ttl_seconds: int = 7 * 24 * 3600  # Since last update
+    conversation_flush_interval_seconds: float = 2.0
+
+    # Threads for blocking work run via asyncio.to_thread; each BedrockModel
+    # stream holds one for the whole response, so this caps concurrent chats
+    model_stream_workers: int = 64
+
+    # Chat SSE streaming: coalesce text deltas into one frame per interval/size
+    sse_flush_interval_ms: int = 50  # 0 sends one frame per delta
+    sse_flush_bytes: int = 1024
+
     # Development
     debug: bool = True
 
@@ -0,0 +1,455 @@
+"""
+Bounded conversation store shared by the chat API and agent manager.
+
+Conversations live in an LRU of compact ``__slots__`` records, each holding
+at most ``max_messages`` recent messages. A conversation expires
+``ttl_seconds`` after its last update. With a persistence backend (SQLite or
+DynamoDB, see ``src.database.conversations``), changes are written behind by
+a background flusher in batches: only messages appended since the last
+flush, plus deletes for messages trimmed by the cap. Conversations evicted
+from memory are loaded back lazily (summary first, messages on demand).
+
+Backend reads and writes are blocking; async callers use ``append_async``,
+which runs them on a worker thread instead of the event loop.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from src.core.config import settings
+from src.database.conversations import encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class MessageRecord:
+    """A single stored message."""
+
+    __slots__ = ("seq", "role", "content", "thinking", "timestamp")
+
+    def __init__(self, seq: int, role: str, content: str, thinking: Optional[list] = None,
+                 timestamp: Optional[float] = None):
+        self.seq = seq
+        self.role = role
+        self.content = content
+        self.thinking = thinking
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_dict(self) -> dict:
+        """Return the message in the persistence format."""
+        return {
+            "seq": self.seq,
+            "role": self.role,
+            "content": self.content,
+            "thinking": self.thinking,
+            "timestamp": self.timestamp,
+        }
+
+
+class ConversationRecord:
+    """
+    A conversation with its most recent messages.
+
+    Messages have increasing ``seq`` numbers; those in [min_seq, next_seq) are
+    retained. ``persisted_seq`` and ``persisted_min_seq`` describe what the
+    backend holds, so a flush writes only the difference.
+    """
+
+    __slots__ = (
+        "id", "agent_id", "actor_id", "title", "messages", "next_seq", "min_seq",
+        "created_at", "updated_at", "persisted_seq", "persisted_min_seq",
+    )
+
+    def __init__(self, conversation_id: str, agent_id: str, actor_id: str, max_messages: int,
+                 title: Optional[str] = None):
+        now = time.time()
+        self.id = conversation_id
+        self.agent_id = agent_id
+        self.actor_id = actor_id
+        self.title = title
+        self.messages: deque = deque(maxlen=max_messages)
+        self.next_seq = 0
+        self.min_seq = 0
+        self.created_at = now
+        self.updated_at = now
+        self.persisted_seq = 0
+        self.persisted_min_seq = 0
+
+    @property
+    def message_count(self) -> int:
+        return self.next_seq - self.min_seq
+
+    def summary(self, ttl_seconds: float) -> dict:
+        """Return the summary (meta) dict used by backends and list endpoints."""
+        return {
+            "id": self.id,
+            "agentId": self.agent_id,
+            "actorId": self.actor_id,
+            "title": self.title,
+            "messageCount": self.message_count,
+            "nextSeq": self.next_seq,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "expiresAt": int(self.updated_at + ttl_seconds),
+        }
+
+    @classmethod
+    def from_summary(cls, meta: dict, max_messages: int) -> "ConversationRecord":
+        """Rebuild a record from a persisted summary; messages stay in the backend."""
+        record = cls(meta["id"], meta["agentId"], meta["actorId"], max_messages, meta.get("title"))
+        record.next_seq = record.persisted_seq = meta["nextSeq"]
+        record.min_seq = record.persisted_min_seq = meta["nextSeq"] - meta["messageCount"]
+        record.created_at = meta["createdAt"]
+        record.updated_at = meta["updatedAt"]
+        return record
+
+
+def to_datetime(epoch: float) -> datetime:
+    """Convert a stored epoch timestamp to a naive UTC datetime, as the API returns."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+class ConversationStore:
+    """LRU + TTL bounded conversation store with optional write-behind persistence."""
+
+    def __init__(
+        self,
+        backend: Any = None,
+        max_messages: int = 200,
+        max_cached: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        flush_interval_seconds: float = 2.0,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            backend: Persistence backend, or None to keep conversations in memory only
+            max_messages: Messages kept per conversation; older ones are dropped
+            max_cached: Conversations kept in memory before LRU eviction
+            ttl_seconds: Conversations expire this long after their last update
+            flush_interval_seconds: Write-behind interval for the backend
+        """
+        self.backend = backend
+        self.max_messages = max_messages
+        self.max_cached = max_cached
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self._records: OrderedDict[str, ConversationRecord] = OrderedDict()
+        self._dirty: set[str] = set()
+        # Updates of dirty records evicted from memory, written on the next flush
+        self._pending: list[dict] = []
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._stats = {"evictions_lru": 0, "evictions_ttl": 0, "flushes": 0, "flush_errors": 0}
+
+    # Record access
+
+    def _get_record(self, conversation_id: str) -> Optional[ConversationRecord]:
+        record = self._records.get(conversation_id)
+        if record is not None:
+            if record.updated_at + self.ttl_seconds <= time.time():
+                self._drop(conversation_id)
+                self._stats["evictions_ttl"] += 1
+                return None
+            self._records.move_to_end(conversation_id)
+            return record
+        if self.backend is None:
+            return None
+        # An evicted record whose update is still pending is newer than the backend copy
+        meta = next((u["meta"] for u in reversed(self._pending) if u["meta"]["id"] == conversation_id), None)
+        if meta is None:
+            meta = self.backend.load(conversation_id)
+        if meta is None:
+            return None
+        record = ConversationRecord.from_summary(meta, self.max_messages)
+        self._insert(record)
+        return record
+
+    def _insert(self, record: ConversationRecord) -> None:
+        self._records[record.id] = record
+        while len(self._records) > self.max_cached:
+            oldest_id = next(iter(self._records))
+            if oldest_id in self._dirty:
+                self._pending.append(self._snapshot(self._records[oldest_id]))
+            self._drop(oldest_id)
+            self._stats["evictions_lru"] += 1
+
+    def _drop(self, conversation_id: str) -> None:
+        self._records.pop(conversation_id, None)
+        self._dirty.discard(conversation_id)
+
+    def _snapshot(self, record: ConversationRecord) -> dict:
+        """Build the backend update for a dirty record and mark it persisted."""
+        update = {
+            "meta": record.summary(self.ttl_seconds),
+            "messages": [m.to_dict() for m in record.messages if m.seq >= record.persisted_seq],
+            "deleteSeqs": list(range(record.persisted_min_seq, min(record.min_seq, record.persisted_seq))),
+        }
+        record.persisted_seq = record.next_seq
+        record.persisted_min_seq = record.min_seq
+        self._dirty.discard(record.id)
+        return update
+
+    def _mark_dirty(self, record: ConversationRecord) -> None:
+        if self.backend is None:
+            return
+        self._dirty.add(record.id)
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="conversation-flusher", daemon=True)
+            self._flusher.start()
+
+    # Writes
+
+    def append(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        agent_id: str = "default",
+        actor_id: str = "default-user",
+        thinking: Optional[list] = None,
+    ) -> dict:
+        """
+        Append a message, creating the conversation if needed.
+
+        The first user message becomes the conversation title.
+
+        Returns:
+            The conversation summary
+        """
+        with self._lock:
+            record = self._get_record(conversation_id)
+            if record is None:
+                record = ConversationRecord(conversation_id, agent_id, actor_id, self.max_messages)
+                self._insert(record)
+            if record.title is None and role == "user":
+                record.title = content[:50] + "..." if len(content) > 50 else content
+
+            record.messages.append(MessageRecord(record.next_seq, role, content, thinking))
+            record.next_seq += 1
+            record.min_seq = max(record.min_seq, record.next_seq - self.max_messages)
+            record.updated_at = time.time()
+            self._mark_dirty(record)
+            return record.summary(self.ttl_seconds)
+
+    async def append_async(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        agent_id: str = "default",
+        actor_id: str = "default-user",
+        thinking: Optional[list] = None,
+    ) -> dict:
+        """
+        ``append`` for async callers.
+
+        With a backend, a conversation that is not in memory is loaded from
+        it, so the append runs on a worker thread to keep the event loop free.
+        """
+        if self.backend is None:
+            return self.append(conversation_id, role, content, agent_id, actor_id, thinking)
+        return await asyncio.to_thread(
+            self.append, conversation_id, role, content, agent_id, actor_id, thinking
+        )
+
+    def clear(self, conversation_id: str) -> bool:
+        """Remove all messages of a conversation. Returns False if not found."""
+        with self._lock:
+            record = self._get_record(conversation_id)
+            if record is None:
+                return False
+            record.messages.clear()
+            record.min_seq = record.next_seq
+            record.updated_at = time.time()
+            self._mark_dirty(record)
+            return True
+
+    def delete(self, conversation_id: str) -> bool:
+        """Delete a conversation. Returns False if not found."""
+        # Holding the flush lock waits out a flush in progress, which may be
+        # writing this conversation, so its save cannot land after the delete
+        with self._flush_lock:
+            with self._lock:
+                if self._get_record(conversation_id) is None:
+                    return False
+                self._drop(conversation_id)
+                self._pending = [u for u in self._pending if u["meta"]["id"] != conversation_id]
+            if self.backend is not None:
+                self.backend.delete(conversation_id)
+        return True
+
+    # Reads
+
+    def get_summary(self, conversation_id: str) -> Optional[dict]:
+        """Return a conversation summary without loading its messages."""
+        with self._lock:
+            record = self._get_record(conversation_id)
+            return record.summary(self.ttl_seconds) if record else None
+
+    def get_messages(
+        self, conversation_id: str, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Return a page of messages, oldest first.
+
+        Args:
+            conversation_id: The conversation ID
+            cursor: Cursor from a previous page, or None for the first page
+            limit: Page size, or None for all retained messages
+
+        Returns:
+            (messages, next_cursor); next_cursor is None on the last page
+        """
+        after_seq = decode_cursor(cursor) if cursor else -1
+        if self.backend is not None:
+            # Make unflushed messages visible to the backend read
+            self.flush()
+            messages = self.backend.load_messages(
+                conversation_id, after_seq, None if limit is None else limit + 1
+            )
+        else:
+            with self._lock:
+                record = self._get_record(conversation_id)
+                messages = [m.to_dict() for m in record.messages if m.seq > after_seq] if record else []
+
+        next_cursor = None
+        if limit is not None and len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = encode_cursor(messages[-1]["seq"])
+        return messages, next_cursor
+
+    def list_summaries(self, limit: int = 50, cursor: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+        """
+        List conversation summaries, most recently updated first.
+
+        Returns:
+            (summaries, next_cursor); next_cursor is None on the last page
+        """
+        if self.backend is not None:
+            self.flush()
+            return self.backend.list_summaries(limit, cursor)
+
+        now = time.time()
+        with self._lock:
+            summaries = sorted(
+                (r.summary(self.ttl_seconds) for r in self._records.values()
+                 if r.updated_at + self.ttl_seconds > now),
+                key=lambda s: (s["updatedAt"], s["id"]),
+                reverse=True,
+            )
+        if cursor:
+            position = tuple(decode_cursor(cursor))
+            summaries = [s for s in summaries if (s["updatedAt"], s["id"]) < position]
+        page = summaries[:limit]
+        next_cursor = None
+        if len(summaries) > limit:
+            next_cursor = encode_cursor([page[-1]["updatedAt"], page[-1]["id"]])
+        return page, next_cursor
+
+    # Persistence
+
+    def flush(self) -> None:
+        """Write pending changes to the backend."""
+        if self.backend is None:
+            return
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending + [self._snapshot(self._records[i]) for i in list(self._dirty)]
+                self._pending = []
+            if not batch:
+                return
+            try:
+                self.backend.save(batch)
+                self._stats["flushes"] += 1
+            except Exception as e:
+                # Keep the batch for the next attempt
+                self._stats["flush_errors"] += 1
+                logger.error(f"Failed to persist {len(batch)} conversations: {e}")
+                with self._lock:
+                    self._pending = batch + self._pending
+
+    def _flush_loop(self) -> None:
+        last_purge = time.monotonic()
+        while not self._closed.wait(self.flush_interval_seconds):
+            self.flush()
+            if time.monotonic() - last_purge > 60:
+                last_purge = time.monotonic()
+                try:
+                    self.backend.purge_expired()
+                except Exception as e:
+                    logger.warning(f"Failed to purge expired conversations: {e}")
+
+    def close(self) -> None:
+        """Flush pending changes and stop the flusher."""
+        self._closed.set()
+        self.flush()
+
+    def stats(self) -> dict:
+        """Return store size and eviction/flush counters."""
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__ if self.backend else "memory",
+                "cached": len(self._records),
+                "dirty": len(self._dirty) + len(self._pending),
+                "max_cached": self.max_cached,
+                "max_messages": self.max_messages,
+                **self._stats,
+            }
+
+
+# Global conversation store instance
+_conversation_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def _create_backend():
+    backend = settings.conversation_backend
+    if backend == "sqlite":
+        from src.database.conversations import SQLiteConversationBackend
+        return SQLiteConversationBackend(settings.conversation_sqlite_path)
+    if backend == "dynamodb":
+        from src.database.conversations import DynamoDBConversationBackend
+        return DynamoDBConversationBackend()
+    if backend == "memory":
+        return None
+    raise ValueError(f"Unsupported conversation backend: {backend}")
+
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Get or create the global ConversationStore instance.
+
+    Returns:
+        ConversationStore singleton instance
+    """
+    global _conversation_store
+    with _store_lock:
+        if _conversation_store is None:
+            _conversation_store = ConversationStore(
+                backend=_create_backend(),
+                max_messages=settings.conversation_max_messages,
+                max_cached=settings.conversation_max_cached,
+                ttl_seconds=settings.conversation_ttl_seconds,
+                flush_interval_seconds=settings.conversation_flush_interval_seconds,
+            )
+            atexit.register(_conversation_store.close)
+            logger.info(f"Conversation store initialized ({settings.conversation_backend})")
+        return _conversation_store
+
+
+def reset_conversation_store():
+    """Reset the global ConversationStore instance (mainly for testing)."""
+    global _conversation_store
+    with _store_lock:
+        if _conversation_store is not None:
+            _conversation_store.close()
+        _conversation_store = None
@@ -1,17 +1,85 @@
 """
 MCP Manager for managing Model Context Protocol client connections.
+
+Clients are pooled per MCP server ID and shared by every agent that uses the
+server. Servers an agent needs are started concurrently, kept alive with
+periodic health checks and restarted with exponential backoff when they
+die. Agents keep working across a restart because their tools stay bound to
+the same ``MCPClient`` instance.
 """
 from mcp.client.stdio import stdio_client, StdioServerParameters
 from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
 from strands.tools.mcp import MCPClient
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Any
+import asyncio
 import logging
+import threading
+import time
 
+from src.core.config import settings
 from src.database.dynamodb import db_client
 
 logger = logging.getLogger(__name__)
 
+class PooledMCPClient(MCPClient):
+    """
+    MCPClient that caps the number of in-flight tool calls to its server.
+
+    The cap is a thread semaphore rather than an asyncio one because the
+    pooled client is shared by agents running on different event loops.
+    """
+
+    def __init__(self, transport_callable, max_concurrent_calls: int = 0, **kwargs):
+        super().__init__(transport_callable, **kwargs)
+        self.max_concurrent_calls = max_concurrent_calls
+        self.calls_in_flight = 0
+        self._call_limit = threading.BoundedSemaphore(max_concurrent_calls) if max_concurrent_calls > 0 else None
+        self._count_lock = threading.Lock()
+
+    def _track(self, delta: int) -> None:
+        with self._count_lock:
+            self.calls_in_flight += delta
+
+    def call_tool_sync(self, *args, **kwargs):
+        if self._call_limit is None:
+            return super().call_tool_sync(*args, **kwargs)
+        with self._call_limit:
+            self._track(1)
+            try:
+                return super().call_tool_sync(*args, **kwargs)
+            finally:
+                self._track(-1)
+
+    async def call_tool_async(self, *args, **kwargs):
+        if self._call_limit is None:
+            return await super().call_tool_async(*args, **kwargs)
+        await self._acquire_slot()
+        self._track(1)
+        try:
+            return await super().call_tool_async(*args, **kwargs)
+        finally:
+            self._track(-1)
+            self._call_limit.release()
+
+    async def _acquire_slot(self) -> None:
+        if self._call_limit.acquire(blocking=False):
+            return
+        # Wait on a worker thread without blocking the event loop
+        acquire = asyncio.get_running_loop().run_in_executor(None, self._call_limit.acquire)
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # The thread still takes the slot; hand it back once it does
+            acquire.add_done_callback(lambda f: f.cancelled() or self._call_limit.release())
+            raise
+
+
+# Consumer ID the pool registers on started clients, so that strands does not
+# stop a shared client when the last agent using it is garbage collected.
+_POOL_CONSUMER = "mcp-manager-pool"
+
 
 class MCPManager:
     """Manages MCP client connections and lifecycle."""
@@ -20,6 +88,20 @@ class MCPManager:
         """Initialize MCP manager."""
         self._mcp_clients: Dict[str, MCPClient] = {}
         self._mcp_tools_cache: Dict[str, List[Any]] = {}
+        self._started: set[str] = set()
+        self._health: Dict[str, dict] = {}
+        self._server_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.RLock()
+        self._monitor: Optional[threading.Thread] = None
+        self._stop_monitor = threading.Event()
+        # Health checks run here so a hung server cannot block past ping_timeout
+        self._pinger = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mcp-ping")
+
+        self.max_concurrent_calls = settings.mcp_max_concurrent_calls
+        self.ping_interval = settings.mcp_ping_interval_seconds
+        self.ping_timeout = settings.mcp_ping_timeout_seconds
+        self.backoff_base = settings.mcp_restart_backoff_base_seconds
+        self.backoff_max = settings.mcp_restart_backoff_max_seconds
         logger.info("🔌 MCP Manager initialized")
 
     def get_mcp_client(self, mcp_id: str) -> Optional[MCPClient]:
@@ -35,29 +117,30 @@ class MCPManager:
         Raises:
             ValueError: If MCP server configuration is invalid
         """
-        # Return cached client if exists
-        if mcp_id in self._mcp_clients:
-            logger.info(f"♻️ Using cached MCP client for {mcp_id}")
-            return self._mcp_clients[mcp_id]
-
-        # Load MCP server config from database
-        mcp_config = db_client.get_mcp_server(mcp_id)
-        if not mcp_config:
-            logger.error(f"❌ MCP server {mcp_id} not found in database")
-            raise ValueError(f"MCP server {mcp_id} not found")
-
-        # Create MCP client based on connection type
-        try:
-            mcp_client = self._create_mcp_client(mcp_config)
-            if mcp_client:
-                self._mcp_clients[mcp_id] = mcp_client
-                logger.info(f"✅ MCP client created for {mcp_config.get('name', mcp_id)}")
-                return mcp_client
-        except Exception as e:
-            logger.error(f"💥 Failed to create MCP client for {mcp_id}: {e}")
-            raise
-
-        return None
+        with self._lock:
+            # Return cached client if exists
+            if mcp_id in self._mcp_clients:
+                logger.info(f"♻️ Using cached MCP client for {mcp_id}")
+                return self._mcp_clients[mcp_id]
+
+            # Load MCP server config from database
+            mcp_config = db_client.get_mcp_server(mcp_id)
+            if not mcp_config:
+                logger.error(f"❌ MCP server {mcp_id} not found in database")
+                raise ValueError(f"MCP server {mcp_id} not found")
+
+            # Create MCP client based on connection type
+            try:
+                mcp_client = self._create_mcp_client(mcp_config)
+                if mcp_client:
+                    self._mcp_clients[mcp_id] = mcp_client
+                    logger.info(f"✅ MCP client created for {mcp_config.get('name', mcp_id)}")
+                    return mcp_client
+            except Exception as e:
+                logger.error(f"💥 Failed to create MCP client for {mcp_id}: {e}")
+                raise
+
+            return None
 
     def _create_mcp_client(self, mcp_config: dict) -> Optional[MCPClient]:
         """
@@ -85,26 +168,26 @@ class MCPManager:
 
                 logger.info(f"📡 stdio connection: {command} {' '.join(args)}")
 
-                return MCPClient(lambda: stdio_client(
+                return PooledMCPClient(lambda: stdio_client(
                     StdioServerParameters(
                         command=command,
                         args=args
                     )
-                ))
+                ), max_concurrent_calls=self.max_concurrent_calls)
 
             elif connection_type == "sse":
                 # Server-Sent Events connection
                 logger.info(f"📡 SSE connection: {endpoint}")
-                return MCPClient(lambda: sse_client(endpoint))
+                return PooledMCPClient(lambda: sse_client(endpoint), max_concurrent_calls=self.max_concurrent_calls)
 
             elif connection_type == "http":
                 # Streamable HTTP connection
                 logger.info(f"📡 HTTP connection: {endpoint}")
                 headers = config.get("headers", {})
-                return MCPClient(lambda: streamablehttp_client(
+                return PooledMCPClient(lambda: streamablehttp_client(
                     url=endpoint,
                     headers=headers if headers else None
-                ))
+                ), max_concurrent_calls=self.max_concurrent_calls)
 
             else:
                 logger.error(f"❌ Unknown connection type: {connection_type}")
@@ -114,6 +197,177 @@ class MCPManager:
             logger.error(f"💥 Failed to create MCP client: {e}")
             raise
 
+    def _server_lock(self, mcp_id: str) -> threading.Lock:
+        with self._lock:
+            return self._server_locks.setdefault(mcp_id, threading.Lock())
+
+    def _start_client(self, mcp_id: str) -> List[Any]:
+        """
+        Start (or restart) a pooled client and cache its tool schemas.
+
+        Failures schedule the next attempt with exponential backoff.
+
+        Args:
+            mcp_id: The MCP server ID
+
+        Returns:
+            List of tools from the MCP server
+        """
+        mcp_client = self.get_mcp_client(mcp_id)
+        state = self._health.setdefault(
+            mcp_id, {"failures": 0, "restarts": 0, "retry_at": 0.0, "last_ping_ms": None, "last_error": None}
+        )
+
+        if mcp_id in self._started:
+            logger.warning(f"🔄 Restarting MCP server {mcp_id}")
+            self._stop_client(mcp_id)
+            state["restarts"] += 1
+
+        try:
+            start_time = time.perf_counter()
+            # load_tools starts the client and caches the tool list on it, so
+            # agents attaching the client later skip both the launch and listing
+            tools = list(asyncio.run(mcp_client.load_tools()))
+            mcp_client.add_consumer(_POOL_CONSUMER)
+        except Exception as e:
+            state["failures"] += 1
+            state["last_error"] = str(e)
+            state["retry_at"] = time.monotonic() + min(
+                self.backoff_max, self.backoff_base * 2 ** (state["failures"] - 1)
+            )
+            logger.error(f"💥 Failed to start MCP server {mcp_id} (attempt {state['failures']}): {e}")
+            raise
+
+        self._started.add(mcp_id)
+        self._mcp_tools_cache[mcp_id] = tools
+        state.update(failures=0, retry_at=0.0, last_error=None)
+        logger.info(
+            f"✅ MCP server {mcp_id} started with {len(tools)} tools "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+        return tools
+
+    def _stop_client(self, mcp_id: str):
+        """Stop a pooled client, ignoring errors from an already dead session."""
+        self._started.discard(mcp_id)
+        self._mcp_tools_cache.pop(mcp_id, None)
+        mcp_client = self._mcp_clients.get(mcp_id)
+        if mcp_client is None:
+            return
+        try:
+            mcp_client.stop(None, None, None)
+        except Exception as e:
+            logger.debug(f"Ignoring error while stopping MCP server {mcp_id}: {e}")
+
+    def _ensure_started(self, mcp_id: str) -> List[Any]:
+        """
+        Return the tools of a running pooled client, starting it if needed.
+
+        Raises:
+            RuntimeError: If the server is waiting out its restart backoff
+        """
+        with self._server_lock(mcp_id):
+            # A started server is trusted until a health check fails it
+            if mcp_id in self._started and self._mcp_clients.get(mcp_id) is not None:
+                return self._mcp_tools_cache.get(mcp_id, [])
+
+            wait = self._health.get(mcp_id, {}).get("retry_at", 0.0) - time.monotonic()
+            if wait > 0:
+                raise RuntimeError(f"MCP server {mcp_id} unavailable, retrying in {wait:.1f}s")
+            return self._start_client(mcp_id)
+
+    def warm_up(self, mcp_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Start the given MCP servers concurrently.
+
+        Servers that are already running return immediately, so the cost of
+        building an agent is the slowest server rather than the sum of all.
+
+        Args:
+            mcp_ids: MCP server IDs to start
+
+        Returns:
+            Dict mapping each MCP server ID to an error message, or None if it is ready
+        """
+        mcp_ids = list(dict.fromkeys(mcp_ids))
+        if not mcp_ids:
+            return {}
+
+        self.start_health_checks()
+
+        def warm(mcp_id: str) -> Optional[str]:
+            try:
+                self._ensure_started(mcp_id)
+                return None
+            except Exception as e:
+                return str(e)
+
+        # Always go through worker threads: load_tools runs its own event
+        # loop, which is not allowed on a thread that is already running one
+        with ThreadPoolExecutor(max_workers=len(mcp_ids), thread_name_prefix="mcp-warm-up") as executor:
+            return dict(zip(mcp_ids, executor.map(warm, mcp_ids)))
+
+    def _ping(self, mcp_id: str) -> bool:
+        """Check that a started server still answers a tool listing within ping_timeout."""
+        mcp_client = self._mcp_clients.get(mcp_id)
+        if mcp_client is None:
+            return False
+        try:
+            start_time = time.perf_counter()
+            self._pinger.submit(mcp_client.list_tools_sync).result(timeout=self.ping_timeout)
+            if mcp_id in self._health:
+                self._health[mcp_id]["last_ping_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ MCP server {mcp_id} failed liveness ping: {e}")
+            return False
+
+    def check_health(self):
+        """Ping every pooled server once, restarting dead ones whose backoff has elapsed."""
+        for mcp_id in list(self._health):
+            state = self._health.get(mcp_id)
+            if state is None or (mcp_id in self._started and self._ping(mcp_id)):
+                continue
+            if state["retry_at"] > time.monotonic():
+                continue
+            with self._server_lock(mcp_id):
+                try:
+                    self._start_client(mcp_id)
+                except Exception:
+                    pass
+
+    def start_health_checks(self):
+        """Start the background liveness monitor if it is not running."""
+        with self._lock:
+            if self._monitor is not None or self.ping_interval <= 0:
+                return
+
+            def run():
+                while not self._stop_monitor.wait(self.ping_interval):
+                    try:
+                        self.check_health()
+                    except Exception as e:
+                        logger.error(f"💥 MCP health check failed: {e}")
+
+            self._monitor = threading.Thread(target=run, name="mcp-health-monitor", daemon=True)
+            self._monitor.start()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return per-server pool state for the health endpoint."""
+        servers = {}
+        for mcp_id, state in list(self._health.items()):
+            mcp_client = self._mcp_clients.get(mcp_id)
+            servers[mcp_id] = {
+                "running": mcp_id in self._started,
+                "tool_count": len(self._mcp_tools_cache.get(mcp_id, [])),
+                "failures": state["failures"],
+                "restarts": state["restarts"],
+                "last_ping_ms": state["last_ping_ms"],
+                "last_error": state["last_error"],
+                "calls_in_flight": mcp_client.calls_in_flight if isinstance(mcp_client, PooledMCPClient) else None,
+            }
+        return {"max_concurrent_calls": self.max_concurrent_calls, "servers": servers}
+
     def get_mcp_tools(self, mcp_id: str, use_cache: bool = True) -> List[Any]:
         """
         Get tools from an MCP server.
@@ -137,20 +391,36 @@ class MCPManager:
             return []
 
         try:
-            # List tools using context manager
             logger.info(f"🔍 Discovering tools from MCP server {mcp_id}...")
-            with mcp_client:
+            if mcp_id in self._started:
+                # Pooled client is already running; entering it again would fail
                 tools = mcp_client.list_tools_sync()
-                logger.info(f"✅ Found {len(tools)} tools from MCP server {mcp_id}")
+            else:
+                # List tools using context manager
+                with mcp_client:
+                    tools = mcp_client.list_tools_sync()
+            logger.info(f"✅ Found {len(tools)} tools from MCP server {mcp_id}")
 
-                # Cache tools
-                self._mcp_tools_cache[mcp_id] = tools
-                return tools
+            # Cache tools
+            self._mcp_tools_cache[mcp_id] = tools
+            return tools
 
         except Exception as e:
             logger.error(f"💥 Failed to list tools from MCP {mcp_id}: {e}")
             return []
 
+    def invalidate_tools(self, mcp_id: str):
+        """
+        Drop the cached tool schemas of an MCP server.
+
+        The next get_mcp_tools call re-lists them from the server.
+
+        Args:
+            mcp_id: The MCP server ID
+        """
+        self._mcp_tools_cache.pop(mcp_id, None)
+        logger.info(f"Invalidated tool cache for MCP {mcp_id}")
+
     def test_mcp_connection(self, mcp_id: str) -> Dict[str, Any]:
         """
         Test connection to an MCP server.
@@ -193,19 +463,31 @@ class MCPManager:
 
     def clear_cache(self, mcp_id: Optional[str] = None):
         """
-        Clear MCP client cache.
+        Clear MCP client cache, stopping pooled clients.
 
         Args:
             mcp_id: If provided, clear only this MCP. Otherwise clear all.
         """
-        if mcp_id:
-            self._mcp_clients.pop(mcp_id, None)
-            self._mcp_tools_cache.pop(mcp_id, None)
-            logger.info(f"Cleared cache for MCP {mcp_id}")
-        else:
-            self._mcp_clients.clear()
-            self._mcp_tools_cache.clear()
-            logger.info("Cleared all MCP caches")
+        with self._lock:
+            mcp_ids = [mcp_id] if mcp_id else list(self._mcp_clients)
+            for cleared_id in mcp_ids:
+                if cleared_id in self._started:
+                    self._stop_client(cleared_id)
+                self._mcp_clients.pop(cleared_id, None)
+                self._mcp_tools_cache.pop(cleared_id, None)
+                self._health.pop(cleared_id, None)
+
+            if mcp_id:
+                logger.info(f"Cleared cache for MCP {mcp_id}")
+            else:
+                self._mcp_tools_cache.clear()
+                logger.info("Cleared all MCP caches")
+
+    def close(self):
+        """Stop the health monitor and every pooled client."""
+        self._stop_monitor.set()
+        self.clear_cache()
+        self._pinger.shutdown(wait=False)
 
 
 # Global MCP manager instance
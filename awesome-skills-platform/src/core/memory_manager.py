@@ -1,66 +1,70 @@
 """
 Simple Memory Manager for Conversation History
 
-This module provides a simple in-memory conversation storage.
-No external dependencies required - conversations are stored in memory.
-
-Note: Conversations are lost when the server restarts.
-For production, consider using DynamoDB or Redis for persistence.
+Session-oriented view over the shared conversation store
+(``src.core.conversation_store``), so the agent manager and the chat API
+record each message once, in one bounded and persisted place.
 """
 
 import logging
 from typing import Optional
-from dataclasses import dataclass, field
-from datetime import datetime
+
+from src.core.conversation_store import ConversationStore, get_conversation_store
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class ConversationMessage:
-    """A single message in a conversation."""
-    role: str  # "user" or "assistant"
-    content: str
-    timestamp: datetime = field(default_factory=datetime.now)
+class ConversationSession:
+    """A conversation session backed by the conversation store."""
 
+    def __init__(self, store: ConversationStore, session_id: str, agent_id: str, actor_id: str):
+        self._store = store
+        self.session_id = session_id
+        self.agent_id = agent_id
+        self.actor_id = actor_id
 
-@dataclass
-class ConversationSession:
-    """A conversation session with message history."""
-    session_id: str
-    agent_id: str
-    actor_id: str
-    messages: list[ConversationMessage] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
+    @property
+    def messages(self) -> list[dict]:
+        """Retained messages, oldest first."""
+        messages, _ = self._store.get_messages(self.session_id)
+        return messages
 
     def add_message(self, role: str, content: str):
         """Add a message to the conversation."""
-        self.messages.append(ConversationMessage(role=role, content=content))
+        self._store.append(
+            self.session_id, role, content, agent_id=self.agent_id, actor_id=self.actor_id
+        )
+
+    async def add_message_async(self, role: str, content: str):
+        """Add a message without blocking the event loop on the store backend."""
+        await self._store.append_async(
+            self.session_id, role, content, agent_id=self.agent_id, actor_id=self.actor_id
+        )
 
     def get_history(self) -> list[dict]:
         """Get conversation history as list of dicts."""
         return [
-            {"role": msg.role, "content": msg.content}
+            {"role": msg["role"], "content": msg["content"]}
             for msg in self.messages
         ]
 
     def clear(self):
         """Clear conversation history."""
-        self.messages.clear()
+        self._store.clear(self.session_id)
 
 
 class MemoryManager:
     """
-    Simple in-memory conversation storage.
+    Session API over the conversation store.
 
-    Stores conversations in a dictionary keyed by session_id.
+    Sessions are keyed by session_id (the chat conversation ID).
     """
 
-    def __init__(self):
+    def __init__(self, store: Optional[ConversationStore] = None):
         """Initialize the Memory Manager."""
-        self._sessions: dict[str, ConversationSession] = {}
+        self._store = store or get_conversation_store()
         self.enabled = True
-        logger.info("Memory Manager initialized (in-memory storage)")
+        logger.info("Memory Manager initialized (conversation store)")
 
     def get_or_create_session(
         self,
@@ -71,6 +75,8 @@ class MemoryManager:
         """
         Get an existing session or create a new one.
 
+        The conversation is created in the store on its first message.
+
         Args:
             session_id: Unique conversation/session identifier
             agent_id: Agent identifier
@@ -79,39 +85,37 @@ class MemoryManager:
         Returns:
             ConversationSession instance
         """
-        if session_id not in self._sessions:
-            self._sessions[session_id] = ConversationSession(
-                session_id=session_id,
-                agent_id=agent_id,
-                actor_id=actor_id,
-            )
-            logger.info(f"Created new session: {session_id}")
-
-        return self._sessions[session_id]
+        summary = self._store.get_summary(session_id)
+        if summary:
+            agent_id, actor_id = summary["agentId"], summary["actorId"]
+        return ConversationSession(self._store, session_id, agent_id, actor_id)
 
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """Get a session by ID, returns None if not found."""
-        return self._sessions.get(session_id)
+        summary = self._store.get_summary(session_id)
+        if summary is None:
+            return None
+        return ConversationSession(self._store, session_id, summary["agentId"], summary["actorId"])
 
     def delete_session(self, session_id: str) -> bool:
         """Delete a session. Returns True if deleted, False if not found."""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        deleted = self._store.delete(session_id)
+        if deleted:
             logger.info(f"Deleted session: {session_id}")
-            return True
-        return False
+        return deleted
 
     def list_sessions(self, agent_id: Optional[str] = None) -> list[str]:
         """List all session IDs, optionally filtered by agent_id."""
-        if agent_id:
-            return [
-                sid for sid, session in self._sessions.items()
-                if session.agent_id == agent_id
-            ]
-        return list(self._sessions.keys())
+        session_ids = []
+        cursor = None
+        while True:
+            summaries, cursor = self._store.list_summaries(limit=500, cursor=cursor)
+            session_ids += [s["id"] for s in summaries if not agent_id or s["agentId"] == agent_id]
+            if cursor is None:
+                return session_ids
 
     def is_enabled(self) -> bool:
-        """Check if memory is enabled (always True for in-memory)."""
+        """Check if memory is enabled (always True)."""
         return self.enabled
 
 
@@ -0,0 +1,314 @@
+"""
+Persistence backends for the conversation store.
+
+Both backends keep one summary row per conversation plus one row per message
+keyed by (conversation id, seq), so the store can append and trim messages
+without rewriting the whole conversation. They are written to in batches by
+the store's write-behind flusher.
+
+Summary (meta) dicts use the API's camelCase names with epoch-second times:
+id, agentId, actorId, title, messageCount, nextSeq, createdAt, updatedAt,
+expiresAt. Message dicts: seq, role, content, thinking, timestamp.
+"""
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Optional
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(value: Any) -> str:
+    """Encode a pagination position as an opaque URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(value, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class SQLiteConversationBackend:
+    """SQLite persistence for local development and single-node deployments."""
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the SQLite database.
+
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id TEXT PRIMARY KEY,
+                    agent_id TEXT,
+                    actor_id TEXT,
+                    title TEXT,
+                    message_count INTEGER,
+                    next_seq INTEGER,
+                    created_at REAL,
+                    updated_at REAL,
+                    expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS conversations_by_updated
+                    ON conversations (updated_at DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS conversations_by_expiry
+                    ON conversations (expires_at);
+                CREATE TABLE IF NOT EXISTS messages (
+                    conversation_id TEXT,
+                    seq INTEGER,
+                    role TEXT,
+                    content TEXT,
+                    thinking TEXT,
+                    timestamp REAL,
+                    PRIMARY KEY (conversation_id, seq)
+                ) WITHOUT ROWID;
+                """
+            )
+        logger.info(f"SQLite conversation backend initialized at {path}")
+
+    @staticmethod
+    def _meta(row: tuple) -> dict:
+        keys = ("id", "agentId", "actorId", "title", "messageCount", "nextSeq",
+                "createdAt", "updatedAt", "expiresAt")
+        return dict(zip(keys, row))
+
+    def save(self, batch: list[dict]) -> None:
+        """Write a batch of {meta, messages, deleteSeqs} updates in one transaction."""
+        with self._lock, self._conn:
+            for update in batch:
+                meta = update["meta"]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (meta["id"], meta["agentId"], meta["actorId"], meta["title"], meta["messageCount"],
+                     meta["nextSeq"], meta["createdAt"], meta["updatedAt"], meta["expiresAt"]),
+                )
+                self._conn.executemany(
+                    "DELETE FROM messages WHERE conversation_id = ? AND seq = ?",
+                    [(meta["id"], seq) for seq in update["deleteSeqs"]],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (meta["id"], m["seq"], m["role"], m["content"],
+                         json.dumps(m["thinking"]) if m["thinking"] else None, m["timestamp"])
+                        for m in update["messages"]
+                    ],
+                )
+
+    def load(self, conversation_id: str) -> Optional[dict]:
+        """Load a conversation summary, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM conversations WHERE id = ? AND expires_at > ?",
+                (conversation_id, time.time()),
+            ).fetchone()
+        return self._meta(row) if row else None
+
+    def load_messages(self, conversation_id: str, after_seq: int = -1, limit: Optional[int] = None) -> list[dict]:
+        """Load messages with seq > after_seq in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, role, content, thinking, timestamp FROM messages "
+                "WHERE conversation_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (conversation_id, after_seq, -1 if limit is None else limit),
+            ).fetchall()
+        return [
+            {"seq": seq, "role": role, "content": content,
+             "thinking": json.loads(thinking) if thinking else None, "timestamp": timestamp}
+            for seq, role, content, thinking, timestamp in rows
+        ]
+
+    def list_summaries(self, limit: int, cursor: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+        """List summaries, most recently updated first, with keyset pagination."""
+        query = "SELECT * FROM conversations WHERE expires_at > ?"
+        params: list = [time.time()]
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            query += " AND (updated_at < ? OR (updated_at = ? AND id < ?))"
+            params += [updated_at, updated_at, conversation_id]
+        query += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        summaries = [self._meta(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = summaries[-1]
+            next_cursor = encode_cursor([last["updatedAt"], last["id"]])
+        return summaries, next_cursor
+
+    def delete(self, conversation_id: str) -> None:
+        """Delete a conversation and its messages."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def purge_expired(self) -> int:
+        """Delete expired conversations; returns how many were removed."""
+        with self._lock, self._conn:
+            expired = [
+                row[0] for row in self._conn.execute(
+                    "SELECT id FROM conversations WHERE expires_at <= ?", (time.time(),)
+                )
+            ]
+            for conversation_id in expired:
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            self._conn.executemany("DELETE FROM conversations WHERE id = ?", [(i,) for i in expired])
+        return len(expired)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class DynamoDBConversationBackend:
+    """
+    DynamoDB persistence.
+
+    Uses a single table with a ``pk`` (conversation id) hash key and ``sk``
+    range key: ``META`` for the summary and ``MSG#<seq>`` per message. The
+    ``expiresAt`` attribute is meant for DynamoDB TTL, which removes expired
+    items without a purge job.
+    """
+
+    META = "META"
+
+    def __init__(self, table_name: Optional[str] = None):
+        """
+        Args:
+            table_name: Table name, defaults to settings.conversations_table_name
+        """
+        dynamodb_kwargs = {"region_name": settings.aws_region}
+        if settings.dynamodb_endpoint_url:
+            dynamodb_kwargs["endpoint_url"] = settings.dynamodb_endpoint_url
+        self.table = boto3.resource("dynamodb", **dynamodb_kwargs).Table(
+            table_name or settings.conversations_table_name
+        )
+        logger.info(f"DynamoDB conversation backend initialized ({self.table.name})")
+
+    @staticmethod
+    def _sk(seq: int) -> str:
+        return f"MSG#{seq:010d}"
+
+    @staticmethod
+    def _from_item(item: dict) -> dict:
+        # DynamoDB returns numbers as Decimal
+        return {
+            k: (int(v) if v == v.to_integral_value() else float(v)) if isinstance(v, Decimal) else v
+            for k, v in item.items()
+            if k not in ("pk", "sk")
+        }
+
+    def save(self, batch: list[dict]) -> None:
+        """Write a batch of {meta, messages, deleteSeqs} updates."""
+        # A batch can hold two updates of one conversation (one evicted while
+        # dirty, then reloaded and changed); BatchWriteItem rejects repeated
+        # keys, so the later write of a key replaces the earlier one
+        with self.table.batch_writer(overwrite_by_pkeys=["pk", "sk"]) as writer:
+            for update in batch:
+                meta = update["meta"]
+                writer.put_item(Item={
+                    "pk": meta["id"], "sk": self.META,
+                    **{k: Decimal(str(v)) if isinstance(v, float) else v for k, v in meta.items()},
+                })
+                for seq in update["deleteSeqs"]:
+                    writer.delete_item(Key={"pk": meta["id"], "sk": self._sk(seq)})
+                for m in update["messages"]:
+                    writer.put_item(Item={
+                        "pk": meta["id"], "sk": self._sk(m["seq"]),
+                        **{k: Decimal(str(v)) if isinstance(v, float) else v
+                           for k, v in m.items() if v is not None},
+                        "expiresAt": meta["expiresAt"],
+                    })
+
+    def load(self, conversation_id: str) -> Optional[dict]:
+        """Load a conversation summary, or None if missing or expired."""
+        item = self.table.get_item(Key={"pk": conversation_id, "sk": self.META}).get("Item")
+        if not item or item.get("expiresAt", 0) <= time.time():
+            return None
+        return self._from_item(item)
+
+    def load_messages(self, conversation_id: str, after_seq: int = -1, limit: Optional[int] = None) -> list[dict]:
+        """Load messages with seq > after_seq in order."""
+        messages: list[dict] = []
+        kwargs: dict = {
+            "KeyConditionExpression": Key("pk").eq(conversation_id)
+            & Key("sk").between(self._sk(after_seq + 1), self._sk(10 ** 10 - 1)),
+        }
+        while True:
+            if limit is not None:
+                kwargs["Limit"] = limit - len(messages)
+            response = self.table.query(**kwargs)
+            for item in response.get("Items", []):
+                message = self._from_item(item)
+                message.pop("expiresAt", None)
+                message.setdefault("thinking", None)
+                messages.append(message)
+            if "LastEvaluatedKey" not in response or (limit is not None and len(messages) >= limit):
+                return messages
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def list_summaries(self, limit: int, cursor: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+        """
+        List summaries page by page.
+
+        Scan order is not by update time; a GSI on updatedAt would be needed
+        for that at scale.
+        """
+        summaries: list[dict] = []
+        kwargs: dict = {"FilterExpression": Attr("sk").eq(self.META) & Attr("expiresAt").gt(int(time.time()))}
+        if cursor:
+            kwargs["ExclusiveStartKey"] = decode_cursor(cursor)
+        while len(summaries) < limit:
+            response = self.table.scan(**kwargs)
+            for item in response.get("Items", []):
+                summaries.append(self._from_item(item))
+                if len(summaries) == limit:
+                    last = {"pk": item["pk"], "sk": item["sk"]}
+                    return summaries, encode_cursor(last)
+            if "LastEvaluatedKey" not in response:
+                return summaries, None
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return summaries, None
+
+    def delete(self, conversation_id: str) -> None:
+        """Delete a conversation and its messages."""
+        kwargs: dict = {
+            "KeyConditionExpression": Key("pk").eq(conversation_id),
+            "ProjectionExpression": "pk, sk",
+        }
+        with self.table.batch_writer() as writer:
+            while True:
+                response = self.table.query(**kwargs)
+                for item in response.get("Items", []):
+                    writer.delete_item(Key={"pk": item["pk"], "sk": item["sk"]})
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def purge_expired(self) -> int:
+        """Expired items are removed by DynamoDB TTL."""
+        return 0
+
+    def close(self) -> None:
+        """Nothing to close."""
@@ -53,3 +53,34 @@ class Conversation(BaseModel):
     class Config:
         populate_by_name = True
         from_attributes = True
+
+
+class ConversationSummary(BaseModel):
+    """Schema for a conversation in list responses (without messages)."""
+    id: str
+    agent_id: str = Field(..., alias="agentId")
+    title: Optional[str] = None
+    message_count: int = Field(0, alias="messageCount")
+    created_at: datetime = Field(..., alias="createdAt")
+    updated_at: datetime = Field(..., alias="updatedAt")
+
+    class Config:
+        populate_by_name = True
+
+
+class ConversationPage(BaseModel):
+    """Schema for a page of conversation summaries."""
+    conversations: List[ConversationSummary]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+
+    class Config:
+        populate_by_name = True
+
+
+class MessagePage(BaseModel):
+    """Schema for a page of conversation messages."""
+    messages: List[ChatMessage]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+
+    class Config:
+        populate_by_name = True
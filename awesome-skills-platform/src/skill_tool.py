@@ -2,8 +2,11 @@ from strands import tool
 from strands.hooks import HookProvider,HookRegistry,AfterToolCallEvent,MessageAddedEvent,BeforeModelCallEvent
 import os
 import re
+import threading
 import traceback
 import logging
+import weakref
+from functools import lru_cache
 
 # 配置日志格式
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,10 +28,12 @@ How to use skills:
   - `command: "pdf"` - invoke the pdf skill
   - `command: "xlsx"` - invoke the xlsx skill
   - `command: "ms-office-suite:pdf"` - invoke using fully qualified name
+- Large skills load an overview with a section index; load a section with `command: "<skill>#<section title>"`
+- Load a reference file from the skill directory with `command: "<skill>/<file>"`, e.g. `command: "pdf/forms.md"`
 
 Important:
 - Only use skills listed in <available_skills> below
-- Do not invoke a skill that is already running
+- Do not invoke a skill that is already running; a skill invoked again in the same conversation only returns a reminder
 - Do not use this tool for built-in CLI commands (like /help, /clear, etc.)
 </skills_instructions>
 
@@ -74,9 +79,8 @@ def init_skills() ->str:
             path = os.path.join(skill_root_path,sub_folder,"SKILL.md")
             logger.info(f"🔍 正在处理技能: {sub_folder}")
             
-            # Read the skill file
-            with open(path, 'r', encoding='utf-8') as f:
-                skill_content = f.read()
+            # Read the skill file (cached until it changes on disk)
+            skill_content = _read_skill_file(path)
 
             # Parse YAML frontmatter (basic parsing)
             frontmatter_match = re.match(r'^---\n(.*?)\n---\n(.*)', skill_content, re.DOTALL)
@@ -107,36 +111,173 @@ def init_skills() ->str:
         return ""
 
 
+# Skills longer than this load as an overview plus a section index (0 = always load in full)
+SKILL_LAZY_THRESHOLD = int(os.environ.get("SKILL_LAZY_THRESHOLD", "12000"))
+# Reference files larger than this are not inlined; read them with file_read instead
+SKILL_REFERENCE_MAX_CHARS = 100_000
+
+# path -> (mtime_ns, content); files are re-read only when they change on disk
+_skill_file_cache = {}
+_skill_file_cache_lock = threading.Lock()
+# skills description -> generated Skill tool
+_skill_tools = {}
+
+
+def _read_skill_file(path: str) -> str:
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _skill_file_cache.get(path)
+    if cached and mtime is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if mtime is not None:
+        with _skill_file_cache_lock:
+            _skill_file_cache[path] = (mtime, content)
+    return content
+
+
+def clear_skill_cache():
+    """清空技能内容缓存"""
+    with _skill_file_cache_lock:
+        _skill_file_cache.clear()
+    _skill_tools.clear()
+    _split_sections.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def _split_sections(markdown: str) -> tuple:
+    """Split skill markdown into (intro, ((title, text), ...)) at level-2 headings outside code blocks."""
+    intro, sections = [], []
+    in_code = False
+    for line in markdown.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        if not in_code and line.startswith("## "):
+            sections.append([line[3:].strip(), [line]])
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            intro.append(line)
+    return "".join(intro), tuple((title, "".join(lines)) for title, lines in sections)
+
+
+def _skill_dir(name: str):
+    """
+    The directory of a discovered skill, or None if `name` is not one: names
+    with path separators or dots that could leave SKILLS_ROOT are rejected,
+    and the resolved directory must sit directly under SKILLS_ROOT.
+    """
+    if not name or name.startswith('.') or '..' in name or '/' in name or '\\' in name or os.sep in name:
+        return None
+    skill_dir = os.path.join(SKILLS_ROOT, name)
+    if os.path.dirname(os.path.realpath(skill_dir)) != os.path.realpath(SKILLS_ROOT):
+        return None
+    if not os.path.isfile(os.path.join(skill_dir, "SKILL.md")):
+        return None
+    return skill_dir
+
+
+def _skill_references(skill_dir: str) -> list:
+    references = []
+    for entry in sorted(os.listdir(skill_dir)):
+        if entry in ("SKILL.md", "LICENSE.txt") or entry.startswith('.'):
+            continue
+        path = os.path.join(skill_dir, entry)
+        if os.path.isdir(path):
+            references.append(f"- {entry}/ (directory)")
+        else:
+            references.append(f"- {entry} ({os.path.getsize(path) // 1024 + 1} KB)")
+    return references
+
+
+def _skill_result(command: str, body: str) -> list:
+    return [{
+                "text": f"<command-message>The \"{command}\" skill is running</command-message>\n<command-name>{command}</command-name>"
+            },
+            {
+                "text": body
+            }]
+
+
+SKILL_FAILED_MARKER = "skill launching failed</command-message>"
+
+
+def _skill_failed(command: str, reason: str = "") -> list:
+    return [{
+        "text": f"<command-message>The \"{command}\" {SKILL_FAILED_MARKER}\n<command-name>{command}</command-name>{reason}"
+    }]
+
+
+def skill_load_failed(content: list) -> bool:
+    """True if `content` is a load_skill failure rather than skill content."""
+    return bool(content) and SKILL_FAILED_MARKER in content[0].get("text", "")
+
+
 def load_skill(command:str) -> str:
+    """
+    加载技能内容。command 可以是:
+    - "<skill>": SKILL.md 正文（大型技能只返回概览和章节索引）
+    - "<skill>#<section>": SKILL.md 的某个二级章节
+    - "<skill>/<file>": 技能目录中的参考文件
+    """
     logger.info(f"🎯 开始加载技能: {command}")
     try:
-        skill_root_path = SKILLS_ROOT
-        path = os.path.join(skill_root_path,command,"SKILL.md")
+        name, sep, rest = re.match(r'([^#/]*)([#/]?)(.*)', command, re.DOTALL).groups()
+        skill_dir = _skill_dir(name)
+        if skill_dir is None:
+            logger.error(f"❌ 未知技能: '{name}'")
+            return _skill_failed(command, "\nUnknown skill. Only use skills listed in <available_skills>.")
+
+        if sep == "/":
+            path = os.path.realpath(os.path.join(skill_dir, rest))
+            if not path.startswith(os.path.realpath(skill_dir) + os.sep):
+                return _skill_failed(command, "\nReference files must be inside the skill directory.")
+            content = _read_skill_file(path)
+            if len(content) > SKILL_REFERENCE_MAX_CHARS:
+                return _skill_failed(command, f"\nThe file is too large to load here; read {path} with file_read.")
+            logger.info(f"✅ 技能参考文件 '{command}' 加载成功，内容长度: {len(content)} 字符")
+            return _skill_result(command, f"Reference file {path}:\n\n{content}")
+
+        path = os.path.join(skill_dir,"SKILL.md")
         logger.info(f"📄 读取技能文件: {path}")
-        
-        with open(path, 'r', encoding='utf-8') as f:
-            skill_content = f.read()
+        skill_content = _read_skill_file(path)
         # Parse YAML frontmatter (basic parsing)
         frontmatter_match = re.match(r'^---\n(.*?)\n---\n(.*)', skill_content, re.DOTALL)
 
         if not frontmatter_match:
             logger.error(f"❌ 技能 '{command}' 格式无效，缺少YAML前置内容")
-            return [ {
-                "text": f"<command-message>The \"{command}\" skill launching failed</command-message>\n<command-name>{command}</command-name>"
-            }]
+            return _skill_failed(command)
         markdown_content = frontmatter_match.group(2)
+
+        if sep == "#":
+            _, sections = _split_sections(markdown_content)
+            for title, text in sections:
+                if title.lower() == rest.strip().lower():
+                    logger.info(f"✅ 技能章节 '{command}' 加载成功，内容长度: {len(text)} 字符")
+                    return _skill_result(command, text)
+            titles = ", ".join(title for title, _ in sections)
+            return _skill_failed(command, f"\nNo such section. Sections: {titles}")
+
+        if SKILL_LAZY_THRESHOLD and len(markdown_content) > SKILL_LAZY_THRESHOLD:
+            intro, sections = _split_sections(markdown_content)
+            if sections:
+                index = "\n".join(f"- {name}#{title} ({len(text) // 1024 + 1} KB)" for title, text in sections)
+                references = "\n".join(_skill_references(skill_dir)) or "(none)"
+                logger.info(f"✅ 技能 '{command}' 按需加载: 概览 {len(intro)} 字符，{len(sections)} 个章节")
+                return _skill_result(command, (
+                    f"Base directory for this skill: {skill_dir}\n\n{intro}\n"
+                    f"This skill is large. Load the sections you need with the Skill tool:\n{index}\n\n"
+                    f"Reference files (load with command \"{name}/<file>\" when needed):\n{references}"
+                ))
+
         logger.info(f"✅ 技能 '{command}' 加载成功，内容长度: {len(markdown_content)} 字符")
-        return [{
-                    "text": f"<command-message>The \"{command}\" skill is running</command-message>\n<command-name>{command}</command-name>"
-                },
-                {
-                     "text": f"Base directory for this skill: {os.path.join(skill_root_path,command)}\n\n{markdown_content}"
-                }]
+        return _skill_result(command, f"Base directory for this skill: {skill_dir}\n\n{markdown_content}")
     except Exception as e:
         logger.error(f"💥 技能 '{command}' 加载失败: {str(e)}")
-        return [ {
-            "text": f"<command-message>The \"{command}\" skill launching failed</command-message>\n<command-name>{command}</command-name>"
-          }]
+        return _skill_failed(command)
         
 def generate_skill_tool():
     logger.info("🔧 开始生成技能工具...")
@@ -145,6 +286,12 @@ def generate_skill_tool():
         logger.warning("⚠️ 没有找到可用的技能，跳过工具生成")
         return None
     
+    # Agents created with the same skills share one tool instead of
+    # rebuilding its spec every time
+    cached = _skill_tools.get(skills_desc)
+    if cached is not None:
+        return cached
+
     logger.info("🛠️ 创建动态技能函数...")
     def dynamic_func(command: str) -> str:
        logger.info(f"🚀 执行技能命令: {command}")
@@ -158,6 +305,8 @@ def generate_skill_tool():
     # 应用工具装饰器
     decorated_func = tool(dynamic_func)
     globals()[function_name] = decorated_func
+    _skill_tools.clear()
+    _skill_tools[skills_desc] = decorated_func
     logger.info(f"✅ 技能工具 '{function_name}' 生成完成")
     return decorated_func
 
@@ -166,6 +315,10 @@ class SkillToolInterceptor(HookProvider):
     def __init__(self):
         super().__init__()
         self.tooluse_ids = {}
+        # toolUseId -> command, for tool results still waiting for their skill content
+        self.pending_commands = {}
+        # agent -> {command: message the skill content was injected into}
+        self.injected_skills = weakref.WeakKeyDictionary()
         logger.info("🎣 技能工具拦截器初始化完成")
     
     def register_hooks(self, registry: HookRegistry) -> None:
@@ -175,14 +328,34 @@ class SkillToolInterceptor(HookProvider):
         registry.add_callback(BeforeModelCallEvent,self.add_message_cache)
         logger.info("✅ 所有钩子注册完成")
     
+    def _injected_message(self, agent, command):
+        """The message holding this skill's content, if it is still in the agent's context."""
+        message = self.injected_skills.get(agent, {}).get(command)
+        if message is not None and any(m is message for m in agent.messages):
+            return message
+        return None
+
     # load skill content
     def add_skill_content(self, event: AfterToolCallEvent) -> None:
         logger.info(f"🔧 工具调用事件: {event.tool_use['name']}")
         # print(f"\n#Tool use:{event.tool_use['name']}\n")
         if event.tool_use['name'] == 'Skill':
             command = event.tool_use['input']['command']
+            tooluse_id = event.tool_use['toolUseId']
             logger.info(f"🎯 处理技能命令: {command}")
-            self.tooluse_ids[event.tool_use['toolUseId']] = load_skill(command)
+            if self._injected_message(event.agent, command) is not None:
+                # Already in context: a short reminder instead of the full skill again
+                self.tooluse_ids[tooluse_id] = [{
+                    "text": f"<command-message>The \"{command}\" skill is already loaded</command-message>\n<command-name>{command}</command-name>\n"
+                            f"Its instructions are earlier in this conversation; follow them."
+                }]
+                logger.info(f"♻️ 技能 '{command}' 已在上下文中，跳过重复注入")
+            else:
+                content = load_skill(command)
+                self.tooluse_ids[tooluse_id] = content
+                # Only a successful load counts as injected; a retry must load it again
+                if not skill_load_failed(content):
+                    self.pending_commands[tooluse_id] = command
             # logger.info(f"📝 技能内容已缓存，工具ID: {event.tool_use['toolUseId']}")
         # elif event.tool_use['name'] == 'AskUserQuestion':
         #     print(f"AskUserQuestion tool_use:{event.tool_use}")
@@ -199,6 +372,9 @@ class SkillToolInterceptor(HookProvider):
                     if skill_content:
                         event.message['content'] += skill_content
                         self.tooluse_ids.pop(tooluse_id)
+                        command = self.pending_commands.pop(tooluse_id, None)
+                        if command:
+                            self.injected_skills.setdefault(event.agent, {})[command] = event.message
                         logger.info(f"✅ 技能内容已添加到消息，工具ID: {tooluse_id}")
                         break
 
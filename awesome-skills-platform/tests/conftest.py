@@ -10,6 +10,9 @@ from typing import Generator, Any
 # Add src to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep conversations in memory instead of creating a SQLite file
+os.environ.setdefault("CONVERSATION_BACKEND", "memory")
+
 
 # =============================================================================
 # Environment Fixtures
@@ -155,6 +155,19 @@ class TestMCPEndpoints:
         assert response.status_code == 204
         mock_db.delete_mcp_server.assert_called_once_with("delete-mcp")
 
+    @patch("src.api.routers.mcp.agent_manager")
+    @patch("src.api.routers.mcp.db_client")
+    def test_delete_mcp_server_invalidates_only_its_agents(self, mock_db, mock_agent_manager, test_client):
+        """Test deleting an MCP server drops only the cached agents that use it."""
+        mock_db.get_mcp_server.return_value = {"id": "delete-mcp", "name": "To Delete"}
+        mock_db.delete_mcp_server.return_value = True
+
+        response = test_client.delete("/api/mcp/delete-mcp")
+
+        assert response.status_code == 204
+        mock_agent_manager.invalidate_mcp.assert_called_once_with("delete-mcp")
+        mock_agent_manager.clear_cache.assert_not_called()
+
     @patch("src.api.routers.mcp.db_client")
     def test_delete_mcp_server_not_found(self, mock_db, test_client):
         """Test deleting non-existent MCP server."""
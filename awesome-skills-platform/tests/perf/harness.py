@@ -0,0 +1,194 @@
+"""
+Load harness for the replay benchmarks.
+
+run_load drives many sessions of a few turns each through an async turn
+function, with bounded concurrency, and collects time to first token, turn
+latency, the number of streams in flight and, optionally, traced memory
+growth. The report is printed and, when PERF_REPORT_DIR is set, written there
+as JSON so CI can keep it as an artifact and compare runs.
+"""
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+# A turn function takes (session_index, turn_index) and returns the seconds
+# until the first streamed token, or None if no token was streamed
+TurnFunction = Callable[[int, int], Awaitable[Optional[float]]]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+@dataclass
+class LoadReport:
+    """Measurements of one load run."""
+
+    name: str
+    sessions: int
+    turns: int
+    concurrency: int
+    wall_seconds: float = 0.0
+    ttft: list[float] = field(default_factory=list)
+    latency: list[float] = field(default_factory=list)
+    errors: int = 0
+    no_token_turns: int = 0
+    max_concurrent_streams: int = 0
+    memory_growth_mb_per_1000_sessions: Optional[float] = None
+
+    def summary(self) -> dict:
+        """Percentiles in milliseconds and the other counters."""
+        ms = lambda seconds: round(seconds * 1000, 1)  # noqa: E731
+        return {
+            "name": self.name,
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "no_token_turns": self.no_token_turns,
+            "throughput_turns_per_s": round(self.turns / self.wall_seconds, 1) if self.wall_seconds else 0.0,
+            "ttft_ms": {f"p{p}": ms(percentile(self.ttft, p)) for p in (50, 95, 99)},
+            "latency_ms": {f"p{p}": ms(percentile(self.latency, p)) for p in (50, 95, 99)},
+            "max_concurrent_streams": self.max_concurrent_streams,
+            "memory_growth_mb_per_1000_sessions": self.memory_growth_mb_per_1000_sessions,
+        }
+
+    def publish(self) -> dict:
+        """Print the summary and write it to PERF_REPORT_DIR if set."""
+        summary = self.summary()
+        print(f"\n[perf] {json.dumps(summary)}")
+        report_dir = os.environ.get("PERF_REPORT_DIR")
+        if report_dir:
+            Path(report_dir).mkdir(parents=True, exist_ok=True)
+            (Path(report_dir) / f"{self.name}.json").write_text(
+                json.dumps({**summary, "raw": asdict(self)}, indent=2)
+            )
+        return summary
+
+
+async def run_load(
+    name: str,
+    turn: TurnFunction,
+    sessions: int,
+    turns_per_session: int = 1,
+    concurrency: int = 10,
+    trace_memory: bool = False,
+) -> LoadReport:
+    """
+    Run sessions through the turn function and measure them.
+
+    Sessions run concurrently up to `concurrency`; the turns of one session
+    run in order. With trace_memory, traced allocations still alive after the
+    run (and a gc) are extrapolated to 1,000 sessions; tracing slows the run
+    down, so latency from a traced run should not be compared with an
+    untraced one.
+    """
+    report = LoadReport(name=name, sessions=sessions, turns=sessions * turns_per_session, concurrency=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = 0
+
+    async def run_session(session: int) -> None:
+        nonlocal in_flight
+        async with semaphore:
+            for turn_index in range(turns_per_session):
+                in_flight += 1
+                report.max_concurrent_streams = max(report.max_concurrent_streams, in_flight)
+                start = time.perf_counter()
+                try:
+                    ttft = await turn(session, turn_index)
+                except Exception:
+                    report.errors += 1
+                    continue
+                finally:
+                    in_flight -= 1
+                report.latency.append(time.perf_counter() - start)
+                if ttft is None:
+                    report.no_token_turns += 1
+                else:
+                    report.ttft.append(ttft)
+
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_session(session) for session in range(sessions)))
+    finally:
+        report.wall_seconds = time.perf_counter() - start
+        if trace_memory:
+            gc.collect()
+            growth = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            report.memory_growth_mb_per_1000_sessions = round(growth / sessions * 1000 / 2 ** 20, 2)
+    return report
+
+
+async def asgi_stream(app, method: str, path: str, payload: dict, headers: Optional[dict] = None):
+    """
+    Call an ASGI app in process and yield response body chunks as they are
+    sent, so time to first token can be measured without a server (httpx's
+    ASGITransport only returns the body once the app has finished).
+    """
+    body = json.dumps(payload).encode()
+    queue: asyncio.Queue = asyncio.Queue()
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 0
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            await queue.put(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json")]
+                   + [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    # Ends the body, also when the app fails before sending one
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while (chunk := await queue.get()) is not None:
+            if status >= 400:
+                raise RuntimeError(f"{method} {path} returned {status}: {chunk[:200]!r}")
+            yield chunk
+        await task
+    finally:
+        task.cancel()
+
+
+def sse_events(chunk: bytes) -> list[dict]:
+    """Decode the JSON `data:` events in a chunk of an SSE stream."""
+    events = []
+    for line in chunk.decode().splitlines():
+        if line.startswith("data: ") and line != "data: [DONE]":
+            events.append(json.loads(line[len("data: "):]))
+    return events
+
+
+def budget(name: str, default: float) -> float:
+    """A benchmark budget, overridable with PERF_BUDGET_<NAME> for slower CI hosts."""
+    return float(os.environ.get(f"PERF_BUDGET_{name.upper()}", default))
@@ -0,0 +1,230 @@
+"""
+Replay stand-in for the Bedrock runtime client.
+
+ReplayBedrockClient implements the converse_stream call a BedrockModel makes
+and replays recorded event streams (text, reasoning and tool-use deltas) at a
+configurable time to first token and token rate. Swapping it in as
+`model.client` keeps the whole BedrockModel and agent event loop in the path,
+so agents can be load-tested without AWS access or model cost.
+
+A script is a list of recorded responses, one per model call within a turn:
+the first call after a user message replays response 0, the call after the
+first tool result replays response 1, and so on. The response is chosen from
+the request alone, so one client can serve any number of concurrent
+sessions.
+
+Recordings are JSON files {"responses": [[event, ...], ...]} holding raw
+converse_stream events; RecordingBedrockClient captures them from a real
+client.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+
+CHARS_PER_TOKEN = 4
+
+
+# =============================================================================
+# Response builders
+# =============================================================================
+
+def _chunks(text: str, chunk_chars: int) -> list[str]:
+    return [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+
+
+def _metadata(output_chars: int) -> dict:
+    output_tokens = -(-output_chars // CHARS_PER_TOKEN)
+    return {"metadata": {
+        "usage": {"inputTokens": 1000, "outputTokens": output_tokens, "totalTokens": 1000 + output_tokens},
+        "metrics": {"latencyMs": 0},
+    }}
+
+
+def text_response(text: str, reasoning: Optional[str] = None, chunk_chars: int = 16) -> list[dict]:
+    """Events of a final answer, optionally preceded by a reasoning block."""
+    events = [{"messageStart": {"role": "assistant"}}]
+    index = 0
+    if reasoning:
+        events += [
+            {"contentBlockDelta": {"delta": {"reasoningContent": {"text": chunk}}, "contentBlockIndex": index}}
+            for chunk in _chunks(reasoning, chunk_chars)
+        ]
+        events += [
+            {"contentBlockDelta": {"delta": {"reasoningContent": {"signature": "replay"}}, "contentBlockIndex": index}},
+            {"contentBlockStop": {"contentBlockIndex": index}},
+        ]
+        index += 1
+    events += [{"contentBlockDelta": {"delta": {"text": chunk}, "contentBlockIndex": index}}
+               for chunk in _chunks(text, chunk_chars)]
+    events += [
+        {"contentBlockStop": {"contentBlockIndex": index}},
+        {"messageStop": {"stopReason": "end_turn"}},
+        _metadata(len(text) + len(reasoning or "")),
+    ]
+    return events
+
+
+def tool_use_response(name: str, tool_input: dict, text: str = "", tool_use_id: str = "tooluse_replay",
+                      chunk_chars: int = 16) -> list[dict]:
+    """Events of a tool call, optionally preceded by some text."""
+    events = [{"messageStart": {"role": "assistant"}}]
+    index = 0
+    if text:
+        events += [{"contentBlockDelta": {"delta": {"text": chunk}, "contentBlockIndex": index}}
+                   for chunk in _chunks(text, chunk_chars)]
+        events.append({"contentBlockStop": {"contentBlockIndex": index}})
+        index += 1
+    arguments = json.dumps(tool_input)
+    events.append({"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": name}},
+                                         "contentBlockIndex": index}})
+    events += [{"contentBlockDelta": {"delta": {"toolUse": {"input": chunk}}, "contentBlockIndex": index}}
+               for chunk in _chunks(arguments, chunk_chars)]
+    events += [
+        {"contentBlockStop": {"contentBlockIndex": index}},
+        {"messageStop": {"stopReason": "tool_use"}},
+        _metadata(len(text) + len(arguments)),
+    ]
+    return events
+
+
+def load_recording(name: str) -> list[list[dict]]:
+    """Load a recorded script by file name (without .json) from RECORDINGS_DIR, or by path."""
+    path = Path(name)
+    if not path.suffix:
+        path = RECORDINGS_DIR / f"{name}.json"
+    return json.loads(path.read_text())["responses"]
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+def _delta_tokens(event: dict) -> int:
+    delta = event.get("contentBlockDelta", {}).get("delta", {})
+    text = delta.get("text") or delta.get("reasoningContent", {}).get("text") or delta.get("toolUse", {}).get("input")
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _is_tool_result(message: dict) -> bool:
+    return any("toolResult" in block for block in message.get("content", []))
+
+
+class ReplayBedrockClient:
+    """Serves recorded converse_stream responses with simulated latency."""
+
+    def __init__(
+        self,
+        script: list[list[dict]],
+        time_to_first_token: float = 0.05,
+        tokens_per_second: float = 500.0,
+        region_name: str = "us-east-1",
+    ):
+        """
+        Args:
+            script: Recorded responses, one per model call within a turn
+            time_to_first_token: Seconds before the first event of a response
+            tokens_per_second: Output rate of text, reasoning and tool-input deltas;
+                0 replays without delay
+            region_name: Reported as the client's region
+        """
+        self.script = script
+        self.time_to_first_token = time_to_first_token
+        self.tokens_per_second = tokens_per_second
+        self.meta = SimpleNamespace(region_name=region_name)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.active_streams = 0
+        self.max_concurrent_streams = 0
+
+    def select(self, messages: list) -> list[dict]:
+        """Pick the response for the model call after the given messages."""
+        step = 0
+        for message in reversed(messages):
+            if message["role"] != "user":
+                continue
+            if not _is_tool_result(message):
+                break
+            step += 1
+        return self.script[min(step, len(self.script) - 1)]
+
+    def converse_stream(self, **request: Any) -> dict:
+        """Same shape as the bedrock-runtime converse_stream response."""
+        with self._lock:
+            self.calls += 1
+        return {"stream": self._replay(self.select(request["messages"]))}
+
+    def _replay(self, events: list[dict]) -> Iterator[dict]:
+        with self._lock:
+            self.active_streams += 1
+            self.max_concurrent_streams = max(self.max_concurrent_streams, self.active_streams)
+        try:
+            # BedrockModel reads the stream in a worker thread, so sleeping
+            # here behaves like waiting on the network
+            time.sleep(self.time_to_first_token)
+            for event in events:
+                tokens = _delta_tokens(event)
+                if tokens and self.tokens_per_second:
+                    time.sleep(tokens / self.tokens_per_second)
+                yield event
+        finally:
+            with self._lock:
+                self.active_streams -= 1
+
+    def model_seconds(self, response: list[dict]) -> float:
+        """Time the replay of one response takes, before any overhead."""
+        tokens = sum(_delta_tokens(event) for event in response)
+        return self.time_to_first_token + (tokens / self.tokens_per_second if self.tokens_per_second else 0)
+
+
+class RecordingBedrockClient:
+    """
+    Wraps a real bedrock-runtime client and records converse_stream events.
+
+    Usage:
+        recorder = RecordingBedrockClient(model.client)
+        model.client = recorder
+        agent("...")
+        recorder.save(RECORDINGS_DIR / "my_flow.json")
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.meta = client.meta
+        self.responses: list[list[dict]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def converse_stream(self, **request: Any) -> dict:
+        response = self._client.converse_stream(**request)
+        return {**response, "stream": self._record(response["stream"])}
+
+    def _record(self, stream: Iterator[dict]) -> Iterator[dict]:
+        events = []
+        self.responses.append(events)
+        for event in stream:
+            events.append(event)
+            yield event
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps({"responses": self.responses}, indent=1, default=str))
+
+
+def replay_model(client: ReplayBedrockClient, model_id: str = "replay-model", **model_kwargs: Any):
+    """
+    Create a BedrockModel that talks to a replay client.
+
+    One client can back many models, e.g. one per session, and collects
+    call and stream counts for all of them.
+    """
+    from strands.models import BedrockModel
+
+    model = BedrockModel(model_id=model_id, region_name=client.meta.region_name, **model_kwargs)
+    model.client = client
+    return model
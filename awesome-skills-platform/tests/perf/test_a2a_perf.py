@@ -0,0 +1,87 @@
+"""
+Load benchmark for the a2a-agent-ui backend (/invoke_stream).
+
+a2a-agent-ui/backend/loadtest.py drives the backend with its lead model
+replaced by a scripted model (no Bedrock) that delegates each query to the
+next of its stub A2A servers. The backend pins an older strands release and needs the A2A
+SDK, so the load test runs in that project's environment: the interpreter in
+A2A_PYTHON, or `uv run` when uv is installed.
+
+The stub servers are subprocesses on the same host, so the overhead budgets
+are looser than the in-process suites'; PERF_BUDGET_<NAME> adjusts them.
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from tests.perf.harness import budget
+
+pytestmark = pytest.mark.perf
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+A2A_BACKEND_DIR = os.path.join(REPO_ROOT, "a2a-agent-ui", "backend")
+
+LEAD_FIRST_TOKEN_DELAY = 0.05
+LEAD_TOKENS, LEAD_TOKENS_PER_SEC = 100, 200
+STUB_LATENCY = 0.2
+STUB_TOKENS, STUB_TOKENS_PER_SEC = 50, 200
+
+
+def _a2a_python() -> list[str]:
+    if os.environ.get("A2A_PYTHON"):
+        return [os.environ["A2A_PYTHON"]]
+    if shutil.which("uv"):
+        return ["uv", "run", "--project", A2A_BACKEND_DIR, "python"]
+    pytest.skip("set A2A_PYTHON to an interpreter with the a2a-agent-ui backend's dependencies, or install uv")
+
+
+def _run_loadtest(tmp_path, *options: str) -> dict:
+    report_dir = os.environ.get("PERF_REPORT_DIR") or str(tmp_path)
+    os.makedirs(report_dir, exist_ok=True)
+    output = os.path.join(report_dir, "a2a_invoke_stream.json")
+    result = subprocess.run(
+        _a2a_python() + [
+            "loadtest.py",
+            "--lead-first-token-delay", str(LEAD_FIRST_TOKEN_DELAY),
+            "--lead-tokens", str(LEAD_TOKENS),
+            "--lead-tokens-per-sec", str(LEAD_TOKENS_PER_SEC),
+            "--stub-latency", str(STUB_LATENCY),
+            "--stub-tokens", str(STUB_TOKENS),
+            "--stub-tokens-per-sec", str(STUB_TOKENS_PER_SEC),
+            "--output", output,
+            *options,
+        ],
+        cwd=A2A_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    with open(output) as f:
+        report = json.load(f)
+    print(f"\n[perf] {json.dumps({k: v for k, v in report.items() if k != 'config'})}")
+    return report
+
+
+class TestA2APerf:
+    """Latency and event-loop health of the a2a lead agent under scripted load."""
+
+    def test_delegating_streams(self, tmp_path):
+        """Test delegated turns stay close to the scripted model and stub time without stalling the loop."""
+        report = _run_loadtest(tmp_path, "--agents", "2", "--sessions", "10", "--turns", "3")
+        # Tool call, the delegated stub answer, then the first token of the final answer
+        delegation_seconds = 2 * LEAD_FIRST_TOKEN_DELAY + STUB_LATENCY + STUB_TOKENS / STUB_TOKENS_PER_SEC
+        answer_seconds = LEAD_TOKENS / LEAD_TOKENS_PER_SEC
+
+        assert report["turns"] == 30
+        assert report["errors"] == 0, report["error_samples"]
+        # Delegations rotate over the stub agents
+        assert sorted(report["requests_per_agent"].values()) == [15, 15]
+        assert report["ttft_seconds"]["p95"] <= delegation_seconds + budget("a2a_ttft_overhead", 1.0)
+        assert report["turn_latency_seconds"]["p95"] <= (
+            delegation_seconds + answer_seconds + budget("a2a_latency_overhead", 1.5)
+        )
+        assert report["backend_loop_lag_seconds"]["p99"] <= budget("a2a_loop_lag", 0.1)
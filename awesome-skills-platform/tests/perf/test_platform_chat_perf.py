@@ -0,0 +1,117 @@
+"""
+Replay benchmarks for the platform chat API (/api/chat/stream).
+
+The agent manager builds real Strands agents; only the Bedrock client is
+replaced by a replay client, so the numbers cover agent creation and caching,
+the event loop, SSE encoding and the conversation store.
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.perf.harness import asgi_stream, budget, run_load, sse_events
+from tests.perf.replay_bedrock import ReplayBedrockClient, load_recording, replay_model
+
+pytestmark = pytest.mark.perf
+
+AGENT_CONFIG = {
+    "id": "perf-agent",
+    "name": "Perf Agent",
+    "modelId": "replay-model",
+    "temperature": 0.7,
+    "maxTokens": 4096,
+    "systemPrompt": "You are a helpful assistant.",
+    "skillIds": [],
+    "mcpIds": [],
+    "updatedAt": "2025-01-01T00:00:00",
+}
+
+
+@pytest.fixture
+def chat_app(tmp_path):
+    """The API app with agents that talk to a replay client."""
+    from src.api.main import app
+    from src.core.agent_manager import agent_manager
+    from src.core.config import settings
+    from src.core.conversation_store import reset_conversation_store
+
+    def start(**replay_options):
+        client = ReplayBedrockClient(load_recording("chat_reasoning"), **replay_options)
+        model = replay_model(client)
+        patches.extend([
+            patch("src.core.agent_manager.db_client.get_agent", return_value=AGENT_CONFIG),
+            patch.object(agent_manager, "_get_or_create_model", return_value=(model, AGENT_CONFIG["modelId"])),
+        ])
+        for p in patches:
+            p.start()
+        return app, client
+
+    patches = []
+    agent_manager.clear_cache()
+    reset_conversation_store()
+    # The store's SQLite file goes to the test's temporary directory
+    with patch.object(settings, "conversation_sqlite_path", str(tmp_path / "conversations.db")):
+        yield start
+        for p in patches:
+            p.stop()
+        agent_manager.clear_cache()
+        reset_conversation_store()
+
+
+async def _serve(app, work):
+    """Run work with the app's lifespan (which sizes the default executor) active."""
+    async with app.router.lifespan_context(app):
+        return await work
+
+
+def _chat_turn(app):
+    async def turn(session: int, turn_index: int):
+        start = time.perf_counter()
+        ttft = None
+        payload = {"agent_id": AGENT_CONFIG["id"], "message": f"question {turn_index}",
+                   "conversation_id": f"perf-{session}"}
+        async for chunk in asgi_stream(app, "POST", "/api/chat/stream", payload):
+            for event in sse_events(chunk):
+                if event["type"] == "error":
+                    raise RuntimeError(event["error"])
+                if ttft is None and event["type"] in ("text", "thinking"):
+                    ttft = time.perf_counter() - start
+        return ttft
+
+    return turn
+
+
+class TestPlatformChatPerf:
+    """Latency and memory of the streaming chat endpoint under replayed load."""
+
+    def test_concurrent_streams(self, chat_app):
+        """Test TTFT and turn latency stay close to the replayed model time."""
+        app, client = chat_app(time_to_first_token=0.05, tokens_per_second=1000)
+        report = asyncio.run(_serve(app, run_load(
+            "platform_chat_stream", _chat_turn(app), sessions=100, turns_per_session=2, concurrency=25
+        )))
+        summary = report.publish()
+        model_seconds = client.model_seconds(client.script[0])
+
+        assert report.errors == report.no_token_turns == 0
+        assert client.calls == 200
+        # Every request gets a model stream; none wait for a worker thread
+        assert client.max_concurrent_streams == 25
+        assert summary["ttft_ms"]["p95"] <= 1000 * (0.05 + budget("platform_ttft_overhead", 0.5))
+        assert summary["latency_ms"]["p95"] <= 1000 * (model_seconds + budget("platform_latency_overhead", 0.75))
+
+    def test_memory_growth_per_session(self, chat_app):
+        """Test memory kept per new session stays bounded."""
+        app, _ = chat_app(time_to_first_token=0, tokens_per_second=0)
+        turn = _chat_turn(app)
+        # Warm up imports and one-off caches outside the measurement
+        asyncio.run(_serve(app, turn(-1, 0)))
+        report = asyncio.run(_serve(app, run_load(
+            "platform_chat_memory", turn, sessions=100, concurrency=10, trace_memory=True
+        )))
+        report.publish()
+
+        assert report.errors == report.no_token_turns == 0
+        assert report.memory_growth_mb_per_1000_sessions <= budget("platform_memory_mb_per_1000", 200)
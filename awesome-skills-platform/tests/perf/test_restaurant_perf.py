@@ -0,0 +1,166 @@
+"""
+Replay benchmarks for the restaurant assistant (/invoke-streaming).
+
+The app (deployment/01.restaurant_assistant_fargate/docker/app) shares one
+BedrockModel between all agents; its client is replaced by a replay client
+and the session table by an in-memory stand-in, so the numbers cover
+admission, the warm agent pool, the session log and the text stream.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from unittest.mock import patch
+
+import pytest
+
+from tests.perf.harness import asgi_stream, budget, run_load
+from tests.perf.replay_bedrock import ReplayBedrockClient, load_recording
+
+pytestmark = pytest.mark.perf
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+RESTAURANT_APP_DIR = os.path.join(REPO_ROOT, "deployment", "01.restaurant_assistant_fargate", "docker", "app")
+API_KEY = "perf-key"
+MAX_CONCURRENT = 8
+
+
+class InMemorySessionTable:
+    """The DynamoDB calls SessionStore makes, on a dict keyed by (session_id, seq)."""
+
+    def __init__(self):
+        self.items: dict[tuple[str, int], dict] = {}
+        self._lock = threading.Lock()
+
+    def put_item(self, TableName, Item, ConditionExpression=None):
+        self._put([Item])
+
+    def transact_write_items(self, TransactItems):
+        self._put([entry["Put"]["Item"] for entry in TransactItems])
+
+    def _put(self, items: list[dict]) -> None:
+        from botocore.exceptions import ClientError
+
+        keys = [(item["session_id"]["S"], int(item["seq"]["N"])) for item in items]
+        with self._lock:
+            if any(key in self.items for key in keys):
+                raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+            self.items.update(zip(keys, items))
+
+    def query(self, ExpressionAttributeValues, Limit, **kwargs):
+        session_id = ExpressionAttributeValues[":sid"]["S"]
+        start = kwargs.get("ExclusiveStartKey")
+        with self._lock:
+            seqs = sorted((seq for sid, seq in self.items if sid == session_id), reverse=True)
+            if start is not None:
+                seqs = [seq for seq in seqs if seq < int(start["seq"]["N"])]
+            page = [self.items[(session_id, seq)] for seq in seqs[:Limit]]
+        response = {"Items": page}
+        if len(seqs) > Limit:
+            response["LastEvaluatedKey"] = {"session_id": {"S": session_id}, "seq": page[-1]["seq"]}
+        return response
+
+
+@pytest.fixture
+def restaurant_app():
+    """The restaurant app with its shared model talking to a replay client."""
+    pytest.importorskip("strands_tools")
+    # The app modules use flat imports inside their container
+    sys.path.insert(0, RESTAURANT_APP_DIR)
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    import app
+    import session
+    from admission import AdmissionController
+    from agent_pool import AgentPool
+
+    def start(**replay_options):
+        client = ReplayBedrockClient(load_recording("chat_reasoning"), **replay_options)
+        patchers.extend([
+            patch.object(app, "API_KEY", API_KEY),
+            patch.object(app.model, "client", client),
+            # Admission primitives bind to the event loop of their first use
+            patch.object(app, "admission", AdmissionController(max_concurrent=MAX_CONCURRENT, max_queued=64)),
+            patch.object(app, "agent_pool", AgentPool(app.AGENT_POOL_SIZE, session.session_store.is_current)),
+            patch.object(session.session_store, "client", InMemorySessionTable()),
+            patch.object(session.session_store, "_cache", OrderedDict()),
+        ])
+        for patcher in patchers:
+            patcher.start()
+        return app, client
+
+    patchers = []
+    yield start
+    for patcher in patchers:
+        patcher.stop()
+    sys.path.remove(RESTAURANT_APP_DIR)
+
+
+async def _serve(app, work):
+    """Run work with the app's lifespan (which sizes the default executor) active."""
+    async with app.router.lifespan_context(app):
+        return await work
+
+
+def _streaming_turn(app):
+    async def turn(session: int, turn_index: int):
+        start = time.perf_counter()
+        ttft = None
+        text = ""
+        payload = {"prompt": f"question {turn_index} about the menu", "session_id": f"perf-{session}"}
+        async for chunk in asgi_stream(app, "POST", "/invoke-streaming", payload,
+                                       headers={"Authorization": f"Bearer {API_KEY}"}):
+            text += chunk.decode()
+            if ttft is None and chunk:
+                ttft = time.perf_counter() - start
+        if "\nError: " in text:
+            raise RuntimeError(text[text.index("\nError: "):])
+        return ttft
+
+    return turn
+
+
+class TestRestaurantPerf:
+    """Latency, agent reuse and memory of the restaurant stream under replayed load."""
+
+    def test_concurrent_streams(self, restaurant_app):
+        """Test later turns reuse the warm agent and latency stays close to the replayed model time."""
+        app, client = restaurant_app(time_to_first_token=0.05, tokens_per_second=1000)
+        report = asyncio.run(_serve(app.app, run_load(
+            "restaurant_stream", _streaming_turn(app.app), sessions=40, turns_per_session=3, concurrency=16
+        )))
+        summary = report.publish()
+        model_seconds = client.model_seconds(client.script[0])
+        pool = app.agent_pool.stats()
+
+        assert report.errors == report.no_token_turns == 0
+        assert client.calls == 120
+        # Admission caps the model streams; the rest wait in its queue
+        assert client.max_concurrent_streams <= MAX_CONCURRENT
+        # Only the first turn of a session builds an agent
+        assert (pool["hits"], pool["misses"]) == (80, 40)
+        assert summary["ttft_ms"]["p95"] <= 1000 * (
+            2 * model_seconds + budget("restaurant_ttft_overhead", 0.5)
+        )
+        assert summary["latency_ms"]["p95"] <= 1000 * (
+            2 * model_seconds + budget("restaurant_latency_overhead", 0.75)
+        )
+
+    def test_memory_growth_per_session(self, restaurant_app):
+        """Test memory kept per new session stays bounded once the agent pool is full."""
+        app, _ = restaurant_app(time_to_first_token=0, tokens_per_second=0)
+        turn = _streaming_turn(app.app)
+
+        async def run():
+            # Fill the agent pool and warm up one-off caches outside the measurement
+            for session in range(app.AGENT_POOL_SIZE):
+                await turn(-1 - session, 0)
+            return await run_load("restaurant_memory", turn, sessions=100, concurrency=MAX_CONCURRENT,
+                                  trace_memory=True)
+
+        report = asyncio.run(_serve(app.app, run()))
+        report.publish()
+
+        assert report.errors == report.no_token_turns == 0
+        assert report.memory_growth_mb_per_1000_sessions <= budget("restaurant_memory_mb_per_1000", 200)
@@ -0,0 +1,110 @@
+"""
+Replay benchmarks for the AgentCore Strands runtime (/invocations).
+
+The runtime builds its agents with BedrockModel; the model class is patched
+to talk to a replay client, so the numbers cover agent creation, the skill
+tool, the streaming queue and SSE encoding.
+
+Requests run one at a time: the runtime streams every request through one
+process-wide queue, and AgentCore sends one session per runtime instance.
+"""
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.perf.harness import asgi_stream, budget, run_load, sse_events
+from tests.perf.replay_bedrock import ReplayBedrockClient, load_recording, replay_model
+
+pytestmark = pytest.mark.perf
+
+RUNTIME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "src", "agentcore_runtime")
+SESSION_HEADER = "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id"
+
+
+@pytest.fixture
+def runtime_app():
+    """The runtime app with agents that talk to a replay client."""
+    # The runtime modules use flat imports inside their container
+    sys.path.insert(0, RUNTIME_DIR)
+    work_dir_existed = os.path.isdir(os.path.join(RUNTIME_DIR, "workdir"))
+    import strands_runtime
+
+    def start(**replay_options):
+        client = ReplayBedrockClient(load_recording("skill_tool_turn"), **replay_options)
+        patchers.extend([
+            patch.object(strands_runtime, "BedrockModel", lambda **kwargs: replay_model(client, **kwargs)),
+            # The queue binds to the event loop of its first use; one per test
+            patch.object(strands_runtime, "stream_queue", strands_runtime.StreamingQueue()),
+        ])
+        for patcher in patchers:
+            patcher.start()
+        return strands_runtime.app, client
+
+    patchers = []
+    strands_runtime.agent_pool.clear()
+    yield start
+    for patcher in patchers:
+        patcher.stop()
+    strands_runtime.agent_pool.clear()
+    sys.path.remove(RUNTIME_DIR)
+    if not work_dir_existed:
+        try:
+            os.rmdir(os.path.join(RUNTIME_DIR, "workdir"))
+        except OSError:
+            pass
+
+
+def _invocation_turn(app):
+    async def turn(session: int, turn_index: int):
+        start = time.perf_counter()
+        ttft = None
+        payload = {"prompt": f"extract the tables, step {turn_index}"}
+        async for chunk in asgi_stream(app, "POST", "/invocations", {"payload": payload},
+                                       headers={SESSION_HEADER: f"perf-{session}"}):
+            for event in sse_events(chunk):
+                delta = event.get("choices", [{}])[0].get("delta", {})
+                if ttft is None and (delta.get("content") or delta.get("reasoning_content")):
+                    ttft = time.perf_counter() - start
+        return ttft
+
+    return turn
+
+
+class TestRuntimePerf:
+    """Latency and memory of the runtime's streaming invocation under replayed load."""
+
+    def test_skill_turn_latency(self, runtime_app):
+        """Test a turn with a skill tool call stays close to the replayed model time."""
+        app, client = runtime_app(time_to_first_token=0.05, tokens_per_second=1000)
+        report = asyncio.run(run_load(
+            "runtime_invocation", _invocation_turn(app), sessions=20, turns_per_session=2, concurrency=1
+        ))
+        summary = report.publish()
+        model_seconds = sum(client.model_seconds(response) for response in client.script)
+
+        assert report.errors == report.no_token_turns == 0
+        # A tool call and the final answer per turn
+        assert client.calls == 80
+        assert summary["ttft_ms"]["p95"] <= 1000 * (0.05 + budget("runtime_ttft_overhead", 0.5))
+        assert summary["latency_ms"]["p95"] <= 1000 * (model_seconds + budget("runtime_latency_overhead", 1.0))
+
+    def test_memory_growth_per_session(self, runtime_app):
+        """Test memory kept per new session (one pooled agent each) stays bounded."""
+        app, _ = runtime_app(time_to_first_token=0, tokens_per_second=0)
+        turn = _invocation_turn(app)
+
+        async def run():
+            # Warm up imports and one-off caches outside the measurement
+            await turn(-1, 0)
+            return await run_load("runtime_memory", turn, sessions=20, concurrency=1, trace_memory=True)
+
+        report = asyncio.run(run())
+        report.publish()
+
+        assert report.errors == report.no_token_turns == 0
+        assert report.memory_growth_mb_per_1000_sessions <= budget("runtime_memory_mb_per_1000", 500)
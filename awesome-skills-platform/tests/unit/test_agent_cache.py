@@ -0,0 +1,69 @@
+"""
+Unit tests for the bounded agent cache.
+"""
+from unittest.mock import patch, MagicMock
+
+
+class TestAgentCache:
+    """Tests for AgentCache class."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at capacity."""
+        from src.core.agent_cache import AgentCache
+
+        cache = AgentCache(max_entries=2)
+        cache.put("a:1", "a", agent=MagicMock())
+        cache.put("a:2", "a", agent=MagicMock())
+        cache.get("a:1")
+        cache.put("b:1", "b", agent=MagicMock())
+
+        assert "a:1" in cache
+        assert "a:2" not in cache
+        assert "b:1" in cache
+        assert cache.stats()["evictions_lru"] == 1
+
+    def test_idle_eviction(self):
+        """Test that entries idle longer than the TTL are evicted."""
+        from src.core.agent_cache import AgentCache
+
+        cache = AgentCache(max_entries=10, idle_ttl_seconds=60)
+        with patch("src.core.agent_cache.time.monotonic", return_value=1000.0):
+            cache.put("a:1", "a", agent=MagicMock())
+        with patch("src.core.agent_cache.time.monotonic", return_value=1030.0):
+            cache.put("a:2", "a", agent=MagicMock())
+        with patch("src.core.agent_cache.time.monotonic", return_value=1070.0):
+            assert cache.get("a:1") is None
+            assert cache.get("a:2") is not None
+
+        stats = cache.stats()
+        assert stats["evictions_idle"] == 1
+        assert stats["size"] == 1
+
+    def test_invalidate_agent_uses_index(self):
+        """Test that invalidation removes only the agent's own sessions."""
+        from src.core.agent_cache import AgentCache
+
+        cache = AgentCache()
+        cache.put("a", "a", agent=MagicMock())
+        cache.put("a:1", "a", agent=MagicMock())
+        cache.put("ab:1", "ab", agent=MagicMock())
+
+        assert cache.invalidate_agent("a") == 2
+        assert len(cache) == 1
+        assert "ab:1" in cache
+        assert cache.invalidate_agent("a") == 0
+
+    def test_invalidate_mcp_removes_only_agents_using_it(self):
+        """Test that MCP invalidation removes only entries whose agent uses the server."""
+        from src.core.agent_cache import AgentCache
+
+        cache = AgentCache()
+        cache.put("a:1", "a", agent=MagicMock(), mcp_ids=("mcp1", "mcp2"))
+        cache.put("b:1", "b", agent=MagicMock(), mcp_ids=("mcp2",))
+        cache.put("c:1", "c", agent=MagicMock())
+
+        assert cache.invalidate_mcp("mcp1") == 1
+        assert "a:1" not in cache and "b:1" in cache and "c:1" in cache
+        # The removed entry no longer shows up under its other servers
+        assert cache.invalidate_mcp("mcp2") == 1
+        assert len(cache) == 1
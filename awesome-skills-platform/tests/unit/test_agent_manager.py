@@ -13,7 +13,7 @@ class TestAgentManager:
         from src.core.agent_manager import AgentManager
 
         manager = AgentManager()
-        assert manager._agents == {}
+        assert len(manager._agents) == 0
         assert manager._models == {}
         assert manager._skill_tool is None
         assert manager._skill_interceptor is None
@@ -154,6 +154,39 @@ class TestAgentManagerGetOrCreateAgent:
         assert mock_agent_class.call_count == 2
 
 
+    @patch("src.core.agent_manager.get_memory_manager")
+    @patch("src.core.agent_manager.Agent")
+    @patch("src.core.agent_manager.BedrockModel")
+    @patch("src.core.agent_manager.db_client")
+    def test_updated_config_invalidates_cached_agent(
+        self, mock_db, mock_bedrock, mock_agent_class, mock_memory
+    ):
+        """Test that a changed updatedAt rebuilds the agent for every session."""
+        config = {
+            "id": "versioned-agent",
+            "modelId": "claude-3",
+            "skillIds": [],
+            "mcpIds": [],
+            "updatedAt": "2025-01-01T00:00:00",
+        }
+        mock_db.get_agent.return_value = config
+        mock_agent_class.side_effect = lambda **kwargs: MagicMock()
+
+        from src.core.agent_manager import AgentManager
+
+        manager = AgentManager()
+        first = manager.get_or_create_agent("versioned-agent", session_id="s1")
+        manager.get_or_create_agent("versioned-agent", session_id="s2")
+        assert manager.get_or_create_agent("versioned-agent", session_id="s1") is first
+
+        mock_db.get_agent.return_value = {**config, "updatedAt": "2025-01-02T00:00:00"}
+        second = manager.get_or_create_agent("versioned-agent", session_id="s1")
+
+        assert second is not first
+        assert "versioned-agent:s2" not in manager._agents
+        assert mock_agent_class.call_count == 3
+
+
 class TestAgentManagerWithSkills:
     """Tests for agent creation with skills."""
 
@@ -244,19 +277,46 @@ class TestAgentManagerWithMCP:
 
         mock_mcp_client = MagicMock()
         mock_mcp_manager.get_mcp_client.return_value = mock_mcp_client
+        mock_mcp_manager.warm_up.return_value = {"mcp-calculator": None}
 
         from src.core.agent_manager import AgentManager
 
         manager = AgentManager()
         result = manager.get_or_create_agent("mcp-agent")
 
-        # Verify MCP client was requested
+        # Verify MCP servers were started before the client was requested
+        mock_mcp_manager.warm_up.assert_called_once_with(["mcp-calculator"])
         mock_mcp_manager.get_mcp_client.assert_called_once_with("mcp-calculator")
 
         # Verify agent was created with MCP client in tools
         call_kwargs = mock_agent_class.call_args.kwargs
         assert mock_mcp_client in call_kwargs.get("tools", [])
 
+    @patch("src.core.agent_manager.mcp_manager")
+    @patch("src.core.agent_manager.get_memory_manager")
+    @patch("src.core.agent_manager.Agent")
+    @patch("src.core.agent_manager.BedrockModel")
+    @patch("src.core.agent_manager.db_client")
+    def test_agent_skips_failed_mcp(
+        self, mock_db, mock_bedrock, mock_agent_class, mock_memory, mock_mcp_manager
+    ):
+        """Test an MCP server that fails to start is left out of the agent's tools."""
+        mock_db.get_agent.return_value = {
+            "id": "mcp-agent",
+            "modelId": "claude-3",
+            "skillIds": [],
+            "mcpIds": ["mcp-up", "mcp-down"],
+        }
+        mock_memory.return_value.create_session_manager.return_value = None
+        mock_mcp_manager.warm_up.return_value = {"mcp-up": None, "mcp-down": "connection refused"}
+
+        from src.core.agent_manager import AgentManager
+
+        manager = AgentManager()
+        manager.get_or_create_agent("mcp-agent")
+
+        mock_mcp_manager.get_mcp_client.assert_called_once_with("mcp-up")
+
 
 class TestAgentManagerRunAsync:
     """Tests for run_async method."""
@@ -354,14 +414,14 @@ class TestAgentManagerClearCache:
         from src.core.agent_manager import AgentManager
 
         manager = AgentManager()
-        manager._agents = {
-            "agent1": {"agent": MagicMock(), "model_id": "claude-3"},
-            "agent2": {"agent": MagicMock(), "model_id": "claude-3"},
-        }
+        manager._agents.put("agent1", "agent1", agent=MagicMock(), model_id="claude-3")
+        manager._agents.put("agent1:s1", "agent1", agent=MagicMock(), model_id="claude-3")
+        manager._agents.put("agent2", "agent2", agent=MagicMock(), model_id="claude-3")
 
         manager.clear_cache("agent1")
 
         assert "agent1" not in manager._agents
+        assert "agent1:s1" not in manager._agents
         assert "agent2" in manager._agents
 
     def test_clear_all_cache(self):
@@ -369,14 +429,12 @@ class TestAgentManagerClearCache:
         from src.core.agent_manager import AgentManager
 
         manager = AgentManager()
-        manager._agents = {
-            "agent1": {"agent": MagicMock(), "model_id": "claude-3"},
-        }
+        manager._agents.put("agent1", "agent1", agent=MagicMock(), model_id="claude-3")
         manager._models = {
             "claude-3": {"model": MagicMock(), "model_id": "claude-3"},
         }
 
         manager.clear_cache()
 
-        assert manager._agents == {}
+        assert len(manager._agents) == 0
         assert manager._models == {}
@@ -0,0 +1,118 @@
+"""
+Unit tests for the incremental context pruner.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+
+def _tool_result(*blocks) -> dict:
+    return {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "status": "success", "content": list(blocks)}}]}
+
+
+def _long_text(n: int) -> dict:
+    return {"text": f"{n}" * 2000}
+
+
+def _image() -> dict:
+    return {"image": {"format": "png", "source": {"bytes": b"..."}}}
+
+
+class Transcript:
+    """Feeds messages to a pruner the way the agent's hooks would."""
+
+    def __init__(self, pruner):
+        self.pruner = pruner
+        self.agent = SimpleNamespace(messages=[])
+
+    def add(self, message: dict) -> None:
+        self.agent.messages.append(message)
+        self.pruner.index_message(SimpleNamespace(agent=self.agent, message=message))
+
+    def model_call(self) -> int:
+        return self.pruner.prune(SimpleNamespace(agent=self.agent))
+
+
+@pytest.fixture
+def transcript():
+    from src.agentcore_runtime.context_pruner import ContextPruner
+
+    return Transcript(ContextPruner(window_size=2, text_length_threshold=100, redaction_batch=2,
+                                    images_to_keep=1, image_batch=1))
+
+
+def _texts(messages: list) -> list:
+    return [
+        block.get("text")
+        for message in messages
+        for item in message["content"]
+        for block in item["toolResult"]["content"]
+    ]
+
+
+class TestContextPruner:
+    """Tests for ContextPruner class."""
+
+    def test_redacts_old_texts_in_batches(self, transcript):
+        """Test long texts beyond the window are redacted a batch at a time."""
+        from src.agentcore_runtime.context_pruner import REDACTED_MARKER
+
+        for n in range(3):
+            transcript.add(_tool_result(_long_text(n)))
+        # One text over the window is less than a batch: nothing changes yet
+        assert transcript.model_call() == 0
+
+        transcript.add(_tool_result(_long_text(3)))
+        saved = transcript.model_call()
+
+        texts = _texts(transcript.agent.messages)
+        assert texts[0] == "0" * 100 + REDACTED_MARKER
+        assert texts[1] == "1" * 100 + REDACTED_MARKER
+        assert texts[2:] == ["2" * 2000, "3" * 2000]
+        assert saved == 2 * (500 - 30)
+
+    def test_replaces_old_images(self, transcript):
+        """Test images beyond images_to_keep are replaced by a placeholder."""
+        from src.agentcore_runtime.context_pruner import IMAGE_PLACEHOLDER
+
+        transcript.add(_tool_result({"text": "screenshot"}, _image()))
+        transcript.add(_tool_result(_image()))
+        transcript.model_call()
+
+        first, second = (m["content"][0]["toolResult"]["content"] for m in transcript.agent.messages)
+        assert first == [{"text": "screenshot"}, {"text": IMAGE_PLACEHOLDER}]
+        assert "image" in second[0]
+
+    def test_only_new_messages_are_indexed(self, transcript):
+        """Test adding a message does not rescan earlier ones."""
+        from src.agentcore_runtime import context_pruner
+
+        transcript.add(_tool_result(_long_text(0)))
+        scanned = []
+        original = context_pruner.ContextPruner._index
+        transcript.pruner._index = lambda message: (scanned.append(message), original(transcript.pruner, message))
+        for n in range(1, 4):
+            transcript.add(_tool_result(_long_text(n)))
+            transcript.model_call()
+
+        assert len(scanned) == 3
+
+    def test_reindexes_after_context_reduction(self, transcript):
+        """Test the index is rebuilt when the conversation manager replaces messages."""
+        for n in range(3):
+            transcript.add(_tool_result(_long_text(n)))
+        # A summarizing conversation manager swaps old messages for a summary
+        transcript.agent.messages[:2] = [{"role": "user", "content": [{"text": "summary"}]}]
+        transcript.model_call()
+
+        assert transcript.pruner.stats()["tracked_long_texts"] == 1
+
+    def test_reports_tokens_saved_per_turn(self, transcript):
+        """Test savings are accumulated per turn and reset after reporting."""
+        for n in range(4):
+            transcript.add(_tool_result(_long_text(n)))
+        saved = transcript.model_call()
+
+        assert transcript.pruner.report_turn() == saved > 0
+        assert transcript.pruner.report_turn() == 0
+        assert transcript.pruner.stats()["total_tokens_saved"] == saved
@@ -0,0 +1,222 @@
+"""
+Unit tests for the bounded conversation store.
+"""
+from unittest.mock import patch
+
+
+class TestConversationStore:
+    """Tests for ConversationStore class (memory only)."""
+
+    def test_append_caps_messages(self):
+        """Test only the most recent max_messages messages are kept."""
+        from src.core.conversation_store import ConversationStore
+
+        store = ConversationStore(max_messages=3)
+        for i in range(5):
+            store.append("conv-1", "user", f"message {i}", agent_id="agent-1")
+
+        messages, _ = store.get_messages("conv-1")
+        summary = store.get_summary("conv-1")
+
+        assert [m["content"] for m in messages] == ["message 2", "message 3", "message 4"]
+        assert summary["messageCount"] == 3
+        assert summary["title"] == "message 0"
+
+    def test_ttl_expiry(self):
+        """Test conversations expire ttl_seconds after their last update."""
+        from src.core.conversation_store import ConversationStore
+
+        store = ConversationStore(ttl_seconds=60)
+        with patch("src.core.conversation_store.time.time", return_value=1000.0):
+            store.append("conv-1", "user", "hello")
+        with patch("src.core.conversation_store.time.time", return_value=1061.0):
+            assert store.get_summary("conv-1") is None
+        assert store.stats()["evictions_ttl"] == 1
+
+    def test_list_summaries_paginates(self):
+        """Test summaries come newest first and pages chain by cursor."""
+        from src.core.conversation_store import ConversationStore
+
+        store = ConversationStore()
+        for i in range(5):
+            with patch("src.core.conversation_store.time.time", return_value=1000.0 + i):
+                store.append(f"conv-{i}", "user", "hi")
+
+        with patch("src.core.conversation_store.time.time", return_value=1010.0):
+            page1, cursor = store.list_summaries(limit=2)
+            page2, cursor2 = store.list_summaries(limit=2, cursor=cursor)
+            page3, cursor3 = store.list_summaries(limit=2, cursor=cursor2)
+
+        assert [s["id"] for s in page1 + page2 + page3] == [f"conv-{i}" for i in range(4, -1, -1)]
+        assert "messages" not in page1[0]
+        assert cursor3 is None
+
+    def test_message_pagination(self):
+        """Test messages are paged oldest first."""
+        from src.core.conversation_store import ConversationStore
+
+        store = ConversationStore()
+        for i in range(5):
+            store.append("conv-1", "user", str(i))
+
+        first, cursor = store.get_messages("conv-1", limit=3)
+        rest, end = store.get_messages("conv-1", cursor=cursor, limit=3)
+
+        assert [m["content"] for m in first] == ["0", "1", "2"]
+        assert [m["content"] for m in rest] == ["3", "4"]
+        assert end is None
+
+
+class TestConversationStoreSQLite:
+    """Tests for write-behind persistence to SQLite."""
+
+    def _store(self, path, **kwargs):
+        from src.core.conversation_store import ConversationStore
+        from src.database.conversations import SQLiteConversationBackend
+
+        return ConversationStore(backend=SQLiteConversationBackend(path), flush_interval_seconds=60, **kwargs)
+
+    def test_write_behind_round_trip(self, tmp_path):
+        """Test flushed conversations are loaded lazily by a new store."""
+        path = str(tmp_path / "conversations.db")
+        store = self._store(path, max_messages=3)
+        for i in range(4):
+            store.append("conv-1", "user", f"message {i}", agent_id="agent-1")
+        store.append("conv-1", "assistant", "answer", thinking=["hmm"])
+        store.close()
+
+        reopened = self._store(path, max_messages=3)
+        summary = reopened.get_summary("conv-1")
+        messages, _ = reopened.get_messages("conv-1")
+
+        assert summary["agentId"] == "agent-1"
+        assert summary["messageCount"] == 3
+        assert [m["content"] for m in messages] == ["message 2", "message 3", "answer"]
+        assert messages[-1]["thinking"] == ["hmm"]
+
+    def test_lru_eviction_keeps_unflushed_changes(self, tmp_path):
+        """Test a dirty conversation evicted from memory is still persisted."""
+        store = self._store(str(tmp_path / "conversations.db"), max_cached=1)
+        store.append("conv-1", "user", "first")
+        store.append("conv-2", "user", "second")
+
+        assert store.stats()["evictions_lru"] == 1
+        messages, _ = store.get_messages("conv-1")
+        assert [m["content"] for m in messages] == ["first"]
+
+        summaries, _ = store.list_summaries()
+        assert {s["id"] for s in summaries} == {"conv-1", "conv-2"}
+
+    def test_clear_and_delete(self, tmp_path):
+        """Test clear drops persisted messages and delete removes the conversation."""
+        store = self._store(str(tmp_path / "conversations.db"))
+        store.append("conv-1", "user", "hello")
+        store.flush()
+
+        assert store.clear("conv-1")
+        assert store.get_messages("conv-1")[0] == []
+
+        assert store.delete("conv-1")
+        assert store.get_summary("conv-1") is None
+        assert store.delete("conv-1") is False
+
+    async def test_append_async_loads_off_the_event_loop(self, tmp_path):
+        """Test a cache miss reads the backend on a worker thread."""
+        import threading
+
+        path = str(tmp_path / "conversations.db")
+        store = self._store(path)
+        store.append("conv-1", "user", "hello")
+        store.close()
+
+        reopened = self._store(path)
+        load_threads = []
+        original_load = reopened.backend.load
+
+        def load(conversation_id):
+            load_threads.append(threading.current_thread())
+            return original_load(conversation_id)
+
+        reopened.backend.load = load
+        summary = await reopened.append_async("conv-1", "assistant", "hi")
+
+        assert summary["messageCount"] == 2
+        assert load_threads and threading.main_thread() not in load_threads
+
+    def test_delete_during_flush_is_not_undone(self, tmp_path):
+        """Test a delete racing an in-flight flush leaves the conversation deleted."""
+        import threading
+
+        store = self._store(str(tmp_path / "conversations.db"))
+        store.append("conv-1", "user", "hello")
+        saving, release = threading.Event(), threading.Event()
+        original_save = store.backend.save
+
+        def save(batch):
+            saving.set()
+            release.wait(5)
+            original_save(batch)
+
+        store.backend.save = save
+        flusher = threading.Thread(target=store.flush)
+        flusher.start()
+        assert saving.wait(5)
+
+        deleter = threading.Thread(target=store.delete, args=("conv-1",))
+        deleter.start()
+        release.set()
+        flusher.join(5)
+        deleter.join(5)
+
+        assert store.backend.load("conv-1") is None
+        assert store.get_summary("conv-1") is None
+
+
+class TestConversationStoreDynamoDB:
+    """Tests for write-behind persistence to DynamoDB."""
+
+    def test_flush_with_two_updates_of_one_conversation(self, mock_aws_credentials):
+        """Test a conversation evicted while dirty, reloaded and changed again flushes in one batch."""
+        import json
+
+        import boto3
+        from moto import mock_aws
+        from src.core.conversation_store import ConversationStore
+        from src.database.conversations import DynamoDBConversationBackend
+
+        with mock_aws():
+            boto3.client("dynamodb", region_name="us-east-1").create_table(
+                TableName="conversations",
+                KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
+                AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"},
+                                      {"AttributeName": "sk", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            with patch("src.database.conversations.settings.aws_region", "us-east-1"), \
+                    patch("src.database.conversations.settings.dynamodb_endpoint_url", None):
+                backend = DynamoDBConversationBackend("conversations")
+
+            def reject_repeated_keys(params, **kwargs):
+                # DynamoDB rejects a BatchWriteItem naming a key twice; moto only
+                # rejects identical requests
+                keys = []
+                for requests in params["RequestItems"].values():
+                    for request in requests:
+                        item = request["PutRequest"]["Item"] if "PutRequest" in request else request["DeleteRequest"]["Key"]
+                        keys.append((json.dumps(item["pk"]), json.dumps(item["sk"])))
+                assert len(keys) == len(set(keys)), "Provided list of item keys contains duplicates"
+
+            backend.table.meta.client.meta.events.register(
+                "provide-client-params.dynamodb.BatchWriteItem", reject_repeated_keys
+            )
+            store = ConversationStore(backend=backend, max_cached=1, flush_interval_seconds=60)
+            store.append("conv-1", "user", "first")
+            # Evicts conv-1 while dirty, then reloads it from its pending update
+            store.append("conv-2", "user", "other")
+            store.append("conv-1", "assistant", "second")
+            store.flush()
+
+            assert store.stats()["flush_errors"] == 0
+            assert store.stats()["dirty"] == 0
+            assert backend.load("conv-1")["messageCount"] == 2
+            assert [m["content"] for m in backend.load_messages("conv-1")] == ["first", "second"]
@@ -1,6 +1,9 @@
 """
 Unit tests for MCP Manager.
 """
+import asyncio
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -29,7 +32,7 @@ class TestMCPManager:
             manager.get_mcp_client("nonexistent-mcp")
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     @patch("src.core.mcp_manager.streamablehttp_client")
     def test_get_mcp_client_http(self, mock_http_client, mock_mcp_client, mock_db):
         """Test get_mcp_client with HTTP connection type."""
@@ -53,7 +56,7 @@ class TestMCPManager:
         mock_mcp_client.assert_called_once()
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     @patch("src.core.mcp_manager.sse_client")
     def test_get_mcp_client_sse(self, mock_sse_client, mock_mcp_client, mock_db):
         """Test get_mcp_client with SSE connection type."""
@@ -76,7 +79,7 @@ class TestMCPManager:
         assert result == mock_client_instance
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     @patch("src.core.mcp_manager.stdio_client")
     def test_get_mcp_client_stdio(self, mock_stdio_client, mock_mcp_client, mock_db):
         """Test get_mcp_client with stdio connection type."""
@@ -117,7 +120,7 @@ class TestMCPManager:
             manager.get_mcp_client("unknown-mcp")
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     def test_get_mcp_client_cached(self, mock_mcp_client, mock_db):
         """Test get_mcp_client returns cached client."""
         from src.core.mcp_manager import MCPManager
@@ -139,7 +142,7 @@ class TestMCPManagerGetTools:
     """Tests for get_mcp_tools method."""
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     @patch("src.core.mcp_manager.streamablehttp_client")
     def test_get_mcp_tools_success(self, mock_http, mock_mcp_client, mock_db):
         """Test successful tool discovery."""
@@ -193,7 +196,7 @@ class TestMCPManagerTestConnection:
     """Tests for test_mcp_connection method."""
 
     @patch("src.core.mcp_manager.db_client")
-    @patch("src.core.mcp_manager.MCPClient")
+    @patch("src.core.mcp_manager.PooledMCPClient")
     @patch("src.core.mcp_manager.streamablehttp_client")
     def test_connection_success(self, mock_http, mock_mcp_client, mock_db):
         """Test successful connection test."""
@@ -267,3 +270,150 @@ class TestMCPManagerClearCache:
 
         assert manager._mcp_clients == {}
         assert manager._mcp_tools_cache == {}
+
+
+class TestMCPManagerPool:
+    """Tests for pooled client warm-up, backoff and call limits."""
+
+    @staticmethod
+    def _pooled_client(delay=0.0, tools=None, error=None):
+        """Build a mock MCPClient whose load_tools takes `delay` seconds."""
+        client = MagicMock()
+
+        async def load_tools():
+            time.sleep(delay)
+            if error:
+                raise error
+            return tools or [MagicMock()]
+
+        client.load_tools = load_tools
+        return client
+
+    def test_warm_up_starts_servers_concurrently(self):
+        """Test warm_up costs the slowest server, not the sum of all."""
+        from src.core.mcp_manager import MCPManager
+
+        manager = MCPManager()
+        manager.ping_interval = 0
+        for mcp_id in ("mcp1", "mcp2", "mcp3"):
+            manager._mcp_clients[mcp_id] = self._pooled_client(delay=0.2)
+
+        start = time.perf_counter()
+        errors = manager.warm_up(["mcp1", "mcp2", "mcp3"])
+        elapsed = time.perf_counter() - start
+
+        assert errors == {"mcp1": None, "mcp2": None, "mcp3": None}
+        assert elapsed < 0.5
+        assert len(manager._mcp_tools_cache["mcp1"]) == 1
+
+        # Running servers are not started again
+        start = time.perf_counter()
+        manager.warm_up(["mcp1", "mcp2", "mcp3"])
+        assert time.perf_counter() - start < 0.1
+
+    def test_warm_up_failure_backs_off(self):
+        """Test a failed server is skipped until its backoff elapses."""
+        from src.core.mcp_manager import MCPManager
+
+        manager = MCPManager()
+        manager.ping_interval = 0
+        manager.backoff_base = 60
+        manager._mcp_clients["down-mcp"] = self._pooled_client(error=RuntimeError("boom"))
+
+        errors = manager.warm_up(["down-mcp"])
+        assert "boom" in errors["down-mcp"]
+
+        errors = manager.warm_up(["down-mcp"])
+        assert "retrying in" in errors["down-mcp"]
+        assert manager.pool_stats()["servers"]["down-mcp"]["failures"] == 1
+
+    def test_check_health_restarts_dead_server(self):
+        """Test a server that stops answering is restarted by the health check."""
+        from src.core.mcp_manager import MCPManager
+
+        manager = MCPManager()
+        manager.ping_interval = 0
+        client = self._pooled_client()
+        manager._mcp_clients["flaky-mcp"] = client
+        manager.warm_up(["flaky-mcp"])
+
+        client.list_tools_sync.side_effect = RuntimeError("connection closed")
+        manager.check_health()
+
+        client.stop.assert_called_once()
+        assert manager.pool_stats()["servers"]["flaky-mcp"]["restarts"] == 1
+        assert "flaky-mcp" in manager._started
+
+    def test_max_concurrent_calls(self):
+        """Test tool calls to one server are capped at max_concurrent_calls."""
+        from src.core.mcp_manager import MCPClient, PooledMCPClient
+
+        in_flight = []
+        peak = []
+
+        async def call_tool_async(self, *args, **kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.pop()
+            return {"status": "success"}
+
+        client = PooledMCPClient(MagicMock(), max_concurrent_calls=2)
+
+        async def run():
+            return await asyncio.gather(
+                *(client.call_tool_async("id", "tool", {}) for _ in range(6))
+            )
+
+        with patch.object(MCPClient, "call_tool_async", call_tool_async):
+            results = asyncio.run(run())
+
+        assert len(results) == 6
+        assert max(peak) == 2
+        assert client.calls_in_flight == 0
+
+    def test_cancelled_wait_releases_its_slot(self):
+        """Test a call cancelled while waiting for a slot does not leak it."""
+        from src.core.mcp_manager import MCPClient, PooledMCPClient
+
+        release = None
+
+        async def call_tool_async(self, *args, **kwargs):
+            await release.wait()
+            return {"status": "success"}
+
+        client = PooledMCPClient(MagicMock(), max_concurrent_calls=1)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            running = asyncio.ensure_future(client.call_tool_async("a", "tool", {}))
+            waiting = asyncio.ensure_future(client.call_tool_async("b", "tool", {}))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            release.set()
+            await running
+            await asyncio.sleep(0.05)
+            # Both slots are free again: a new call runs straight away
+            return await asyncio.wait_for(client.call_tool_async("c", "tool", {}), timeout=1)
+
+        with patch.object(MCPClient, "call_tool_async", call_tool_async):
+            assert asyncio.run(run()) == {"status": "success"}
+
+    def test_invalidate_tools(self):
+        """Test invalidating the tool cache forces a re-list from the server."""
+        from src.core.mcp_manager import MCPManager
+
+        manager = MCPManager()
+        client = MagicMock()
+        client.list_tools_sync.return_value = [MagicMock(), MagicMock()]
+        manager._mcp_clients["pooled-mcp"] = client
+        manager._started.add("pooled-mcp")
+        manager._mcp_tools_cache["pooled-mcp"] = [MagicMock()]
+
+        manager.invalidate_tools("pooled-mcp")
+        tools = manager.get_mcp_tools("pooled-mcp")
+
+        assert len(tools) == 2
+        # Running pooled client is listed directly, not re-entered
+        client.__enter__.assert_not_called()
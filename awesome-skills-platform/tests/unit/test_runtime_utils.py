@@ -0,0 +1,142 @@
+"""
+Unit tests for the AgentCore runtime DynamoDB helpers.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+# The runtime modules use flat imports inside their container
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src", "agentcore_runtime")
+)
+
+
+class FakeTable:
+    """Local stand-in for a DynamoDB Table with blocking, network-like latency."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.items = {}
+        self.get_calls = 0
+        self._lock = threading.Lock()
+
+    def get_item(self, Key):
+        time.sleep(self.latency)
+        with self._lock:
+            self.get_calls += 1
+        item = self.items.get(Key["userId"])
+        return {"Item": item} if item else {}
+
+    def put_item(self, Item):
+        time.sleep(self.latency)
+        self.items[Item["userId"]] = Item
+
+    def delete_item(self, Key):
+        time.sleep(self.latency)
+        self.items.pop(Key["userId"], None)
+
+
+@pytest.fixture
+def runtime_utils():
+    """Import the runtime utils with a fake table and empty caches."""
+    import utils
+
+    table = FakeTable()
+    for i in range(200):
+        table.items[f"user-{i}"] = {"userId": f"user-{i}", "data": json.dumps({"server": {"url": f"u{i}"}})}
+    with patch.object(utils, "_table", return_value=table), \
+            patch.object(utils, "dynamodb_enabled", True):
+        utils._user_config_cache.clear()
+        utils._user_config_loads.clear()
+        yield utils
+        utils._user_config_cache.clear()
+
+
+async def _loop_lag_p99(work) -> float:
+    """
+    Run work while a ticker measures how late the event loop wakes it up.
+
+    Returns the 99th percentile rather than the max, so one scheduler hiccup
+    on a busy CI host does not fail the test; a blocking call shows up as a
+    run of late ticks.
+    """
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await work
+    done.set()
+    await task
+    lags.sort()
+    return lags[int(len(lags) * 0.99)]
+
+
+class TestUserServerConfigs:
+    """Tests for get_user_server_configs and the DynamoDB executor."""
+
+    def test_loop_stays_responsive_during_concurrent_loads(self, runtime_utils):
+        """Test 200 concurrent config loads do not block the event loop."""
+        async def start_loads():
+            # Requests arrive from separate connections over a few loop
+            # iterations; all 200 are still in flight together
+            loads = []
+            for i in range(200):
+                loads.append(asyncio.ensure_future(runtime_utils.get_user_server_configs(f"user-{i}")))
+                if i % 20 == 19:
+                    await asyncio.sleep(0)
+            return await asyncio.gather(*loads)
+
+        async def run():
+            loads = asyncio.ensure_future(start_loads())
+            lag = await _loop_lag_p99(loads)
+            return lag, await loads
+
+        lag, configs = asyncio.run(run())
+
+        assert lag < 0.005
+        assert configs[7] == {"server": {"url": "u7"}}
+        assert runtime_utils._table().get_calls == 200
+
+    def test_cache_and_shared_loads(self, runtime_utils):
+        """Test concurrent loads of one user share a request and later reads hit the cache."""
+        async def run():
+            first = await asyncio.gather(*(runtime_utils.get_user_server_configs("user-1") for _ in range(50)))
+            second = await runtime_utils.get_user_server_configs("user-1")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert runtime_utils._table().get_calls == 1
+        assert all(c == {"server": {"url": "u1"}} for c in first)
+        # Callers get copies, so mutating one does not corrupt the cache
+        second["other"] = {}
+        assert asyncio.run(runtime_utils.get_user_server_configs("user-1")) == {"server": {"url": "u1"}}
+
+    def test_save_invalidates_cache(self, runtime_utils):
+        """Test saving a server config is visible on the next read."""
+        async def run():
+            await runtime_utils.get_user_server_configs("user-2")
+            await runtime_utils.save_user_server_config("user-2", "new", {"url": "n"})
+            return await runtime_utils.get_user_server_configs("user-2")
+
+        assert asyncio.run(run()) == {"server": {"url": "u2"}, "new": {"url": "n"}}
+
+    def test_cache_expires(self, runtime_utils):
+        """Test cached configs are reloaded after the TTL."""
+        asyncio.run(runtime_utils.get_user_server_configs("user-3"))
+        with patch.object(runtime_utils.time, "monotonic", return_value=time.monotonic() + 3600):
+            asyncio.run(runtime_utils.get_user_server_configs("user-3"))
+
+        assert runtime_utils._table().get_calls == 2
@@ -6,6 +6,16 @@ import pytest
 from unittest.mock import patch, MagicMock, mock_open
 
 
+@pytest.fixture(autouse=True)
+def clear_skill_cache():
+    """Skill files and tools are cached per process; start each test empty."""
+    from src.skill_tool import clear_skill_cache
+
+    clear_skill_cache()
+    yield
+    clear_skill_cache()
+
+
 class TestInitSkills:
     """Tests for init_skills function."""
 
@@ -267,3 +277,188 @@ class TestSkillToolInterceptor:
         # Last message should have cachePoint
         last_content = mock_agent.messages[-1]["content"]
         assert any("cachePoint" in item for item in last_content)
+
+
+class TestSkillCacheAndDedup:
+    """Tests for the skill content cache, lazy sections and deduplicated injection."""
+
+    @pytest.fixture
+    def skills_root(self, tmp_path, monkeypatch):
+        """A skills directory with a small and a large skill."""
+        import src.skill_tool as skill_tool
+
+        small = tmp_path / "small"
+        small.mkdir()
+        (small / "SKILL.md").write_text("---\nname: small\ndescription: d\n---\n# Small\n\nDo it.\n")
+        large = tmp_path / "large"
+        large.mkdir()
+        (large / "SKILL.md").write_text(
+            "---\nname: large\ndescription: d\n---\n# Large\n\nIntro.\n\n"
+            "## First\n\n```bash\n## not a heading\n```\n" + "a" * 200 + "\n\n## Second\n\n" + "b" * 200 + "\n"
+        )
+        (large / "reference.md").write_text("Reference body")
+        monkeypatch.setattr(skill_tool, "SKILLS_ROOT", str(tmp_path))
+        monkeypatch.setattr(skill_tool, "SKILL_LAZY_THRESHOLD", 300)
+        skill_tool.clear_skill_cache()
+        yield tmp_path
+        skill_tool.clear_skill_cache()
+
+    def test_skill_file_read_once(self, skills_root):
+        """Test SKILL.md is read from disk once while unchanged."""
+        from src.skill_tool import load_skill
+
+        load_skill("small")
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            result = load_skill("small")
+
+        assert "Do it." in result[1]["text"]
+
+    def test_large_skill_loads_index_and_sections(self, skills_root):
+        """Test a large skill returns an overview with a section index, and sections on demand."""
+        from src.skill_tool import load_skill
+
+        overview = load_skill("large")[1]["text"]
+        section = load_skill("large#first")[1]["text"]
+        reference = load_skill("large/reference.md")[1]["text"]
+
+        assert "Intro." in overview and "large#First" in overview and "large#Second" in overview
+        assert "a" * 200 not in overview
+        assert "reference.md" in overview
+        assert section.startswith("## First") and "## not a heading" in section and "b" * 200 not in section
+        assert "Reference body" in reference
+
+    def test_reference_outside_skill_dir_rejected(self, skills_root):
+        """Test reference paths cannot escape the skill directory."""
+        from src.skill_tool import load_skill
+
+        result = load_skill("large/../small/SKILL.md")
+
+        assert len(result) == 1
+        assert "failed" in result[0]["text"]
+
+    @pytest.mark.parametrize("command", ["../x", "..", "../small/SKILL.md", "./small", "missing", "small\\..\\x"])
+    def test_skill_name_outside_skills_root_rejected(self, skills_root, command):
+        """Test skill names must be discovered skills, so commands cannot leave the skills tree."""
+        from src.skill_tool import load_skill
+
+        (skills_root.parent / "x").write_text("outside")
+        (skills_root.parent / "SKILL.md").write_text("---\nname: outside\n---\noutside\n")
+        result = load_skill(command)
+
+        assert len(result) == 1
+        assert "Unknown skill" in result[0]["text"]
+
+    def test_repeat_skill_use_gets_stub(self, skills_root):
+        """Test a skill already in the agent's context is not injected again."""
+        from src.skill_tool import SkillToolInterceptor
+
+        interceptor = SkillToolInterceptor()
+        agent = MagicMock()
+        agent.messages = []
+
+        def use_skill(tooluse_id):
+            interceptor.add_skill_content(MagicMock(
+                agent=agent, tool_use={"name": "Skill", "input": {"command": "small"}, "toolUseId": tooluse_id}
+            ))
+            message = {"role": "user", "content": [{"toolResult": {"toolUseId": tooluse_id}}]}
+            agent.messages.append(message)
+            interceptor.add_skill_message(MagicMock(agent=agent, message=message))
+            return message["content"][-1]["text"]
+
+        first = use_skill("t1")
+        second = use_skill("t2")
+        # Once the injected message leaves the context, the skill is loaded again
+        agent.messages.pop(0)
+        third = use_skill("t3")
+
+        assert "Do it." in first
+        assert "already loaded" in second and "Do it." not in second
+        assert "Do it." in third
+
+    def test_failed_skill_load_is_not_deduplicated(self, skills_root):
+        """Test a failed load is not recorded, so a retry loads the skill instead of a reminder."""
+        from src.skill_tool import SkillToolInterceptor
+
+        interceptor = SkillToolInterceptor()
+        agent = MagicMock()
+        agent.messages = []
+
+        def use_skill(tooluse_id):
+            interceptor.add_skill_content(MagicMock(
+                agent=agent, tool_use={"name": "Skill", "input": {"command": "small"}, "toolUseId": tooluse_id}
+            ))
+            message = {"role": "user", "content": [{"toolResult": {"toolUseId": tooluse_id}}]}
+            agent.messages.append(message)
+            interceptor.add_skill_message(MagicMock(agent=agent, message=message))
+            return message["content"][-1]["text"]
+
+        with patch("src.skill_tool._read_skill_file", side_effect=OSError("busy")):
+            first = use_skill("t1")
+        second = use_skill("t2")
+
+        assert "failed" in first
+        assert "Do it." in second
+
+
+SKILL_TOOL_COPIES = {
+    "platform": "src/skill_tool.py",
+    "runtime": "src/agentcore_runtime/skill_tool.py",
+    "demo": "../strands_skills_demo/skill_tool.py",
+}
+
+
+class TestSkillToolCopies:
+    """Tests for the load_skill guards in every copy of skill_tool.py."""
+
+    @pytest.fixture(params=sorted(SKILL_TOOL_COPIES))
+    def skill_tool(self, request, tmp_path, monkeypatch):
+        """One copy of the module, loaded from its file, with a skills directory holding one skill."""
+        import importlib.util
+        from pathlib import Path
+
+        path = Path(__file__).resolve().parents[2] / SKILL_TOOL_COPIES[request.param]
+        if not path.is_file():
+            pytest.skip(f"{path} is not checked out")
+        spec = importlib.util.spec_from_file_location(f"skill_tool_copy_{request.param}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        skills = tmp_path / "skills"
+        (skills / "small").mkdir(parents=True)
+        (skills / "small" / "SKILL.md").write_text("---\nname: small\ndescription: d\n---\n# Small\n\nDo it.\n")
+        (tmp_path / "secret.txt").write_text("outside")
+        (tmp_path / "SKILL.md").write_text("---\nname: outside\n---\noutside\n")
+        monkeypatch.setattr(module, "SKILLS_ROOT", str(skills))
+        module.clear_skill_cache()
+        return module
+
+    @pytest.mark.parametrize("command", ["../secret.txt", "..", "../small/SKILL.md", "./small", "small\\..\\x"])
+    def test_skill_name_outside_skills_root_rejected(self, skill_tool, command):
+        """Test no copy reads files outside its skills tree."""
+        result = skill_tool.load_skill(command)
+
+        assert len(result) == 1
+        assert "Unknown skill" in result[0]["text"]
+        assert "outside" not in result[0]["text"]
+
+    def test_failed_skill_load_is_not_deduplicated(self, skill_tool):
+        """Test no copy records a failed load as injected."""
+        interceptor = skill_tool.SkillToolInterceptor()
+        agent = MagicMock()
+        agent.messages = []
+
+        def use_skill(tooluse_id):
+            interceptor.add_skill_content(MagicMock(
+                agent=agent, tool_use={"name": "Skill", "input": {"command": "small"}, "toolUseId": tooluse_id}
+            ))
+            message = {"role": "user", "content": [{"toolResult": {"toolUseId": tooluse_id}}]}
+            agent.messages.append(message)
+            interceptor.add_skill_message(MagicMock(agent=agent, message=message))
+            return message["content"][-1]["text"]
+
+        with patch.object(skill_tool, "_read_skill_file", side_effect=OSError("busy")):
+            first = use_skill("t1")
+        second = use_skill("t2")
+
+        assert "failed" in first
+        assert "Do it." in second
@@ -0,0 +1,81 @@
+"""
+Unit tests for the coalescing SSE writer.
+"""
+import json
+from unittest.mock import patch
+
+
+def _payloads(sse: str) -> list:
+    """Decode every data frame in an SSE string."""
+    return [json.loads(line[len("data: "):]) for line in sse.split("\n\n") if line]
+
+
+class TestSSEWriter:
+    """Tests for SSEWriter class."""
+
+    def test_envelope_matches_full_frame(self):
+        """Test prefix + encoded text + suffix equals encoding the whole payload."""
+        from src.agentcore_runtime.sse_writer import SLOT, dumps, envelope, frame
+
+        prefix, suffix = envelope({"type": "text", "content": SLOT})
+        text = 'héllo "world"\n'
+
+        assert prefix + dumps(text) + suffix == frame({"type": "text", "content": text})
+
+    def test_coalesces_burst_of_deltas(self):
+        """Test deltas inside the flush interval are sent as one frame."""
+        from src.agentcore_runtime.sse_writer import SLOT, SSEWriter, envelope
+
+        writer = SSEWriter({"text": envelope({"type": "text", "content": SLOT})}, flush_interval_ms=50)
+        with patch("src.agentcore_runtime.sse_writer.time.monotonic", return_value=100.0):
+            # First delta goes out at once, the rest of the burst is held
+            first = writer.delta("text", "Hel")
+            held = [writer.delta("text", chunk) for chunk in ("lo", ", ", "world")]
+        with patch("src.agentcore_runtime.sse_writer.time.monotonic", return_value=100.06):
+            later = writer.delta("text", "!")
+
+        assert _payloads(first) == [{"type": "text", "content": "Hel"}]
+        assert held == ["", "", ""]
+        assert _payloads(later) == [{"type": "text", "content": "lo, world!"}]
+
+    def test_size_limit_flushes(self):
+        """Test reaching flush_bytes emits the buffer without waiting."""
+        from src.agentcore_runtime.sse_writer import SLOT, SSEWriter, envelope
+
+        writer = SSEWriter(
+            {"text": envelope({"type": "text", "content": SLOT})}, flush_interval_ms=1000, flush_bytes=8
+        )
+        writer.delta("text", "a")
+        assert writer.delta("text", "bcd") == ""
+        assert _payloads(writer.delta("text", "efghij")) == [{"type": "text", "content": "bcdefghij"}]
+
+    def test_boundaries_flush_in_order(self):
+        """Test kind switches and events flush buffered text before themselves."""
+        from src.agentcore_runtime.sse_writer import SLOT, SSEWriter, envelope
+
+        writer = SSEWriter(
+            {kind: envelope({"type": kind, "content": SLOT}) for kind in ("text", "thinking")},
+            flush_interval_ms=1000,
+        )
+        out = writer.delta("thinking", "hmm")
+        out += writer.delta("thinking", "...")
+        out += writer.delta("text", "Answer")
+        out += writer.delta("text", " is 42")
+        out += writer.event({"type": "tool_use", "tool": {"name": "calc"}})
+        out += writer.flush()
+
+        assert _payloads(out) == [
+            {"type": "thinking", "content": "hmm"},
+            {"type": "thinking", "content": "..."},
+            {"type": "text", "content": "Answer is 42"},
+            {"type": "tool_use", "tool": {"name": "calc"}},
+        ]
+
+    def test_zero_interval_sends_every_delta(self):
+        """Test flush_interval_ms=0 disables coalescing."""
+        from src.agentcore_runtime.sse_writer import SLOT, SSEWriter, envelope
+
+        writer = SSEWriter({"text": envelope({"type": "text", "content": SLOT})}, flush_interval_ms=0)
+        out = "".join(writer.delta("text", chunk) for chunk in ("a", "b", "c"))
+
+        assert [p["content"] for p in _payloads(out)] == ["a", "b", "c"]
@@ -0,0 +1,152 @@
+"""
+Unit tests for the token-budget conversation manager.
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _assistant(text: str) -> dict:
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def _tool_turn(output: str) -> list:
+    return [
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t", "name": "search", "input": {"q": "x"}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "status": "success", "content": [{"text": output}]}}]},
+    ]
+
+
+def _dialogue(turns: int, chars: int = 400) -> list:
+    messages = []
+    for n in range(turns):
+        messages += [_user(f"question {n} " + "q" * chars), _assistant(f"answer {n} " + "a" * chars)]
+    return messages
+
+
+class TestTokenEstimate:
+    """Tests for the token estimate helpers."""
+
+    def test_ascii_and_cjk_text(self):
+        """Test ASCII counts ~4 chars per token and CJK ~1 char per token."""
+        from src.agentcore_runtime.token_budget_manager import estimate_text_tokens
+
+        assert estimate_text_tokens("a" * 400) == 100
+        assert estimate_text_tokens("你好世界" * 25) == 100
+        assert estimate_text_tokens("hello 你好") == 2 + 2
+
+    def test_estimate_is_cached_until_content_changes(self):
+        """Test a message is re-estimated only when its content list changes."""
+        from src.agentcore_runtime import token_budget_manager
+        from src.agentcore_runtime.token_budget_manager import TokenBudgetConversationManager
+
+        manager = TokenBudgetConversationManager()
+        message = _user("hello")
+        with patch.object(
+            token_budget_manager, "estimate_message_tokens", wraps=token_budget_manager.estimate_message_tokens
+        ) as estimate:
+            first = manager.message_tokens(message)
+            manager.message_tokens(message)
+            message["content"].append({"text": "more text"})
+            second = manager.message_tokens(message)
+
+        assert estimate.call_count == 2
+        assert second > first
+
+
+class TestTokenBudgetConversationManager:
+    """Tests for TokenBudgetConversationManager class."""
+
+    def test_no_reduction_under_budget(self):
+        """Test a short chat is left alone and the summarizer is not called."""
+        from src.agentcore_runtime.token_budget_manager import TokenBudgetConversationManager
+
+        summarizer = MagicMock()
+        manager = TokenBudgetConversationManager(max_tokens=10_000, summarization_agent=summarizer)
+        agent = SimpleNamespace(messages=_dialogue(20))
+        manager.apply_management(agent)
+
+        assert len(agent.messages) == 40
+        summarizer.assert_not_called()
+
+    def test_truncates_tool_results_before_dialogue(self):
+        """Test a large old tool result is truncated and all turns are kept."""
+        from src.agentcore_runtime.token_budget_manager import TRUNCATED_MARKER, TokenBudgetConversationManager
+
+        manager = TokenBudgetConversationManager(max_tokens=3000, preserve_recent_messages=2)
+        messages = [_user("find it")] + _tool_turn("r" * 40_000) + [_assistant("found")] + _dialogue(2)
+        agent = SimpleNamespace(messages=messages)
+        manager.apply_management(agent)
+
+        assert len(agent.messages) == 8
+        result = agent.messages[2]["content"][0]["toolResult"]["content"][0]["text"]
+        assert result.endswith(TRUNCATED_MARKER) and len(result) < 1000
+        assert manager.total_tokens(agent.messages) <= manager.target_tokens
+
+    def test_evicts_oldest_turns_at_user_boundary(self):
+        """Test dialogue is evicted from the front, keeping a user message first."""
+        from src.agentcore_runtime.token_budget_manager import TokenBudgetConversationManager
+
+        manager = TokenBudgetConversationManager(max_tokens=1500, preserve_recent_messages=4)
+        agent = SimpleNamespace(messages=_dialogue(12))
+        manager.apply_management(agent)
+
+        assert agent.messages[0]["role"] == "user"
+        assert agent.messages[-1]["content"][0]["text"].startswith("answer 11")
+        assert manager.total_tokens(agent.messages) <= manager.target_tokens
+        assert manager.removed_message_count == 24 - len(agent.messages)
+
+    def test_summarizes_evicted_turns(self):
+        """Test evicted turns are folded into a summary on the first kept message."""
+        from src.agentcore_runtime.token_budget_manager import SUMMARY_PREFIX, TokenBudgetConversationManager
+
+        summarizer = MagicMock(return_value="they talked about questions")
+        manager = TokenBudgetConversationManager(max_tokens=1500, summarization_agent=summarizer)
+        agent = SimpleNamespace(messages=_dialogue(12))
+        manager.apply_management(agent)
+
+        summarizer.assert_called_once()
+        assert "question 0" in summarizer.call_args.args[0]
+        assert agent.messages[0]["content"][0]["text"] == SUMMARY_PREFIX + "they talked about questions"
+        assert summarizer.messages == []
+
+    def test_overflow_without_anything_to_remove_raises(self):
+        """Test a context overflow is re-raised when the history cannot shrink."""
+        from strands.types.exceptions import ContextWindowOverflowException
+        from src.agentcore_runtime.token_budget_manager import TokenBudgetConversationManager
+
+        manager = TokenBudgetConversationManager(max_tokens=10)
+        agent = SimpleNamespace(messages=[_user("x" * 1000)])
+
+        with pytest.raises(ContextWindowOverflowException):
+            manager.reduce_context(agent, e=ContextWindowOverflowException("too long"))
+
+    def test_accepts_message_list(self):
+        """Test the pre-0.2 strands signature that passes the message list."""
+        from src.agentcore_runtime.token_budget_manager import TokenBudgetConversationManager
+
+        manager = TokenBudgetConversationManager(max_tokens=1500)
+        messages = _dialogue(12)
+        manager.apply_management(messages)
+
+        assert len(messages) < 24
+
+
+class TestVendoredCopies:
+    """Tests for the copies of the module in the other apps."""
+
+    def test_copies_match_canonical_module(self):
+        """Test every copy is identical to src/agentcore_runtime (run scripts/sync_token_budget_manager.py)."""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        script = Path(__file__).resolve().parents[2] / "scripts" / "sync_token_budget_manager.py"
+        result = subprocess.run([sys.executable, str(script), "--check"], capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
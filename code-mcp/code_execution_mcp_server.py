@@ -20,6 +20,10 @@ Key benefits:
 - Skill persistence and reusability
 """
 
+# Times the imports below when STARTUP_PROFILE=1
+import startup_profile
+startup_profile.start()
+
 import os
 import sys
 import json
@@ -34,6 +38,8 @@ import inspect
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+startup_profile.mark("imports")
+
 # Initialize FastMCP server
 mcp_server = FastMCP("code-execution-mcp-server")
 
@@ -639,6 +645,9 @@ if __name__ == "__main__":
     logger.info(f"Skills Directory: {SKILLS_DIR}")
     logger.info("=" * 60)
 
+    startup_profile.mark("server setup")
+    startup_profile.report()
+
     # Run the server
     logger.info("Starting MCP server...")
     mcp_server.run()
@@ -0,0 +1,132 @@
+"""
+Startup profiling for cold-start work.
+
+With STARTUP_PROFILE=1, start() hooks the import statement to time every
+module imported after it, nested so the report is a tree, and mark()/phase()
+time the server's init steps. report() logs both and returns the text.
+Without the variable start() and report() do nothing, and mark()/phase() only
+record a timestamp.
+
+Call start() right after importing this module, before the server's other
+imports:
+
+    import startup_profile
+    startup_profile.start()
+    ...
+    startup_profile.mark("imports")
+"""
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+# Imports faster than this are left out of the report
+MIN_IMPORT_MS = float(os.environ.get("STARTUP_PROFILE_MIN_MS", "5"))
+MAX_IMPORT_DEPTH = int(os.environ.get("STARTUP_PROFILE_DEPTH", "4"))
+
+_started_at = time.perf_counter()
+_last_mark = _started_at
+# (name, seconds) of marks and phases, in order
+phases: list = []
+
+
+class _ImportNode:
+    __slots__ = ("name", "seconds", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.children = []
+
+
+_root = _ImportNode("<startup>")
+_stack = [_root]
+_original_import = None
+_thread_id = None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only first imports on the starting thread; relative imports are
+    # attributed to the importing module
+    if level or name in sys.modules or threading.get_ident() != _thread_id:
+        return _original_import(name, globals, locals, fromlist, level)
+    node = _ImportNode(name)
+    _stack[-1].children.append(node)
+    _stack.append(node)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        node.seconds = time.perf_counter() - start
+        _stack.pop()
+
+
+def start() -> None:
+    """Start timing imports if STARTUP_PROFILE is set."""
+    global _original_import, _thread_id, _started_at, _last_mark
+    if not ENABLED or _original_import is not None:
+        return
+    _original_import = builtins.__import__
+    _thread_id = threading.get_ident()
+    _started_at = _last_mark = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def stop() -> None:
+    """Stop timing imports."""
+    global _original_import
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
+
+
+def mark(name: str) -> float:
+    """Record the time since the previous mark (or start) as phase `name`."""
+    global _last_mark
+    now = time.perf_counter()
+    seconds = now - _last_mark
+    _last_mark = now
+    phases.append((name, seconds))
+    return seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as phase `name`; logged when profiling."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        phases.append((name, seconds))
+        if ENABLED:
+            logger.info(f"[startup] {name}: {seconds * 1000:.1f} ms")
+
+
+def _import_lines(node: _ImportNode, depth: int, lines: list) -> None:
+    for child in sorted(node.children, key=lambda n: n.seconds, reverse=True):
+        if child.seconds * 1000 < MIN_IMPORT_MS:
+            continue
+        lines.append(f"{child.seconds * 1000:9.1f} ms {'  ' * depth}{child.name}")
+        if depth < MAX_IMPORT_DEPTH:
+            _import_lines(child, depth + 1, lines)
+
+
+def report() -> str:
+    """Stop timing imports, then log and return the import tree and phases."""
+    if not ENABLED:
+        return ""
+    stop()
+    lines = [f"[startup] {(time.perf_counter() - _started_at) * 1000:.1f} ms since start", "imports:"]
+    _import_lines(_root, 1, lines)
+    lines.append("phases:")
+    lines += [f"{seconds * 1000:9.1f} ms   {name}" for name, seconds in phases]
+    text = "\n".join(lines)
+    logger.info(text)
+    return text
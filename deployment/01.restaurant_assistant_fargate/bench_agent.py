@@ -0,0 +1,89 @@
+"""
+Benchmark of the per-request agent setup in docker/app/app.py.
+
+Measures, without calling Bedrock or DynamoDB:
+
+- per-request: a new BedrockModel (boto3 client) and tool registry for every
+  request, as the app used to do;
+- cold: a pool miss, an Agent built on the shared model and tools;
+- warm: a pool hit, the session's idle agent checked out and back in.
+
+Loading a session from DynamoDB on a pool miss is not included. Run it where
+the task's AWS credentials resolve (e.g. a task or an instance role) to see
+the credential lookup that every request used to pay.
+
+Usage:
+    python bench_agent.py --iterations 200 --history 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "docker", "app"))
+
+import app  # noqa: E402
+from session import SessionWindow  # noqa: E402
+
+
+def make_history(turns: int) -> list:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": [{"text": f"Question {i} about the menu at Nonna?"}]})
+        history.append({"role": "assistant", "content": [{"text": f"Restaurant Helper here, answer {i}. " * 10}]})
+    return history
+
+
+def per_request(history: list):
+    """The old setup: model, client and tools built on every request."""
+    model = app.create_model()
+    return app.Agent(
+        model=model,
+        messages=list(history),
+        conversation_manager=app.TokenBudgetConversationManager(max_tokens=app.CONTEXT_TOKEN_BUDGET),
+        system_prompt=app.system_prompt,
+        tools=[
+            app.retrieve, app.current_time, app.get_booking_details, app.request_confirm,
+            app.create_booking, app.delete_booking,
+        ],
+    )
+
+
+def cold(history: list):
+    return app.create_agent("bench", list(history))
+
+
+def measure(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--history", type=int, default=20, help="Turns of history per session")
+    args = parser.parse_args()
+
+    history = make_history(args.history)
+    window = SessionWindow("bench", 1, list(history))
+    pool = app.AgentPool(max_size=1, is_current=lambda w: True)
+    pool.checkin(cold(history), window)
+
+    def warm():
+        agent, w = pool.checkout("bench")
+        pool.checkin(agent, w)
+
+    for name, fn in (("per-request", lambda: per_request(history)), ("cold", lambda: cold(history)), ("warm", warm)):
+        samples = measure(fn, args.iterations)
+        print(f"{name:12} p50 {statistics.median(samples):8.3f}ms  "
+              f"p99 {sorted(samples)[int(0.99 * (len(samples) - 1))]:8.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Admission control for agent invocations.
+
+Each invocation holds a Bedrock stream and a few worker threads for tens of
+seconds. Without a bound, a burst of requests piles up threads until every
+request on the task is slow, including the ALB health check. The
+AdmissionController runs at most `max_concurrent` invocations at a time,
+lets up to `max_queued` more wait for a slot for `queue_timeout` seconds,
+and rejects the rest straight away with Overloaded (a 429 in app.py).
+
+The controller is per process: with several uvicorn workers the limits
+apply to each worker.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when an invocation cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Slot:
+    """An admitted invocation. release() may be called more than once."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """
+    Bounds concurrent invocations with a semaphore and a short wait queue.
+
+    Args:
+        max_concurrent: invocations allowed to run at the same time
+        max_queued: requests allowed to wait for a slot; 0 rejects as soon
+            as all slots are busy
+        queue_timeout: seconds a queued request waits before it is rejected
+    """
+
+    # Retry-After hint for rejected requests, in seconds
+    retry_after = 5
+
+    def __init__(self, max_concurrent: int, max_queued: int = 0, queue_timeout: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> Slot:
+        """Wait for a slot, or raise Overloaded if the queue is full or the wait times out."""
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queued:
+                self.rejected += 1
+                raise Overloaded("Too many concurrent requests", retry_after=self.retry_after)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise Overloaded("Timed out waiting for a free slot", retry_after=self.retry_after)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.running += 1
+        return Slot(self)
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def admit(self):
+        """Run the body in an admitted slot."""
+        slot = await self.acquire()
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+        }
@@ -0,0 +1,78 @@
+"""
+Pool of warm per-session agents.
+
+Building an agent means loading the session and setting up its history and
+conversation manager. Between turns of a conversation the agent is kept
+here, keyed by session id, so the next turn on this task reuses it without
+touching DynamoDB.
+
+An agent is checked out for the length of a turn and checked back in once
+the turn is saved; a concurrent request for the same session finds no idle
+agent and builds its own from the store, so one agent never runs two turns
+at once. A pooled agent is only reused while the session store still has
+its version cached: after the session cache TTL, or a turn written by
+another task or request, it is dropped and rebuilt from the store.
+
+The pool is per process and only used from the event loop, so it needs no
+lock.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from session import SessionWindow
+
+logger = logging.getLogger(__name__)
+
+
+class AgentPool:
+    """
+    Bounded LRU of idle agents with the session windows they were built from.
+
+    Args:
+        max_size: idle agents kept; the least recently used is dropped first
+        is_current: tells whether a window is still the latest version of its
+            session (SessionStore.is_current)
+    """
+
+    def __init__(self, max_size: int, is_current: Callable[[SessionWindow], bool]):
+        self.max_size = max_size
+        self.is_current = is_current
+        self._idle: OrderedDict[str, tuple[Any, SessionWindow]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def checkout(self, session_id: str) -> Optional[tuple[Any, SessionWindow]]:
+        """Take the idle agent of a session, or None if there is no usable one."""
+        entry = self._idle.pop(session_id, None)
+        if entry is not None and not self.is_current(entry[1]):
+            logger.debug(f"Pooled agent for session {session_id} is stale, rebuilding")
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def checkin(self, agent: Any, window: SessionWindow) -> None:
+        """Return an agent whose turn was saved; it is kept only if still current."""
+        if not self.is_current(window):
+            return
+        current = self._idle.get(window.session_id)
+        if current is not None and current[1].version > window.version:
+            return
+        self._idle[window.session_id] = (agent, window)
+        self._idle.move_to_end(window.session_id)
+        while len(self._idle) > self.max_size:
+            self._idle.popitem(last=False)
+
+    def discard(self, session_id: str) -> None:
+        self._idle.pop(session_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
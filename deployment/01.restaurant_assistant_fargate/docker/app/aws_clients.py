@@ -0,0 +1,159 @@
+"""
+Shared AWS clients and cached SSM parameters.
+
+Creating a boto3 client resolves credentials and the endpoint and opens a
+new connection pool, so tools that create clients per call pay for it on
+every invocation. get_client() creates each client once per process, on
+first use, and hands the same instance to every thread; boto3 clients are
+thread-safe, unlike boto3 resources and the default session, which is why
+the tools use clients and a dedicated session created under a lock.
+
+get_parameter() caches SSM parameter values for SSM_PARAMETER_TTL seconds.
+A value read in the last part of its TTL (after SSM_PARAMETER_REFRESH_AHEAD
+of it) is returned straight away and refreshed in the background, so hot
+parameters never wait on SSM. If SSM fails the last known value is kept.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+SSM_PARAMETER_TTL = float(os.environ.get("SSM_PARAMETER_TTL", "300"))
+# Fraction of the TTL after which a read triggers a background refresh
+SSM_PARAMETER_REFRESH_AHEAD = float(os.environ.get("SSM_PARAMETER_REFRESH_AHEAD", "0.8"))
+# Connections per client; tools run on the agent threads
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "32"))
+
+# Prefix of the SSM parameters written by prereqs/
+KB_NAME = os.environ.get("KB_NAME", "restaurant-assistant")
+DEFAULT_BOOKING_TABLE_NAME = "restaurant-assistant-bookings"
+
+_client_config = Config(
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    retries=dict(max_attempts=3, mode="standard"),
+)
+_clients: dict = {}
+_clients_lock = threading.Lock()
+_session: Optional[boto3.session.Session] = None
+
+
+def get_client(service_name: str):
+    """The process-wide boto3 client for a service, created on first use."""
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+    global _session
+    with _clients_lock:
+        client = _clients.get(service_name)
+        if client is None:
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(service_name, config=_client_config)
+            _clients[service_name] = client
+        return client
+
+
+class ParameterCache:
+    """
+    SSM parameter values cached with a TTL and refreshed ahead of expiry.
+
+    Args:
+        ttl: seconds a value is used before it must be read again
+        refresh_ahead: fraction of the TTL after which reads refresh the
+            value in the background while returning the cached one
+        fetch: function reading a parameter value, by name
+    """
+
+    def __init__(self, ttl: float = SSM_PARAMETER_TTL, refresh_ahead: float = SSM_PARAMETER_REFRESH_AHEAD, fetch=None):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.fetch = fetch or _fetch_parameter
+        # name -> (value, fetched_at)
+        self._values: dict[str, tuple[str, float]] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> str:
+        """The value of a parameter; raises only if it was never read successfully."""
+        cached = self._values.get(name)
+        if cached is not None:
+            age = time.monotonic() - cached[1]
+            if age < self.ttl * self.refresh_ahead:
+                return cached[0]
+            if age < self.ttl:
+                self._refresh_in_background(name)
+                return cached[0]
+        try:
+            return self._load(name)
+        except Exception:
+            if cached is None:
+                raise
+            logger.exception(f"Failed to refresh SSM parameter {name}, keeping the cached value")
+            # Keep serving it; later reads retry in the background
+            with self._lock:
+                self._values[name] = (cached[0], time.monotonic() - self.ttl * self.refresh_ahead)
+            return cached[0]
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
+
+    def _load(self, name: str) -> str:
+        value = self.fetch(name)
+        with self._lock:
+            self._values[name] = (value, time.monotonic())
+        return value
+
+    def _refresh_in_background(self, name: str) -> None:
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def refresh():
+            try:
+                self._load(name)
+            except Exception:
+                logger.exception(f"Background refresh of SSM parameter {name} failed")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=refresh, name=f"ssm-refresh-{name}", daemon=True).start()
+
+
+def _fetch_parameter(name: str) -> str:
+    response = get_client('ssm').get_parameter(Name=name, WithDecryption=True)
+    return response['Parameter']['Value']
+
+
+parameter_cache = ParameterCache()
+
+
+def get_parameter(name: str) -> str:
+    """The cached value of an SSM parameter."""
+    return parameter_cache.get(name)
+
+
+def booking_table_name() -> str:
+    """
+    The bookings table: BOOKING_TABLE_NAME if set, else the name prereqs/
+    stored in SSM, else the default table name.
+    """
+    name = os.environ.get("BOOKING_TABLE_NAME")
+    if name:
+        return name
+    try:
+        return get_parameter(f'{KB_NAME}-table-name')
+    except Exception as e:
+        logger.warning(f"Could not read the booking table name from SSM, using {DEFAULT_BOOKING_TABLE_NAME}: {e}")
+        return DEFAULT_BOOKING_TABLE_NAME
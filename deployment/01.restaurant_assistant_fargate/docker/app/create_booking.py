@@ -1,7 +1,6 @@
 from strands import tool
-import boto3
 import uuid
-table_name = "restaurant-assistant-bookings"
+from aws_clients import get_client, booking_table_name
 
 @tool
 def request_confirm(date: str, hour: str, restaurant_name:str, guest_name: str, num_guests: int) ->str:
@@ -41,22 +40,19 @@ def create_booking(date: str, hour: str, restaurant_name:str, guest_name: str, n
         Status of booking
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-
-
         results = f"Creating reservation for {num_guests} people at {restaurant_name}, {date} at {hour} in the name of {guest_name}"
         print(results)
         booking_id = str(uuid.uuid4())[:8]
-        response = table.put_item(
+        response = get_client('dynamodb').put_item(
+            TableName=booking_table_name(),
             Item={
-                'booking_id': booking_id,
-                'restaurant_name': restaurant_name,
-                'date': date,
-                'name': guest_name,
-                'hour': hour,
-                'num_guests': num_guests,
-                # 'status':'pending'
+                'booking_id': {'S': booking_id},
+                'restaurant_name': {'S': restaurant_name},
+                'date': {'S': date},
+                'name': {'S': guest_name},
+                'hour': {'S': hour},
+                'num_guests': {'N': str(num_guests)},
+                # 'status': {'S': 'pending'}
             }
         )
         if response['ResponseMetadata']['HTTPStatusCode'] == 200:
@@ -1,6 +1,5 @@
 from strands import tool
-import boto3 
-table_name = "restaurant-assistant-bookings"
+from aws_clients import get_client, booking_table_name
 
 @tool
 def delete_booking(booking_id: str, restaurant_name:str) -> str:
@@ -13,9 +12,10 @@ def delete_booking(booking_id: str, restaurant_name:str) -> str:
         confirmation_message: confirmation message
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        response = table.delete_item(Key={'booking_id': booking_id, 'restaurant_name': restaurant_name})
+        response = get_client('dynamodb').delete_item(
+            TableName=booking_table_name(),
+            Key={'booking_id': {'S': booking_id}, 'restaurant_name': {'S': restaurant_name}},
+        )
         if response['ResponseMetadata']['HTTPStatusCode'] == 200:
             return f'Booking with ID {booking_id} deleted successfully'
         else:
@@ -1,5 +1,26 @@
 from strands import tool
-import boto3 
+import time
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from aws_clients import get_client, booking_table_name
+
+# BatchGetItem reads at most 100 keys per call
+BATCH_GET_SIZE = 100
+# Attempts to read keys DynamoDB returned as unprocessed (throttling)
+BATCH_GET_ATTEMPTS = 4
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _booking_key(booking_id: str, restaurant_name: str) -> dict:
+    return {
+        'booking_id': _serializer.serialize(booking_id),
+        'restaurant_name': _serializer.serialize(restaurant_name),
+    }
+
+
+def _deserialize(item: dict) -> dict:
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
 
 
 @tool
@@ -13,24 +34,52 @@ def get_booking_details(booking_id:str, restaurant_name:str) -> dict:
         booking_details: the details of the booking in JSON format
     """
     try:
-        kb_name = 'restaurant-assistant'
-        dynamodb = boto3.resource('dynamodb')
-        smm_client = boto3.client('ssm')
-        table_name = smm_client.get_parameter(
-            Name=f'{kb_name}-table-name',
-            WithDecryption=False
-        )
-        table = dynamodb.Table(table_name["Parameter"]["Value"])
-        response = table.get_item(
-            Key={
-                'booking_id': booking_id, 
-                'restaurant_name': restaurant_name
-            }
+        response = get_client('dynamodb').get_item(
+            TableName=booking_table_name(),
+            Key=_booking_key(booking_id, restaurant_name),
         )
         if 'Item' in response:
-            return response['Item']
+            return _deserialize(response['Item'])
         else:
             return f'No booking found with ID {booking_id}'
     except Exception as e:
         print(e)
         return str(e)
+
+
+@tool
+def get_bookings_details(bookings: list[dict]) -> dict:
+    """Get the details of several bookings at once. Use it instead of get_booking_details
+    when the customer asks about more than one booking.
+    Args:
+        bookings: the bookings to look up, each as {"booking_id": ..., "restaurant_name": ...}
+
+    Returns:
+        booking_details: the details of each booking in JSON format, by booking_id
+    """
+    try:
+        table_name = booking_table_name()
+        client = get_client('dynamodb')
+        # BatchGetItem rejects duplicate keys
+        keys = list({(b['booking_id'], b['restaurant_name']): None for b in bookings})
+        found = {}
+        for start in range(0, len(keys), BATCH_GET_SIZE):
+            request = {table_name: {'Keys': [_booking_key(*key) for key in keys[start:start + BATCH_GET_SIZE]]}}
+            for attempt in range(BATCH_GET_ATTEMPTS):
+                response = client.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(table_name, []):
+                    booking = _deserialize(item)
+                    found[(booking['booking_id'], booking['restaurant_name'])] = booking
+                request = response.get('UnprocessedKeys')
+                if not request:
+                    break
+                time.sleep(0.05 * 2 ** attempt)
+            else:
+                return 'Could not read all bookings, please try again'
+        return {
+            booking_id: found.get((booking_id, restaurant_name), f'No booking found with ID {booking_id}')
+            for booking_id, restaurant_name in keys
+        }
+    except Exception as e:
+        print(e)
+        return str(e)
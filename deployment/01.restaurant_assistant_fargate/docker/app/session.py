@@ -1,53 +1,362 @@
-import boto3
+"""
+Session persistence for the restaurant assistant.
+
+Sessions are stored as an append-only log in DynamoDB, one item per turn:
+
+    session_id (HASH) | seq (RANGE, N) | payload (B) | tokens (N) | part (N) | parts (N) | ttl (N)
+
+`payload` is the zlib-compressed JSON of the messages the turn added, so a
+turn costs one small write however long the conversation is. A turn whose
+compressed payload is over MAX_ITEM_PAYLOAD is split over several items
+(`part` of `parts`) written in one transaction, so no item hits the 400 KB
+DynamoDB limit. `tokens` is the turn's estimated token count, and the
+highest seq is the session's version.
+
+Loading queries the newest items first and stops once the turns read cover
+the token budget of the conversation manager: older turns would be evicted
+straight away, so they are never read. Recent sessions are cached in
+process with their version; a hot session is served from the cache with no
+read at all. Appends are conditional on the seq being free, so a turn
+written by another task is detected, the cache entry is refreshed and the
+turn is appended after it.
+"""
+import asyncio
 import json
+import logging
+import os
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from aws_clients import get_client
+from token_budget_manager import estimate_message_tokens
+
+logger = logging.getLogger(__name__)
+
+session_table_name = os.environ.get("SESSION_TABLE_NAME", "restaurant-assistant-sessions")
+# Estimated tokens of history loaded per session (the conversation manager's budget)
+SESSION_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "40000"))
+# Sessions cached in process, and how long a cached session is trusted
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "256"))
+SESSION_CACHE_TTL = float(os.environ.get("SESSION_CACHE_TTL", "300"))
+# Compressed bytes per item, leaving room for the other attributes
+MAX_ITEM_PAYLOAD = 350 * 1024
+# Items read per query page while loading a session
+LOAD_PAGE_SIZE = 20
+# Attempts to append a turn when other writers keep taking the next seq
+MAX_APPEND_ATTEMPTS = 3
+
+# The process-wide DynamoDB client, shared with the booking tools
+dynamodb_client = get_client('dynamodb')
+# Session I/O gets its own small pool so it never waits behind agent threads
+_session_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="session-io")
+
+
+@dataclass
+class Turn:
+    """Messages added by one turn, as stored."""
+
+    seq: int
+    tokens: int
+    # Uncompressed JSON of the turn's messages
+    data: str
+
+
+@dataclass
+class SessionWindow:
+    """The recent part of a session, as handed to an agent."""
+
+    session_id: str
+    version: int
+    messages: list
+    # The loaded message objects; anything else in agent.messages is new.
+    # Kept alive so their ids cannot be reused by new messages.
+    _loaded: list = field(default_factory=list, init=False, repr=False)
 
-session_table_name = "restaurant-assistant-sessions"
-dynamodb_resource = boto3.resource('dynamodb')
+    def __post_init__(self):
+        self._loaded = list(self.messages)
+        self._loaded_ids = {id(m) for m in self._loaded}
 
-def save_session(session_id:str, messages:[],ttl_days=7):
+    def new_messages(self, messages: list) -> list:
+        """Messages of `messages` that were not loaded from the store."""
+        return [m for m in messages if id(m) not in self._loaded_ids]
+
+
+@dataclass
+class _CachedSession:
+    version: int
+    # Oldest first, trimmed to the token budget
+    turns: list
+    cached_at: float
+
+
+class SessionStore:
     """
-    保存session`
-    :param session_id: session id
-    :param messages: session messages
-    :param ttl_days: session ttl days
-    :return: True or False
+    Append-only, compressed session log with a per-process cache.
+
+    Args:
+        table_name: DynamoDB table with session_id (S) HASH and seq (N) RANGE keys
+        client: boto3 DynamoDB client
+        token_budget: estimated tokens of history to load per session
+        cache_size: sessions kept in the in-process cache
+        cache_ttl: seconds a cached session is served without reading
+        ttl_days: days until stored turns expire
     """
-    try:
-        table = dynamodb_resource.Table(session_table_name)
-        # 计算TTL时间 (当前时间 + ttl_days天)
-        ttl_timestamp = int((datetime.now() + timedelta(days=ttl_days)).timestamp())
 
-        table.put_item(
-            Item={
-                'session_id': session_id,
-                'messages': json.dumps(messages,ensure_ascii=False),
-                'ttl': ttl_timestamp  
+    def __init__(
+        self,
+        table_name: str,
+        client,
+        token_budget: int = SESSION_TOKEN_BUDGET,
+        cache_size: int = SESSION_CACHE_SIZE,
+        cache_ttl: float = SESSION_CACHE_TTL,
+        ttl_days: int = 7,
+    ):
+        self.table_name = table_name
+        self.client = client
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.ttl_days = ttl_days
+        self._cache: OrderedDict[str, _CachedSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> SessionWindow:
+        """Load the recent turns of a session that fit in the token budget."""
+        cached = self._cached(session_id)
+        if cached is None:
+            version, turns = self._read_window(session_id)
+            cached = self._remember(session_id, version, turns)
+        messages = [m for turn in cached.turns for m in json.loads(turn.data)]
+        return SessionWindow(session_id, cached.version, messages)
+
+    def save(self, window: SessionWindow, messages: list) -> bool:
+        """
+        Append the messages added since `window` was loaded as one turn.
+
+        Returns:
+            True if the turn was stored (or there was nothing to store)
+        """
+        new_messages = window.new_messages(messages)
+        if not new_messages:
+            return True
+        data = json.dumps(new_messages, ensure_ascii=False)
+        tokens = sum(estimate_message_tokens(m) for m in new_messages)
+        payload = zlib.compress(data.encode("utf-8"))
+        parts = [payload[i:i + MAX_ITEM_PAYLOAD] for i in range(0, len(payload), MAX_ITEM_PAYLOAD)]
+
+        version = window.version
+        for _ in range(MAX_APPEND_ATTEMPTS):
+            try:
+                self._append(window.session_id, version, parts, tokens)
+            except ClientError as e:
+                if not _is_condition_failure(e):
+                    logger.exception(f"Failed to save session {window.session_id}")
+                    return False
+                # Another writer appended first: append after its turns
+                version = self._read_version(window.session_id)
+                self._forget(window.session_id)
+                logger.info(f"Session {window.session_id} changed elsewhere, appending at {version + 1}")
+                continue
+            except Exception:
+                logger.exception(f"Failed to save session {window.session_id}")
+                return False
+
+            new_version = version + len(parts)
+            self._extend_cache(window.session_id, version, Turn(new_version, tokens, data))
+            window.version = new_version
+            # Everything the agent holds is stored now; messages the
+            # conversation manager evicted need not be tracked any more
+            window._loaded = list(messages)
+            window._loaded_ids = {id(m) for m in messages}
+            return True
+
+        logger.error(f"Failed to save session {window.session_id}: too many concurrent writers")
+        return False
+
+    def is_current(self, window: SessionWindow) -> bool:
+        """
+        True if `window` is the version cached for its session, i.e. no other
+        writer appended since and the cache entry has not expired.
+        """
+        cached = self._cached(window.session_id)
+        return cached is not None and cached.version == window.version
+
+    def _append(self, session_id: str, version: int, parts: list, tokens: int) -> None:
+        ttl = str(int((datetime.now() + timedelta(days=self.ttl_days)).timestamp()))
+        items = [
+            {
+                'session_id': {'S': session_id},
+                'seq': {'N': str(version + 1 + index)},
+                'payload': {'B': part},
+                'part': {'N': str(index)},
+                'parts': {'N': str(len(parts))},
+                'tokens': {'N': str(tokens)},
+                'ttl': {'N': ttl},
             }
+            for index, part in enumerate(parts)
+        ]
+        condition = "attribute_not_exists(seq)"
+        if len(items) == 1:
+            self.client.put_item(TableName=self.table_name, Item=items[0], ConditionExpression=condition)
+        else:
+            self.client.transact_write_items(TransactItems=[
+                {'Put': {'TableName': self.table_name, 'Item': item, 'ConditionExpression': condition}}
+                for item in items
+            ])
+
+    def _read_window(self, session_id: str) -> tuple[int, list]:
+        """Read turns newest first until they cover the token budget."""
+        version = 0
+        turns: list[Turn] = []
+        chunks: list[bytes] = []
+        expected_part = 0
+        tokens = 0
+        kwargs = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': 'session_id = :sid',
+            'ExpressionAttributeValues': {':sid': {'S': session_id}},
+            'ScanIndexForward': False,
+            'Limit': LOAD_PAGE_SIZE,
+        }
+        while True:
+            response = self.client.query(**kwargs)
+            for item in response.get('Items', []):
+                seq = int(item['seq']['N'])
+                version = version or seq
+                part, parts = int(item['part']['N']), int(item['parts']['N'])
+                # Parts arrive last first; skip turns with a part missing
+                # (e.g. expired by TTL one item at a time)
+                if part != (parts - 1 if not chunks else expected_part):
+                    chunks = []
+                    if part != parts - 1:
+                        continue
+                chunks.append(item['payload']['B'])
+                expected_part = part - 1
+                if part > 0:
+                    continue
+                # Reached the first part of a turn: it is complete
+                payload = b"".join(reversed(chunks))
+                chunks = []
+                turn_tokens = int(item['tokens']['N'])
+                end_seq = seq + parts - 1
+                if turns and tokens + turn_tokens > self.token_budget:
+                    return version, turns[::-1]
+                turns.append(Turn(end_seq, turn_tokens, zlib.decompress(payload).decode("utf-8")))
+                tokens += turn_tokens
+            if 'LastEvaluatedKey' not in response:
+                return version, turns[::-1]
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _read_version(self, session_id: str) -> int:
+        response = self.client.query(
+            TableName=self.table_name,
+            KeyConditionExpression='session_id = :sid',
+            ExpressionAttributeValues={':sid': {'S': session_id}},
+            ProjectionExpression='seq',
+            ScanIndexForward=False,
+            Limit=1,
         )
+        items = response.get('Items', [])
+        return int(items[0]['seq']['N']) if items else 0
+
+    def _cached(self, session_id: str) -> Optional[_CachedSession]:
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is None:
+                return None
+            if time.monotonic() - cached.cached_at > self.cache_ttl:
+                del self._cache[session_id]
+                return None
+            self._cache.move_to_end(session_id)
+            return cached
+
+    def _remember(self, session_id: str, version: int, turns: list) -> _CachedSession:
+        cached = _CachedSession(version, turns, time.monotonic())
+        with self._lock:
+            current = self._cache.get(session_id)
+            if current is not None and current.version > version:
+                return current
+            self._cache[session_id] = cached
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return cached
+
+    def _extend_cache(self, session_id: str, version: int, turn: Turn) -> None:
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is None or cached.version != version:
+                # Not cached, or cached at another version: reload on next use
+                self._cache.pop(session_id, None)
+                return
+            turns = cached.turns + [turn]
+            # Drop the oldest turns the window no longer needs
+            tokens = sum(t.tokens for t in turns)
+            while len(turns) > 1 and tokens > self.token_budget:
+                tokens -= turns[0].tokens
+                turns = turns[1:]
+            self._cache[session_id] = _CachedSession(turn.seq, turns, time.monotonic())
+            self._cache.move_to_end(session_id)
+
+    def _forget(self, session_id: str) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+
+def _is_condition_failure(e: ClientError) -> bool:
+    code = e.response.get('Error', {}).get('Code')
+    if code == 'ConditionalCheckFailedException':
         return True
-    except Exception as e:
-        print(e)
-        return False
+    if code == 'TransactionCanceledException':
+        reasons = e.response.get('CancellationReasons') or []
+        return any(r.get('Code') == 'ConditionalCheckFailed' for r in reasons)
+    return False
+
 
-def load_session(session_id:str):
+session_store = SessionStore(session_table_name, dynamodb_client)
+
+
+def load_session(session_id:str) -> SessionWindow:
     """
-    加载session
+    加载session (只加载会保留在上下文中的最近几轮)
     :param session_id: session id
-    :return: session messages
+    :return: session window; its messages are handed to the agent
     """
-    try:
-        table = dynamodb_resource.Table(session_table_name)
-        response = table.get_item(
-            Key={
-                'session_id': session_id
-            }
-        )
-        if 'Item' in response:
-            return json.loads(response['Item']['messages'])
-        else:
-            return []
-    except Exception as e:
-        print(e)
-        return []
+    return session_store.load(session_id)
+
+def save_session(window:SessionWindow, messages:list) -> bool:
+    """
+    保存session (只追加本轮新增的消息)
+    :param window: session window returned by load_session
+    :param messages: the agent's messages after the turn
+    :return: True or False
+    """
+    return session_store.save(window, messages)
+
+async def load_session_async(session_id:str) -> SessionWindow:
+    """
+    在线程池中加载session, 不阻塞事件循环
+    :param session_id: session id
+    :return: session window
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_session_executor, load_session, session_id)
+
+async def save_session_async(window:SessionWindow, messages:list) -> bool:
+    """
+    在线程池中保存session, 不阻塞事件循环
+    :param window: session window returned by load_session
+    :param messages: the agent's messages after the turn
+    :return: True or False
+    """
+    loop = asyncio.get_running_loop()
+    # Copy so the agent can keep appending while the turn is written
+    return await loop.run_in_executor(_session_executor, save_session, window, list(messages))
@@ -0,0 +1,112 @@
+"""
+Load test for the restaurant assistant service.
+
+Saturates /invoke with concurrent requests while polling /health, and
+checks that health checks stay fast while the agent is busy. Past
+MAX_CONCURRENT_INVOCATIONS + MAX_QUEUED_INVOCATIONS the service should
+answer 429 instead of letting requests pile up.
+
+Usage:
+    python load_test.py --url http://<alb-dns-name> --api-key <key> \\
+        --concurrency 20 --duration 60
+
+Exits with status 1 if the health check p99 latency exceeds
+--health-max-ms or any health check fails.
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+PROMPT = "Which restaurants do you have in San Francisco, and what is on the menu at Nonna?"
+
+
+def _request(url: str, data: bytes | None = None, headers: dict | None = None, timeout: float = 300):
+    request = urllib.request.Request(url, data=data, headers=headers or {}, method="POST" if data else "GET")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - start
+
+
+def invoke_worker(args, stop: threading.Event, results: list):
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {args.api_key}"}
+    while not stop.is_set():
+        body = json.dumps({"prompt": args.prompt, "session_id": f"load-test-{uuid.uuid4()}"}).encode()
+        status, elapsed = _request(f"{args.url}/invoke", body, headers)
+        results.append((status, elapsed))
+        if status == 429:
+            # Back off like a well-behaved client would
+            time.sleep(1)
+
+
+def health_worker(args, stop: threading.Event, results: list):
+    while not stop.is_set():
+        results.append(_request(f"{args.url}/health", timeout=args.health_timeout))
+        time.sleep(args.health_interval)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="Service base URL, e.g. http://my-alb.elb.amazonaws.com")
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent /invoke clients")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to keep the load up")
+    parser.add_argument("--prompt", default=PROMPT)
+    parser.add_argument("--health-interval", type=float, default=0.5)
+    parser.add_argument("--health-timeout", type=float, default=5, help="The ALB health check timeout")
+    parser.add_argument("--health-max-ms", type=float, default=500, help="Allowed health check p99 latency")
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+
+    stop = threading.Event()
+    invoke_results: list = []
+    health_results: list = []
+    with ThreadPoolExecutor(max_workers=args.concurrency + 1) as pool:
+        pool.submit(health_worker, args, stop, health_results)
+        for _ in range(args.concurrency):
+            pool.submit(invoke_worker, args, stop, invoke_results)
+        time.sleep(args.duration)
+        stop.set()
+        print("Waiting for in-flight requests to finish...")
+
+    statuses = Counter(status for status, _ in invoke_results)
+    ok_latencies = [elapsed for status, elapsed in invoke_results if status == 200]
+    health_latencies = [elapsed * 1000 for _, elapsed in health_results]
+    health_failures = sum(1 for status, _ in health_results if status != 200)
+
+    print(f"/invoke: {len(invoke_results)} requests, statuses {dict(statuses)}")
+    if ok_latencies:
+        print(f"/invoke latency (200s): p50 {statistics.median(ok_latencies):.1f}s, "
+              f"p99 {percentile(ok_latencies, 99):.1f}s")
+    print(f"/health: {len(health_results)} checks, {health_failures} failed, "
+          f"p50 {percentile(health_latencies, 50):.0f}ms, p99 {percentile(health_latencies, 99):.0f}ms, "
+          f"max {max(health_latencies, default=0):.0f}ms")
+
+    healthy = health_failures == 0 and percentile(health_latencies, 99) <= args.health_max_ms
+    print("PASS" if healthy else f"FAIL: health checks must succeed within {args.health_max_ms:.0f}ms (p99)")
+    return 0 if healthy else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -77,15 +77,18 @@ class AmazonDynamoDB:
                 Overwrite=True
             )
     
-    def create_dynamodb_2(self, kb_name: str, table_name: str, pk_item: str, ttl_attribute: str = "ttl"):
+    def create_dynamodb_2(self, kb_name: str, table_name: str, pk_item: str, sk_item: str = "seq", ttl_attribute: str = "ttl"):
         try:
+            # 会话按轮次追加存储: session_id (HASH) + seq (RANGE, N)
             table = self._dynamodb_resource.create_table(
                 TableName=table_name,
                 KeySchema=[
                     {"AttributeName": pk_item, "KeyType": "HASH"},
+                    {"AttributeName": sk_item, "KeyType": "RANGE"},
                 ],
                 AttributeDefinitions=[
                     {"AttributeName": pk_item, "AttributeType": "S"},
+                    {"AttributeName": sk_item, "AttributeType": "N"},
                 ],
                 BillingMode="PAY_PER_REQUEST",  # Use on-demand capacity mode
             )
@@ -181,6 +184,7 @@ if __name__ == '__main__':
             data['knowledge_base_name'],
             data['session_table_name'],
             data['session_pk_item'],
+            data['session_sk_item'],
             'ttl'
         )
         print(f"Table Name: {data['session_table_name']}")
@@ -7,6 +7,10 @@ Resources have been removed for compatibility with clients that don't support MC
 It exposes skills from a configurable directory structure.
 """
 
+# Times the imports below when STARTUP_PROFILE=1
+import startup_profile
+startup_profile.start()
+
 import os
 import re
 import logging
@@ -18,13 +22,13 @@ import sys
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Union
 from mcp.server.fastmcp import FastMCP
-import boto3
-from botocore.exceptions import ClientError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+startup_profile.mark("imports")
+
 # Initialize FastMCP server
 mcp_server = FastMCP("skills-mcp-server",stateless_http=True)
 
@@ -814,6 +818,9 @@ def s3_upload(
            )
     """
     logger.info(f"S3 upload request: {file_path}")
+    # Only this tool talks to AWS; boto3 is not loaded at startup
+    import boto3
+    from botocore.exceptions import ClientError
 
     try:
         # Expand user path
@@ -1165,6 +1172,9 @@ if __name__ == "__main__":
     logger.info(f"Skills Directory: {SKILLS_DIR}")
     logger.info("=" * 60)
 
+    startup_profile.mark("server setup")
+    startup_profile.report()
+
     # Run the server
     logger.info("Starting server with streamable-http transport...")
     mcp_server.run(transport="streamable-http")
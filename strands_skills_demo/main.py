@@ -1,6 +1,5 @@
 from strands import Agent
 from strands.models import BedrockModel
-from strands.agent.conversation_manager import SummarizingConversationManager,SlidingWindowConversationManager
 from strands_tools import file_read, shell, editor,file_write,tavily
 import boto3
 import json
@@ -8,6 +7,7 @@ import os
 import asyncio
 import argparse
 from skill_tool import generate_skill_tool,SkillToolInterceptor 
+from token_budget_manager import TokenBudgetConversationManager
 from ask_user_tool import ask_user
 from pathlib import Path
 from dotenv import load_dotenv
@@ -82,10 +82,11 @@ summarization_model = BedrockModel(
     temperature=0.1,  # Low temperature for consistent summaries
 )
 
-conversation_manager = SummarizingConversationManager(
-    summary_ratio=0.4,
+# Summarize only when the history exceeds the token budget, not after a fixed message count
+conversation_manager = TokenBudgetConversationManager(
+    max_tokens=int(os.environ.get('CONTEXT_TOKEN_BUDGET', '120000')),
     preserve_recent_messages=20,
-    summarization_agent=Agent(model=summarization_model,system_prompt=DEFAULT_SUMMARIZATION_PROMPT)
+    summarization_agent=Agent(model=summarization_model,system_prompt=DEFAULT_SUMMARIZATION_PROMPT,callback_handler=None)
 )
 
 # Dynamically create skill tools, as it should read Skills folders when agent starts.